@@ -7,6 +7,8 @@ from pathlib import Path
 import yaml
 from tools.logger import get_logger
 from tools.agent_communication import get_communication_system
+from tools.log_tail import LogTailer
+from tools.pattern_matcher import PatternMatcher
 
 
 class LogAnalyzer:
@@ -22,6 +24,13 @@ class LogAnalyzer:
         self.check_interval = agent_config.get('check_interval', 120)
         self.log_paths = agent_config.get('log_paths', [])
         self.patterns = agent_config.get('patterns', {})
+        self.matcher = PatternMatcher(
+            [(pattern_type, pattern) for pattern_type, pattern_list in self.patterns.items() for pattern in pattern_list],
+            re.IGNORECASE
+        )
+        
+        # Only lines appended since the last cycle are analyzed; offsets survive restarts
+        self.tailer = LogTailer(agent_config.get('state_file', './data/log_analyzer_offsets.json'))
         
         self.findings = []
         self.max_findings = 500
@@ -52,6 +61,7 @@ class LogAnalyzer:
     
     def stop(self):
         self.running = False
+        self.tailer.save()
         self.comm_system.unregister_agent(self.agent_name)
         self.logger.info("Log Analyzer stopped")
     
@@ -65,6 +75,9 @@ class LogAnalyzer:
                 self._analyze_file(log_path)
             else:
                 self.logger.warning(f"Log path not found: {log_path}")
+        
+        self.tailer.forget_missing()
+        self.tailer.save()
     
     def _analyze_directory(self, directory: str):
         try:
@@ -84,34 +97,24 @@ class LogAnalyzer:
             if not os.path.exists(file_path):
                 return
             
-            file_size = os.path.getsize(file_path)
-            if file_size > 100 * 1024 * 1024:
-                self.logger.warning(f"Skipping large file (>100MB): {file_path}")
-                return
-            
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()[-1000:]
-            
-            for line_num, line in enumerate(lines, 1):
+            for line_num, line in self.tailer.read_new_lines(file_path):
                 self._check_patterns(file_path, line_num, line)
                 
         except Exception as e:
             self.logger.error(f"Error analyzing file {file_path}: {e}")
     
     def _check_patterns(self, file_path: str, line_num: int, line: str):
-        for pattern_type, pattern_list in self.patterns.items():
-            for pattern in pattern_list:
-                if re.search(pattern, line, re.IGNORECASE):
-                    finding = {
-                        'timestamp': datetime.now().isoformat(),
-                        'file': file_path,
-                        'line_number': line_num,
-                        'type': pattern_type,
-                        'pattern': pattern,
-                        'content': line.strip()[:200]
-                    }
-                    
-                    self._handle_finding(finding)
+        for match in self.matcher.match_all(line):
+            finding = {
+                'timestamp': datetime.now().isoformat(),
+                'file': file_path,
+                'line_number': line_num,
+                'type': match.name,
+                'pattern': match.pattern,
+                'content': line.strip()[:200]
+            }
+            
+            self._handle_finding(finding)
     
     def _handle_finding(self, finding: Dict):
         self.findings.append(finding)
@@ -1,4 +1,3 @@
-import psutil
 import time
 from datetime import datetime
 from typing import Dict
@@ -6,6 +5,8 @@ import yaml
 from pathlib import Path
 from tools.logger import get_logger
 from tools.agent_communication import get_communication_system
+from tools.metrics_store import get_metrics_store, DEFAULT_STORE_PATH
+from tools.metrics_sampler import get_metrics_sampler
 
 
 class PerformanceMonitor:
@@ -20,8 +21,15 @@ class PerformanceMonitor:
         self.thresholds = self.config.get('agents', {}).get('performance_monitor', {}).get('thresholds', {})
         self.check_interval = self.config.get('agents', {}).get('performance_monitor', {}).get('check_interval', 30)
         
-        self.metrics_history = []
-        self.max_history = 100
+        monitor_config = self.config.get('agents', {}).get('performance_monitor', {})
+        self.store = get_metrics_store(monitor_config.get('metrics_store', DEFAULT_STORE_PATH))
+        self.save_interval = monitor_config.get('save_interval', 300)
+        
+        # Samples every sample_interval seconds into the store; checks read its snapshot
+        self.sampler = get_metrics_sampler(monitor_config.get('sample_interval', 1))
+        self.sampler.record_to(self.store)
+        self.last_metrics = None
+        self._last_save = time.time()
         
         self.comm_system.register_agent(self.agent_name)
         self.logger.info("Performance Monitor initialized")
@@ -33,6 +41,7 @@ class PerformanceMonitor:
     
     def start(self):
         self.running = True
+        self.sampler.start()
         self.logger.info("Performance Monitor started")
         
         try:
@@ -47,44 +56,14 @@ class PerformanceMonitor:
     
     def stop(self):
         self.running = False
+        self.sampler.stop()
+        self.store.save()
         self.comm_system.unregister_agent(self.agent_name)
         self.logger.info("Performance Monitor stopped")
     
     def _collect_metrics(self) -> Dict:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        net_io = psutil.net_io_counters()
-        
-        metrics = {
-            'timestamp': datetime.now().isoformat(),
-            'cpu': {
-                'percent': cpu_percent,
-                'count': psutil.cpu_count(),
-                'per_cpu': psutil.cpu_percent(percpu=True)
-            },
-            'memory': {
-                'total_gb': round(memory.total / (1024**3), 2),
-                'available_gb': round(memory.available / (1024**3), 2),
-                'used_gb': round(memory.used / (1024**3), 2),
-                'percent': memory.percent
-            },
-            'disk': {
-                'total_gb': round(disk.total / (1024**3), 2),
-                'used_gb': round(disk.used / (1024**3), 2),
-                'free_gb': round(disk.free / (1024**3), 2),
-                'percent': disk.percent
-            },
-            'network': {
-                'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
-                'bytes_recv_mb': round(net_io.bytes_recv / (1024**2), 2),
-                'packets_sent': net_io.packets_sent,
-                'packets_recv': net_io.packets_recv
-            }
-        }
-        
-        self.logger.debug(f"Metrics collected - CPU: {cpu_percent}%, Memory: {memory.percent}%, Disk: {disk.percent}%")
+        metrics = self.sampler.latest()
+        self.logger.debug(f"Metrics collected - CPU: {metrics['cpu']['percent']}%, Memory: {metrics['memory']['percent']}%, Disk: {metrics['disk']['percent']}%")
         return metrics
     
     def _analyze_metrics(self, metrics: Dict):
@@ -138,45 +117,37 @@ class PerformanceMonitor:
         )
     
     def _store_metrics(self, metrics: Dict):
-        self.metrics_history.append(metrics)
+        self.last_metrics = metrics
         
-        if len(self.metrics_history) > self.max_history:
-            self.metrics_history = self.metrics_history[-self.max_history:]
+        if time.time() - self._last_save >= self.save_interval:
+            self.store.save()
+            self._last_save = time.time()
     
     def get_current_status(self) -> Dict:
-        if self.metrics_history:
-            return self.metrics_history[-1]
-        return {}
+        return self.last_metrics or {}
     
     def get_metrics_summary(self, count: int = 10) -> Dict:
-        recent_metrics = self.metrics_history[-count:] if count > 0 else self.metrics_history
-        
-        if not recent_metrics:
-            return {}
+        # Summary over the last `count` check intervals (everything retained if count <= 0)
+        seconds = count * self.check_interval if count > 0 else max(
+            resolution * capacity for resolution, capacity in self.store.resolutions
+        )
         
-        cpu_values = [m['cpu']['percent'] for m in recent_metrics]
-        memory_values = [m['memory']['percent'] for m in recent_metrics]
-        disk_values = [m['disk']['percent'] for m in recent_metrics]
+        summary = {}
+        samples = 0
+        for group in ('cpu', 'memory', 'disk'):
+            stats = self.store.summary(f"{group}.percent", seconds)
+            if not stats:
+                return {}
+            summary[group] = {
+                'avg': round(stats['avg'], 2),
+                'max': stats['max'],
+                'min': stats['min'],
+                'p95': stats['p95']
+            }
+            samples = stats['samples']
         
-        return {
-            'cpu': {
-                'avg': round(sum(cpu_values) / len(cpu_values), 2),
-                'max': max(cpu_values),
-                'min': min(cpu_values)
-            },
-            'memory': {
-                'avg': round(sum(memory_values) / len(memory_values), 2),
-                'max': max(memory_values),
-                'min': min(memory_values)
-            },
-            'disk': {
-                'avg': round(sum(disk_values) / len(disk_values), 2),
-                'max': max(disk_values),
-                'min': min(disk_values)
-            },
-            'samples': len(recent_metrics)
-        }
-
+        summary['samples'] = samples
+        return summary
 
 if __name__ == "__main__":
     monitor = PerformanceMonitor()
@@ -1,18 +1,29 @@
 import os
-import re
 import time
-import subprocess
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Set, Optional
 from pathlib import Path
 import yaml
 from collections import defaultdict
 from tools.logger import get_logger
 from tools.agent_communication import get_communication_system
+from tools.pattern_matcher import PatternMatcher
+from tools.log_tail import LogTailer
+from tools.sliding_window import SlidingWindowCounter
+from tools.firewall import FirewallBlocker
 
 
 class SecurityMonitor:
+    FAILED_LOGIN_MATCHER = PatternMatcher([
+        ('failed_password', r'Failed password for (\w+) from ([\d\.]+)'),
+        ('failed_password_invalid_user', r'Failed password for invalid user (\w+) from ([\d\.]+)'),
+        ('authentication_failure', r'authentication failure.*user=(\w+)'),
+        ('invalid_user', r'Invalid user (\w+) from ([\d\.]+)'),
+        ('closed_authenticating', r'Connection closed by authenticating user (\w+) ([\d\.]+)'),
+        ('max_auth_attempts', r'maximum authentication attempts exceeded for (\w+) from ([\d\.]+)'),
+    ])
+    
     def __init__(self):
         self.logger = get_logger('security_monitor')
         self.config = self._load_config()
@@ -26,11 +37,20 @@ class SecurityMonitor:
         self.monitored_ports = agent_config.get('monitored_ports', [])
         self.max_failed_logins = agent_config.get('max_failed_logins', 5)
         
-        self.failed_login_attempts = defaultdict(list)
+        # Failed logins per IP in 30 buckets over the window; memory capped by max_tracked_ips
+        self.failed_logins = SlidingWindowCounter(
+            agent_config.get('failed_login_window_minutes', 30) * 60,
+            buckets=30,
+            max_keys=agent_config.get('max_tracked_ips', 10000),
+            sketch_width=agent_config.get('sketch_width', 0)
+        )
+        self.pending_blocks: Dict[str, Dict] = {}
+        self.tailer = LogTailer(agent_config.get('state_file', './data/security_monitor_offsets.json'))
         self.security_events = []
         self.max_events = 1000
         
-        self.blocked_ips: Set[str] = set()
+        # Blocked IP -> epoch when its firewall block expires (0 = permanent)
+        self.blocked_ips: Dict[str, float] = {}
         self.blocked_ips_file = Path(agent_config.get('suspicious_ips_file', './configs/suspicious_ips.txt'))
         
         self.whitelist_ips: Set[str] = set()
@@ -38,6 +58,11 @@ class SecurityMonitor:
         
         self.auto_block_enabled = agent_config.get('auto_block_enabled', True)
         self.block_duration_minutes = agent_config.get('block_duration_minutes', 1440)
+        self.firewall = FirewallBlocker(
+            backend=agent_config.get('block_backend', 'auto'),
+            set_name=agent_config.get('ipset_name', 'ai_blocked_ips'),
+            timeout_seconds=self.block_duration_minutes * 60
+        )
         
         self._load_whitelist_ips()
         self._load_blocked_ips()
@@ -66,6 +91,7 @@ class SecurityMonitor:
     
     def stop(self):
         self.running = False
+        self.tailer.save()
         self.comm_system.unregister_agent(self.agent_name)
         self.logger.info("Security Monitor stopped")
     
@@ -92,34 +118,18 @@ class SecurityMonitor:
         for log_path in all_paths:
             if not os.path.exists(log_path):
                 continue
-                
-            try:
-                with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()[-100:]
-                
-                for line in lines:
-                    self._analyze_auth_line(line)
-                    
-            except PermissionError:
-                self.logger.debug(f"No permission to read {log_path}")
-            except Exception as e:
-                self.logger.debug(f"Could not read {log_path}: {e}")
+            
+            # Only lines appended since the previous check
+            for _, line in self.tailer.read_new_lines(log_path):
+                self._analyze_auth_line(line)
+        
+        self.tailer.save()
+        self._flush_blocks()
     
     def _analyze_auth_line(self, line: str):
-        failed_patterns = [
-            r'Failed password for (\w+) from ([\d\.]+)',
-            r'Failed password for invalid user (\w+) from ([\d\.]+)',
-            r'authentication failure.*user=(\w+)',
-            r'Invalid user (\w+) from ([\d\.]+)',
-            r'Connection closed by authenticating user (\w+) ([\d\.]+)',
-            r'maximum authentication attempts exceeded for (\w+) from ([\d\.]+)',
-        ]
-        
-        for pattern in failed_patterns:
-            match = re.search(pattern, line)
-            if match:
-                self._record_failed_login(line, match.groups())
-                break
+        match = self.FAILED_LOGIN_MATCHER.match_first(line)
+        if match:
+            self._record_failed_login(line, match.groups)
     
     def _record_failed_login(self, log_line: str, match_groups: tuple):
         timestamp = datetime.now()
@@ -146,27 +156,11 @@ class SecurityMonitor:
         if ip_address == 'unknown' or ip_address in self.blocked_ips:
             return
         
-        self.failed_login_attempts[ip_address].append(timestamp)
-        
-        recent_attempts = [
-            t for t in self.failed_login_attempts[ip_address]
-            if timestamp - t < timedelta(minutes=30)
-        ]
-        self.failed_login_attempts[ip_address] = recent_attempts
+        attempts = self.failed_logins.add(ip_address)
         
-        if len(recent_attempts) >= self.max_failed_logins:
-            self._block_ip_address(ip_address, username, len(recent_attempts))
-            self._send_security_alert(
-                f"تم حظر IP {ip_address} تلقائياً",
-                {
-                    'ip_address': ip_address,
-                    'username': username,
-                    'attempts': len(recent_attempts),
-                    'threshold': self.max_failed_logins,
-                    'action': 'blocked'
-                },
-                severity='critical'
-            )
+        if attempts >= self.max_failed_logins:
+            # Blocked in one batch at the end of the check
+            self.pending_blocks[ip_address] = {'username': username, 'attempts': attempts}
     
     def _check_suspicious_processes(self):
         try:
@@ -251,98 +245,131 @@ class SecurityMonitor:
         except Exception as e:
             self.logger.error(f"خطأ في تحميل IPs الموثوقة: {e}")
     
+    def _block_expiry(self, now: float) -> float:
+        return now + self.firewall.timeout_seconds if self.firewall.expires else 0
+    
     def _load_blocked_ips(self):
         try:
             if self.blocked_ips_file.exists():
+                now = time.time()
+                stale = False
                 with open(self.blocked_ips_file, 'r') as f:
-                    self.blocked_ips = {line.strip() for line in f if line.strip()}
+                    for line in f:
+                        parts = line.split()
+                        if not parts:
+                            continue
+                        if len(parts) > 1 and self.firewall.expires:
+                            self.blocked_ips[parts[0]] = float(parts[1])
+                        else:
+                            # No recorded expiry (permanent, or written by an older version),
+                            # or a firewall that keeps blocks: expire as a new block would
+                            self.blocked_ips[parts[0]] = self._block_expiry(now)
+                            stale = stale or (len(parts) > 1) != self.firewall.expires
                 self.logger.info(f"🛡️ تم تحميل {len(self.blocked_ips)} IP محظور")
+                if not self._prune_expired_blocks(now) and stale:
+                    self._rewrite_blocked_ips()
         except Exception as e:
             self.logger.error(f"خطأ في تحميل IPs المحظورة: {e}")
     
+    def _prune_expired_blocks(self, now: Optional[float] = None) -> int:
+        # The firewall dropped these entries itself; forget them so the IPs are counted again
+        now = time.time() if now is None else now
+        expired = [ip for ip, expires_at in self.blocked_ips.items() if expires_at and expires_at <= now]
+        if not expired:
+            return 0
+        for ip_address in expired:
+            del self.blocked_ips[ip_address]
+        self._rewrite_blocked_ips()
+        self.logger.info(f"⌛ انتهى حظر {len(expired)} IP")
+        return len(expired)
+    
     def _restore_iptables_rules(self):
         if not self.auto_block_enabled or not self.blocked_ips:
             return
         
-        restored = 0
-        failed = 0
+        # Restored ipset entries expire when the original block would have
+        now = time.time()
+        timeouts = {
+            ip: max(1, int(expires_at - now)) for ip, expires_at in self.blocked_ips.items() if expires_at
+        }
+        restored, failed = self.firewall.block(sorted(self.blocked_ips), timeouts=timeouts)
         
-        for ip in self.blocked_ips:
-            try:
-                result = subprocess.run(
-                    ['sudo', 'iptables', '-C', 'INPUT', '-s', ip, '-j', 'DROP'],
-                    capture_output=True,
-                    timeout=5
-                )
-                
-                if result.returncode != 0:
-                    result = subprocess.run(
-                        ['sudo', 'iptables', '-A', 'INPUT', '-s', ip, '-j', 'DROP'],
-                        capture_output=True,
-                        timeout=5
-                    )
-                    
-                    if result.returncode == 0:
-                        restored += 1
-                    else:
-                        failed += 1
-                        self.logger.warning(f"فشل استعادة حظر {ip}")
-            except Exception as e:
-                failed += 1
-                self.logger.error(f"خطأ في استعادة حظر {ip}: {e}")
-        
-        if restored > 0:
-            self.logger.info(f"♻️ تم استعادة حظر {restored} IP بعد إعادة التشغيل")
-        if failed > 0:
-            self.logger.warning(f"⚠️ فشل استعادة {failed} IP")
+        if restored:
+            self.logger.info(f"♻️ تم استعادة حظر {len(restored)} IP بعد إعادة التشغيل")
+        if failed:
+            self.logger.warning(f"⚠️ فشل استعادة {len(failed)} IP")
     
-    def _block_ip_address(self, ip_address: str, username: str, attempts: int):
-        if not self.auto_block_enabled:
-            self.logger.debug(f"الحظر التلقائي معطل: {ip_address}")
+    def _flush_blocks(self):
+        if not self.pending_blocks:
             return
         
-        if ip_address in self.blocked_ips:
-            return
+        pending = self.pending_blocks
+        self.pending_blocks = {}
+        
+        to_block = []
+        for ip_address, info in pending.items():
+            if not self.auto_block_enabled:
+                self.logger.debug(f"الحظر التلقائي معطل: {ip_address}")
+            elif ip_address in self.whitelist_ips:
+                self.logger.warning(
+                    f"⚠️ IP {ip_address} في القائمة البيضاء - لن يتم حظره (المحاولات: {info['attempts']})"
+                )
+            elif ip_address not in self.blocked_ips:
+                to_block.append(ip_address)
+        
+        blocked, failed = self.firewall.block(to_block) if to_block else ([], [])
+        if failed:
+            self.logger.error(f"فشل حظر {len(failed)} IP: {', '.join(failed[:10])}")
+        
+        if blocked:
+            expires_at = self._block_expiry(time.time())
+            self.blocked_ips.update((ip_address, expires_at) for ip_address in blocked)
+            self._save_blocked_ips(blocked)
         
-        if ip_address in self.whitelist_ips:
+        for ip_address in blocked:
+            info = pending[ip_address]
+            self.failed_logins.discard(ip_address)
             self.logger.warning(
-                f"⚠️ IP {ip_address} في القائمة البيضاء - لن يتم حظره (المحاولات: {attempts})"
+                f"🛡️ تم حظر IP {ip_address} | المستخدم: {info['username']} | المحاولات: {info['attempts']}"
             )
-            return
+            self._notify_ai_manager_of_block(ip_address, info['username'], info['attempts'])
         
-        try:
-            result = subprocess.run(
-                ['sudo', 'iptables', '-A', 'INPUT', '-s', ip_address, '-j', 'DROP'],
-                capture_output=True,
-                text=True,
-                timeout=10
+        for ip_address, info in pending.items():
+            self._send_security_alert(
+                f"تم حظر IP {ip_address} تلقائياً",
+                {
+                    'ip_address': ip_address,
+                    'username': info['username'],
+                    'attempts': info['attempts'],
+                    'threshold': self.max_failed_logins,
+                    'action': 'blocked'
+                },
+                severity='critical'
             )
-            
-            if result.returncode == 0:
-                self.blocked_ips.add(ip_address)
-                self._save_blocked_ip(ip_address)
-                
-                self.logger.warning(
-                    f"🛡️ تم حظر IP {ip_address} | المستخدم: {username} | المحاولات: {attempts}"
-                )
-                
-                self._notify_ai_manager_of_block(ip_address, username, attempts)
-            else:
-                self.logger.error(f"فشل حظر IP {ip_address}: {result.stderr}")
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"انتهت مهلة حظر IP {ip_address}")
-        except Exception as e:
-            self.logger.error(f"خطأ في حظر IP {ip_address}: {e}")
     
-    def _save_blocked_ip(self, ip_address: str):
+    def _format_blocked_ip(self, ip_address: str) -> str:
+        expires_at = self.blocked_ips.get(ip_address)
+        return f"{ip_address} {int(expires_at)}\n" if expires_at else f"{ip_address}\n"
+    
+    def _save_blocked_ips(self, ip_addresses: List[str]):
         try:
             self.blocked_ips_file.parent.mkdir(parents=True, exist_ok=True)
             
             with open(self.blocked_ips_file, 'a') as f:
-                f.write(f"{ip_address}\n")
+                f.write(''.join(self._format_blocked_ip(ip_address) for ip_address in ip_addresses))
         except Exception as e:
             self.logger.error(f"خطأ في حفظ IP المحظور: {e}")
     
+    def _rewrite_blocked_ips(self):
+        try:
+            self.blocked_ips_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.blocked_ips_file.with_suffix(self.blocked_ips_file.suffix + '.tmp')
+            with open(tmp_file, 'w') as f:
+                f.write(''.join(self._format_blocked_ip(ip_address) for ip_address in self.blocked_ips))
+            os.replace(tmp_file, self.blocked_ips_file)
+        except Exception as e:
+            self.logger.error(f"خطأ في حفظ IPs المحظورة: {e}")
+    
     def _get_ip_geolocation(self, ip_address: str) -> Optional[Dict]:
         """الحصول على معلومات جغرافية عن IP"""
         if ip_address == 'unknown':
@@ -438,16 +465,9 @@ class SecurityMonitor:
         )
     
     def _cleanup_old_events(self):
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        
-        for ip in list(self.failed_login_attempts.keys()):
-            self.failed_login_attempts[ip] = [
-                t for t in self.failed_login_attempts[ip]
-                if t > cutoff_time
-            ]
-            
-            if not self.failed_login_attempts[ip]:
-                del self.failed_login_attempts[ip]
+        self._prune_expired_blocks()
+        self.failed_logins.expire()
+        self.tailer.forget_missing()
     
     def get_security_summary(self) -> Dict:
         recent_events = self.security_events[-100:]
@@ -456,7 +476,7 @@ class SecurityMonitor:
             'total_events': len(self.security_events),
             'recent_events_count': len(recent_events),
             'by_type': defaultdict(int),
-            'suspicious_ips': list(self.failed_login_attempts.keys())
+            'suspicious_ips': list(self.failed_logins)
         }
         
         for event in recent_events:
@@ -29,7 +29,7 @@ def run_execute(command, timeout=120):
     # Connect to server
     print("Connecting to server...")
     with SSHClientManager(config.get('server', {})) as ssh:
-        if not ssh.client:
+        if not ssh.is_connected():
             print("✗ Failed to connect to server")
             return False
         
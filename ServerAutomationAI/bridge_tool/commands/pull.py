@@ -40,7 +40,7 @@ def run_pull(what='logs', output=None):
     # Connect to server
     print("\n2. Connecting to server...")
     with SSHClientManager(config.get('server', {})) as ssh:
-        if not ssh.client:
+        if not ssh.is_connected():
             print("✗ Failed to connect to server")
             return False
         
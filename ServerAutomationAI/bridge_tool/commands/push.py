@@ -140,7 +140,7 @@ def run_push(dry_run=False, skip_backup=False, skip_verify=False):
     # Connect to server
     print(f"\n4️⃣  الاتصال بالسيرفر (Connecting to server)...")
     with SSHClientManager(server_config) as ssh:
-        if not ssh.client:
+        if not ssh.is_connected():
             print("✗ فشل الاتصال بالسيرفر")
             report_data['errors'].append("SSH connection failed")
             _save_deployment_report(report_data, f"bridge_reports/deploy_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md")
@@ -185,12 +185,12 @@ def run_push(dry_run=False, skip_backup=False, skip_verify=False):
             sync_manager = SyncManager(ssh, config)
             if config.get('sync', {}).get('prefer_rsync', False):
                 if not sync_manager.sync_directory_rsync(release_path, dry_run):
-                    total, transferred, errors = sync_manager.sync_files(release_path, dry_run)
+                    total, transferred, errors = sync_manager.sync_files(release_path, dry_run, seed_from=current_path)
                     report_data['server']['files_transferred'] = transferred
                     if errors:
                         report_data['errors'].extend(errors[:5])
             else:
-                total, transferred, errors = sync_manager.sync_files(release_path, dry_run)
+                total, transferred, errors = sync_manager.sync_files(release_path, dry_run, seed_from=current_path)
                 report_data['server']['files_transferred'] = transferred
                 if errors:
                     report_data['errors'].extend(errors[:5])
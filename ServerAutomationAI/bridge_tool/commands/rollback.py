@@ -36,7 +36,7 @@ def run_rollback(list_releases=False, release=None):
     # Connect to server
     print("\n2️⃣  الاتصال بالسيرفر (Connecting to server)...")
     with SSHClientManager(config.get('server', {})) as ssh:
-        if not ssh.client:
+        if not ssh.is_connected():
             print("✗ فشل الاتصال بالسيرفر")
             return False
         
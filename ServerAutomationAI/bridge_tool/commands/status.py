@@ -29,20 +29,33 @@ def run_status(detailed=False):
     # Connect to server
     print("\n2. Connecting to server...")
     with SSHClientManager(config.get('server', {})) as ssh:
-        if not ssh.client:
+        if not ssh.is_connected():
             print("✗ Failed to connect to server")
             return False
         
         current_path = config.get('paths', {}).get('remote', {}).get('current', '/srv/ai_system/current')
         service_name = config.get('deployment', {}).get('service_name', 'ai_agents')
         
+        # Run all checks in one round trip
+        checks = [
+            f'systemctl is-active {service_name} 2>&1 || echo "not found"',
+            f'cd {current_path} && timeout 10 python3 main.py status 2>&1 || echo "timeout"',
+            f'df -h {current_path}',
+            f'tail -n 5 {current_path}/logs/*.log 2>/dev/null | head -20',
+            f'cd {current_path} && timeout 5 python3 -c "from agents.database_manager import DatabaseManager; print(DatabaseManager().check_connection())" 2>&1 || echo "check failed"'
+        ]
+        if detailed:
+            checks += ['uname -a && uptime', 'free -h', f'ls -l {current_path}']
+        results = [result[1:] for result in ssh.execute_batch(checks, stop_on_error=False)]
+        results += [(1, "", "")] * (len(checks) - len(results))  # Batch interrupted
+        
         print(f"\n{'='* 60}")
         print("System Status")
         print(f"{'='* 60}")
         
         # Check service status
         print("\n1. Service Status:")
-        exit_code, stdout, stderr = ssh.execute_command(f'systemctl is-active {service_name} 2>&1 || echo "not found"')
+        exit_code, stdout, stderr = results[0]
         if 'active' in stdout.lower():
             print(f"   ✓ Service '{service_name}' is ACTIVE")
         elif 'not found' in stdout.lower():
@@ -54,7 +67,7 @@ def run_status(detailed=False):
         
         # Check agents status
         print("\n2. AI Agents Status:")
-        exit_code, stdout, stderr = ssh.execute_command(f'cd {current_path} && timeout 10 python3 main.py status 2>&1 || echo "timeout"')
+        exit_code, stdout, stderr = results[1]
         if exit_code == 0:
             print(stdout)
         else:
@@ -64,7 +77,7 @@ def run_status(detailed=False):
         
         # Check disk space
         print("\n3. Disk Space:")
-        exit_code, stdout, _ = ssh.execute_command(f'df -h {current_path}')
+        exit_code, stdout, _ = results[2]
         if exit_code == 0:
             lines = stdout.strip().split('\n')
             if len(lines) >= 2:
@@ -75,7 +88,7 @@ def run_status(detailed=False):
         
         # Check recent logs
         print("\n4. Recent Log Activity:")
-        exit_code, stdout, _ = ssh.execute_command(f'tail -n 5 {current_path}/logs/*.log 2>/dev/null | head -20')
+        exit_code, stdout, _ = results[3]
         if exit_code == 0 and stdout.strip():
             print(stdout)
         else:
@@ -83,7 +96,7 @@ def run_status(detailed=False):
         
         # Check database connection (if configured)
         print("\n5. Database Connection:")
-        exit_code, stdout, _ = ssh.execute_command(f'cd {current_path} && timeout 5 python3 -c "from agents.database_manager import DatabaseManager; print(DatabaseManager().check_connection())" 2>&1 || echo "check failed"')
+        exit_code, stdout, _ = results[4]
         if exit_code == 0 and 'True' in stdout:
             print("   ✓ Database connection OK")
         else:
@@ -97,17 +110,17 @@ def run_status(detailed=False):
             
             # System info
             print("\n6. System Info:")
-            exit_code, stdout, _ = ssh.execute_command('uname -a && uptime')
+            exit_code, stdout, _ = results[5]
             print(stdout)
             
             # Memory usage
             print("\n7. Memory Usage:")
-            exit_code, stdout, _ = ssh.execute_command('free -h')
+            exit_code, stdout, _ = results[6]
             print(stdout)
             
             # Current release
             print("\n8. Current Release:")
-            exit_code, stdout, _ = ssh.execute_command(f'ls -l {current_path}')
+            exit_code, stdout, _ = results[7]
             print(stdout)
         
         print(f"\n{'='* 60}")
@@ -32,7 +32,7 @@ def run_test():
     print("\n2. Testing SSH connection...")
     try:
         with SSHClientManager(config.get('server', {})) as ssh:
-            if not ssh.client:
+            if not ssh.is_connected():
                 print("✗ SSH connection failed")
                 return False
             
@@ -0,0 +1,142 @@
+"""
+Ignore Matcher for Bridge Tool
+Compiled .gitignore-compatible matching for .bridgeignore
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+class IgnoreMatcher:
+    """
+    Matches relative paths against .gitignore-style patterns
+    
+    Supports comments, negation (!), directory-only patterns (trailing /),
+    anchored patterns (containing /), *, ?, [...] and **. All patterns are
+    compiled into one regex per entry type, so a path is checked with a
+    single match instead of a loop over patterns.
+    """
+    
+    def __init__(self, patterns: List[str]):
+        """
+        Initialize matcher
+        
+        Args:
+            patterns: Lines of an ignore file
+        """
+        self.rules: List[Tuple[str, bool, bool]] = []  # (regex, negated, dir_only)
+        for line in patterns:
+            rule = self._parse(line)
+            if rule:
+                self.rules.append(rule)
+        
+        self._dir_regex = self._combine(self.rules)
+        self._file_regex = self._combine([rule for rule in self.rules if not rule[2]])
+    
+    @classmethod
+    def _parse(cls, line: str) -> Optional[Tuple[str, bool, bool]]:
+        # Trailing spaces are ignored unless escaped
+        line = line.rstrip('\n')
+        while line.endswith(' ') and not line.endswith('\\ '):
+            line = line[:-1]
+        if not line or line.startswith('#'):
+            return None
+        
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]  # "\#file", "\!file"
+        
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+        
+        # A slash anywhere but the end anchors the pattern to the root
+        anchored = '/' in line
+        regex = cls._translate(line.lstrip('/'))
+        return (regex if anchored else f"(?:.*/)?{regex}"), negated, dir_only
+    
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        regex = []
+        i = 0
+        while i < len(pattern):
+            c = pattern[i]
+            if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+                regex.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i) and i + 2 == len(pattern) and (i == 0 or pattern[i - 1] == '/'):
+                regex.append('.*')
+                i += 2
+                continue
+            if c == '*':
+                regex.append('[^/]*')
+            elif c == '?':
+                regex.append('[^/]')
+            elif c == '\\' and i + 1 < len(pattern):
+                i += 1
+                regex.append(re.escape(pattern[i]))
+            elif c == '[':
+                end = pattern.find(']', i + 2)
+                if end == -1:
+                    regex.append(re.escape(c))
+                else:
+                    body = pattern[i + 1:end].replace('\\', '\\\\')
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    regex.append(f'[{body}]')
+                    i = end
+            else:
+                regex.append(re.escape(c))
+            i += 1
+        return ''.join(regex)
+    
+    @staticmethod
+    def _combine(rules: List[Tuple[str, bool, bool]]) -> Optional['re.Pattern']:
+        # Later patterns take precedence: alternatives are tried last rule
+        # first and the matching group tells whether it was a negation
+        if not rules:
+            return None
+        alternatives = [
+            f"(?P<{'n' if negated else 'x'}{index}>{regex})"
+            for index, (regex, negated, _) in reversed(list(enumerate(rules)))
+        ]
+        return re.compile('|'.join(alternatives), re.DOTALL)
+    
+    def match(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Check a single path (its parent directories are not checked)
+        
+        Args:
+            path: Path relative to the ignore file's directory, / separated
+            is_dir: Whether the path is a directory
+        
+        Returns:
+            True if the last matching pattern excludes the path
+        """
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return False
+        m = regex.fullmatch(path)
+        return bool(m) and m.lastgroup[0] == 'x'
+    
+    def is_excluded(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Check a path and its parent directories
+        
+        Args:
+            path: Relative path, / or os separated
+            is_dir: Whether the path is a directory
+        
+        Returns:
+            True if the path or any parent directory is excluded
+        """
+        parts = Path(path).as_posix().strip('/').split('/')
+        for i in range(1, len(parts)):
+            if self.match('/'.join(parts[:i]), is_dir=True):
+                return True
+        return self.match('/'.join(parts), is_dir)
@@ -0,0 +1,283 @@
+"""
+SSH Connection Broker for Bridge Tool
+Keeps one authenticated SSH connection open across bridge commands
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def get_socket_path(config: dict) -> str:
+    """
+    Broker socket path for a server configuration
+    
+    Args:
+        config: Server configuration dictionary
+    
+    Returns:
+        Unix socket path (private to the current user)
+    """
+    identity = "{username}@{host}:{port}/{auth_method}/{key_path}".format(
+        username=config.get('username', ''),
+        host=config.get('host', ''),
+        port=config.get('port', 22),
+        auth_method=config.get('auth_method', 'key'),
+        key_path=config.get('key_path', '')
+    )
+    digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+    base = os.environ.get('XDG_RUNTIME_DIR') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'bridge_tool', f"ssh-{digest}.sock")
+
+
+class BrokerClient:
+    """Sends requests to a running broker"""
+    
+    def __init__(self, socket_path: str):
+        """
+        Initialize broker client
+        
+        Args:
+            socket_path: Broker socket path
+        """
+        self.socket_path = socket_path
+    
+    def request(self, payload: Dict, timeout: Optional[float] = None) -> Dict:
+        """
+        Send one request and wait for the response
+        
+        Args:
+            payload: Request (op and its arguments)
+            timeout: Seconds to wait for the response
+        
+        Returns:
+            Response dictionary
+        
+        Raises:
+            ConnectionError: If the broker is unreachable or failed
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+        except OSError as e:
+            raise ConnectionError(f"SSH broker unavailable: {e}")
+        
+        try:
+            response = json.loads(line)
+        except ValueError:
+            raise ConnectionError("SSH broker closed the connection")
+        if 'error' in response:
+            raise ConnectionError(f"SSH broker error: {response['error']}")
+        return response
+    
+    def ping(self) -> bool:
+        """Check whether the broker is running"""
+        try:
+            return self.request({'op': 'ping'}, timeout=5).get('ok', False)
+        except ConnectionError:
+            return False
+    
+    def execute(self, command: str, timeout: int = 120) -> Tuple[int, str, str]:
+        """Execute a command over the shared connection"""
+        response = self.request({'op': 'exec', 'command': command, 'timeout': timeout})
+        return response['exit_code'], response['stdout'], response['stderr']
+    
+    def execute_batch(self, commands: List[str], stop_on_error: bool, timeout: int) -> List[Tuple[str, int, str, str]]:
+        """Execute commands in one remote shell over the shared connection"""
+        response = self.request({
+            'op': 'batch',
+            'commands': commands,
+            'stop_on_error': stop_on_error,
+            'timeout': timeout
+        })
+        return [tuple(result) for result in response['results']]
+    
+    def shutdown(self) -> bool:
+        """Stop the broker"""
+        try:
+            return self.request({'op': 'shutdown'}, timeout=5).get('ok', False)
+        except ConnectionError:
+            return False
+
+
+def start_broker(config: dict, socket_path: str, idle_timeout: int = 600, wait: float = 30.0) -> bool:
+    """
+    Start a broker in the background and wait until it accepts requests
+    
+    Credentials are passed on stdin, not on the command line.
+    
+    Args:
+        config: Server configuration dictionary
+        socket_path: Broker socket path
+        idle_timeout: Seconds without requests before the broker exits
+        wait: Seconds to wait for the broker to connect
+    
+    Returns:
+        True if the broker is running
+    """
+    package_root = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+    
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'bridge_tool.services.ssh_broker', socket_path, str(idle_timeout)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        env=env
+    )
+    process.stdin.write(json.dumps(config).encode('utf-8'))
+    process.stdin.close()
+    
+    client = BrokerClient(socket_path)
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        if client.ping():
+            return True
+        if process.poll() is not None:
+            return False
+        time.sleep(0.1)
+    return False
+
+
+class SSHBroker:
+    """
+    Serves remote command requests over one SSH connection
+    
+    Listens on a Unix socket (mode 0600) and runs each request on its own
+    channel of the shared transport, reconnecting if the transport drops.
+    Exits after idle_timeout seconds without requests.
+    """
+    
+    def __init__(self, config: dict, socket_path: str, idle_timeout: int = 600):
+        """
+        Initialize broker
+        
+        Args:
+            config: Server configuration dictionary
+            socket_path: Unix socket to listen on
+            idle_timeout: Seconds without requests before exiting
+        """
+        from .ssh_client import SSHClientManager
+        
+        self.ssh = SSHClientManager(dict(config, multiplex=False))
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.last_activity = time.time()
+        self.active_requests = 0
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def _ensure_connected(self) -> bool:
+        with self._connect_lock:
+            transport = self.ssh.client.get_transport() if self.ssh.client else None
+            if transport is not None and transport.is_active():
+                return True
+            return self.ssh.connect()
+    
+    def _handle_request(self, request: Dict) -> Dict:
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True}
+        if op == 'shutdown':
+            self._stop.set()
+            return {'ok': True}
+        if not self._ensure_connected():
+            return {'error': 'SSH connection failed'}
+        if op == 'exec':
+            exit_code, stdout, stderr = self.ssh.execute_command(request['command'], request.get('timeout', 120))
+            return {'exit_code': exit_code, 'stdout': stdout, 'stderr': stderr}
+        if op == 'batch':
+            results = self.ssh.execute_batch(
+                request['commands'], request.get('stop_on_error', True), request.get('timeout')
+            )
+            return {'results': results}
+        return {'error': f"unknown op: {op}"}
+    
+    def _serve_connection(self, conn: socket.socket):
+        with self._lock:
+            self.active_requests += 1
+        try:
+            with conn, conn.makefile('rb') as reader:
+                line = reader.readline()
+                try:
+                    response = self._handle_request(json.loads(line))
+                except Exception as e:
+                    response = {'error': str(e)}
+                conn.sendall(json.dumps(response).encode('utf-8') + b'\n')
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self.active_requests -= 1
+                self.last_activity = time.time()
+    
+    def serve(self) -> int:
+        """
+        Connect and serve requests until idle or shut down
+        
+        Returns:
+            Process exit code
+        """
+        # Another broker already serving this server?
+        if BrokerClient(self.socket_path).ping():
+            return 0
+        if not self.ssh.connect():
+            return 1
+        
+        os.makedirs(os.path.dirname(self.socket_path), mode=0o700, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(1.0)
+        
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    idle = self.active_requests == 0 and time.time() - self.last_activity > self.idle_timeout
+                if idle:
+                    break
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            self.ssh.disconnect()
+        return 0
+
+
+def main() -> int:
+    """Broker process entry point: ssh_broker.py SOCKET_PATH IDLE_TIMEOUT (config JSON on stdin)"""
+    socket_path, idle_timeout = sys.argv[1], int(sys.argv[2])
+    config = json.loads(sys.stdin.read())
+    return SSHBroker(config, socket_path, idle_timeout).serve()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,35 @@ Handles secure SSH/SFTP connections to production server
 """
 
 import os
+import re
+import time
+import uuid
+import queue
+import threading
+import shlex
+import tarfile
+import posixpath
 import paramiko
 from pathlib import Path
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, Tuple, List
 from paramiko.client import SSHClient, AutoAddPolicy
+from .ssh_broker import BrokerClient, get_socket_path, start_broker
 
 
 class SSHClientManager:
     """Manages SSH connections to production server"""
     
+    # OpenSSH allows 10 sessions per connection by default (MaxSessions)
+    MAX_SFTP_CHANNELS = 8
+    
+    # Upper bound on uncompressed bytes per tar stream of small files
+    PACK_BATCH_SIZE = 16 * 1024 * 1024
+    
+    # Runs a batch script ($1) with bash, or sh where bash is not installed
+    # (sh is dash on Debian/Ubuntu, which lacks bashisms commands may use)
+    BATCH_LAUNCHER = 'if command -v bash >/dev/null 2>&1; then exec bash -c "$1"; fi; exec sh -c "$1"'
+    
     def __init__(self, config: dict):
         """
         Initialize SSH client
@@ -28,16 +48,43 @@ class SSHClientManager:
         self.key_passphrase = config.get('key_passphrase')
         self.password = config.get('password') or os.environ.get('SSH_PASSWORD')
         
+        # Share one connection between bridge commands through a local broker
+        self.config = config
+        self.multiplex = bool(config.get('multiplex', False))
+        self.multiplex_idle_timeout = int(config.get('multiplex_idle_timeout', 600))
+        self.keepalive_interval = int(config.get('keepalive_interval', 30))
+        
         self.client: Optional[SSHClient] = None
         self.sftp: Optional[paramiko.SFTPClient] = None
+        self.broker: Optional[BrokerClient] = None
     
     def connect(self) -> bool:
         """
         Establish SSH connection
         
+        With multiplexing enabled, commands go through the broker (started
+        on first use); a direct connection is opened only for file transfers.
+        
         Returns:
             True if successful, False otherwise
         """
+        if self.multiplex and self._connect_broker():
+            print(f"✓ SSH connection established (shared, {self.username}@{self.host})")
+            return True
+        return self._connect_direct()
+    
+    def _connect_broker(self) -> bool:
+        socket_path = get_socket_path(self.config)
+        broker = BrokerClient(socket_path)
+        if not broker.ping():
+            print(f"Starting SSH connection broker for {self.username}@{self.host}:{self.port}...")
+            if not start_broker(self.config, socket_path, self.multiplex_idle_timeout):
+                print("⚠️  SSH broker unavailable, connecting directly")
+                return False
+        self.broker = broker
+        return True
+    
+    def _connect_direct(self) -> bool:
         try:
             self.client = SSHClient()
             self.client.set_missing_host_key_policy(AutoAddPolicy())
@@ -65,6 +112,9 @@ class SSHClientManager:
             else:
                 raise ValueError("No valid authentication method configured")
             
+            # Keep idle connections (and NAT state) alive
+            self.client.get_transport().set_keepalive(self.keepalive_interval)
+            
             # Open SFTP session
             self.sftp = self.client.open_sftp()
             
@@ -76,13 +126,31 @@ class SSHClientManager:
             return False
     
     def disconnect(self):
-        """Close SSH connection"""
+        """Close SSH connection (a shared broker connection stays open)"""
         if self.sftp:
             self.sftp.close()
         if self.client:
             self.client.close()
+        self.sftp = None
+        self.client = None
+        self.broker = None
         print("Connection closed")
     
+    def is_connected(self) -> bool:
+        """Check whether connect() succeeded (directly or through the broker)"""
+        return self.client is not None or self.broker is not None
+    
+    def _ensure_sftp(self) -> bool:
+        # File transfers need a direct connection, opened on demand in broker mode
+        if self.sftp:
+            return True
+        return self.broker is not None and self._connect_direct()
+    
+    def _broker_failed(self, error: Exception) -> bool:
+        print(f"⚠️  {error}, connecting directly")
+        self.broker = None
+        return self.client is not None or self._connect_direct()
+    
     def execute_command(self, command: str, timeout: int = 120) -> Tuple[int, str, str]:
         """
         Execute command on remote server
@@ -94,6 +162,13 @@ class SSHClientManager:
         Returns:
             Tuple of (exit_code, stdout, stderr)
         """
+        if self.broker:
+            try:
+                return self.broker.execute(command, timeout)
+            except ConnectionError as e:
+                if not self._broker_failed(e):
+                    return 1, "", str(e)
+        
         if not self.client:
             raise RuntimeError("Not connected. Call connect() first.")
         
@@ -109,10 +184,85 @@ class SSHClientManager:
         except Exception as e:
             return 1, "", str(e)
     
+    def execute_batch(
+        self,
+        commands: List[str],
+        stop_on_error: bool = True,
+        timeout: Optional[int] = None
+    ) -> List[Tuple[str, int, str, str]]:
+        """
+        Execute multiple commands in a single remote shell
+        
+        The batch runs under bash (sh if bash is missing). Each command runs
+        in its own subshell (so 'cd' does not leak into the next one); its output and exit code are separated by marker lines.
+        
+        Args:
+            commands: List of commands to execute
+            stop_on_error: Stop at the first failing command
+            timeout: Timeout in seconds (default: 120 per command)
+        
+        Returns:
+            List of (command, exit_code, stdout, stderr) tuples for the
+            commands that ran
+        """
+        if not commands:
+            return []
+        if timeout is None:
+            timeout = 120 * len(commands)
+        
+        if self.broker:
+            try:
+                return self.broker.execute_batch(commands, stop_on_error, timeout)
+            except ConnectionError as e:
+                if not self._broker_failed(e):
+                    return [(commands[0], 1, "", str(e))]
+        
+        marker = f"__bridge_{uuid.uuid4().hex}"
+        lines = []
+        for index, command in enumerate(commands):
+            lines.append(f"(\n{command}\n) </dev/null")
+            lines.append(
+                f"rc=$?; printf '\\n{marker}:{index}:%d\\n' \"$rc\"; printf '\\n{marker}:{index}\\n' >&2"
+            )
+            if stop_on_error:
+                lines.append('[ "$rc" -eq 0 ] || exit "$rc"')
+        
+        script = '\n'.join(lines)
+        exit_code, stdout, stderr = self.execute_command(
+            f"sh -c {shlex.quote(self.BATCH_LAUNCHER)} bridge {shlex.quote(script)}", timeout
+        )
+        
+        outputs = {}
+        position = 0
+        for match in re.finditer(rf"\n{marker}:(\d+):(\d+)\n", stdout):
+            outputs[int(match.group(1))] = [int(match.group(2)), stdout[position:match.start()], ""]
+            position = match.end()
+        stdout_rest = stdout[position:]
+        position = 0
+        for match in re.finditer(rf"\n{marker}:(\d+)\n", stderr):
+            if int(match.group(1)) in outputs:
+                outputs[int(match.group(1))][2] = stderr[position:match.start()]
+            position = match.end()
+        stderr_rest = stderr[position:]
+        
+        results = []
+        for index, command in enumerate(commands):
+            if index not in outputs:
+                # Interrupted (timeout, lost connection): report it as failed
+                results.append((command, exit_code or 1, stdout_rest, stderr_rest))
+                break
+            code, out, err = outputs[index]
+            results.append((command, code, out, err))
+            if stop_on_error and code != 0:
+                break
+        return results
+    
     def execute_commands(self, commands: List[str], stop_on_error: bool = True) -> List[Tuple[str, int, str, str]]:
         """
         Execute multiple commands
         
+        Commands are pipelined through one remote shell (see execute_batch).
+        
         Args:
             commands: List of commands to execute
             stop_on_error: Stop if any command fails
@@ -120,19 +270,15 @@ class SSHClientManager:
         Returns:
             List of (command, exit_code, stdout, stderr) tuples
         """
-        results = []
+        results = self.execute_batch(commands, stop_on_error)
         
-        for cmd in commands:
+        for cmd, exit_code, stdout, stderr in results:
             print(f"Executing: {cmd}")
-            exit_code, stdout, stderr = self.execute_command(cmd)
-            results.append((cmd, exit_code, stdout, stderr))
             
             if exit_code != 0:
                 print(f"✗ Command failed (exit code {exit_code})")
                 if stderr:
                     print(f"Error: {stderr}")
-                if stop_on_error:
-                    break
             else:
                 print(f"✓ Command successful")
         
@@ -149,7 +295,7 @@ class SSHClientManager:
         Returns:
             True if successful
         """
-        if not self.sftp:
+        if not self._ensure_sftp():
             raise RuntimeError("SFTP not connected. Call connect() first.")
         
         try:
@@ -159,6 +305,176 @@ class SSHClientManager:
             print(f"✗ Upload failed: {e}")
             return False
     
+    def _upload_packed(self, files: List[Tuple[str, str]], compress: bool) -> int:
+        """
+        Stream files as one tar archive into a remote 'tar -x'
+        
+        Args:
+            files: List of (local_path, remote_path) tuples
+            compress: gzip the stream
+        
+        Returns:
+            Number of bytes sent (uncompressed)
+        """
+        base = posixpath.commonpath([posixpath.dirname(remote) for _, remote in files]) or '.'
+        flags = 'xzf' if compress else 'xf'
+        stdin, stdout, stderr = self.client.exec_command(
+            f"mkdir -p {shlex.quote(base)} && tar -{flags} - -C {shlex.quote(base)}"
+        )
+        
+        sent = 0
+        with tarfile.open(fileobj=stdin, mode='w|gz' if compress else 'w|', format=tarfile.GNU_FORMAT) as tar:
+            for local_path, remote_path in files:
+                tar.add(local_path, arcname=posixpath.relpath(remote_path, base), recursive=False)
+                sent += os.path.getsize(local_path)
+        stdin.flush()
+        stdin.channel.shutdown_write()
+        
+        exit_code = stdout.channel.recv_exit_status()
+        if exit_code != 0:
+            raise IOError(f"remote tar exited with {exit_code}: {stderr.read().decode('utf-8', 'replace').strip()}")
+        return sent
+    
+    def upload_files(
+        self,
+        files: List[Tuple[str, str]],
+        workers: int = 4,
+        pack_small: bool = True,
+        small_file_size: int = 64 * 1024,
+        compress: bool = True
+    ) -> Dict:
+        """
+        Upload many files concurrently
+        
+        Large files are sent over a pool of SFTP channels on the existing
+        connection; small files are packed into tar streams extracted on
+        the server, so thousands of files cost a few round trips instead of
+        several each. Remote parent directories must exist for SFTP uploads.
+        
+        Args:
+            files: List of (local_path, remote_path) tuples
+            workers: Parallel transfers (SFTP channels)
+            pack_small: Send files up to small_file_size as tar streams
+            small_file_size: Size limit (bytes) for packing
+            compress: gzip tar streams
+        
+        Returns:
+            Dict with uploaded (remote paths), failed ((remote_path, error) tuples),
+            bytes, duration, throughput (bytes/s), files_per_second, packed
+        """
+        if not self._ensure_sftp():
+            raise RuntimeError("SFTP not connected. Call connect() first.")
+        
+        started = time.time()
+        workers = max(1, min(workers, self.MAX_SFTP_CHANNELS))
+        
+        # Split into tar batches and individual SFTP uploads
+        batches: List[List[Tuple[str, str]]] = []
+        singles: List[Tuple[str, str]] = []
+        batch, batch_size = [], 0
+        for local_path, remote_path in files:
+            try:
+                size = os.path.getsize(local_path)
+            except OSError:
+                size = None
+            if pack_small and size is not None and size <= small_file_size:
+                if batch and batch_size + size > self.PACK_BATCH_SIZE:
+                    batches.append(batch)
+                    batch, batch_size = [], 0
+                batch.append((local_path, remote_path))
+                batch_size += size
+            else:
+                singles.append((local_path, remote_path))
+        if batch:
+            batches.append(batch)
+        
+        # Up to one SFTP channel per worker, opened on demand and shared through a queue
+        channels: queue.Queue = queue.Queue()
+        channels.put(self.sftp)
+        opened = []
+        open_lock = threading.Lock()
+        can_open = workers > 1
+        
+        def acquire_channel() -> paramiko.SFTPClient:
+            nonlocal can_open
+            try:
+                return channels.get_nowait()
+            except queue.Empty:
+                pass
+            with open_lock:
+                if can_open and len(opened) < workers - 1:
+                    try:
+                        opened.append(self.client.open_sftp())
+                        return opened[-1]
+                    except Exception as e:
+                        print(f"⚠️  Could not open more SFTP channels: {e}")
+                        can_open = False
+            return channels.get()
+        
+        def put_file(local_path: str, remote_path: str) -> int:
+            sftp = acquire_channel()
+            try:
+                sftp.put(local_path, remote_path, confirm=False)
+            finally:
+                channels.put(sftp)
+            return os.path.getsize(local_path)
+        
+        uploaded: List[str] = []
+        failed: List[Tuple[str, str]] = []
+        total_bytes = 0
+        packed = 0
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self._upload_packed, b, compress): ('tar', b) for b in batches}
+                futures.update({pool.submit(put_file, *f): ('sftp', [f]) for f in singles})
+                
+                retry: List[Tuple[str, str]] = []
+                for future in as_completed(futures):
+                    kind, batch_files = futures[future]
+                    try:
+                        total_bytes += future.result()
+                        uploaded.extend(remote for _, remote in batch_files)
+                        if kind == 'tar':
+                            packed += len(batch_files)
+                    except Exception as e:
+                        if kind == 'tar':
+                            # e.g. no tar on the server: fall back to SFTP
+                            print(f"⚠️  Packed upload failed ({e}), retrying {len(batch_files)} file(s) via SFTP")
+                            retry.extend(batch_files)
+                        else:
+                            print(f"✗ Upload failed: {batch_files[0][1]}: {e}")
+                            failed.append((batch_files[0][1], str(e)))
+                
+                for future, (_, remote_path) in [(pool.submit(put_file, *f), f) for f in retry]:
+                    try:
+                        total_bytes += future.result()
+                        uploaded.append(remote_path)
+                    except Exception as e:
+                        print(f"✗ Upload failed: {remote_path}: {e}")
+                        failed.append((remote_path, str(e)))
+        finally:
+            for channel in opened:
+                channel.close()
+        
+        duration = max(time.time() - started, 1e-6)
+        stats = {
+            'uploaded': uploaded,
+            'failed': failed,
+            'bytes': total_bytes,
+            'duration': round(duration, 2),
+            'throughput': total_bytes / duration,
+            'files_per_second': len(uploaded) / duration,
+            'packed': packed
+        }
+        if files:
+            print(
+                f"✓ Uploaded {len(uploaded)}/{len(files)} file(s), {total_bytes / 1024 / 1024:.1f} MB "
+                f"in {duration:.1f}s ({stats['throughput'] / 1024 / 1024:.2f} MB/s, "
+                f"{stats['files_per_second']:.0f} files/s, {packed} packed)"
+            )
+        return stats
+    
     def download_file(self, remote_path: str, local_path: str) -> bool:
         """
         Download file from server
@@ -170,7 +486,7 @@ class SSHClientManager:
         Returns:
             True if successful
         """
-        if not self.sftp:
+        if not self._ensure_sftp():
             raise RuntimeError("SFTP not connected. Call connect() first.")
         
         try:
@@ -180,6 +496,47 @@ class SSHClientManager:
             print(f"✗ Download failed: {e}")
             return False
     
+    def read_file(self, remote_path: str) -> Optional[bytes]:
+        """
+        Read a remote file into memory
+        
+        Args:
+            remote_path: Remote file path
+        
+        Returns:
+            File content, or None if it does not exist or cannot be read
+        """
+        if not self._ensure_sftp():
+            raise RuntimeError("SFTP not connected. Call connect() first.")
+        
+        try:
+            with self.sftp.open(remote_path, 'rb') as f:
+                return f.read()
+        except IOError:
+            return None
+    
+    def write_file(self, remote_path: str, data: bytes) -> bool:
+        """
+        Write bytes to a remote file
+        
+        Args:
+            remote_path: Remote file path
+            data: File content
+        
+        Returns:
+            True if successful
+        """
+        if not self._ensure_sftp():
+            raise RuntimeError("SFTP not connected. Call connect() first.")
+        
+        try:
+            with self.sftp.open(remote_path, 'wb') as f:
+                f.write(data)
+            return True
+        except IOError as e:
+            print(f"✗ Write failed: {e}")
+            return False
+    
     def file_exists(self, remote_path: str) -> bool:
         """
         Check if file exists on remote server
@@ -190,7 +547,7 @@ class SSHClientManager:
         Returns:
             True if file exists
         """
-        if not self.sftp:
+        if not self._ensure_sftp():
             return False
         
         try:
@@ -209,7 +566,7 @@ class SSHClientManager:
         Returns:
             True if successful
         """
-        if not self.client:
+        if not self.is_connected():
             return False
         
         try:
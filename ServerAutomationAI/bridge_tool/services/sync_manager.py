@@ -4,15 +4,28 @@ Handles file synchronization between local and remote
 """
 
 import os
+import json
+import time
+import shlex
 import hashlib
+import posixpath
+from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional
 from .ssh_client import SSHClientManager
+from .ignore_matcher import IgnoreMatcher
 
 
 class SyncManager:
     """Manages file synchronization"""
     
+    # Remote manifest of deployed files (relative path -> MD5), one per remote base
+    MANIFEST_NAME = '.bridge_manifest.json'
+    
+    # Keep batched remote commands well under ARG_MAX
+    MAX_COMMAND_LENGTH = 64 * 1024
+    
     def __init__(self, ssh_client: SSHClientManager, config: dict):
         """
         Initialize sync manager
@@ -26,6 +39,18 @@ class SyncManager:
         self.local_root = config.get('paths', {}).get('local', {}).get('root', '.')
         self.exclude_file = config.get('paths', {}).get('local', {}).get('exclude_file', '.bridgeignore')
         self.excluded_patterns = self._load_exclude_patterns()
+        self.ignore_matcher = IgnoreMatcher(self.excluded_patterns)
+        
+        sync_config = config.get('sync', {})
+        self.delta = sync_config.get('delta', True)
+        self.delete_remote = sync_config.get('delete_remote', False)
+        self.hash_workers = int(sync_config.get('hash_workers', min(8, os.cpu_count() or 1)))
+        self.hash_cache_file = Path(self.local_root) / sync_config.get('hash_cache', 'bridge_reports/.sync_hash_cache.json')
+        self.compress = sync_config.get('compress', True)
+        self.transfer_workers = int(sync_config.get('transfer_workers', 4))
+        self.pack_small_files = sync_config.get('pack_small_files', True)
+        self.small_file_size = int(sync_config.get('small_file_size', 64 * 1024))
+        self.last_sync_stats: Dict = {}
     
     def _load_exclude_patterns(self) -> List[str]:
         """
@@ -46,50 +71,49 @@ class SyncManager:
         
         return patterns
     
-    def _should_exclude(self, path: str) -> bool:
+    def _should_exclude(self, path: str, is_dir: bool = False) -> bool:
         """
         Check if path should be excluded
         
         Args:
-            path: File path to check
+            path: Path relative to the local root
+            is_dir: Whether the path is a directory
         
         Returns:
             True if should be excluded
         """
-        for pattern in self.excluded_patterns:
-            # Simple pattern matching
-            if pattern.endswith('/'):
-                # Directory pattern
-                if path.startswith(pattern) or ('/' + pattern.rstrip('/') + '/') in path:
-                    return True
-            elif '*' in pattern:
-                # Wildcard pattern (simple implementation)
-                if pattern.replace('*', '') in path:
-                    return True
-            else:
-                # Exact match or substring
-                if pattern in path or path.endswith(pattern):
-                    return True
-        
-        return False
+        return self.ignore_matcher.is_excluded(path, is_dir)
     
     def get_files_to_sync(self) -> List[Tuple[str, str]]:
         """
         Get list of files to sync (local_path, relative_path)
         
+        Excluded directories are pruned without being listed.
+        
         Returns:
             List of (local_path, relative_path) tuples
         """
         files_to_sync = []
-        root_path = Path(self.local_root).resolve()
+        root_path = str(Path(self.local_root).resolve())
         
-        for path in root_path.rglob('*'):
-            if path.is_file():
-                relative_path = path.relative_to(root_path)
-                relative_str = str(relative_path)
-                
-                if not self._should_exclude(relative_str):
-                    files_to_sync.append((str(path), relative_str))
+        stack = ['']
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(os.path.join(root_path, directory)))
+            except OSError:
+                continue
+            
+            for entry in entries:
+                relative_path = f"{directory}/{entry.name}" if directory else entry.name
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink() and not self.ignore_matcher.match(relative_path, is_dir=True):
+                            stack.append(relative_path)
+                    elif entry.is_file() and not self.ignore_matcher.match(relative_path):
+                        files_to_sync.append((entry.path, relative_path))
+                except OSError:
+                    continue
         
         return files_to_sync
     
@@ -106,23 +130,148 @@ class SyncManager:
         hash_md5 = hashlib.md5()
         try:
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
                     hash_md5.update(chunk)
             return hash_md5.hexdigest()
         except Exception:
             return ""
     
-    def sync_files(self, remote_base: str, dry_run: bool = False) -> Tuple[int, int, List[str]]:
+    def _load_hash_cache(self) -> Dict[str, list]:
+        try:
+            with open(self.hash_cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_hash_cache(self, cache: Dict[str, list]):
+        try:
+            self.hash_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.hash_cache_file, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            print(f"⚠️  Could not save hash cache: {e}")
+    
+    def compute_local_hashes(self, files: List[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Calculate MD5 hashes of local files in parallel
+        
+        Hashes are cached by (mtime, size), so unchanged files are not re-read.
+        
+        Args:
+            files: List of (local_path, relative_path) tuples
+        
+        Returns:
+            Dict of relative_path -> MD5 (files that could not be read are omitted)
+        """
+        cache = self._load_hash_cache()
+        hashes: Dict[str, str] = {}
+        to_hash = []
+        
+        for local_path, relative_path in files:
+            try:
+                stat = os.stat(local_path)
+            except OSError:
+                continue
+            cached = cache.get(relative_path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                hashes[relative_path] = cached[2]
+            else:
+                to_hash.append((local_path, relative_path, stat))
+        
+        if to_hash:
+            with ThreadPoolExecutor(max_workers=max(1, self.hash_workers)) as pool:
+                digests = pool.map(lambda item: self.calculate_file_hash(item[0]), to_hash)
+                for (_, relative_path, stat), digest in zip(to_hash, digests):
+                    if digest:
+                        hashes[relative_path] = digest
+                        cache[relative_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        
+        self.last_sync_stats['hashed'] = len(to_hash)
+        self.last_sync_stats['hash_cache_hits'] = len(files) - len(to_hash)
+        self._save_hash_cache({path: cache[path] for path in hashes if path in cache})
+        return hashes
+    
+    def fetch_remote_manifest(self, remote_base: str) -> Tuple[Dict[str, str], bool]:
         """
-        Sync files to remote server
+        Get hashes of the files deployed under remote_base
+        
+        Reads the manifest written by the last sync; without one, hashes the
+        remote tree with a single md5sum command.
+        
+        Args:
+            remote_base: Remote base directory
+        
+        Returns:
+            Tuple of (relative_path -> MD5, True if read from the manifest)
+        """
+        data = self.ssh.read_file(f"{remote_base}/{self.MANIFEST_NAME}")
+        if data is not None:
+            try:
+                return json.loads(data.decode('utf-8')).get('files', {}), True
+            except (ValueError, AttributeError):
+                print("⚠️  Remote manifest is invalid, re-scanning remote files")
+        
+        exit_code, stdout, _ = self.ssh.execute_command(
+            f"cd {shlex.quote(remote_base)} 2>/dev/null && "
+            f"find . -type f ! -name {shlex.quote(self.MANIFEST_NAME)} -print0 | xargs -0 -r md5sum",
+            timeout=600
+        )
+        manifest = {}
+        if exit_code == 0:
+            for line in stdout.splitlines():
+                # md5sum prefixes lines with "\" when it had to escape the name; skip those
+                digest, _, path = line.partition('  ')
+                if not line.startswith('\\') and path.startswith('./'):
+                    manifest[path[2:]] = digest
+        return manifest, False
+    
+    def _run_batched(self, prefix: str, args: List[str]) -> bool:
+        """Run 'prefix arg1 arg2 ...' remotely in as few commands as possible"""
+        success = True
+        batch: List[str] = []
+        length = len(prefix)
+        for arg in [shlex.quote(a) for a in args] + [None]:
+            if arg is None or (batch and length + len(arg) + 1 > self.MAX_COMMAND_LENGTH):
+                if batch:
+                    exit_code, _, stderr = self.ssh.execute_command(f"{prefix} {' '.join(batch)}")
+                    if exit_code != 0:
+                        print(f"✗ Remote command failed: {stderr.strip()[:200]}")
+                        success = False
+                batch, length = [], len(prefix)
+            if arg is not None:
+                batch.append(arg)
+                length += len(arg) + 1
+        return success
+    
+    def _seed_from(self, remote_base: str, seed_from: str) -> bool:
+        """Copy a previous release into an empty remote_base so only changes need uploading"""
+        base, seed = shlex.quote(remote_base), shlex.quote(seed_from)
+        exit_code, _, _ = self.ssh.execute_command(
+            f"test -d {seed} && test -z \"$(ls -A {base} 2>/dev/null)\" && "
+            f"mkdir -p {base} && cp -a {seed}/. {base}/",
+            timeout=600
+        )
+        return exit_code == 0
+    
+    def sync_files(self, remote_base: str, dry_run: bool = False, seed_from: Optional[str] = None) -> Tuple[int, int, List[str]]:
+        """
+        Sync files to remote server (delta)
+        
+        Compares local hashes with the remote manifest, uploads only changed
+        files, deletes files removed since the last sync and creates remote
+        directories in batches.
         
         Args:
             remote_base: Remote base directory
             dry_run: If True, don't actually transfer files
+            seed_from: Remote directory (e.g. the current release) copied into an
+                empty remote_base first, so a new release only needs the changes
         
         Returns:
             Tuple of (total_files, transferred_files, errors)
         """
+        started = time.time()
+        self.last_sync_stats = {}
         files = self.get_files_to_sync()
         total_files = len(files)
         transferred = 0
@@ -130,30 +279,91 @@ class SyncManager:
         
         print(f"\n{'[DRY RUN] ' if dry_run else ''}Syncing {total_files} files to {remote_base}...")
         
-        for local_path, relative_path in files:
-            remote_path = os.path.join(remote_base, relative_path).replace('\\', '/')
-            remote_dir = os.path.dirname(remote_path)
+        # Local state
+        local_hashes = self.compute_local_hashes(files)
+        for _, relative_path in files:
+            if relative_path not in local_hashes:
+                errors.append(f"Failed to read: {relative_path}")
+        
+        # Remote state
+        if self.delta and seed_from and not dry_run:
+            if self._seed_from(remote_base, seed_from):
+                print(f"✓ Seeded from {seed_from}")
+        remote_hashes, from_manifest = self.fetch_remote_manifest(remote_base) if self.delta else ({}, False)
+        
+        # Plan: uploads for new/changed files; deletions only for files we deployed
+        # (or every extra file when sync.delete_remote is enabled)
+        uploads = [
+            (local_path, relative_path) for local_path, relative_path in files
+            if relative_path in local_hashes and remote_hashes.get(relative_path) != local_hashes[relative_path]
+        ]
+        deletions = sorted(
+            path for path in remote_hashes
+            if path not in local_hashes and (from_manifest or self.delete_remote)
+        )
+        unchanged = len(local_hashes) - len(uploads)
+        print(f"Changed: {len(uploads)}, unchanged: {unchanged}, to delete: {len(deletions)}")
+        
+        if dry_run:
+            for _, relative_path in uploads:
+                print(f"Would upload: {relative_path}")
+            for relative_path in deletions:
+                print(f"Would delete: {relative_path}")
+        else:
+            targets = {
+                posixpath.join(remote_base, rel.replace('\\', '/')): (local_path, rel) for local_path, rel in uploads
+            }
             
-            try:
-                # Create remote directory if it doesn't exist
-                if not dry_run:
-                    self.ssh.create_directory(remote_dir)
-                
-                # Upload file
-                if dry_run:
-                    print(f"Would upload: {relative_path}")
+            # Directories: one mkdir -p for all leaf directories
+            directories = {remote_base} | {posixpath.dirname(remote_path) for remote_path in targets}
+            parents = {posixpath.dirname(d) for d in directories}
+            self._run_batched("mkdir -p", sorted(directories - parents))
+            
+            result = self.ssh.upload_files(
+                [(local_path, remote_path) for remote_path, (local_path, _) in targets.items()],
+                workers=self.transfer_workers,
+                pack_small=self.pack_small_files,
+                small_file_size=self.small_file_size,
+                compress=self.compress
+            )
+            transferred = len(result['uploaded'])
+            bytes_transferred = result['bytes']
+            failed = set()
+            for remote_path, error in result['failed']:
+                relative_path = targets[remote_path][1]
+                failed.add(relative_path)
+                errors.append(f"Failed to upload: {relative_path}: {error}")
+            
+            if deletions:
+                remote_paths = [posixpath.join(remote_base, path) for path in deletions]
+                if self._run_batched("rm -f --", remote_paths):
+                    print(f"✓ Deleted {len(deletions)} removed file(s)")
                 else:
-                    if self.ssh.upload_file(local_path, remote_path):
-                        print(f"✓ Uploaded: {relative_path}")
-                        transferred += 1
-                    else:
-                        errors.append(f"Failed to upload: {relative_path}")
-                        print(f"✗ Failed: {relative_path}")
-                        
-            except Exception as e:
-                error_msg = f"{relative_path}: {str(e)}"
-                errors.append(error_msg)
-                print(f"✗ Error: {error_msg}")
+                    errors.append("Failed to delete some removed files")
+            
+            # Manifest lists only files known to match local content
+            manifest = {path: digest for path, digest in local_hashes.items() if path not in failed}
+            if self.delta:
+                payload = json.dumps({
+                    'updated': datetime.now().isoformat(),
+                    'files': manifest
+                }).encode('utf-8')
+                if not self.ssh.write_file(f"{remote_base}/{self.MANIFEST_NAME}", payload):
+                    errors.append("Failed to write remote manifest")
+            
+            self.last_sync_stats.update({
+                'bytes_transferred': bytes_transferred,
+                'throughput': result['throughput'],
+                'packed': result['packed']
+            })
+        
+        self.last_sync_stats.update({
+            'total': total_files,
+            'changed': len(uploads),
+            'unchanged': unchanged,
+            'deleted': len(deletions),
+            'duration': round(time.time() - started, 2)
+        })
         
         return total_files, transferred, errors
     
@@ -121,7 +121,8 @@ class BaseAgent(ABC):
         result = self.model.chat(
             messages=messages,
             temperature=temperature,
-            use_cache=use_cache
+            use_cache=use_cache,
+            cache_namespace=self.agent_id
         )
         
         # Log model usage
@@ -129,6 +130,34 @@ class BaseAgent(ABC):
         
         return result
     
+    async def ask_model_async(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        use_cache: bool = True
+    ) -> Dict:
+        """
+        Async version of ask_model (does not block the event loop)
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Randomness (0.0 - 2.0)
+            use_cache: Use cached responses
+        
+        Returns:
+            Model response dict
+        """
+        result = await self.model.chat_async(
+            messages=messages,
+            temperature=temperature,
+            use_cache=use_cache,
+            cache_namespace=self.agent_id
+        )
+        
+        logger.info(f"{self.name} asked model (async) -> tokens: {result.get('tokens_used', 0)}")
+        
+        return result
+    
     def create_task(self, task_description: str, metadata: Optional[Dict] = None) -> str:
         """
         Create a new task
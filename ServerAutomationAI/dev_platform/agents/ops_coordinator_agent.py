@@ -20,6 +20,11 @@ from .schemas import (
     AlertNotification, SeverityLevel
 )
 from ..core.workflow_storage import WorkflowStorage
+from ..core.progress_coalescer import ProgressCoalescer, ProgressQueue
+from ..core.task_scheduler import DAGScheduler
+from ..core.admission_queue import WorkflowAdmissionQueue
+from ..core.async_bridge import get_async_bridge
+from ..core.model_router import stream_tokens_to
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +56,20 @@ class OpsCoordinatorAgent(BaseAgent):
         # Persistent storage
         self.storage = WorkflowStorage(storage_path)
         
+        # Rate-limited persistence of progress columns for running workflows
+        self._progress_coalescer = ProgressCoalescer(self.storage)
+        
+        # Delivery-pipeline task parallelism (per-provider LLM limits live in ModelRouter)
+        self.max_parallel_tasks = 4
+        self.agent_concurrency_limits: Dict[str, int] = {"code_executor": 4}
+        
+        # Workflow admission: bounded queue, fixed execution slots, per-type quotas
+        self._admission = WorkflowAdmissionQueue(
+            max_workers=4,
+            max_queue_depth=50,
+            type_quotas={WorkflowType.REGRESSION.value: 2}
+        )
+        
         # Active workflows
         self.active_workflows: Dict[str, Dict] = {}
         
@@ -65,7 +84,7 @@ class OpsCoordinatorAgent(BaseAgent):
         
         # Async infrastructure
         self._workflow_tasks: Dict[str, asyncio.Task] = {}  # workflow_id -> Task
-        self._progress_queues: Dict[str, asyncio.Queue] = {}  # workflow_id -> Queue
+        self._progress_queues: Dict[str, ProgressQueue] = {}  # workflow_id -> fan-out queue
         self._cancel_events: Dict[str, asyncio.Event] = {}  # workflow_id -> Event
         
         # Storage initialized flag
@@ -119,49 +138,12 @@ class OpsCoordinatorAgent(BaseAgent):
         """
         Safely run an async coroutine from sync context
         
-        Handles both scenarios:
-        - No running loop: uses asyncio.run()
-        - Running loop: creates new thread with new loop
+        Works with or without a running loop in the caller: the coroutine runs
+        on the shared background loop (see AsyncBridge), so no thread or event
+        loop is created per call and loop-bound resources like the storage
+        connection pool are reused across sync calls.
         """
-        try:
-            # Try to detect if we're in an async context
-            asyncio.get_running_loop()
-            
-            # If we get here, there's a running loop
-            # Run the coroutine in a new thread with its own event loop
-            import concurrent.futures
-            import threading
-            
-            result_container = {}
-            exception_container = {}
-            
-            def run_in_thread():
-                try:
-                    # Create a new event loop for this thread
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    try:
-                        result = new_loop.run_until_complete(coro)
-                        result_container['value'] = result
-                    finally:
-                        new_loop.close()
-                except Exception as e:
-                    exception_container['error'] = e
-            
-            thread = threading.Thread(target=run_in_thread)
-            thread.start()
-            thread.join(timeout=30)  # 30 second timeout
-            
-            if not thread.is_alive():
-                if 'error' in exception_container:
-                    raise exception_container['error']
-                return result_container.get('value')
-            else:
-                raise TimeoutError("Async operation timed out after 30 seconds")
-                
-        except RuntimeError:
-            # No running loop, safe to use asyncio.run()
-            return asyncio.run(coro)
+        return get_async_bridge().run(coro)
     
     async def _load_state_from_storage(self):
         """
@@ -706,15 +688,19 @@ class OpsCoordinatorAgent(BaseAgent):
     
     # ========== Async Workflow Methods ==========
     
-    async def execute_workflow_async(self, workflow_id: str) -> str:
+    async def execute_workflow_async(self, workflow_id: str, priority: int = 0) -> str:
         """
         Execute a workflow asynchronously (non-blocking)
         
         Args:
             workflow_id: Workflow ID to execute
+            priority: Admission priority (higher runs first)
         
         Returns:
             task_id: Task identifier for tracking
+        
+        Raises:
+            AdmissionRejected: If the admission queue is full
         """
         try:
             # Ensure storage is initialized
@@ -725,16 +711,20 @@ class OpsCoordinatorAgent(BaseAgent):
                 raise ValueError(f"Workflow {workflow_id} not found")
             
             # Guard against reusing workflow_ids after cleanup
-            if workflow_id in self._workflow_tasks:
+            if workflow_id in self._workflow_tasks or self._admission.is_queued(workflow_id):
                 raise ValueError(f"Workflow {workflow_id} is already running")
             
+            workflow = self.active_workflows[workflow_id]
+            self._admission.submit(workflow_id, workflow["workflow_type"], priority)
+            workflow["queued_at"] = datetime.now().isoformat()
+            
             # Create progress queue and cancel event
-            self._progress_queues[workflow_id] = asyncio.Queue()
+            self._progress_queues[workflow_id] = self._create_progress_queue(workflow_id)
             self._cancel_events[workflow_id] = asyncio.Event()
             
-            # Start background task
+            # Start background task (waits for an execution slot first)
             task = asyncio.create_task(
-                self._workflow_runner(workflow_id)
+                self._run_admitted_workflow(workflow_id)
             )
             self._workflow_tasks[workflow_id] = task
             
@@ -744,41 +734,65 @@ class OpsCoordinatorAgent(BaseAgent):
         except Exception as e:
             logger.error(f"Error starting async workflow {workflow_id}: {e}")
             # Cleanup on error
+            if workflow_id not in self._workflow_tasks:
+                await self._admission.remove(workflow_id)
             if workflow_id in self._progress_queues:
                 del self._progress_queues[workflow_id]
             if workflow_id in self._cancel_events:
                 del self._cancel_events[workflow_id]
             raise
     
-    async def get_progress_stream(self, workflow_id: str) -> AsyncIterator[Dict]:
+    def get_progress_stream(self, workflow_id: str, include_tokens: bool = False) -> AsyncIterator[Dict]:
         """
         Stream progress updates for a workflow
         
+        Every caller gets its own subscription (starting from the latest
+        progress update), so several streams can follow one workflow.
+        
         Args:
             workflow_id: Workflow ID to stream progress for
+            include_tokens: Also yield LLM token events ({"type": "token", ...})
+                emitted while agents are generating
+        
+        Returns:
+            Async iterator of progress update dictionaries
         
-        Yields:
-            Progress update dictionaries
+        Raises:
+            ValueError: If the workflow is not queued or running
         """
-        if workflow_id not in self._progress_queues:
+        queue = self._progress_queues.get(workflow_id)
+        if queue is None:
             raise ValueError(f"No progress queue for workflow {workflow_id}")
         
-        queue = self._progress_queues[workflow_id]
-        
-        while True:
-            try:
+        return self._iter_progress(workflow_id, queue, queue.subscribe(), include_tokens)
+    
+    async def _iter_progress(
+        self,
+        workflow_id: str,
+        queue: ProgressQueue,
+        subscription: asyncio.Queue,
+        include_tokens: bool
+    ) -> AsyncIterator[Dict]:
+        """Yield one subscriber's progress updates until the workflow completes"""
+        try:
+            while True:
                 # Wait for next progress update
-                update = await queue.get()
+                update = await subscription.get()
                 
                 # Check for completion marker
                 if update.get("_complete"):
                     break
                 
+                if update.get("type") == "token" and not include_tokens:
+                    continue
+                
                 yield update
-            
-            except asyncio.CancelledError:
-                logger.info(f"Progress stream cancelled for {workflow_id}")
-                break
+        
+        except asyncio.CancelledError:
+            logger.info(f"Progress stream cancelled for {workflow_id}")
+        
+        finally:
+            queue.unsubscribe(subscription)
     
     async def cancel_workflow_async(self, workflow_id: str) -> bool:
         """
@@ -793,6 +807,14 @@ class OpsCoordinatorAgent(BaseAgent):
         if workflow_id not in self._cancel_events:
             return False
         
+        # Not started yet: drop it from the admission queue right away
+        if self._admission.is_queued(workflow_id):
+            task = self._workflow_tasks.get(workflow_id)
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            return True
+        
         # Signal cancellation
         self._cancel_events[workflow_id].set()
         
@@ -813,7 +835,8 @@ class OpsCoordinatorAgent(BaseAgent):
         project_name: Optional[str] = None,
         user_request: Optional[str] = None,
         parameters: Optional[Dict] = None,
-        auto_execute: bool = True
+        auto_execute: bool = True,
+        priority: int = 0
     ) -> str:
         """
         Unified async method: Create and execute a workflow in one call
@@ -828,10 +851,14 @@ class OpsCoordinatorAgent(BaseAgent):
             user_request: Optional user request description
             parameters: Optional workflow-specific parameters
             auto_execute: Whether to auto-execute tasks
+            priority: Admission priority (higher runs first)
         
         Returns:
             workflow_id: ID of the created and executing workflow
         
+        Raises:
+            AdmissionRejected: If the admission queue is full (nothing is created)
+        
         Usage:
             workflow_id = await coordinator.start_and_execute_workflow_async(
                 workflow_type=WorkflowType.DELIVERY_PIPELINE,
@@ -851,6 +878,10 @@ class OpsCoordinatorAgent(BaseAgent):
             # Generate workflow ID
             workflow_id = f"wf_{uuid.uuid4().hex[:8]}"
             
+            # Backpressure: reject before anything is created or persisted
+            self._admission.submit(workflow_id, workflow_type.value, priority)
+            now = datetime.now().isoformat()
+            
             # Initialize workflow data
             workflow_data = {
                 "workflow_id": workflow_id,
@@ -860,7 +891,8 @@ class OpsCoordinatorAgent(BaseAgent):
                 "user_request": user_request,
                 "parameters": parameters or {},
                 "auto_execute": auto_execute,
-                "created_at": datetime.now().isoformat(),
+                "created_at": now,
+                "queued_at": now,
                 "steps": [],
                 "current_step": None
             }
@@ -874,16 +906,16 @@ class OpsCoordinatorAgent(BaseAgent):
             logger.info(f"Created workflow {workflow_id} of type {workflow_type.value}")
             
             # Create progress queue and cancel event
-            self._progress_queues[workflow_id] = asyncio.Queue()
+            self._progress_queues[workflow_id] = self._create_progress_queue(workflow_id)
             self._cancel_events[workflow_id] = asyncio.Event()
             
-            # Start background execution task
+            # Start background execution task (waits for an execution slot first)
             task = asyncio.create_task(
-                self._workflow_runner(workflow_id)
+                self._run_admitted_workflow(workflow_id)
             )
             self._workflow_tasks[workflow_id] = task
             
-            logger.info(f"Started async execution for workflow {workflow_id}")
+            logger.info(f"Queued async execution for workflow {workflow_id}")
             
             return workflow_id
         
@@ -891,6 +923,7 @@ class OpsCoordinatorAgent(BaseAgent):
             logger.error(f"Error in start_and_execute_workflow_async: {e}")
             # Cleanup on error (only if workflow_id was created)
             if workflow_id:
+                await self._admission.remove(workflow_id)
                 if workflow_id in self._progress_queues:
                     del self._progress_queues[workflow_id]
                 if workflow_id in self._cancel_events:
@@ -899,6 +932,93 @@ class OpsCoordinatorAgent(BaseAgent):
                     del self.active_workflows[workflow_id]
             raise
     
+    async def _run_admitted_workflow(self, workflow_id: str) -> None:
+        """
+        Wait for an execution slot, then run the workflow
+        
+        Args:
+            workflow_id: Workflow ID (already submitted to the admission queue)
+        """
+        admitted = False
+        try:
+            async with self._admission.slot(workflow_id):
+                admitted = True
+                await self._workflow_runner(workflow_id)
+        except asyncio.CancelledError:
+            if not admitted:
+                await self._cancel_queued_workflow(workflow_id)
+            raise
+    
+    async def _cancel_queued_workflow(self, workflow_id: str) -> None:
+        """Mark a workflow cancelled before it ever started running"""
+        logger.info(f"Workflow {workflow_id} cancelled while queued")
+        persistence_success = False
+        
+        workflow = self.active_workflows.get(workflow_id)
+        if workflow is not None:
+            workflow["status"] = WorkflowStatus.CANCELLED.value
+            workflow["cancelled_at"] = datetime.now().isoformat()
+            workflow["error"] = "Cancelled by user (queued)"
+            try:
+                await self.storage.save_workflow(workflow)
+                persistence_success = True
+            except Exception as persist_err:
+                logger.error(f"Persistence error cancelling queued workflow: {persist_err}")
+            
+            if persistence_success:
+                self.workflow_history.append(workflow)
+                del self.active_workflows[workflow_id]
+        
+        queue = self._progress_queues.get(workflow_id)
+        if queue is not None:
+            await queue.put({
+                "_complete": True,
+                "cancelled": True,
+                "status": WorkflowStatus.CANCELLED.value,
+                "progress_percent": 0.0,
+                "persistence_error": not persistence_success
+            })
+        
+        if workflow_id in self._workflow_tasks:
+            del self._workflow_tasks[workflow_id]
+        if workflow_id in self._cancel_events:
+            del self._cancel_events[workflow_id]
+        if workflow_id in self._progress_queues:
+            del self._progress_queues[workflow_id]
+    
+    def get_admission_stats(self) -> Dict[str, Any]:
+        """Get admission queue depth, running counts and wait-time metrics"""
+        return self._admission.get_stats()
+    
+    def _create_progress_queue(self, workflow_id: str) -> ProgressQueue:
+        """Create a progress queue whose events also update hot workflow state"""
+        return ProgressQueue(lambda event: self._on_progress_event(workflow_id, event))
+    
+    def _on_progress_event(self, workflow_id: str, event: Dict) -> None:
+        """
+        Apply a progress event to in-memory workflow state and schedule a
+        coalesced write of the changed columns (terminal states are saved
+        separately by the runner)
+        """
+        if event.get("_complete") or event.get("type") == "token":
+            return
+        
+        workflow = self.active_workflows.get(workflow_id)
+        if workflow is None:
+            return
+        
+        fields = {
+            column: event[column]
+            for column in ("progress_percent", "current_step", "total_steps")
+            if event.get(column) is not None
+        }
+        if not fields:
+            return
+        
+        workflow.update(fields)
+        if workflow.get("status") == WorkflowStatus.RUNNING.value:
+            self._progress_coalescer.update(workflow_id, status=workflow["status"], **fields)
+    
     async def _workflow_runner(self, workflow_id: str) -> None:
         """
         Background workflow runner (executes workflow and emits progress)
@@ -949,23 +1069,36 @@ class OpsCoordinatorAgent(BaseAgent):
             
             logger.info(f"Executing async workflow {workflow_id} of type {workflow_type.value}")
             
+            # Forward LLM tokens generated by agents into the progress stream
+            # (tokens are only useful live: drop them while nobody is watching)
+            def token_sink(event: Dict) -> None:
+                if isinstance(queue, ProgressQueue) and not queue.has_subscribers():
+                    return
+                queue.put_nowait({
+                    "workflow_id": workflow_id,
+                    "type": "token",
+                    "content": event.get("content", ""),
+                    "provider": event.get("provider")
+                })
+            
             # Route to appropriate workflow executor (async version)
-            if workflow_type == WorkflowType.DELIVERY_PIPELINE:
-                result = await self._execute_delivery_pipeline_async(
-                    workflow_id, workflow, queue, cancel_event
-                )
-            elif workflow_type == WorkflowType.REGRESSION:
-                result = await self._execute_regression_workflow_async(
-                    workflow_id, workflow, queue, cancel_event
-                )
-            elif workflow_type == WorkflowType.MAINTENANCE:
-                result = await self._execute_maintenance_workflow_async(
-                    workflow_id, workflow, queue, cancel_event
-                )
-            else:  # CUSTOM
-                result = await self._execute_custom_workflow_async(
-                    workflow_id, workflow, queue, cancel_event
-                )
+            with stream_tokens_to(token_sink):
+                if workflow_type == WorkflowType.DELIVERY_PIPELINE:
+                    result = await self._execute_delivery_pipeline_async(
+                        workflow_id, workflow, queue, cancel_event
+                    )
+                elif workflow_type == WorkflowType.REGRESSION:
+                    result = await self._execute_regression_workflow_async(
+                        workflow_id, workflow, queue, cancel_event
+                    )
+                elif workflow_type == WorkflowType.MAINTENANCE:
+                    result = await self._execute_maintenance_workflow_async(
+                        workflow_id, workflow, queue, cancel_event
+                    )
+                else:  # CUSTOM
+                    result = await self._execute_custom_workflow_async(
+                        workflow_id, workflow, queue, cancel_event
+                    )
             
             # Update final status (with persistence error handling)
             # Check for cooperative cancellation FIRST
@@ -979,6 +1112,8 @@ class OpsCoordinatorAgent(BaseAgent):
                 workflow["error"] = "Cancelled by user"
                 workflow["progress_percent"] = workflow.get("progress_percent", 0.0)
                 
+                # Full-row terminal save supersedes any coalesced progress write
+                self._progress_coalescer.discard(workflow_id)
                 persistence_success = False
                 try:
                     await self.storage.save_workflow(workflow)
@@ -1009,6 +1144,8 @@ class OpsCoordinatorAgent(BaseAgent):
                 workflow["progress_percent"] = 100.0
                 
                 # Save to database FIRST, only remove from active if successful
+                # Full-row terminal save supersedes any coalesced progress write
+                self._progress_coalescer.discard(workflow_id)
                 persistence_success = False
                 try:
                     await self.storage.save_workflow(workflow)
@@ -1037,6 +1174,8 @@ class OpsCoordinatorAgent(BaseAgent):
                 workflow["failed_at"] = datetime.now().isoformat()
                 workflow["error"] = result.get("error")
                 
+                # Full-row terminal save supersedes any coalesced progress write
+                self._progress_coalescer.discard(workflow_id)
                 try:
                     await self.storage.save_workflow(workflow)
                 except Exception as persist_err:
@@ -1064,6 +1203,8 @@ class OpsCoordinatorAgent(BaseAgent):
                 workflow["progress_percent"] = workflow.get("progress_percent", 0.0)
                 current_progress = workflow["progress_percent"]
                 
+                # Full-row terminal save supersedes any coalesced progress write
+                self._progress_coalescer.discard(workflow_id)
                 try:
                     await self.storage.save_workflow(workflow)
                     persistence_success = True
@@ -1091,6 +1232,8 @@ class OpsCoordinatorAgent(BaseAgent):
             if workflow_id in self.active_workflows:
                 self.active_workflows[workflow_id]["status"] = WorkflowStatus.FAILED.value
                 self.active_workflows[workflow_id]["error"] = str(e)
+                # Full-row terminal save supersedes any coalesced progress write
+                self._progress_coalescer.discard(workflow_id)
                 try:
                     await self.storage.save_workflow(self.active_workflows[workflow_id])
                 except Exception as persist_err:
@@ -1106,10 +1249,18 @@ class OpsCoordinatorAgent(BaseAgent):
             # Always cleanup to prevent hanging streams
             await queue.put({"_complete": True})  # Ensure sentinel is sent
             
+            # Guaranteed flush of any progress still pending for this workflow
+            try:
+                await self._progress_coalescer.close_workflow(workflow_id)
+            except Exception as flush_err:
+                logger.error(f"Persistence error flushing progress for {workflow_id}: {flush_err}")
+            
             if workflow_id in self._workflow_tasks:
                 del self._workflow_tasks[workflow_id]
             if workflow_id in self._cancel_events:
                 del self._cancel_events[workflow_id]
+            if self._progress_queues.get(workflow_id) is queue:
+                del self._progress_queues[workflow_id]
             
             logger.debug(f"Workflow runner cleanup complete for {workflow_id}")
     
@@ -1467,10 +1618,11 @@ class OpsCoordinatorAgent(BaseAgent):
             plan = plan_result.result.get("plan", {}) if plan_result.result else {}
             tasks = plan.get("tasks", [])
             
-            # Save ProjectPlan to workflow storage (Phase 3.1 integration)
+            # Keep ProjectPlan in hot workflow state (Phase 3.1 integration); it has no
+            # column of its own and is persisted with the final report, so a full-row
+            # rewrite here would only add write amplification
             workflow["project_plan"] = plan
-            await self.storage.save_workflow(workflow)
-            logger.info(f"[{workflow_id}] ✓ Saved ProjectPlan: {len(tasks)} tasks, "
+            logger.info(f"[{workflow_id}] ✓ Stored ProjectPlan: {len(tasks)} tasks, "
                        f"{plan.get('resource_estimate', {}).get('total_estimated_hours', 0):.1f}h estimated")
             
             # Step 2: Task execution (using async CodeExecutor methods)
@@ -1485,12 +1637,9 @@ class OpsCoordinatorAgent(BaseAgent):
                 "message": f"⚙️ Executing {len(tasks)} tasks..."
             })
             
-            for i, task in enumerate(tasks):
-                if cancel_event.is_set():
-                    return {"success": False, "cancelled": True, "error": "Cancelled"}
-                
-                # Use async generate_code for each task
-                task_result = await self._dispatch_agent_command_async(
+            # Independent tasks run concurrently; dependents wait for their dependencies
+            async def generate_task_code(task: Dict) -> AgentResult:
+                return await self._dispatch_agent_command_async(
                     AgentCommand(
                         agent_id="code_executor",
                         action="generate_code",
@@ -1501,20 +1650,49 @@ class OpsCoordinatorAgent(BaseAgent):
                         timeout=None
                     )
                 )
-                results.append(task_result)
-                
-                # Update progress
-                task_progress = 50.0 + (25.0 * (i + 1) / len(tasks)) if tasks else 75.0
+            
+            async def report_task_done(task: Dict, task_result: Any, done: int, total: int):
+                task_progress = 50.0 + (25.0 * done / total) if total else 75.0
                 await queue.put({
                     "workflow_id": workflow_id,
                     "current_step": 2,
                     "total_steps": total_steps,
                     "progress_percent": task_progress,
-                    "message": f"⚙️ Task {i+1}/{len(tasks)}: {task.get('title', 'Unknown')}"
+                    "task_id": task.get("id"),
+                    "task_success": isinstance(task_result, AgentResult) and task_result.success,
+                    "message": f"⚙️ Task {done}/{total}: {task.get('title', 'Unknown')}"
                 })
-                
-                # Yield to event loop
-                await asyncio.sleep(0)
+            
+            scheduler = DAGScheduler(
+                max_concurrency=self.max_parallel_tasks,
+                agent_limits=self.agent_concurrency_limits
+            )
+            dag_run = await scheduler.run(
+                tasks,
+                generate_task_code,
+                is_success=lambda r: isinstance(r, AgentResult) and r.success,
+                cancel_event=cancel_event,
+                on_task_done=report_task_done
+            )
+            
+            if dag_run["cancelled"]:
+                return {"success": False, "cancelled": True, "error": "Cancelled"}
+            
+            # Plan order, each result tagged with its task id
+            for entry in dag_run["results"]:
+                task_id, task_result = entry["task_id"], entry["result"]
+                if isinstance(task_result, AgentResult):
+                    results.append(task_result.model_copy(update={"task_id": task_id}))
+                    continue
+                if entry["skipped"]:
+                    error = f"Task {task_id} skipped: a dependency failed"
+                else:
+                    error = str(task_result)
+                results.append(AgentResult(
+                    agent_id="code_executor", success=False, result=None,
+                    error=error, duration=None,
+                    timestamp=datetime.now().isoformat(), task_id=task_id
+                ))
             
             # Step 3: QA run (using async QATestAgent methods)
             if cancel_event.is_set():
@@ -1630,7 +1808,9 @@ class OpsCoordinatorAgent(BaseAgent):
                     action="run_tests",
                     parameters={
                         "test_type": "all",
-                        "coverage": False
+                        "coverage": True,  # Per-test coverage keeps the impact map current
+                        "shards": 0,  # One pytest process per CPU core
+                        "impacted": True  # Only tests affected by changes since the last passing run
                     },
                     timeout=None
                 )
@@ -2073,7 +2253,9 @@ class OpsCoordinatorAgent(BaseAgent):
                 elif command.action == "run_tests" and hasattr(agent, "run_tests_async"):
                     test_result = await agent.run_tests_async(  # type: ignore
                         test_type=command.parameters.get("test_type", "all"),
-                        coverage=command.parameters.get("coverage", False)
+                        coverage=command.parameters.get("coverage", False),
+                        shards=command.parameters.get("shards"),
+                        impacted=command.parameters.get("impacted", False)
                     )
                     result = {"success": True, "test_result": test_result}
                 else:
@@ -3,7 +3,7 @@ QA/Test Agent
 Automated testing, quality analysis, and bug detection
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 import uuid
 import re
@@ -52,6 +52,13 @@ class QATestAgent(BaseAgent):
         # Known defects
         self.defects: Dict[str, DefectRecord] = {}
         
+        # Sharded runs: seconds per test file (shard balancing) and last failures (run first)
+        self.test_durations: Dict[str, float] = {}
+        self.last_failed_tests: List[str] = []
+        
+        # Test impact analysis state (see TestImpactAnalyzer.get_state)
+        self.test_impact_state: Dict = {}
+        
         # Load state
         self._load_qa_state()
     
@@ -71,6 +78,17 @@ class QATestAgent(BaseAgent):
         defects_data = self.cache.cache_get(f"qa_defects_{self.agent_id}")
         if defects_data:
             self.defects = {k: DefectRecord(**v) for k, v in defects_data.items()}
+        
+        # Load sharded run history
+        durations = self.cache.cache_get(f"qa_test_durations_{self.agent_id}")
+        if durations:
+            self.test_durations = durations
+        failed = self.cache.cache_get(f"qa_last_failed_{self.agent_id}")
+        if failed:
+            self.last_failed_tests = failed
+        impact = self.cache.cache_get(f"qa_test_impact_{self.agent_id}")
+        if impact:
+            self.test_impact_state = impact
     
     def _save_qa_state(self):
         """Save QA state to cache"""
@@ -89,6 +107,21 @@ class QATestAgent(BaseAgent):
             {k: v.model_dump() for k, v in self.defects.items()},
             expire=86400 * 30  # 30 days
         )
+        self.cache.cache_set(
+            f"qa_test_durations_{self.agent_id}",
+            self.test_durations,
+            expire=86400 * 30
+        )
+        self.cache.cache_set(
+            f"qa_last_failed_{self.agent_id}",
+            self.last_failed_tests,
+            expire=86400 * 7
+        )
+        self.cache.cache_set(
+            f"qa_test_impact_{self.agent_id}",
+            self.test_impact_state,
+            expire=86400 * 30
+        )
     
     def execute(self, request: Dict) -> Dict:
         """
@@ -681,7 +714,10 @@ Return ONLY the test code, no explanations."""
         test_path: Optional[str] = None,
         test_pattern: Optional[str] = None,
         coverage: bool = True,
-        verbose: bool = False
+        verbose: bool = False,
+        shards: Optional[int] = None,
+        fail_fast: bool = False,
+        impacted: bool = False
     ) -> Dict:
         """
         Run tests asynchronously
@@ -692,10 +728,25 @@ Return ONLY the test code, no explanations."""
             test_pattern: Test name pattern (e.g., 'test_*')
             coverage: Generate coverage report
             verbose: Verbose output
+            shards: Run in parallel pytest processes (0 = one per CPU core);
+                None runs a single pytest process
+            fail_fast: Sharded runs only - stop if a previously failed test still fails
+            impacted: Run only tests affected by changes since the last
+                passing run (see run_impacted_tests_async)
         
         Returns:
             RunTestsResponse data
         """
+        if impacted:
+            return await self.run_impacted_tests_async(
+                test_type=test_type, coverage=coverage, shards=shards
+            )
+        
+        if shards is not None:
+            return await self._run_tests_sharded_async(
+                test_type, test_path, test_pattern, coverage, verbose, shards, fail_fast
+            )
+        
         try:
             logger.info(f"Running {test_type} tests asynchronously...")
             
@@ -716,9 +767,9 @@ Return ONLY the test code, no explanations."""
             if test_pattern:
                 cmd_parts.extend(["-k", test_pattern])
             
-            # Add coverage if requested
+            # Add coverage if requested (per-test contexts feed test impact analysis)
             if coverage:
-                cmd_parts.extend(["--cov=dev_platform", "--cov-report=term-missing"])
+                cmd_parts.extend(["--cov=dev_platform", "--cov-report=term-missing", "--cov-context=test"])
             
             # Add verbosity
             if verbose:
@@ -774,6 +825,9 @@ Return ONLY the test code, no explanations."""
                 "summary": test_results.get("summary", "Tests completed")
             }
             
+            if coverage:
+                self._update_test_impact_coverage()
+            
             # Save to history
             self.test_history.append({
                 "timestamp": self._get_timestamp(),
@@ -799,11 +853,244 @@ Return ONLY the test code, no explanations."""
                 "duration": 0.0
             }
     
+    async def _run_tests_sharded_async(
+        self,
+        test_type: str,
+        test_path: Optional[Union[str, List[str]]],
+        test_pattern: Optional[str],
+        coverage: bool,
+        verbose: bool,
+        shards: int,
+        fail_fast: bool
+    ) -> Dict:
+        """
+        Run tests in parallel shards (see ShardedTestRunner)
+        
+        Shards are balanced by stored per-file durations, and tests that failed
+        in the previous run are executed first.
+        """
+        from dev_platform.tools.sharded_test_runner import ShardedTestRunner
+        
+        try:
+            target = test_path or {"unit": "tests/unit/", "integration": "tests/integration/"}.get(test_type, "tests/")
+            logger.info(f"Running {test_type} tests in shards...")
+            
+            runner = ShardedTestRunner(shards=shards or None, timeout=300.0)
+            run = await runner.run(
+                target,
+                test_pattern=test_pattern,
+                coverage=coverage,
+                verbose=verbose,
+                durations=self.test_durations,
+                failed_first=self.last_failed_tests,
+                fail_fast=fail_fast
+            )
+            
+            # Update failed-first state and (complete runs only) shard balancing
+            if run["timed_out"] or run["stopped_early"]:
+                # Tests that did not run keep their previous failed status
+                passed = set(run["passed_tests"])
+                previous = [t for t in self.last_failed_tests if t not in passed]
+                self.last_failed_tests = list(dict.fromkeys(run["failed_tests"] + previous))
+            else:
+                self.last_failed_tests = run["failed_tests"]
+                self.test_durations.update(run["file_durations"])
+            if coverage:
+                self._update_test_impact_coverage()
+            
+            counts = run["counts"]
+            total = sum(counts.values())
+            summary = f"{counts['passed']}/{total} tests passed"
+            if counts["failed"] or counts["errors"]:
+                summary += f", {counts['failed']} failed, {counts['errors']} errors"
+            summary += f" ({run['shards']} shards)"
+            if run["stopped_early"]:
+                summary += " - stopped early: previously failed tests still fail"
+            
+            response = {
+                "success": not run["timed_out"],
+                "total_tests": total,
+                "passed": counts["passed"],
+                "failed": counts["failed"],
+                "skipped": counts["skipped"],
+                "errors": counts["errors"],
+                "duration": run["duration"],
+                "coverage": run["coverage"],
+                "test_results": [r.model_dump() for r in run["results"]],
+                "summary": summary,
+                "shards": run["shards"],
+                "stopped_early": run["stopped_early"]
+            }
+            if run["timed_out"]:
+                response["error"] = "Test execution timed out (5 minutes)"
+            
+            self.test_history.append({
+                "timestamp": self._get_timestamp(),
+                "test_type": test_type,
+                "results": {k: v for k, v in response.items() if k != "test_results"}
+            })
+            self._save_qa_state()
+            
+            logger.info(f"Sharded test run completed: {summary}")
+            
+            return response
+        
+        except Exception as e:
+            logger.error(f"Error running sharded tests: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "total_tests": 0,
+                "passed": 0,
+                "failed": 0,
+                "skipped": 0,
+                "errors": 0,
+                "duration": 0.0
+            }
+    
+    def _get_test_impact_analyzer(self):
+        """TestImpactAnalyzer restored from the cached QA state"""
+        from dev_platform.tools.test_impact import TestImpactAnalyzer
+        
+        return TestImpactAnalyzer(state=self.test_impact_state)
+    
+    def _update_test_impact_coverage(self):
+        """Refresh the test impact map from the per-test coverage of the last run"""
+        try:
+            analyzer = self._get_test_impact_analyzer()
+            if analyzer.update_from_coverage(".coverage"):
+                self.test_impact_state = analyzer.get_state()
+        except Exception as e:
+            logger.warning(f"Failed to update test impact map: {e}")
+    
+    def _get_changed_files(self, since_commit: Optional[str]) -> Tuple[Optional[List[str]], Optional[str]]:
+        """
+        Files changed since a commit (committed and working tree), relative to the project
+        
+        Returns:
+            (changed files, or None if unknown, e.g. no base commit; current HEAD commit)
+        """
+        try:
+            from dev_platform.services.bridge_git_service import BridgeGitService
+            
+            git = BridgeGitService(".")
+            head = git.get_current_commit()
+            if not since_commit or not head:
+                return None, head
+            committed = git.get_files_changed_since(since_commit)
+            if committed is None:
+                return None, head
+            staged, unstaged, untracked = git.get_file_changes()
+            # git reports paths from the repository root
+            prefix = git.get_path_prefix()
+        except Exception as e:
+            logger.warning(f"Cannot read git changes for test impact analysis: {e}")
+            return None, None
+        
+        changed = committed + [c.file_path for c in staged + unstaged] + untracked
+        return [path[len(prefix):] for path in changed if path.startswith(prefix)], head
+    
+    async def run_impacted_tests_async(
+        self,
+        changed_files: Optional[List[str]] = None,
+        test_type: str = "all",
+        coverage: bool = False,
+        shards: Optional[int] = 0
+    ) -> Dict:
+        """
+        Run only the tests affected by changed files
+        
+        Falls back to the full suite periodically, when the changes are
+        unknown or empty and when test infrastructure changes (see
+        TestImpactAnalyzer). A run without failures, errors or a timeout
+        records HEAD as the base commit for the next diff.
+        
+        Args:
+            changed_files: Changed paths (default: git changes since the last
+                passing run, including the working tree)
+            test_type: Test type for full runs (all, unit, integration)
+            coverage: Generate coverage report (also refreshes the impact map)
+            shards: Parallel pytest processes (0 = one per CPU core, None = one process)
+        
+        Returns:
+            RunTestsResponse data with an "impact" section
+        """
+        try:
+            head = None
+            analyzer = self._get_test_impact_analyzer()
+            if changed_files is None:
+                changed_files, head = await asyncio.to_thread(
+                    self._get_changed_files, analyzer.last_tested_commit
+                )
+            
+            selection = await asyncio.to_thread(analyzer.select_tests, changed_files)
+            analyzer.record_run(selection["full_run"])
+            self.test_impact_state = analyzer.get_state()
+            
+            impact = {
+                "full_run": selection["full_run"],
+                "reason": selection["reason"],
+                "changed_files": len(selection["changed_files"]),
+                "selected_tests": selection["tests"]
+            }
+            logger.info(f"Test impact: {selection['reason']}")
+            
+            if selection["full_run"]:
+                response = await self._run_tests_sharded_async(
+                    test_type, None, None, coverage, False, 1 if shards is None else shards, False
+                )
+            elif selection["tests"]:
+                response = await self._run_tests_sharded_async(
+                    "impacted", selection["tests"], None, coverage, False, 1 if shards is None else shards, False
+                )
+            else:
+                self._save_qa_state()
+                response = {
+                    "success": True,
+                    "total_tests": 0,
+                    "passed": 0,
+                    "failed": 0,
+                    "skipped": 0,
+                    "errors": 0,
+                    "duration": 0.0,
+                    "coverage": None,
+                    "test_results": [],
+                    "summary": f"No tests affected by {impact['changed_files']} changed file(s)"
+                }
+            
+            # Only a clean, complete run becomes the base for the next diff
+            clean = (
+                response.get("success")
+                and not response.get("failed")
+                and not response.get("errors")
+                and not response.get("stopped_early")
+            )
+            if head and clean:
+                self.test_impact_state["last_tested_commit"] = head
+                self._save_qa_state()
+            
+            response["impact"] = impact
+            return response
+        
+        except Exception as e:
+            logger.error(f"Error running impacted tests: {e}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "total_tests": 0,
+                "passed": 0,
+                "failed": 0,
+                "skipped": 0,
+                "errors": 0,
+                "duration": 0.0
+            }
+    
     async def analyze_quality_async(
         self,
         file_path: str,
         tools: Optional[List[QAToolType]] = None,
-        options: Optional[Dict] = None
+        options: Optional[Dict] = None,
+        sequential: Optional[bool] = None
     ) -> AggregatedQAReport:
         """
         Analyze code quality asynchronously using QA tools
@@ -812,6 +1099,8 @@ Return ONLY the test code, no explanations."""
             file_path: Path to file or directory to analyze
             tools: List of tools to run (default: [flake8, bandit, radon])
             options: Tool-specific options
+            sequential: Run tools one at a time (default from QA tools config);
+                False runs them concurrently within the RAM/CPU budget
         
         Returns:
             AggregatedQAReport with results from all tools
@@ -827,7 +1116,8 @@ Return ONLY the test code, no explanations."""
             report = await manager.analyze_code_quality_async(
                 file_path=file_path,
                 tools=tools,
-                options=options
+                options=options,
+                sequential=sequential
             )
             
             # Save to quality history
@@ -421,6 +421,7 @@ class AggregatedQAReport(BaseModel):
     flake8_executed: bool = Field(False, description="Whether flake8 ran")
     bandit_executed: bool = Field(False, description="Whether bandit ran")
     radon_executed: bool = Field(False, description="Whether radon ran")
+    timed_out_tools: List[str] = Field(default_factory=list, description="Tools that hit their timeout (report is partial)")
     
     # Issue counts
     total_issues: int = Field(0, description="Total issues from all tools")
@@ -503,6 +504,7 @@ class AgentResult(BaseModel):
     error: Optional[str] = Field(None, description="Error message if failed")
     duration: Optional[float] = Field(None, description="Execution duration in seconds")
     timestamp: Optional[str] = Field(None, description="Completion timestamp")
+    task_id: Optional[Union[int, str]] = Field(None, description="Plan task this result belongs to")
 
 
 class ProjectProgressSnapshot(BaseModel):
@@ -2,21 +2,32 @@
 
 from .secrets_manager import SecretsManager, get_secrets_manager
 from .cache_manager import CacheManager, get_cache_manager
+from .response_cache import ResponseCache
 from .model_router import ModelRouter, get_model_router
 from .tool_registry import ToolRegistry, get_tool_registry
 from .sandbox import ExecutionSandbox, get_sandbox
 from .workflow_storage import WorkflowStorage
+from .progress_coalescer import ProgressCoalescer, ProgressQueue
+from .admission_queue import WorkflowAdmissionQueue, AdmissionRejected
+from .async_bridge import AsyncBridge, get_async_bridge
 
 __all__ = [
     "SecretsManager",
     "get_secrets_manager",
     "CacheManager",
     "get_cache_manager",
+    "ResponseCache",
     "ModelRouter",
     "get_model_router",
     "ToolRegistry",
     "get_tool_registry",
     "ExecutionSandbox",
     "get_sandbox",
-    "WorkflowStorage"
+    "WorkflowStorage",
+    "ProgressCoalescer",
+    "ProgressQueue",
+    "WorkflowAdmissionQueue",
+    "AdmissionRejected",
+    "AsyncBridge",
+    "get_async_bridge"
 ]
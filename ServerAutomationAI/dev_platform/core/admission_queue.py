@@ -0,0 +1,226 @@
+"""
+Workflow Admission Queue
+Bounded priority admission with a fixed number of execution slots and per-type quotas
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the admission queue is full (backpressure)"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WorkflowAdmissionQueue:
+    """
+    Admission control for workflow execution
+    
+    Features:
+    - Fixed number of execution slots (the worker pool size)
+    - Priority ordering (higher first, FIFO within a priority)
+    - Per-workflow-type running quotas (e.g. at most 2 regressions at once)
+    - Bounded depth: submit() raises AdmissionRejected with a retry-after hint
+    - Queue depth / wait time metrics
+    
+    Usage:
+        admission.submit(workflow_id, "regression", priority=0)
+        async with admission.slot(workflow_id):
+            await run_workflow(workflow_id)
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue_depth: int = 50,
+        type_quotas: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize WorkflowAdmissionQueue
+        
+        Args:
+            max_workers: Maximum workflows running at once
+            max_queue_depth: Maximum workflows waiting; further submits are rejected
+            type_quotas: Maximum running workflows per workflow type
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue_depth = max_queue_depth
+        self.type_quotas = type_quotas or {}
+        
+        self._queue: List[Dict] = []
+        self._running: Dict[str, str] = {}  # workflow_id -> workflow_type
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "total_wait_seconds": 0.0,
+            "total_run_seconds": 0.0
+        }
+    
+    def _get_condition(self) -> asyncio.Condition:
+        """Get the wakeup condition for the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+    
+    def _find(self, workflow_id: str) -> Optional[Dict]:
+        for item in self._queue:
+            if item["workflow_id"] == workflow_id:
+                return item
+        return None
+    
+    def _quota_available(self, workflow_type: str) -> bool:
+        quota = self.type_quotas.get(workflow_type)
+        if quota is None:
+            return True
+        running = sum(1 for t in self._running.values() if t == workflow_type)
+        return running < quota
+    
+    def _next_eligible(self) -> Optional[Dict]:
+        """Highest-priority queued item whose type has quota left"""
+        if len(self._running) >= self.max_workers:
+            return None
+        for item in sorted(self._queue, key=lambda i: (-i["priority"], i["sequence"])):
+            if self._quota_available(item["workflow_type"]):
+                return item
+        return None
+    
+    # ===== Public API =====
+    
+    def retry_after(self) -> float:
+        """Estimate seconds until a queue slot frees up"""
+        completed = self.stats["completed"]
+        avg_run = self.stats["total_run_seconds"] / completed if completed else 30.0
+        backlog = len(self._queue) - self.max_queue_depth + 1
+        return max(1.0, round(avg_run * max(1, backlog) / self.max_workers, 1))
+    
+    def submit(self, workflow_id: str, workflow_type: str, priority: int = 0) -> int:
+        """
+        Admit a workflow into the queue
+        
+        Args:
+            workflow_id: Workflow ID
+            workflow_type: Workflow type (used for quotas and metrics)
+            priority: Higher runs first
+        
+        Returns:
+            Number of queued workflows ahead of this one
+        
+        Raises:
+            AdmissionRejected: If the queue is full
+        """
+        if len(self._queue) >= self.max_queue_depth:
+            self.stats["rejected"] += 1
+            raise AdmissionRejected(
+                f"Workflow queue is full ({len(self._queue)} waiting)",
+                retry_after=self.retry_after()
+            )
+        
+        item = {
+            "workflow_id": workflow_id,
+            "workflow_type": workflow_type,
+            "priority": priority,
+            "sequence": next(self._sequence),
+            "enqueued_at": time.monotonic()
+        }
+        self._queue.append(item)
+        self.stats["admitted"] += 1
+        
+        key = (-priority, item["sequence"])
+        return sum(1 for i in self._queue if (-i["priority"], i["sequence"]) < key)
+    
+    @asynccontextmanager
+    async def slot(self, workflow_id: str):
+        """
+        Wait for a submitted workflow's turn and hold an execution slot
+        
+        Cancelling while waiting removes the workflow from the queue.
+        """
+        item = self._find(workflow_id)
+        if item is None:
+            raise ValueError(f"Workflow {workflow_id} was not submitted")
+        
+        condition = self._get_condition()
+        async with condition:
+            try:
+                while self._next_eligible() is not item:
+                    await condition.wait()
+            except BaseException:
+                if item in self._queue:
+                    self._queue.remove(item)
+                # This item may have been next in line; let the others re-check
+                condition.notify_all()
+                raise
+            self._queue.remove(item)
+            self._running[workflow_id] = item["workflow_type"]
+            # Waiters parked behind this item may now be next in line
+            condition.notify_all()
+        
+        started = time.monotonic()
+        self.stats["total_wait_seconds"] += started - item["enqueued_at"]
+        try:
+            yield
+        finally:
+            self.stats["completed"] += 1
+            self.stats["total_run_seconds"] += time.monotonic() - started
+            self._running.pop(workflow_id, None)
+            # Wake every waiter: a freed type quota may unblock a lower-priority item
+            async with condition:
+                condition.notify_all()
+    
+    async def remove(self, workflow_id: str) -> bool:
+        """Remove a workflow that has not started yet; True if it was queued"""
+        item = self._find(workflow_id)
+        if item is None:
+            return False
+        condition = self._get_condition()
+        async with condition:
+            if item in self._queue:
+                self._queue.remove(item)
+            # The removed item may have been next in line; let the others re-check
+            condition.notify_all()
+        return True
+    
+    def is_queued(self, workflow_id: str) -> bool:
+        return self._find(workflow_id) is not None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, running counts and wait/run time metrics"""
+        queued_by_type: Dict[str, int] = {}
+        for item in self._queue:
+            queued_by_type[item["workflow_type"]] = queued_by_type.get(item["workflow_type"], 0) + 1
+        running_by_type: Dict[str, int] = {}
+        for workflow_type in self._running.values():
+            running_by_type[workflow_type] = running_by_type.get(workflow_type, 0) + 1
+        
+        started = self.stats["completed"] + len(self._running)
+        completed = self.stats["completed"]
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+            "running": len(self._running),
+            "max_workers": self.max_workers,
+            "queued_by_type": queued_by_type,
+            "running_by_type": running_by_type,
+            "type_quotas": dict(self.type_quotas),
+            "admitted": self.stats["admitted"],
+            "rejected": self.stats["rejected"],
+            "completed": completed,
+            "avg_wait_seconds": round(self.stats["total_wait_seconds"] / started, 3) if started else 0.0,
+            "avg_run_seconds": round(self.stats["total_run_seconds"] / completed, 3) if completed else 0.0
+        }
@@ -0,0 +1,190 @@
+"""
+Sync-to-Async Bridge
+Runs coroutines from synchronous code on one long-lived background event loop
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Coroutine, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBridge:
+    """
+    Shared background event loop for sync entry points
+    
+    Features:
+    - One daemon thread running one event loop, started lazily and reused
+    - Coroutines submitted with run_coroutine_threadsafe (no per-call thread/loop)
+    - Timed-out calls are cancelled on the loop instead of left running
+    - Latency metrics: dispatch (submit -> coroutine starts) and total round trip
+    
+    Loop-bound resources (e.g. WorkflowStorage's connection pool) created by
+    bridged calls stay valid across calls because the loop never changes.
+    """
+    
+    def __init__(self, default_timeout: float = 30.0, name: str = "async-bridge", sample_size: int = 256):
+        """
+        Initialize AsyncBridge
+        
+        Args:
+            default_timeout: Seconds to wait for a coroutine before giving up
+            name: Background thread name
+            sample_size: Number of recent calls kept for percentile metrics
+        """
+        self.default_timeout = default_timeout
+        self.name = name
+        
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        
+        self._stats_lock = threading.Lock()
+        self._dispatch_samples: deque = deque(maxlen=sample_size)
+        self._total_samples: deque = deque(maxlen=sample_size)
+        self.stats = {
+            "calls": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            "max_total_ms": 0.0
+        }
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop thread if it is not running"""
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+            
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+            
+            thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            thread.start()
+            started.wait()
+            
+            self._loop = loop
+            self._thread = thread
+            logger.debug(f"Started background event loop thread '{self.name}'")
+            return loop
+    
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The shared background event loop (started on first use)"""
+        return self._ensure_loop()
+    
+    def in_bridge_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+    
+    async def _timed(self, coro: Coroutine, submitted: float) -> Any:
+        self._dispatch_samples.append((time.perf_counter() - submitted) * 1000)
+        return await coro
+    
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and wait for its result
+        
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait (defaults to default_timeout)
+        
+        Returns:
+            The coroutine's result
+        
+        Raises:
+            TimeoutError: If the coroutine did not finish in time (it is cancelled)
+            RuntimeError: If called from the bridge loop itself (would deadlock)
+        """
+        if self.in_bridge_thread():
+            coro.close()
+            raise RuntimeError("AsyncBridge.run() called from the bridge loop; await the coroutine instead")
+        
+        timeout = self.default_timeout if timeout is None else timeout
+        loop = self._ensure_loop()
+        
+        submitted = time.perf_counter()
+        with self._stats_lock:
+            self.stats["calls"] += 1
+            self.stats["in_flight"] += 1
+        future = asyncio.run_coroutine_threadsafe(self._timed(coro, submitted), loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            with self._stats_lock:
+                self.stats["timeouts"] += 1
+            raise TimeoutError(f"Async operation timed out after {timeout} seconds")
+        except Exception:
+            with self._stats_lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            total_ms = (time.perf_counter() - submitted) * 1000
+            with self._stats_lock:
+                self.stats["in_flight"] -= 1
+                self.stats["max_total_ms"] = max(self.stats["max_total_ms"], total_ms)
+            self._total_samples.append(total_ms)
+    
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the background loop (a later run() starts a new one)"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        
+        if loop is None or thread is None:
+            return
+        
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=timeout)
+        if not thread.is_alive():
+            loop.close()
+    
+    @staticmethod
+    def _percentile(samples: deque, percent: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return round(ordered[index], 3)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Call counters and latency percentiles (milliseconds, recent calls)"""
+        dispatch = list(self._dispatch_samples)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "calls": self.stats["calls"],
+            "errors": self.stats["errors"],
+            "timeouts": self.stats["timeouts"],
+            "in_flight": self.stats["in_flight"],
+            "dispatch_avg_ms": round(sum(dispatch) / len(dispatch), 3) if dispatch else 0.0,
+            "dispatch_p95_ms": self._percentile(self._dispatch_samples, 95),
+            "total_p50_ms": self._percentile(self._total_samples, 50),
+            "total_p95_ms": self._percentile(self._total_samples, 95),
+            "max_total_ms": round(self.stats["max_total_ms"], 3)
+        }
+
+
+# Global instance
+_async_bridge = None
+_async_bridge_lock = threading.Lock()
+
+def get_async_bridge() -> AsyncBridge:
+    """Get global async bridge instance"""
+    global _async_bridge
+    with _async_bridge_lock:
+        if _async_bridge is None:
+            _async_bridge = AsyncBridge()
+            atexit.register(_async_bridge.shutdown)
+    return _async_bridge
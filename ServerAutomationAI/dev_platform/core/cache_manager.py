@@ -5,12 +5,18 @@ Using diskcache + SQLite for efficient caching
 
 import sqlite3
 import json
+import atexit
+import logging
+import threading
 from pathlib import Path
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 from diskcache import Cache
 
 
+logger = logging.getLogger(__name__)
+
+
 class CacheManager:
     """
     Lightweight cache and state manager
@@ -20,11 +26,18 @@ class CacheManager:
     - SQLite for structured state
     - Low memory usage (~50 MB)
     - Fast read/write
+    - Write-behind buffering for hot-path writes (model usage, health scores)
     """
     
-    def __init__(self, cache_dir: str = "data/cache", db_file: str = "data/state.db"):
+    def __init__(self, cache_dir: str = "data/cache", db_file: str = "data/state.db",
+                 flush_interval: float = 1.0, flush_batch_size: int = 100,
+                 max_buffered_rows: int = 10000):
         self.cache_dir = Path(cache_dir)
         self.db_file = Path(db_file)
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.max_buffered_rows = max_buffered_rows
+        self.dropped_rows = 0
         
         # Create directories
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -35,12 +48,32 @@ class CacheManager:
         
         # Initialize SQLite database
         self._init_db()
+        
+        # Write-behind buffers, flushed by size, timer or shutdown. _write_lock
+        # only guards the buffers (held for a swap, never during I/O);
+        # _io_lock serializes flushes on the persistent connection.
+        self._write_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._usage_buffer: List[Tuple] = []
+        self._deferred_cache: Dict[str, Tuple[Any, Optional[int]]] = {}
+        self._flushing_cache: Dict[str, Tuple[Any, Optional[int]]] = {}
+        self._write_conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._write_conn.execute("PRAGMA synchronous=NORMAL")
+        
+        self._stop_flusher = threading.Event()
+        self._wake_flusher = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="cache-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
     
     def _init_db(self):
         """Initialize SQLite database schema"""
         with sqlite3.connect(str(self.db_file)) as conn:
             cursor = conn.cursor()
             
+            # WAL lets readers proceed while the write-behind flusher commits
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             # Agent state table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS agent_state (
@@ -95,18 +128,37 @@ class CacheManager:
     
     def cache_get(self, key: str, default: Any = None) -> Any:
         """Get value from cache"""
+        pending = self._deferred_cache.get(key) or self._flushing_cache.get(key)
+        if pending is not None:
+            return pending[0]
         return self.cache.get(key, default)
     
     def cache_set(self, key: str, value: Any, expire: Optional[int] = None):
         """Set value in cache with optional expiration (seconds)"""
         self.cache.set(key, value, expire=expire)
     
+    def cache_set_deferred(self, key: str, value: Any, expire: Optional[int] = None):
+        """
+        Set value in cache on the next flush
+        
+        Repeated writes to the same key before a flush are coalesced; reads
+        through cache_get() see the pending value immediately.
+        """
+        with self._write_lock:
+            self._deferred_cache[key] = (value, expire)
+    
     def cache_delete(self, key: str):
         """Delete key from cache"""
+        with self._write_lock:
+            self._deferred_cache.pop(key, None)
+            self._flushing_cache.pop(key, None)
         self.cache.delete(key)
     
     def cache_clear(self):
         """Clear all cache"""
+        with self._write_lock:
+            self._deferred_cache.clear()
+            self._flushing_cache.clear()
         self.cache.clear()
     
     # ===== Agent State Management =====
@@ -233,18 +285,92 @@ class CacheManager:
     
     def log_model_usage(self, provider: str, model: str, tokens_used: int, 
                        request_time: float, success: bool = True):
-        """Log model API usage"""
-        with sqlite3.connect(str(self.db_file)) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO model_usage 
-                (provider, model, tokens_used, request_time, timestamp, success)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (provider, model, tokens_used, request_time, datetime.now(), success))
-            conn.commit()
+        """
+        Log model API usage
+        
+        Rows are buffered and written in batches by flush(); this call never
+        touches the disk. A full batch wakes the background flusher.
+        """
+        with self._write_lock:
+            self._usage_buffer.append(
+                (provider, model, tokens_used, request_time, datetime.now(), success)
+            )
+            self._trim_usage_buffer()
+            should_flush = len(self._usage_buffer) >= self.flush_batch_size
+        
+        if should_flush:
+            self._wake_flusher.set()
+    
+    # ===== Write-Behind Flushing =====
+    
+    def _trim_usage_buffer(self):
+        """Drop the oldest rows beyond max_buffered_rows (caller holds _write_lock)"""
+        overflow = len(self._usage_buffer) - self.max_buffered_rows
+        if overflow > 0:
+            del self._usage_buffer[:overflow]
+            self.dropped_rows += overflow
+            logger.warning(f"Usage buffer full, dropped {overflow} oldest rows")
+    
+    def flush(self):
+        """Write buffered usage rows and deferred cache values"""
+        with self._io_lock:
+            with self._write_lock:
+                rows, self._usage_buffer = self._usage_buffer, []
+                # Pending values stay visible to cache_get() until written
+                pending = self._flushing_cache = self._deferred_cache
+                self._deferred_cache = {}
+            
+            try:
+                if rows and self._write_conn is not None:
+                    try:
+                        self._write_conn.executemany("""
+                            INSERT INTO model_usage 
+                            (provider, model, tokens_used, request_time, timestamp, success)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        """, rows)
+                        self._write_conn.commit()
+                    except sqlite3.Error as e:
+                        # Keep rows for the next attempt (e.g. database briefly locked)
+                        logger.warning(f"Could not write {len(rows)} usage rows, retrying later: {e}")
+                        self._write_conn.rollback()
+                        with self._write_lock:
+                            self._usage_buffer = rows + self._usage_buffer
+                            self._trim_usage_buffer()
+                
+                for key, (value, expire) in pending.items():
+                    self.cache.set(key, value, expire=expire)
+            finally:
+                with self._write_lock:
+                    self._flushing_cache = {}
+    
+    def _flush_loop(self):
+        """Background flusher thread (runs every flush_interval or when woken)"""
+        while not self._stop_flusher.is_set():
+            self._wake_flusher.wait(self.flush_interval)
+            self._wake_flusher.clear()
+            if self._stop_flusher.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}", exc_info=True)
+    
+    def close(self):
+        """Flush pending writes and release the persistent connection"""
+        if self._stop_flusher.is_set():
+            return
+        
+        self._stop_flusher.set()
+        self._wake_flusher.set()
+        self.flush()
+        with self._io_lock:
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
     
     def get_model_stats(self, hours: int = 24) -> Dict:
         """Get model usage statistics"""
+        self.flush()
         since = datetime.now() - timedelta(hours=hours)
         
         with sqlite3.connect(str(self.db_file)) as conn:
@@ -272,11 +398,68 @@ class CacheManager:
                     "successful": row[4],
                     "success_rate": round((row[4] / row[1]) * 100, 2) if row[1] > 0 else 0
                 }
+        
+        # Latency distribution per provider (successful calls only)
+        for provider in stats:
+            stats[provider]["latency_histogram"] = self.get_latency_histogram(provider, hours=hours)
+            stats[provider]["latency_p90"] = self.get_latency_percentile(provider, 0.9, hours=hours)
+        
+        return stats
+    
+    # Upper bounds (seconds) of latency histogram buckets; last bucket is open-ended
+    LATENCY_BUCKETS = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0]
+    
+    def get_latencies(self, provider: str, hours: int = 24, limit: int = 500) -> List[float]:
+        """Get most recent successful request latencies for a provider"""
+        self.flush()
+        since = datetime.now() - timedelta(hours=hours)
+        
+        with sqlite3.connect(str(self.db_file)) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT request_time
+                FROM model_usage
+                WHERE provider = ? AND success AND timestamp > ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (provider, since, limit))
             
-            return stats
+            return [row[0] for row in cursor.fetchall()]
+    
+    def get_latency_histogram(self, provider: str, hours: int = 24) -> Dict[str, int]:
+        """
+        Get latency histogram for a provider
+        
+        Returns:
+            Dict mapping bucket label (e.g. "<=0.5s", ">32.0s") to request count
+        """
+        histogram = {f"<={bound}s": 0 for bound in self.LATENCY_BUCKETS}
+        overflow_label = f">{self.LATENCY_BUCKETS[-1]}s"
+        histogram[overflow_label] = 0
+        
+        for latency in self.get_latencies(provider, hours=hours, limit=10000):
+            for bound in self.LATENCY_BUCKETS:
+                if latency <= bound:
+                    histogram[f"<={bound}s"] += 1
+                    break
+            else:
+                histogram[overflow_label] += 1
+        
+        return histogram
+    
+    def get_latency_percentile(self, provider: str, percentile: float = 0.9,
+                               hours: int = 24) -> Optional[float]:
+        """Get latency percentile (0.0 - 1.0) for a provider, None if no data"""
+        latencies = sorted(self.get_latencies(provider, hours=hours))
+        if not latencies:
+            return None
+        
+        index = min(len(latencies) - 1, int(percentile * len(latencies)))
+        return round(latencies[index], 3)
     
     def cleanup_old_data(self, days: int = 30):
         """Clean up old data from database"""
+        self.flush()
         cutoff = datetime.now() - timedelta(days=days)
         
         with sqlite3.connect(str(self.db_file)) as conn:
@@ -4,19 +4,140 @@ Unified interface for multiple free AI models with failover
 """
 
 import time
+import asyncio
 import logging
 import random
-from typing import Optional, Dict, Any, List
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Deque, Iterator, AsyncIterator, Callable
 from datetime import datetime, timedelta
+import httpx
 from litellm import completion, acompletion
 from litellm.exceptions import RateLimitError, APIError, Timeout, AuthenticationError
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
 
 from .secrets_manager import get_secrets_manager
 from .cache_manager import get_cache_manager
+from .response_cache import ResponseCache
 
 
 logger = logging.getLogger(__name__)
 
+# Context-local token sink used by chat_async() to stream tokens (see stream_tokens_to)
+_token_sink: ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = ContextVar(
+    "model_router_token_sink", default=None
+)
+
+
+class _PooledHTTPHandler(AsyncHTTPHandler):
+    """litellm HTTP handler that sends requests over a given keep-alive client"""
+    
+    def __init__(self, client: httpx.AsyncClient):
+        # The base constructor would build its own client; reuse ours instead
+        self.timeout = client.timeout
+        self.event_hooks = None
+        self.client = client
+        self.client_alias = "model_router_pool"
+
+
+class _LoopPool:
+    """Client, litellm handler and concurrency limiters owned by one event loop"""
+    
+    def __init__(self, limits: httpx.Limits):
+        self.client = httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(120.0))
+        self.handler = _PooledHTTPHandler(self.client)
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class AsyncProviderPool:
+    """
+    Shared keep-alive HTTP pools for async model calls
+    
+    Each event loop gets its own httpx.AsyncClient (connections cannot
+    move between loops) and its own per-provider semaphores, which bound
+    how many requests are in flight to each provider at once. The client
+    is passed to every acompletion() call through a litellm HTTP handler,
+    so calls reuse open TLS connections (httpx keeps a separate keep-alive
+    pool per provider host) and never depend on process-global state.
+    Pools of loops that have been closed are released on the next access.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        max_concurrency: int = 16,
+        provider_limits: Optional[Dict[str, int]] = None
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_concurrency = max_concurrency
+        self.provider_limits: Dict[str, int] = dict(provider_limits or {})
+        self._pools: Dict[asyncio.AbstractEventLoop, _LoopPool] = {}
+        self._lock = threading.Lock()
+    
+    def _pool(self) -> _LoopPool:
+        """Get (or create) the pool of the running event loop"""
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is not None and not pool.client.is_closed and len(self._pools) == 1:
+            return pool
+        
+        with self._lock:
+            stale = [self._pools.pop(other).client for other in list(self._pools) if other.is_closed()]
+            pool = self._pools.get(loop)
+            if pool is None or pool.client.is_closed:
+                pool = self._pools[loop] = _LoopPool(self.limits)
+        
+        # Connections of an ended loop can only be torn down from a live one
+        for client in stale:
+            loop.create_task(self._close_client(client))
+        return pool
+    
+    @staticmethod
+    async def _close_client(client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing pooled client: {e}")
+    
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the keep-alive client of the running event loop"""
+        return self._pool().client
+    
+    def get_handler(self) -> AsyncHTTPHandler:
+        """Get the litellm handler to pass as acompletion(client=...)"""
+        return self._pool().handler
+    
+    def get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Get (or create) the running loop's concurrency limiter for a provider"""
+        semaphores = self._pool().semaphores
+        semaphore = semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.provider_limits.get(provider, self.max_concurrency))
+            semaphores[provider] = semaphore
+        return semaphore
+    
+    async def aclose(self):
+        """Close every pooled client (each on its own loop when that loop still runs)"""
+        current = asyncio.get_running_loop()
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        
+        for loop, pool in pools.items():
+            if loop is current or loop.is_closed():
+                await self._close_client(pool.client)
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._close_client(pool.client), loop)
+            else:
+                await self._close_client(pool.client)
+
 
 class ModelRouter:
     """
@@ -27,16 +148,39 @@ class ModelRouter:
     - Automatic failover on errors
     - Rate limit handling with jitter
     - Usage tracking
-    - Response caching
+    - Normalized response caching (see ResponseCache)
     - Health scoring per provider
     - Credential validation via test pings
     - Graceful downgrade with heuristic guidance
+    - Native async path (chat_async) over pooled keep-alive connections
+    - Token streaming (stream_chat / stream_chat_async) with failover
     """
     
     def __init__(self):
         self.secrets = get_secrets_manager()
         self.cache = get_cache_manager()
         
+        # Normalized-key response cache (per-namespace TTLs, bounded LRU eviction)
+        # Near-duplicate matching is opt-in via RESPONSE_CACHE_SIMILARITY (e.g. 0.9)
+        similarity = self.secrets.get("RESPONSE_CACHE_SIMILARITY")
+        self.response_cache = ResponseCache(
+            self.cache,
+            similarity_threshold=float(similarity) if similarity else None
+        )
+        
+        # Keep-alive connection pools for chat_async()
+        self.async_pool = AsyncProviderPool()
+        
+        # Rolling latency samples per provider (adaptive hedge delay)
+        self._latency_samples: Dict[str, Deque[float]] = {}
+        # p90 from CacheManager's model_usage history, loaded once per provider
+        self._persisted_p90: Dict[str, Optional[float]] = {}
+        
+        # Hedged requests: fallback delay and clamp bounds (seconds)
+        self.default_hedge_delay = 2.0
+        self.min_hedge_delay = 0.1
+        self.max_hedge_delay = 30.0
+        
         # Model priorities (fastest first)
         self.model_priority = [
             {
@@ -59,6 +203,16 @@ class ModelRouter:
             }
         ]
         
+        # Optional per-provider in-flight limits, e.g. GROQ_MAX_CONCURRENCY=4
+        for model_config in self.model_priority:
+            provider = model_config["provider"]
+            limit = self.secrets.get(f"{provider.upper()}_MAX_CONCURRENCY")
+            if limit:
+                try:
+                    self.async_pool.provider_limits[provider] = max(1, int(limit))
+                except ValueError:
+                    logger.warning(f"Ignoring invalid {provider.upper()}_MAX_CONCURRENCY: {limit}")
+        
         # Health scores for each provider (0-100, 100 = healthy)
         self.health_scores = {}
         self._load_health_scores()
@@ -79,7 +233,8 @@ class ModelRouter:
     def _save_health_score(self, provider: str, score: int):
         """Save health score to cache"""
         self.health_scores[provider] = max(0, min(100, score))  # Clamp to 0-100
-        self.cache.cache_set(f"health_score_{provider}", self.health_scores[provider], expire=86400)  # 24 hours
+        # Deferred: persisted with the next usage-log flush, not on the request path
+        self.cache.cache_set_deferred(f"health_score_{provider}", self.health_scores[provider], expire=86400)  # 24 hours
         logger.debug(f"Health score for {provider}: {self.health_scores[provider]}")
     
     def _update_health_score(self, provider: str, success: bool):
@@ -248,6 +403,36 @@ class ModelRouter:
             logger.debug(f"{provider} recovery probe failed: {e}")
             return False
     
+    async def _probe_unhealthy_provider_async(self, model_config: Dict) -> bool:
+        """Async version of _probe_unhealthy_provider"""
+        provider = model_config["provider"]
+        
+        try:
+            test_messages = [{"role": "user", "content": "hi"}]
+            
+            await self._call_model_async(
+                model_config,
+                test_messages,
+                temperature=0.1,
+                max_tokens=5
+            )
+            
+            self._update_health_score(provider, success=True)
+            logger.info(f"{provider} recovery probe succeeded - health restored")
+            return True
+        
+        except Exception as e:
+            logger.debug(f"{provider} recovery probe failed: {e}")
+            return False
+    
+    def _sorted_models(self) -> List[Dict]:
+        """Available models ordered by health score (healthiest first)"""
+        return sorted(
+            self.available_models,
+            key=lambda m: self.health_scores.get(m["provider"], 100),
+            reverse=True
+        )
+    
     def _quarantine_provider(self, provider: str, model_config: Dict):
         """
         Quarantine a provider due to authentication failure
@@ -274,7 +459,8 @@ class ModelRouter:
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         use_cache: bool = True,
-        retry_count: int = 3
+        retry_count: int = 3,
+        cache_namespace: str = "default"
     ) -> Dict[str, Any]:
         """
         Send chat completion request with automatic failover
@@ -285,12 +471,13 @@ class ModelRouter:
             max_tokens: Max response tokens
             use_cache: Use cached responses if available
             retry_count: Number of retries per model
+            cache_namespace: Response cache namespace (selects TTL, e.g. "planner")
         
         Returns:
             Dict with 'content', 'model', 'tokens_used', 'time_taken'
         """
         if not self.available_models:
-            return self._graceful_downgrade(messages, "no_models_configured")
+            return self._graceful_downgrade(messages, "no_models_configured", cache_namespace=cache_namespace)
         
         # Periodically revalidate providers (every ~10 requests via random sampling)
         if random.random() < 0.1:
@@ -298,18 +485,13 @@ class ModelRouter:
         
         # Check cache if enabled
         if use_cache:
-            cache_key = self._generate_cache_key(messages, temperature)
-            cached = self.cache.cache_get(cache_key)
+            cached = self.response_cache.get(messages, temperature, cache_namespace)
             if cached:
                 logger.info(f"Cache hit for request")
                 return cached
         
         # Sort models by health score
-        sorted_models = sorted(
-            self.available_models,
-            key=lambda m: self.health_scores.get(m["provider"], 100),
-            reverse=True
-        )
+        sorted_models = self._sorted_models()
         
         # Try each model in priority order
         last_error = None
@@ -349,8 +531,7 @@ class ModelRouter:
                     
                     # Cache successful response
                     if use_cache and result.get("content"):
-                        cache_key = self._generate_cache_key(messages, temperature)
-                        self.cache.cache_set(cache_key, result, expire=3600)  # 1 hour
+                        self.response_cache.set(messages, temperature, result, cache_namespace)
                     
                     return result
                 
@@ -392,7 +573,308 @@ class ModelRouter:
                     break
         
         # All models failed - attempt graceful downgrade
-        return self._graceful_downgrade(messages, last_error, errors_by_provider)
+        return self._graceful_downgrade(messages, last_error, errors_by_provider, cache_namespace)
+    
+    async def chat_async(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        retry_count: int = 3,
+        hedged: bool = False,
+        hedge_delay: Optional[float] = None,
+        cache_namespace: str = "default"
+    ) -> Dict[str, Any]:
+        """
+        Async version of chat() that never blocks the event loop
+        
+        Uses litellm's acompletion() over the shared keep-alive pool and
+        asyncio.sleep() for backoff. Same failover, health scoring, caching
+        and quarantine semantics as chat(). Cancelling the awaiting task
+        aborts the in-flight request without penalizing the provider.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            temperature: Randomness (0.0 - 2.0)
+            max_tokens: Max response tokens
+            use_cache: Use cached responses if available
+            retry_count: Number of retries per model (ignored when hedged)
+            hedged: Race providers - if the current provider hasn't answered
+                after the hedge delay, also send the request to the next
+                healthiest provider and keep whichever answers first
+            hedge_delay: Fixed hedge delay in seconds (default: provider's
+                rolling p90 latency)
+            cache_namespace: Response cache namespace (selects TTL, e.g. "planner")
+        
+        Returns:
+            Dict with 'content', 'model', 'tokens_used', 'time_taken'
+        """
+        if not self.available_models:
+            return self._graceful_downgrade(messages, "no_models_configured", cache_namespace=cache_namespace)
+        
+        # Periodically revalidate providers (test pings are sync, keep them off the loop)
+        if random.random() < 0.1:
+            await asyncio.to_thread(self._revalidate_providers)
+        
+        # Check cache if enabled
+        if use_cache:
+            cached = self.response_cache.get(messages, temperature, cache_namespace)
+            if cached:
+                logger.info(f"Cache hit for request")
+                return cached
+        
+        # A workflow is listening for tokens - stream instead of waiting for the whole completion
+        sink = _token_sink.get()
+        if sink is not None and not hedged:
+            result = await self._chat_via_stream(
+                sink, messages, temperature, max_tokens, use_cache, retry_count, cache_namespace
+            )
+            if result is not None:
+                return result
+            # The stream broke mid-response: fail over below instead of returning partial content
+        
+        if hedged:
+            result = await self._chat_hedged(messages, temperature, max_tokens, hedge_delay, cache_namespace)
+            if use_cache and result.get("content") and not result.get("fallback"):
+                self.response_cache.set(messages, temperature, result, cache_namespace)
+            return result
+        
+        last_error = None
+        errors_by_provider = {}
+        
+        for model_config in self._sorted_models():
+            provider = model_config["provider"]
+            health_score = self.health_scores.get(provider, 100)
+            
+            # If health score is very low, occasionally give it a chance to recover
+            if health_score < 20:
+                if random.random() < 0.2:
+                    logger.info(f"Attempting recovery probe for {provider} (health: {health_score})")
+                    if await self._probe_unhealthy_provider_async(model_config):
+                        logger.info(f"{provider} recovered! Continuing with request")
+                    else:
+                        logger.warning(f"{provider} recovery failed, skipping")
+                        continue
+                else:
+                    logger.debug(f"Skipping {provider} due to low health score: {health_score}")
+                    continue
+            
+            for attempt in range(retry_count):
+                try:
+                    result = await self._call_model_async(
+                        model_config,
+                        messages,
+                        temperature,
+                        max_tokens or model_config["max_tokens"]
+                    )
+                    
+                    self._update_health_score(provider, success=True)
+                    
+                    if use_cache and result.get("content"):
+                        self.response_cache.set(messages, temperature, result, cache_namespace)
+                    
+                    return result
+                
+                except RateLimitError as e:
+                    logger.warning(f"{provider} rate limit hit, trying next model...")
+                    last_error = self._map_provider_exception(provider, e)
+                    errors_by_provider[provider] = last_error
+                    self._update_health_score(provider, success=False)
+                    break
+                
+                except AuthenticationError as e:
+                    logger.error(f"{provider} authentication failed - quarantining for 5 minutes")
+                    last_error = self._map_provider_exception(provider, e)
+                    errors_by_provider[provider] = last_error
+                    self._quarantine_provider(provider, model_config)
+                    break
+                
+                except (APIError, Timeout) as e:
+                    logger.warning(f"{provider} error (attempt {attempt+1}/{retry_count}): {e}")
+                    last_error = self._map_provider_exception(provider, e)
+                    errors_by_provider[provider] = last_error
+                    
+                    if attempt < retry_count - 1:
+                        # Exponential backoff with jitter (non-blocking, cancellable)
+                        backoff = (2 ** attempt) + random.uniform(0, 1)
+                        logger.debug(f"Retrying {provider} after {backoff:.2f}s...")
+                        await asyncio.sleep(backoff)
+                    else:
+                        self._update_health_score(provider, success=False)
+                    continue
+                
+                except Exception as e:
+                    logger.error(f"{provider} unexpected error: {e}")
+                    last_error = self._map_provider_exception(provider, e)
+                    errors_by_provider[provider] = last_error
+                    self._update_health_score(provider, success=False)
+                    break
+        
+        return self._graceful_downgrade(messages, last_error, errors_by_provider, cache_namespace)
+    
+    def _record_latency(self, provider: str, time_taken: float):
+        """Add a successful call latency to the provider's rolling window"""
+        samples = self._latency_samples.get(provider)
+        if samples is None:
+            samples = deque(maxlen=200)
+            self._latency_samples[provider] = samples
+        samples.append(time_taken)
+    
+    def _get_hedge_delay(self, provider: str) -> float:
+        """
+        Adaptive hedge delay: the provider's rolling p90 latency
+        
+        Uses in-process samples when there are enough, otherwise the p90
+        loaded from CacheManager's model_usage history by
+        _load_latency_history() (never queried here, on the event loop).
+        """
+        delay = None
+        samples = self._latency_samples.get(provider)
+        
+        if samples and len(samples) >= 5:
+            ordered = sorted(samples)
+            delay = ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+        else:
+            delay = self._persisted_p90.get(provider)
+        
+        if delay is None:
+            delay = self.default_hedge_delay
+        
+        return max(self.min_hedge_delay, min(self.max_hedge_delay, delay))
+    
+    async def _load_latency_history(self, providers: List[str]):
+        """Load the persisted p90 once per provider, off the event loop"""
+        for provider in providers:
+            if provider in self._persisted_p90:
+                continue
+            samples = self._latency_samples.get(provider)
+            if samples and len(samples) >= 5:
+                continue
+            persisted = None
+            try:
+                value = await asyncio.to_thread(self.cache.get_latency_percentile, provider, 0.9)
+                if isinstance(value, (int, float)):
+                    persisted = float(value)
+            except Exception as e:
+                logger.debug(f"Could not load latency history for {provider}: {e}")
+            self._persisted_p90[provider] = persisted
+    
+    def _record_provider_failure(
+        self,
+        provider: str,
+        model_config: Dict,
+        error: Exception,
+        errors_by_provider: Dict[str, str]
+    ) -> str:
+        """Apply health/quarantine side effects for a failed call and return mapped error"""
+        mapped = self._map_provider_exception(provider, error)
+        errors_by_provider[provider] = mapped
+        
+        if isinstance(error, AuthenticationError):
+            logger.error(f"{provider} authentication failed - quarantining for 5 minutes")
+            self._quarantine_provider(provider, model_config)
+        else:
+            logger.warning(f"{provider} request failed: {mapped}")
+            self._update_health_score(provider, success=False)
+        
+        return mapped
+    
+    async def _chat_hedged(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        hedge_delay: Optional[float] = None,
+        cache_namespace: str = "default"
+    ) -> Dict[str, Any]:
+        """
+        Hedged request: race providers in health order
+        
+        The healthiest provider is called first. Whenever the newest
+        in-flight request has not answered within the hedge delay (or an
+        in-flight request fails), the next provider is launched too. The
+        first successful answer wins and the remaining requests are cancelled.
+        """
+        candidates = [
+            m for m in self._sorted_models()
+            if self.health_scores.get(m["provider"], 100) >= 20
+        ] or self._sorted_models()
+        
+        if hedge_delay is None:
+            await self._load_latency_history([m["provider"] for m in candidates])
+        
+        errors_by_provider: Dict[str, str] = {}
+        last_error = None
+        in_flight: Dict[asyncio.Task, Dict] = {}
+        next_index = 0
+        
+        def launch_next() -> Optional[Dict]:
+            nonlocal next_index
+            if next_index >= len(candidates):
+                return None
+            model_config = candidates[next_index]
+            next_index += 1
+            task = asyncio.create_task(self._call_model_async(
+                model_config,
+                messages,
+                temperature,
+                max_tokens or model_config["max_tokens"]
+            ))
+            in_flight[task] = model_config
+            return model_config
+        
+        newest = launch_next()
+        
+        try:
+            while in_flight:
+                timeout = None
+                if next_index < len(candidates) and newest is not None:
+                    timeout = hedge_delay if hedge_delay is not None else self._get_hedge_delay(newest["provider"])
+                
+                done, _ = await asyncio.wait(
+                    set(in_flight), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # Hedge: newest request is slower than its p90 - race the next provider
+                    hedge = launch_next()
+                    if hedge is not None:
+                        logger.info(f"Hedging {newest['provider']} request with {hedge['provider']}")
+                        newest = hedge
+                    continue
+                
+                for task in done:
+                    model_config = in_flight.pop(task)
+                    provider = model_config["provider"]
+                    error = task.exception()
+                    
+                    if error is None:
+                        self._update_health_score(provider, success=True)
+                        result = task.result()
+                        result["hedged"] = next_index > 1
+                        return result
+                    
+                    last_error = self._record_provider_failure(
+                        provider, model_config, error, errors_by_provider
+                    )
+                
+                # Replace failed requests immediately instead of waiting for the hedge delay
+                if not in_flight:
+                    newest = launch_next()
+        finally:
+            # Cancel losers (and everything, if we were cancelled ourselves)
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+        
+        return self._graceful_downgrade(messages, last_error, errors_by_provider, cache_namespace)
+    
+    async def aclose(self):
+        """Release pooled async connections (call on application shutdown)"""
+        await self.async_pool.aclose()
+        self.response_cache.flush()
     
     def _map_provider_exception(self, provider: str, exception: Exception) -> str:
         """Map provider-specific exceptions to standardized error messages"""
@@ -415,7 +897,8 @@ class ModelRouter:
         self,
         messages: List[Dict[str, str]],
         error: Optional[str],
-        errors_by_provider: Optional[Dict[str, str]] = None
+        errors_by_provider: Optional[Dict[str, str]] = None,
+        cache_namespace: str = "default"
     ) -> Dict[str, Any]:
         """
         Provide graceful downgrade when all models fail
@@ -423,8 +906,7 @@ class ModelRouter:
         Returns cached or heuristic guidance instead of hard failure
         """
         # Try to find any cached response for similar requests
-        cache_key = self._generate_cache_key(messages, temperature=0.7)
-        cached = self.cache.cache_get(cache_key)
+        cached = self.response_cache.get(messages, 0.7, cache_namespace, count=False)
         
         if cached:
             logger.info("Using cached response as fallback")
@@ -494,14 +976,14 @@ Please try again in a few moments. If the issue persists, check:
 
 The system will automatically retry when models become available."""
     
-    def _call_model(
+    def _build_request_params(
         self,
         model_config: Dict,
         messages: List[Dict[str, str]],
         temperature: float,
         max_tokens: int
     ) -> Dict[str, Any]:
-        """Call a specific model"""
+        """Build litellm request parameters for a specific model"""
         provider = model_config["provider"]
         model_name = model_config["model"]
         
@@ -510,8 +992,6 @@ The system will automatically retry when models become available."""
         if not api_key:
             raise Exception(f"Missing API key for {provider}")
         
-        start_time = time.time()
-        
         # Prepare request
         request_params = {
             "model": model_name,
@@ -529,61 +1009,120 @@ The system will automatically retry when models become available."""
         elif provider == "mistral":
             request_params["model"] = f"mistral/{model_name}"
         
+        return request_params
+    
+    def _handle_response(self, model_config: Dict, response: Any, time_taken: float) -> Dict[str, Any]:
+        """Extract content from a completion response and log usage"""
+        provider = model_config["provider"]
+        model_name = model_config["model"]
+        
+        # Extract response (type: ignore for litellm dynamic types)
+        content = response.choices[0].message.content  # type: ignore
+        
+        # Safely extract token usage
+        usage = getattr(response, 'usage', None)
+        tokens_used = getattr(usage, 'total_tokens', 0) if usage else 0
+        
+        # Log usage
+        self.cache.log_model_usage(
+            provider=provider,
+            model=model_name,
+            tokens_used=tokens_used,
+            request_time=time_taken,
+            success=True
+        )
+        
+        self._record_latency(provider, time_taken)
+        
+        logger.info(f"✓ {provider} responded in {time_taken:.2f}s ({tokens_used} tokens)")
+        
+        return {
+            "content": content,
+            "model": f"{provider}/{model_name}",
+            "tokens_used": tokens_used,
+            "time_taken": round(time_taken, 3),
+            "provider": provider
+        }
+    
+    def _log_failed_call(self, model_config: Dict, time_taken: float):
+        """Log a failed model call"""
+        self.cache.log_model_usage(
+            provider=model_config["provider"],
+            model=model_config["model"],
+            tokens_used=0,
+            request_time=time_taken,
+            success=False
+        )
+    
+    def _call_model(
+        self,
+        model_config: Dict,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        """Call a specific model"""
+        request_params = self._build_request_params(model_config, messages, temperature, max_tokens)
+        
+        start_time = time.time()
+        
         # Make the call
         try:
             response = completion(**request_params)
-            
-            time_taken = time.time() - start_time
-            
-            # Extract response (type: ignore for litellm dynamic types)
-            content = response.choices[0].message.content  # type: ignore
-            
-            # Safely extract token usage
-            usage = getattr(response, 'usage', None)
-            tokens_used = getattr(usage, 'total_tokens', 0) if usage else 0
-            
-            # Log usage
-            self.cache.log_model_usage(
-                provider=provider,
-                model=model_name,
-                tokens_used=tokens_used,
-                request_time=time_taken,
-                success=True
-            )
-            
-            logger.info(f"✓ {provider} responded in {time_taken:.2f}s ({tokens_used} tokens)")
-            
-            return {
-                "content": content,
-                "model": f"{provider}/{model_name}",
-                "tokens_used": tokens_used,
-                "time_taken": round(time_taken, 3),
-                "provider": provider
-            }
+            return self._handle_response(model_config, response, time.time() - start_time)
         
         except Exception as e:
             # Log failed attempt
-            self.cache.log_model_usage(
-                provider=provider,
-                model=model_name,
-                tokens_used=0,
-                request_time=time.time() - start_time,
-                success=False
-            )
+            self._log_failed_call(model_config, time.time() - start_time)
             raise
     
-    def _generate_cache_key(self, messages: List[Dict], temperature: float) -> str:
-        """Generate cache key from request parameters"""
-        import hashlib
+    async def _call_model_async(
+        self,
+        model_config: Dict,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        """Call a specific model without blocking the event loop"""
+        provider = model_config["provider"]
+        request_params = self._build_request_params(model_config, messages, temperature, max_tokens)
+        
+        # Route through this loop's keep-alive pool
+        request_params["client"] = self.async_pool.get_handler()
+        
+        start_time = time.time()
+        
+        try:
+            async with self.async_pool.get_semaphore(provider):
+                # Latency excludes waiting for the provider's concurrency slot
+                start_time = time.time()
+                response = await acompletion(**request_params)
+            return self._handle_response(model_config, response, time.time() - start_time)
         
-        # Create deterministic string from messages
-        messages_str = str(messages) + str(temperature)
-        hash_obj = hashlib.md5(messages_str.encode())
-        return f"chat_{hash_obj.hexdigest()}"
+        except asyncio.CancelledError:
+            # Caller cancelled (e.g. workflow cancel) - don't penalize the provider
+            logger.debug(f"{provider} call cancelled after {time.time() - start_time:.2f}s")
+            raise
+        
+        except Exception:
+            self._log_failed_call(model_config, time.time() - start_time)
+            raise
+    
+    def _generate_cache_key(self, messages: List[Dict], temperature: float) -> str:
+        """Generate normalized cache key from request parameters"""
+        return self.response_cache.make_key(messages, temperature)
     
     def get_usage_stats(self, hours: int = 24) -> Dict:
-        """Get usage statistics for all models"""
-        return self.cache.get_model_stats(hours=hours)
+        """
+        Get usage statistics for all models
+        
+        Returns:
+            Per-provider stats keyed by provider name, plus a 'response_cache'
+            entry with hit/miss/bytes-saved counters
+        """
+        stats = self.cache.get_model_stats(hours=hours)
+        stats["response_cache"] = self.response_cache.get_stats()
+        return stats
     
     def get_health_report(self) -> Dict[str, Any]:
         """
@@ -633,18 +1172,335 @@ The system will automatically retry when models become available."""
         
         return report
     
+    def _stream_skip_provider(self, provider: str) -> bool:
+        """Health gate for streaming: low-health providers get an occasional chance"""
+        health_score = self.health_scores.get(provider, 100)
+        if health_score < 20 and random.random() >= 0.2:
+            logger.debug(f"Skipping {provider} due to low health score: {health_score}")
+            return True
+        return False
+    
+    @staticmethod
+    def _stream_should_retry(error: Exception, parts: List[str], attempt: int, retry_count: int) -> bool:
+        """Transient errors are retried on the same provider until the first token"""
+        return (
+            not parts
+            and isinstance(error, (APIError, Timeout))
+            and not isinstance(error, RateLimitError)
+            and attempt < retry_count - 1
+        )
+    
+    @staticmethod
+    def _chunk_delta(chunk: Any) -> str:
+        """Extract the text delta from a streaming chunk"""
+        try:
+            return chunk.choices[0].delta.content or ""  # type: ignore
+        except (AttributeError, IndexError):
+            return ""
+    
+    def _finish_stream(
+        self,
+        model_config: Dict,
+        content: str,
+        tokens_used: int,
+        start_time: float,
+        first_token_time: Optional[float]
+    ) -> Dict[str, Any]:
+        """Log usage for a completed stream and build the final 'done' event"""
+        provider = model_config["provider"]
+        model_name = model_config["model"]
+        time_taken = time.time() - start_time
+        
+        self.cache.log_model_usage(
+            provider=provider,
+            model=model_name,
+            tokens_used=tokens_used,
+            request_time=time_taken,
+            success=True
+        )
+        self._record_latency(provider, time_taken)
+        self._update_health_score(provider, success=True)
+        
+        ttft = (first_token_time - start_time) if first_token_time else time_taken
+        logger.info(f"✓ {provider} streamed in {time_taken:.2f}s (first token {ttft:.2f}s)")
+        
+        return {
+            "type": "done",
+            "content": content,
+            "model": f"{provider}/{model_name}",
+            "tokens_used": tokens_used,
+            "time_taken": round(time_taken, 3),
+            "time_to_first_token": round(ttft, 3),
+            "provider": provider
+        }
+    
+    def _stream_fallback_events(
+        self,
+        messages: List[Dict[str, str]],
+        error: Optional[str],
+        errors_by_provider: Optional[Dict[str, str]] = None,
+        cache_namespace: str = "default"
+    ) -> List[Dict[str, Any]]:
+        """Graceful downgrade for streams: whole fallback text as one token + done"""
+        fallback = self._graceful_downgrade(messages, error, errors_by_provider, cache_namespace)
+        return [
+            {"type": "token", "content": fallback.get("content", ""), "provider": fallback.get("model")},
+            {"type": "done", **fallback}
+        ]
+    
     def stream_chat(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
-    ):
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        retry_count: int = 3,
+        cache_namespace: str = "default"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream chat response token by token with automatic failover
+        
+        Providers are tried in health-score order like chat(). Failover and
+        retries only happen before the first token is emitted; once text has
+        been streamed a mid-stream failure ends the stream with an 'error' event.
+        
+        Yields:
+            {"type": "token", "content": <delta>, "provider": ...} for each chunk,
+            then one {"type": "done", ...} event with the same fields as chat()
+            (plus 'time_to_first_token'), or {"type": "error", ...} on mid-stream failure
+        """
+        if not self.available_models:
+            yield from self._stream_fallback_events(
+                messages, "no_models_configured", cache_namespace=cache_namespace
+            )
+            return
+        
+        if use_cache:
+            cached = self.response_cache.get(messages, temperature, cache_namespace)
+            if cached:
+                logger.info(f"Cache hit for streamed request")
+                yield {"type": "token", "content": cached.get("content", ""), "provider": cached.get("provider")}
+                yield {"type": "done", **cached}
+                return
+        
+        last_error = None
+        errors_by_provider: Dict[str, str] = {}
+        
+        for model_config in self._sorted_models():
+            provider = model_config["provider"]
+            if self._stream_skip_provider(provider):
+                continue
+            
+            for attempt in range(retry_count):
+                start_time = time.time()
+                first_token_time = None
+                parts: List[str] = []
+                tokens_used = 0
+                
+                try:
+                    request_params = self._build_request_params(
+                        model_config, messages, temperature,
+                        max_tokens or model_config["max_tokens"]
+                    )
+                    request_params["stream"] = True
+                    
+                    for chunk in completion(**request_params):
+                        usage = getattr(chunk, "usage", None)
+                        if usage and getattr(usage, "total_tokens", None):
+                            tokens_used = usage.total_tokens
+                        delta = self._chunk_delta(chunk)
+                        if not delta:
+                            continue
+                        if first_token_time is None:
+                            first_token_time = time.time()
+                        parts.append(delta)
+                        yield {"type": "token", "content": delta, "provider": provider}
+                    
+                    done = self._finish_stream(
+                        model_config, "".join(parts), tokens_used, start_time, first_token_time
+                    )
+                    if use_cache and done["content"]:
+                        result = {k: v for k, v in done.items() if k != "type"}
+                        self.response_cache.set(messages, temperature, result, cache_namespace)
+                    yield done
+                    return
+                
+                except Exception as e:
+                    self._log_failed_call(model_config, time.time() - start_time)
+                    
+                    if self._stream_should_retry(e, parts, attempt, retry_count):
+                        last_error = self._map_provider_exception(provider, e)
+                        errors_by_provider[provider] = last_error
+                        backoff = (2 ** attempt) + random.uniform(0, 1)
+                        logger.debug(f"Retrying {provider} stream after {backoff:.2f}s...")
+                        time.sleep(backoff)
+                        continue
+                    
+                    # Health/quarantine bookkeeping once per provider, like chat()
+                    last_error = self._record_provider_failure(provider, model_config, e, errors_by_provider)
+                    if parts:
+                        # Tokens already delivered - can't transparently switch providers
+                        yield {"type": "error", "error": last_error, "provider": provider, "content": "".join(parts)}
+                        return
+                    break
+        
+        yield from self._stream_fallback_events(messages, last_error, errors_by_provider, cache_namespace)
+    
+    async def stream_chat_async(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        retry_count: int = 3,
+        cache_namespace: str = "default",
+        check_cache: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Stream chat responses (for future TUI/CLI implementation)
-        Currently not implemented - use chat() instead
+        Async version of stream_chat() (same events and failover semantics)
+        
+        Uses acompletion(stream=True) over the shared keep-alive pool.
+        check_cache=False skips the cache lookup (the caller already missed)
+        while still caching the completed response.
         """
-        # TODO: Implement streaming for CLI/TUI
-        raise NotImplementedError("Streaming not yet implemented")
+        if not self.available_models:
+            for event in self._stream_fallback_events(
+                messages, "no_models_configured", cache_namespace=cache_namespace
+            ):
+                yield event
+            return
+        
+        if use_cache and check_cache:
+            cached = self.response_cache.get(messages, temperature, cache_namespace)
+            if cached:
+                logger.info(f"Cache hit for streamed request")
+                yield {"type": "token", "content": cached.get("content", ""), "provider": cached.get("provider")}
+                yield {"type": "done", **cached}
+                return
+        
+        last_error = None
+        errors_by_provider: Dict[str, str] = {}
+        
+        for model_config in self._sorted_models():
+            provider = model_config["provider"]
+            if self._stream_skip_provider(provider):
+                continue
+            
+            for attempt in range(retry_count):
+                start_time = time.time()
+                first_token_time = None
+                parts: List[str] = []
+                tokens_used = 0
+                
+                try:
+                    request_params = self._build_request_params(
+                        model_config, messages, temperature,
+                        max_tokens or model_config["max_tokens"]
+                    )
+                    request_params["stream"] = True
+                    request_params["client"] = self.async_pool.get_handler()
+                    
+                    async with self.async_pool.get_semaphore(provider):
+                        start_time = time.time()
+                        response = await acompletion(**request_params)
+                        async for chunk in response:  # type: ignore
+                            usage = getattr(chunk, "usage", None)
+                            if usage and getattr(usage, "total_tokens", None):
+                                tokens_used = usage.total_tokens
+                            delta = self._chunk_delta(chunk)
+                            if not delta:
+                                continue
+                            if first_token_time is None:
+                                first_token_time = time.time()
+                            parts.append(delta)
+                            yield {"type": "token", "content": delta, "provider": provider}
+                    
+                    done = self._finish_stream(
+                        model_config, "".join(parts), tokens_used, start_time, first_token_time
+                    )
+                    if use_cache and done["content"]:
+                        result = {k: v for k, v in done.items() if k != "type"}
+                        self.response_cache.set(messages, temperature, result, cache_namespace)
+                    yield done
+                    return
+                
+                except Exception as e:
+                    self._log_failed_call(model_config, time.time() - start_time)
+                    
+                    if self._stream_should_retry(e, parts, attempt, retry_count):
+                        last_error = self._map_provider_exception(provider, e)
+                        errors_by_provider[provider] = last_error
+                        backoff = (2 ** attempt) + random.uniform(0, 1)
+                        logger.debug(f"Retrying {provider} stream after {backoff:.2f}s...")
+                        await asyncio.sleep(backoff)
+                        continue
+                    
+                    last_error = self._record_provider_failure(provider, model_config, e, errors_by_provider)
+                    if parts:
+                        yield {"type": "error", "error": last_error, "provider": provider, "content": "".join(parts)}
+                        return
+                    break
+        
+        for event in self._stream_fallback_events(messages, last_error, errors_by_provider, cache_namespace):
+            yield event
+    
+    async def _chat_via_stream(
+        self,
+        sink: Callable[[Dict[str, Any]], None],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        use_cache: bool,
+        retry_count: int,
+        cache_namespace: str = "default"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Run chat_async() as a stream, forwarding token events to the sink
+        
+        Returns None if the stream failed after tokens were sent (the partial
+        content is not a completion).
+        """
+        final: Optional[Dict[str, Any]] = None
+        
+        async for event in self.stream_chat_async(
+            messages, temperature, max_tokens, use_cache=use_cache,
+            retry_count=retry_count, cache_namespace=cache_namespace, check_cache=False
+        ):
+            if event["type"] == "token":
+                try:
+                    sink(event)
+                except Exception as e:
+                    logger.debug(f"Token sink error: {e}")
+            elif event["type"] == "error":
+                logger.warning(
+                    f"{event.get('provider')} stream broke after {len(event.get('content', ''))} chars: "
+                    f"{event.get('error')}"
+                )
+            else:
+                final = {k: v for k, v in event.items() if k != "type"}
+        
+        return final
+
+
+@contextmanager
+def stream_tokens_to(sink: Callable[[Dict[str, Any]], None]):
+    """
+    Forward tokens of every chat_async() call in the current context to sink
+    
+    Context-local (contextvars), so it follows the asyncio task that set it
+    and any tasks it spawns. Used by OpsCoordinatorAgent to stream LLM
+    output into a workflow's progress queue without threading callbacks
+    through every agent.
+    
+    Usage:
+        with stream_tokens_to(lambda event: queue.put_nowait(event)):
+            await agent.generate_code_async(task)
+    """
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
 
 
 # Global instance
@@ -0,0 +1,216 @@
+"""
+Progress Coalescer
+Rate-limited persistence of hot workflow progress columns
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressQueue:
+    """
+    Fan-out progress channel for one workflow
+    
+    Producers call put()/put_nowait() as on an asyncio.Queue. Every event is
+    reported to a callback (lets the persistence layer observe progress),
+    then copied into each subscriber's own bounded queue, dropping that
+    subscriber's oldest event when it falls behind. Nothing is buffered
+    while nobody is subscribed; a new subscriber starts from the latest
+    progress event, or gets the terminal ("_complete") event right away if
+    the workflow already finished.
+    """
+    
+    def __init__(self, on_event=None, subscriber_maxsize: int = 1000):
+        self._on_event = on_event
+        self.subscriber_maxsize = subscriber_maxsize
+        self._subscribers: List[asyncio.Queue] = []
+        self._latest = None
+        self._final = None
+        self.dropped = 0
+    
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+    
+    def put_nowait(self, item):
+        if self._on_event is not None:
+            try:
+                self._on_event(item)
+            except Exception as e:
+                logger.warning(f"Progress observer failed: {e}")
+        
+        if self._final is not None:
+            return
+        if item.get("_complete"):
+            self._final = item
+        elif item.get("type") != "token":
+            self._latest = item
+        
+        for subscriber in self._subscribers:
+            self._offer(subscriber, item)
+        if self._final is not None:
+            self._subscribers.clear()
+    
+    async def put(self, item):
+        self.put_nowait(item)
+    
+    def _offer(self, subscriber: asyncio.Queue, item) -> None:
+        if subscriber.full():
+            subscriber.get_nowait()
+            self.dropped += 1
+        subscriber.put_nowait(item)
+    
+    def subscribe(self) -> asyncio.Queue:
+        """Get a new queue receiving this workflow's events from now on"""
+        subscriber = asyncio.Queue(self.subscriber_maxsize)
+        if self._latest is not None:
+            self._offer(subscriber, self._latest)
+        if self._final is not None:
+            self._offer(subscriber, self._final)
+        else:
+            self._subscribers.append(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: asyncio.Queue) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+
+class ProgressCoalescer:
+    """
+    Coalesces workflow progress updates into bounded-rate column writes
+    
+    Features:
+    - Hot state kept in memory; only changed columns are written
+    - At most one write per workflow every `min_interval` seconds
+    - flush() for terminal states (always writes pending changes)
+    """
+    
+    # Columns that progress events may update
+    COLUMNS = ("status", "progress_percent", "current_step", "total_steps")
+    
+    def __init__(self, storage, min_interval: float = 1.0):
+        """
+        Initialize ProgressCoalescer
+        
+        Args:
+            storage: WorkflowStorage instance
+            min_interval: Minimum seconds between writes for one workflow
+        """
+        self.storage = storage
+        self.min_interval = min_interval
+        
+        self._persisted: Dict[str, Dict[str, Any]] = {}  # last written values
+        self._pending: Dict[str, Dict[str, Any]] = {}  # changed, not yet written
+        self._last_write: Dict[str, float] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+        
+        self.stats = {"updates": 0, "writes": 0}
+    
+    def update(self, workflow_id: str, **fields) -> None:
+        """
+        Record new progress values (schedules a write if anything changed)
+        
+        Args:
+            workflow_id: Workflow ID
+            **fields: Any of status, progress_percent, current_step, total_steps
+        """
+        self.stats["updates"] += 1
+        persisted = self._persisted.get(workflow_id, {})
+        pending = self._pending.setdefault(workflow_id, {})
+        
+        for column, value in fields.items():
+            if column not in self.COLUMNS or value is None:
+                continue
+            if persisted.get(column) == value:
+                pending.pop(column, None)
+            else:
+                pending[column] = value
+        
+        if not pending:
+            del self._pending[workflow_id]
+            return
+        
+        if workflow_id not in self._timers:
+            self._schedule(workflow_id)
+    
+    def _schedule(self, workflow_id: str) -> None:
+        """Start the timer task for a workflow's next write"""
+        elapsed = time.monotonic() - self._last_write.get(workflow_id, 0.0)
+        delay = max(0.0, self.min_interval - elapsed)
+        self._timers[workflow_id] = asyncio.create_task(self._flush_later(workflow_id, delay))
+    
+    async def _flush_later(self, workflow_id: str, delay: float) -> None:
+        """Timer task: write pending changes after the rate-limit delay"""
+        try:
+            await asyncio.sleep(delay)
+            # Stays registered while writing so discard() can still cancel it
+            # before a terminal full-row save takes the writer
+            await self._write(workflow_id)
+        except asyncio.CancelledError:
+            return
+        finally:
+            if self._timers.get(workflow_id) is asyncio.current_task():
+                del self._timers[workflow_id]
+        
+        # Changes that arrived during the write get their own timer
+        if workflow_id in self._pending and workflow_id not in self._timers:
+            self._schedule(workflow_id)
+    
+    async def _write(self, workflow_id: str) -> bool:
+        """Write pending columns for a workflow"""
+        changes = self._pending.pop(workflow_id, None)
+        if not changes:
+            return True
+        
+        self._last_write[workflow_id] = time.monotonic()
+        success = await self.storage.update_workflow_columns(workflow_id, changes)
+        if success:
+            self.stats["writes"] += 1
+            self._persisted.setdefault(workflow_id, {}).update(changes)
+        else:
+            # Keep for the next flush; newer values win
+            pending = self._pending.setdefault(workflow_id, {})
+            for column, value in changes.items():
+                pending.setdefault(column, value)
+        return success
+    
+    def _cancel_timer(self, workflow_id: str) -> None:
+        timer = self._timers.pop(workflow_id, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+    
+    async def flush(self, workflow_id: str) -> bool:
+        """
+        Write pending changes now, ignoring the rate limit
+        
+        Returns:
+            True if nothing was pending or the write succeeded
+        """
+        self._cancel_timer(workflow_id)
+        return await self._write(workflow_id)
+    
+    def discard(self, workflow_id: str) -> None:
+        """Drop pending changes (e.g. superseded by a full-row save)"""
+        self._cancel_timer(workflow_id)
+        self._pending.pop(workflow_id, None)
+    
+    async def close_workflow(self, workflow_id: str) -> None:
+        """Flush anything still pending and forget the workflow"""
+        await self.flush(workflow_id)
+        self._persisted.pop(workflow_id, None)
+        self._last_write.pop(workflow_id, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get update/write counters"""
+        updates = self.stats["updates"]
+        writes = self.stats["writes"]
+        return {
+            "updates": updates,
+            "writes": writes,
+            "pending_workflows": len(self._pending),
+            "write_ratio": round(writes / updates, 3) if updates else 0.0
+        }
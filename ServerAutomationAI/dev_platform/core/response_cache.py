@@ -0,0 +1,482 @@
+"""
+LLM Response Cache
+Normalized-key response cache with near-duplicate matching and bounded eviction
+"""
+
+import re
+import json
+import time
+import atexit
+import random
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Volatile fragments that change between otherwise identical prompts
+_VOLATILE_PATTERNS = [
+    (re.compile(
+        r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?\b"
+    ), "<timestamp>"),
+    (re.compile(
+        r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+    ), "<uuid>"),
+    (re.compile(r"\bwf_[0-9a-f]{8}\b"), "<workflow_id>"),
+]
+
+# MinHash parameters: 64 permutations split into 16 LSH bands of 4 rows
+_MINHASH_PERMUTATIONS = 64
+_LSH_BANDS = 16
+_LSH_ROWS = _MINHASH_PERMUTATIONS // _LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_MINHASH_PERMUTATIONS)
+]
+
+
+class ResponseCache:
+    """
+    Response cache for LLM calls
+
+    Features:
+    - Normalized keys: canonical JSON of messages (whitespace collapsed,
+      system prompts merged, volatile timestamps/IDs masked), model-independent
+    - Optional near-duplicate tier: MinHash over word shingles with LSH buckets
+    - Per-namespace TTLs (e.g. planner vs QA prompts)
+    - Size-bounded LRU or LFU eviction (entry count and bytes), O(1) per
+      victim (LFU keeps keys in per-hit-count buckets)
+    - Hit/miss/bytes-saved counters
+
+    Entries are stored through a CacheManager-compatible store
+    (cache_get / cache_set / cache_delete). The eviction index is written
+    back at most every index_flush_interval seconds and at exit (flush()),
+    dropping entries whose TTL has passed. Index, buckets and counters are
+    guarded by one lock (the cache is shared across event loops and worker
+    threads); store I/O happens outside it.
+    """
+
+    DEFAULT_TTLS = {
+        "default": 3600,          # 1 hour
+        "planner": 6 * 3600,      # Plans are stable for the same request
+        "qa_test": 6 * 3600,
+        "code_executor": 3600,
+    }
+
+    INDEX_KEY = "response_cache:index"
+
+    def __init__(
+        self,
+        store: Any,
+        max_entries: int = 5000,
+        max_bytes: int = 50 * 1024 * 1024,
+        eviction_policy: str = "lru",
+        similarity_threshold: Optional[float] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        index_flush_interval: float = 30.0
+    ):
+        """
+        Args:
+            store: CacheManager (or compatible) used for persistence
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached response content
+            eviction_policy: "lru" (least recently used) or "lfu" (least frequently used)
+            similarity_threshold: Enable near-duplicate hits above this
+                estimated Jaccard similarity (0.0 - 1.0); None disables the tier
+            ttls: Per-namespace TTL overrides in seconds
+            index_flush_interval: Minimum seconds between index writes
+        """
+        if eviction_policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
+
+        self.store = store
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        self.similarity_threshold = similarity_threshold
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.index_flush_interval = index_flush_interval
+
+        # key -> {"size": bytes, "hits": count, "namespace": ns, "bands": [...], "expires": epoch}
+        self._lock = threading.RLock()
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # LFU: hit count -> keys with that count, least recently used first
+        self._hit_buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_hits = 0
+        self._total_bytes = 0
+        self._dirty = False
+        self._last_index_save = time.monotonic()
+        self._load_index()
+
+        self._stats: Dict[str, Dict[str, int]] = {}
+        atexit.register(self.flush)
+
+    # ===== Normalization =====
+
+    @staticmethod
+    def _normalize_text(content: Any) -> str:
+        """Collapse whitespace and mask volatile fragments"""
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        for pattern, placeholder in _VOLATILE_PATTERNS:
+            content = pattern.sub(placeholder, content)
+        return " ".join(content.split())
+
+    @classmethod
+    def normalize_messages(cls, messages: List[Dict[str, Any]]) -> List[List[str]]:
+        """
+        Canonical form of a message list
+
+        System messages are merged (sorted, so their order does not matter)
+        and placed first; conversation turns keep their order.
+        """
+        system_parts = sorted(
+            cls._normalize_text(m.get("content", ""))
+            for m in messages if m.get("role") == "system"
+        )
+        normalized = []
+        if system_parts:
+            normalized.append(["system", "\n".join(system_parts)])
+        for message in messages:
+            if message.get("role") == "system":
+                continue
+            normalized.append([message.get("role", "user"), cls._normalize_text(message.get("content", ""))])
+        return normalized
+
+    def make_key(self, messages: List[Dict[str, Any]], temperature: float,
+                 namespace: str = "default") -> str:
+        """Cache key from canonical JSON of normalized messages (model-independent)"""
+        canonical = json.dumps(
+            {"messages": self.normalize_messages(messages), "temperature": round(temperature, 2)},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"chat:{namespace}:{digest}"
+
+    # ===== Similarity tier =====
+
+    def _signature(self, messages: List[Dict[str, Any]]) -> List[int]:
+        """MinHash signature over word 3-shingles of the normalized prompt"""
+        text = " ".join(content for _, content in self.normalize_messages(messages)).lower()
+        words = text.split()
+        if len(words) < 3:
+            shingles = {text}
+        else:
+            shingles = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in shingles
+        ]
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in _PERMUTATIONS
+        ]
+
+    @staticmethod
+    def _band_keys(signature: List[int], namespace: str, temperature: float) -> List[str]:
+        """LSH bucket keys for a signature"""
+        keys = []
+        for band in range(_LSH_BANDS):
+            rows = signature[band * _LSH_ROWS:(band + 1) * _LSH_ROWS]
+            band_hash = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+            keys.append(f"chat_lsh:{namespace}:{round(temperature, 2)}:{band}:{band_hash}")
+        return keys
+
+    def _find_similar(self, messages: List[Dict[str, Any]], temperature: float,
+                      namespace: str) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """Find a cached near-duplicate above the similarity threshold"""
+        signature = self._signature(messages)
+        candidates = set()
+        for band_key in self._band_keys(signature, namespace, temperature):
+            candidates.update(self.store.cache_get(band_key) or [])
+
+        best = None
+        for key in candidates:
+            entry = self.store.cache_get(key)
+            if not isinstance(entry, dict) or "signature" not in entry:
+                continue
+            matches = sum(1 for x, y in zip(signature, entry["signature"]) if x == y)
+            similarity = matches / _MINHASH_PERMUTATIONS
+            if similarity >= self.similarity_threshold and (best is None or similarity > best[2]):
+                best = (key, entry, similarity)
+        return best
+
+    # ===== Cache operations =====
+
+    def _ns_stats(self, namespace: str) -> Dict[str, int]:
+        if namespace not in self._stats:
+            self._stats[namespace] = {
+                "hits": 0, "near_hits": 0, "misses": 0, "sets": 0,
+                "evictions": 0, "bytes_saved": 0, "tokens_saved": 0
+            }
+        return self._stats[namespace]
+
+    def get(self, messages: List[Dict[str, Any]], temperature: float,
+            namespace: str = "default", count: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Args:
+            count: Update hit/miss counters (disable for fallback lookups)
+
+        Returns:
+            Cached result dict, or None on miss
+        """
+        key = self.make_key(messages, temperature, namespace)
+        entry = self.store.cache_get(key)
+        similarity = None
+
+        if not isinstance(entry, dict) and self.similarity_threshold is not None:
+            found = self._find_similar(messages, temperature, namespace)
+            if found:
+                key, entry, similarity = found
+
+        if not isinstance(entry, dict) or "result" not in entry:
+            with self._lock:
+                # Expired in the store: drop its index entry too (a concurrent
+                # set() of the same key carries a fresh expiry and is kept)
+                meta = self._index.get(key)
+                if meta and meta.get("expires", float("inf")) <= time.time():
+                    self._remove_from_index(key)
+                if count:
+                    self._ns_stats(namespace)["misses"] += 1
+            return None
+
+        result = dict(entry["result"])
+        with self._lock:
+            self._touch(key)
+            if count:
+                stats = self._ns_stats(namespace)
+                stats["near_hits" if similarity is not None else "hits"] += 1
+                stats["bytes_saved"] += len(str(result.get("content", "")).encode("utf-8"))
+                stats["tokens_saved"] += int(result.get("tokens_used", 0) or 0)
+        self._maybe_save_index()
+
+        if similarity is not None:
+            result["cache_similarity"] = round(similarity, 3)
+        return result
+
+    def set(self, messages: List[Dict[str, Any]], temperature: float,
+            result: Dict[str, Any], namespace: str = "default"):
+        """Store a response with the namespace TTL, evicting if over budget"""
+        key = self.make_key(messages, temperature, namespace)
+        ttl = self.ttls.get(namespace, self.ttls["default"])
+        size = len(str(result.get("content", "")).encode("utf-8"))
+
+        entry: Dict[str, Any] = {"result": result}
+        band_keys: List[str] = []
+        if self.similarity_threshold is not None:
+            signature = self._signature(messages)
+            entry["signature"] = signature
+            band_keys = self._band_keys(signature, namespace, temperature)
+            for band_key in band_keys:
+                members = self.store.cache_get(band_key) or []
+                if key not in members:
+                    self.store.cache_set(band_key, members + [key], expire=ttl)
+
+        self.store.cache_set(key, entry, expire=ttl)
+
+        with self._lock:
+            previous = self._remove_from_index(key)
+            hits = previous["hits"] if previous else 0
+            self._index[key] = {
+                "size": size,
+                "hits": hits,
+                "namespace": namespace,
+                "bands": band_keys,
+                "expires": time.time() + ttl
+            }
+            self._bucket(key, hits)
+            self._total_bytes += size
+            self._dirty = True
+            self._ns_stats(namespace)["sets"] += 1
+            victims = self._evict()
+
+        for victim, meta in victims:
+            self._delete_from_store(victim, meta)
+        self._maybe_save_index()
+
+    def delete(self, key: str):
+        """Remove an entry and its LSH bucket memberships"""
+        with self._lock:
+            meta = self._remove_from_index(key)
+        self._delete_from_store(key, meta)
+
+    def _remove_from_index(self, key: str) -> Optional[Dict[str, Any]]:
+        """Drop a key from the index and its bucket (caller holds _lock)"""
+        meta = self._index.pop(key, None)
+        if meta:
+            self._total_bytes -= meta["size"]
+            self._unbucket(key, meta["hits"])
+            self._dirty = True
+        return meta
+
+    def _delete_from_store(self, key: str, meta: Optional[Dict[str, Any]]):
+        """Delete an entry and its LSH bucket memberships from the store"""
+        for band_key in (meta or {}).get("bands", []):
+            members = self.store.cache_get(band_key) or []
+            if key in members:
+                self.store.cache_set(band_key, [m for m in members if m != key])
+        self.store.cache_delete(key)
+
+    def _touch(self, key: str):
+        """Record an access for eviction ordering (caller holds _lock)"""
+        meta = self._index.get(key)
+        if meta is None:
+            return
+        self._unbucket(key, meta["hits"])
+        meta["hits"] += 1
+        self._bucket(key, meta["hits"])
+        self._index.move_to_end(key)
+        self._dirty = True
+
+    def _bucket(self, key: str, hits: int):
+        """Add a key to its LFU hit-count bucket (most recent last)"""
+        if self.eviction_policy != "lfu":
+            return
+        self._hit_buckets.setdefault(hits, OrderedDict())[key] = None
+        if hits < self._min_hits or len(self._hit_buckets) == 1:
+            self._min_hits = hits
+
+    def _unbucket(self, key: str, hits: int):
+        """Remove a key from its LFU hit-count bucket"""
+        bucket = self._hit_buckets.get(hits)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del self._hit_buckets[hits]
+            if hits == self._min_hits and self._hit_buckets:
+                # A touch moves the key to hits + 1; other removals are rare
+                self._min_hits = hits + 1 if hits + 1 in self._hit_buckets else min(self._hit_buckets)
+
+    def _evict(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Drop entries from the index until within entry and byte budgets
+        (caller holds _lock); returns the victims to delete from the store
+        """
+        victims = []
+        while self._index and (
+            len(self._index) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            if self.eviction_policy == "lfu":
+                # Least hits first; ties broken by recency
+                victim = next(iter(self._hit_buckets[self._min_hits]))
+            else:
+                victim = next(iter(self._index))
+
+            meta = self._remove_from_index(victim)
+            self._ns_stats(meta["namespace"])["evictions"] += 1
+            victims.append((victim, meta))
+        return victims
+
+    def _prune_expired(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Drop index entries whose store TTL has passed (caller holds _lock)"""
+        now = time.time()
+        expired = [key for key, meta in self._index.items() if meta.get("expires", now) <= now]
+        return [(key, self._remove_from_index(key)) for key in expired]
+
+    def _load_index(self):
+        """Restore eviction bookkeeping from the store"""
+        try:
+            saved = self.store.cache_get(self.INDEX_KEY)
+        except Exception as e:
+            logger.debug(f"Could not load response cache index: {e}")
+            saved = None
+
+        if isinstance(saved, list):
+            for key, meta in saved:
+                self._index[key] = meta
+                self._bucket(key, meta.get("hits", 0))
+                self._total_bytes += meta.get("size", 0)
+
+    def _index_snapshot(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Copy of the index to persist, marking it clean (caller holds _lock)"""
+        self._dirty = False
+        self._last_index_save = time.monotonic()
+        return [(key, dict(meta)) for key, meta in self._index.items()]
+
+    def _write_index(self, snapshot: List[Tuple[str, Dict[str, Any]]]):
+        try:
+            self.store.cache_set(self.INDEX_KEY, snapshot)
+        except Exception:
+            with self._lock:
+                self._dirty = True
+            raise
+
+    def _save_index(self):
+        """Persist eviction bookkeeping (order + counters)"""
+        with self._lock:
+            snapshot = self._index_snapshot()
+        self._write_index(snapshot)
+
+    def _maybe_save_index(self):
+        """Prune expired entries and persist the index once the flush interval has passed"""
+        if time.monotonic() - self._last_index_save < self.index_flush_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_index_save < self.index_flush_interval:
+                return
+            expired = self._prune_expired()
+            if not self._dirty:
+                self._last_index_save = time.monotonic()
+                return
+            snapshot = self._index_snapshot()
+        for key, meta in expired:
+            self._delete_from_store(key, meta)
+        self._write_index(snapshot)
+
+    def flush(self):
+        """Persist pending index changes now (called at exit)"""
+        if not self._dirty:
+            return
+        try:
+            self._save_index()
+        except Exception as e:
+            logger.warning(f"Could not save response cache index: {e}")
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            keys = list(self._index)
+        for key in keys:
+            self.delete(key)
+        self._save_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/bytes-saved counters per namespace plus totals"""
+        with self._lock:
+            namespaces = {ns: dict(stats) for ns, stats in self._stats.items()}
+            entries = len(self._index)
+            total_bytes = self._total_bytes
+
+        totals = {
+            "hits": 0, "near_hits": 0, "misses": 0, "sets": 0,
+            "evictions": 0, "bytes_saved": 0, "tokens_saved": 0
+        }
+        for stats in namespaces.values():
+            for name, value in stats.items():
+                totals[name] += value
+
+        lookups = totals["hits"] + totals["near_hits"] + totals["misses"]
+        totals["hit_rate"] = round(
+            (totals["hits"] + totals["near_hits"]) / lookups * 100, 2
+        ) if lookups else 0
+
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "eviction_policy": self.eviction_policy,
+            "similarity_threshold": self.similarity_threshold,
+            "totals": totals,
+            "namespaces": namespaces
+        }
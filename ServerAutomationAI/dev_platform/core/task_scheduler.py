@@ -0,0 +1,217 @@
+"""
+DAG Task Scheduler
+Runs dependent tasks concurrently while respecting dependency order
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class DAGScheduler:
+    """
+    Concurrent executor for tasks with dependencies
+    
+    Features:
+    - Starts every task as soon as all of its dependencies have succeeded
+    - Global concurrency limit plus optional per-agent-type limits
+    - Dependents of a failed task are skipped, not executed
+    - Cooperative cancellation via an asyncio.Event
+    - Malformed plans still run: duplicate ids and dependency cycles are
+      logged and resolved towards plan order
+    
+    Tasks are dicts with an "id" and optional "dependencies" (list of ids)
+    and "agent_type", as produced by PlannerAgent.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        agent_limits: Optional[Dict[str, int]] = None,
+        default_agent_type: str = "code_executor"
+    ):
+        """
+        Initialize DAGScheduler
+        
+        Args:
+            max_concurrency: Maximum tasks running at once
+            agent_limits: Per-agent-type limits (e.g. {"code_executor": 3})
+            default_agent_type: Agent type for tasks without "agent_type"
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.agent_limits = agent_limits or {}
+        self.default_agent_type = default_agent_type
+    
+    @staticmethod
+    def _task_id(task: Dict, index: int) -> Any:
+        return task.get("id", index + 1)
+    
+    def _agent_type(self, task: Dict) -> str:
+        return task.get("agent_type") or self.default_agent_type
+    
+    def _build_graph(self, tasks: List[Dict]) -> Dict[int, Set[int]]:
+        """
+        Map plan position -> positions it depends on
+        
+        A dependency on a duplicated id refers to its first occurrence.
+        Tasks left in a dependency cycle keep only their dependencies on
+        tasks earlier in the plan, so they run in plan order.
+        """
+        first_index: Dict[Any, int] = {}
+        for index, task in enumerate(tasks):
+            task_id = self._task_id(task, index)
+            if task_id in first_index:
+                logger.warning(f"Duplicate task ID {task_id} in plan, dependencies refer to its first occurrence")
+            else:
+                first_index[task_id] = index
+        
+        graph: Dict[int, Set[int]] = {}
+        for index, task in enumerate(tasks):
+            deps = set()
+            for dep in task.get("dependencies") or []:
+                if dep not in first_index:
+                    logger.warning(f"Task {self._task_id(task, index)} has unknown dependency {dep}, ignoring")
+                    continue
+                deps.add(first_index[dep])
+            graph[index] = deps - {index}
+        
+        # Kahn's algorithm: anything left unvisited is part of (or behind) a cycle
+        dependents: Dict[int, List[int]] = {index: [] for index in graph}
+        for index, deps in graph.items():
+            for dep in deps:
+                dependents[dep].append(index)
+        remaining = {index: len(deps) for index, deps in graph.items()}
+        ready = [index for index, count in remaining.items() if count == 0]
+        while ready:
+            for dependent in dependents[ready.pop()]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        
+        blocked = {index for index, count in remaining.items() if count > 0}
+        if blocked:
+            logger.warning(
+                f"Dependency cycle between tasks {[self._task_id(tasks[i], i) for i in sorted(blocked)]}, "
+                f"falling back to plan order"
+            )
+            for index in blocked:
+                graph[index] = {dep for dep in graph[index] if dep not in blocked or dep < index}
+        
+        return graph
+    
+    async def run(
+        self,
+        tasks: List[Dict],
+        execute: Callable[[Dict], Awaitable[Any]],
+        is_success: Callable[[Any], bool] = lambda result: True,
+        cancel_event: Optional[asyncio.Event] = None,
+        on_task_done: Optional[Callable[[Dict, Any, int, int], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute all tasks
+        
+        Args:
+            tasks: Task dicts
+            execute: Coroutine function running one task and returning its result
+            is_success: Whether a result lets dependents run
+            cancel_event: When set, no new tasks start and running ones are cancelled
+            on_task_done: Awaited after each task with (task, result, done, total)
+        
+        Returns:
+            Dict with results (in plan order, one {"task_id", "result",
+            "skipped"} entry per finished or skipped task), skipped (task ids
+            whose dependencies failed) and cancelled flag
+        """
+        graph = self._build_graph(tasks)
+        total = len(tasks)
+        
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        agent_slots = {
+            agent_type: asyncio.Semaphore(max(1, limit))
+            for agent_type, limit in self.agent_limits.items()
+        }
+        
+        results: Dict[int, Any] = {}
+        succeeded: Set[int] = set()
+        skipped: Set[int] = set()
+        pending = dict(graph)
+        running: Dict[asyncio.Task, int] = {}
+        cancelled = False
+        
+        async def run_one(task: Dict) -> Any:
+            agent_slot = agent_slots.get(self._agent_type(task))
+            async with global_slots:
+                if agent_slot is None:
+                    return await execute(task)
+                async with agent_slot:
+                    return await execute(task)
+        
+        async def finish(index: int, result: Any):
+            results[index] = result
+            if on_task_done is not None:
+                await on_task_done(tasks[index], result, len(results) + len(skipped), total)
+        
+        cancel_wait = asyncio.create_task(cancel_event.wait()) if cancel_event else None
+        try:
+            while pending or running:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                
+                # Skip tasks whose dependencies can no longer succeed
+                failed = (set(results) - succeeded) | skipped
+                for index in [i for i, deps in pending.items() if deps & failed]:
+                    del pending[index]
+                    skipped.add(index)
+                    logger.info(f"Skipping task {self._task_id(tasks[index], index)}: dependency failed")
+                
+                # Start every task whose dependencies all succeeded
+                for index in [i for i, deps in pending.items() if deps <= succeeded]:
+                    del pending[index]
+                    running[asyncio.create_task(run_one(tasks[index]))] = index
+                
+                if not running:
+                    continue
+                
+                waiters = set(running)
+                if cancel_wait is not None:
+                    waiters.add(cancel_wait)
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                
+                for finished in done:
+                    if finished is cancel_wait:
+                        continue
+                    index = running.pop(finished)
+                    try:
+                        result = finished.result()
+                    except Exception as e:
+                        logger.error(f"Task {self._task_id(tasks[index], index)} raised: {e}")
+                        result = e
+                    else:
+                        if is_success(result):
+                            succeeded.add(index)
+                    await finish(index, result)
+        finally:
+            if cancel_wait is not None:
+                cancel_wait.cancel()
+            for leftover in running:
+                leftover.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        ordered = [
+            {
+                "task_id": self._task_id(task, index),
+                "result": results.get(index),
+                "skipped": index in skipped
+            }
+            for index, task in enumerate(tasks)
+            if index in results or index in skipped
+        ]
+        return {
+            "results": ordered,
+            "skipped": [entry["task_id"] for entry in ordered if entry["skipped"]],
+            "cancelled": cancelled
+        }
@@ -4,17 +4,108 @@ Provides async SQLite storage for workflows, steps, and alerts
 """
 
 import aiosqlite
+import asyncio
 import json
 import logging
+import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from pathlib import Path
 from contextlib import asynccontextmanager
 
+from .async_bridge import get_async_bridge
+
 logger = logging.getLogger(__name__)
 
 SCHEMA_VERSION = 1
 
+# Per-connection settings; journal_mode=WAL is persistent but cheap to re-assert
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+class ConnectionPool:
+    """
+    Long-lived aiosqlite connections bound to one event loop
+    
+    - Readers share up to `size` connections (WAL lets them run alongside writes)
+    - All writes go through a single writer connection, serialized by a FIFO lock,
+      so concurrent workflows queue instead of failing with "database is locked"
+    - Statements are compiled once per connection and reused via sqlite3's
+      statement cache
+    """
+    
+    def __init__(self, db_path: str, size: int = 4, cached_statements: int = 256):
+        self.db_path = db_path
+        self.size = size
+        self.cached_statements = cached_statements
+        self.loop = asyncio.get_running_loop()
+        self._idle: List[aiosqlite.Connection] = []
+        self._all: List[aiosqlite.Connection] = []
+        self._reader_slots = asyncio.Semaphore(size)
+        self._write_lock = asyncio.Lock()
+        self._writer: Optional[aiosqlite.Connection] = None
+    
+    async def _connect(self) -> aiosqlite.Connection:
+        """Open a new connection with pool pragmas applied"""
+        conn = aiosqlite.connect(self.db_path, cached_statements=self.cached_statements)
+        
+        # Pooled connections live as long as the process; their worker
+        # threads must not block interpreter exit
+        worker = conn if isinstance(conn, threading.Thread) else getattr(conn, "_thread", None)
+        if worker is not None:
+            worker.daemon = True
+        
+        await conn
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        self._all.append(conn)
+        return conn
+    
+    @asynccontextmanager
+    async def reader(self):
+        """Borrow a read connection"""
+        async with self._reader_slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield conn
+            finally:
+                conn.row_factory = None
+                self._idle.append(conn)
+    
+    @asynccontextmanager
+    async def writer(self):
+        """Acquire the single writer connection (rolls back on error)"""
+        async with self._write_lock:
+            if self._writer is None:
+                self._writer = await self._connect()
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            finally:
+                self._writer.row_factory = None
+    
+    async def close(self):
+        """Close all pooled connections"""
+        conns, self._all, self._idle, self._writer = self._all, [], [], None
+        for conn in conns:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled connection: {e}")
+    
+    def discard(self):
+        """Stop connections without awaiting (their event loop is gone)"""
+        conns, self._all, self._idle, self._writer = self._all, [], [], None
+        for conn in conns:
+            conn.stop()
+
 
 class WorkflowStorage:
     """
@@ -27,14 +118,18 @@ class WorkflowStorage:
     - alerts: Alert notifications
     """
     
-    def __init__(self, db_path: str = "data/workflows.db"):
+    def __init__(self, db_path: str = "data/workflows.db", pool_size: int = 4):
         """
         Initialize WorkflowStorage
         
         Args:
             db_path: Path to SQLite database file
+            pool_size: Maximum number of pooled read connections
         """
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool: Optional[ConnectionPool] = None
+        self._bridge_pool: Optional[ConnectionPool] = None  # for sync callers via AsyncBridge
         self._ensure_data_dir()
     
     def _ensure_data_dir(self):
@@ -42,17 +137,67 @@ class WorkflowStorage:
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
     
+    def _get_pool(self) -> Optional[ConnectionPool]:
+        """
+        Get the connection pool for the running event loop
+        
+        The pool is bound to the loop that created it. Calls from a different
+        loop get None and fall back to a short-lived connection; a pool whose
+        loop has been closed is discarded and rebuilt on the current loop.
+        Calls bridged from sync code run on the shared AsyncBridge loop and
+        get a pool of their own, so they never claim the application's pool.
+        """
+        loop = asyncio.get_running_loop()
+        if get_async_bridge().in_bridge_thread():
+            if self._bridge_pool is None or self._bridge_pool.loop is not loop:
+                self._bridge_pool = ConnectionPool(self.db_path, size=self.pool_size)
+            return self._bridge_pool
+        
+        if self._pool is not None and self._pool.loop is not loop:
+            if not self._pool.loop.is_closed():
+                return None
+            self._pool.discard()
+            self._pool = None
+        
+        if self._pool is None:
+            self._pool = ConnectionPool(self.db_path, size=self.pool_size)
+        return self._pool
+    
     @asynccontextmanager
-    async def _get_connection(self):
-        """Get database connection with proper pragmas"""
+    async def _get_ephemeral_connection(self):
+        """Open a one-off connection (used outside the pool's event loop)"""
         async with aiosqlite.connect(self.db_path) as db:
-            # Enable foreign keys
-            await db.execute("PRAGMA foreign_keys = ON")
+            for pragma in CONNECTION_PRAGMAS:
+                await db.execute(pragma)
+            yield db
+    
+    @asynccontextmanager
+    async def _get_connection(self):
+        """Get a pooled read connection"""
+        pool = self._get_pool()
+        if pool is None:
+            async with self._get_ephemeral_connection() as db:
+                yield db
+            return
+        
+        async with pool.reader() as db:
+            yield db
+    
+    @asynccontextmanager
+    async def _get_write_connection(self):
+        """Get the single writer connection (writes are serialized)"""
+        pool = self._get_pool()
+        if pool is None:
+            async with self._get_ephemeral_connection() as db:
+                yield db
+            return
+        
+        async with pool.writer() as db:
             yield db
     
     async def initialize_schema(self):
         """Create database tables if they don't exist"""
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             # Schema version table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS schema_version (
@@ -305,52 +450,8 @@ class WorkflowStorage:
         Args:
             workflow: Workflow dictionary
         """
-        async with self._get_connection() as db:
-            # Use INSERT ... ON CONFLICT UPDATE to preserve child rows (steps, alerts)
-            await db.execute("""
-                INSERT INTO workflows (
-                    workflow_id, workflow_type, status, project_name, user_request,
-                    parameters, auto_execute, created_at, queued_at, started_at,
-                    paused_at, completed_at, failed_at, current_step, total_steps,
-                    progress_percent, error, result
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(workflow_id) DO UPDATE SET
-                    workflow_type = excluded.workflow_type,
-                    status = excluded.status,
-                    project_name = excluded.project_name,
-                    user_request = excluded.user_request,
-                    parameters = excluded.parameters,
-                    auto_execute = excluded.auto_execute,
-                    queued_at = excluded.queued_at,
-                    started_at = excluded.started_at,
-                    paused_at = excluded.paused_at,
-                    completed_at = excluded.completed_at,
-                    failed_at = excluded.failed_at,
-                    current_step = excluded.current_step,
-                    total_steps = excluded.total_steps,
-                    progress_percent = excluded.progress_percent,
-                    error = excluded.error,
-                    result = excluded.result
-            """, (
-                workflow.get("workflow_id"),
-                workflow.get("workflow_type"),
-                workflow.get("status"),
-                workflow.get("project_name"),
-                workflow.get("user_request"),
-                self._safe_json_dumps(workflow.get("parameters")),
-                1 if workflow.get("auto_execute") else 0,
-                workflow.get("created_at"),
-                workflow.get("queued_at"),
-                workflow.get("started_at"),
-                workflow.get("paused_at"),
-                workflow.get("completed_at"),
-                workflow.get("failed_at"),
-                workflow.get("current_step", 0),
-                workflow.get("total_steps", 0),
-                workflow.get("progress_percent", 0.0),
-                workflow.get("error"),
-                self._safe_json_dumps(workflow.get("result"))
-            ))
+        async with self._get_write_connection() as db:
+            await self._save_workflow_internal(db, workflow)
             await db.commit()
     
     async def get_workflow(self, workflow_id: str) -> Optional[Dict]:
@@ -422,7 +523,7 @@ class WorkflowStorage:
         Args:
             workflow_id: Workflow ID
         """
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             await db.execute(
                 "DELETE FROM workflows WHERE workflow_id = ?",
                 (workflow_id,)
@@ -442,7 +543,7 @@ class WorkflowStorage:
             True if successful, False if workflow not found or error
         """
         try:
-            async with self._get_connection() as db:
+            async with self._get_write_connection() as db:
                 cursor = await db.execute("""
                     UPDATE workflows
                     SET status = 'running',
@@ -475,7 +576,7 @@ class WorkflowStorage:
             True if successful, False if workflow not found or error
         """
         try:
-            async with self._get_connection() as db:
+            async with self._get_write_connection() as db:
                 cursor = await db.execute("""
                     UPDATE workflows
                     SET status = 'completed',
@@ -515,7 +616,7 @@ class WorkflowStorage:
             True if successful, False if workflow not found or error
         """
         try:
-            async with self._get_connection() as db:
+            async with self._get_write_connection() as db:
                 if progress is not None:
                     cursor = await db.execute("""
                         UPDATE workflows
@@ -559,7 +660,7 @@ class WorkflowStorage:
             True if successful, False if workflow not found or error
         """
         try:
-            async with self._get_connection() as db:
+            async with self._get_write_connection() as db:
                 if progress is not None:
                     cursor = await db.execute("""
                         UPDATE workflows
@@ -605,7 +706,7 @@ class WorkflowStorage:
             True if successful, False if workflow not found or error
         """
         try:
-            async with self._get_connection() as db:
+            async with self._get_write_connection() as db:
                 if current_step is not None and total_steps is not None:
                     cursor = await db.execute("""
                         UPDATE workflows
@@ -631,6 +732,43 @@ class WorkflowStorage:
             logger.error(f"Failed to update workflow progress {workflow_id}: {e}")
             return False
     
+    # Columns that may be updated in place without rewriting the whole row
+    UPDATABLE_COLUMNS = ("status", "progress_percent", "current_step", "total_steps")
+    
+    async def update_workflow_columns(self, workflow_id: str, changes: Dict[str, Any]) -> bool:
+        """
+        Update only the given hot columns of a workflow
+        
+        Args:
+            workflow_id: Workflow ID
+            changes: Column -> value (subset of UPDATABLE_COLUMNS)
+        
+        Returns:
+            True if successful, False if workflow not found or error
+        """
+        columns = [column for column in self.UPDATABLE_COLUMNS if column in changes]
+        if not columns:
+            return True
+        
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        values = [changes[column] for column in columns]
+        
+        try:
+            async with self._get_write_connection() as db:
+                cursor = await db.execute(
+                    f"UPDATE workflows SET {assignments} WHERE workflow_id = ?",
+                    (*values, workflow_id)
+                )
+                await db.commit()
+                
+                if cursor.rowcount == 0:
+                    logger.warning(f"Workflow {workflow_id} not found for column update")
+                    return False
+                return True
+        except Exception as e:
+            logger.error(f"Failed to update workflow columns {workflow_id}: {e}")
+            return False
+    
     # ========== Cache Synchronization Helpers ==========
     
     async def load_active_workflows_from_storage(self) -> Dict[str, Dict]:
@@ -690,7 +828,7 @@ class WorkflowStorage:
         """
         stats = {"saved": 0, "errors": 0, "error_messages": []}
         
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             for workflow in workflows:
                 try:
                     await self._save_workflow_internal(db, workflow)
@@ -714,7 +852,7 @@ class WorkflowStorage:
             workflow_id: Workflow ID
             step: Step dictionary
         """
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             # Use INSERT ON CONFLICT to respect UNIQUE constraint
             await db.execute("""
                 INSERT INTO steps (
@@ -774,7 +912,7 @@ class WorkflowStorage:
         Args:
             alert: Alert dictionary
         """
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             await db.execute("""
                 INSERT INTO alerts (
                     alert_type, severity, title, message,
@@ -845,7 +983,7 @@ class WorkflowStorage:
             agent_id = "ops_coordinator"
             
             # Single transaction for all migration
-            async with self._get_connection() as db:
+            async with self._get_write_connection() as db:
                 try:
                     # Migrate active workflows using internal method (same transaction)
                     try:
@@ -1019,7 +1157,7 @@ class WorkflowStorage:
             project_name: Project name
             snapshot_data: Dictionary containing snapshot information
         """
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             now = datetime.now().isoformat()
             snapshot_json = self._safe_json_dumps(snapshot_data)
             
@@ -1100,11 +1238,22 @@ class WorkflowStorage:
         Args:
             project_id: Project identifier
         """
-        async with self._get_connection() as db:
+        async with self._get_write_connection() as db:
             await db.execute("DELETE FROM project_snapshots WHERE project_id = ?", (project_id,))
             await db.commit()
             logger.debug(f"Deleted snapshot for project {project_id}")
     
     async def close(self):
-        """Close database connection (cleanup)"""
-        pass
+        """Close pooled database connections (cleanup)"""
+        pools = [p for p in (self._pool, self._bridge_pool) if p is not None]
+        self._pool = self._bridge_pool = None
+        
+        loop = asyncio.get_running_loop()
+        for pool in pools:
+            if pool.loop is loop:
+                await pool.close()
+            elif pool.loop.is_running():
+                # Close on the pool's own loop (e.g. the sync bridge loop)
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.close(), pool.loop))
+            else:
+                pool.discard()
@@ -73,9 +73,10 @@ class BridgeGitService:
                 text=True,
                 timeout=30
             )
+            # Leading whitespace is significant (porcelain status columns)
             return (
                 result.returncode == 0,
-                result.stdout.strip(),
+                result.stdout.rstrip(),
                 result.stderr.strip()
             )
         except subprocess.TimeoutExpired:
@@ -101,6 +102,25 @@ class BridgeGitService:
         success, stdout, _ = self._run_git_command(["rev-parse", "HEAD"])
         return stdout if success else None
     
+    def get_files_changed_since(self, commit: str) -> Optional[List[str]]:
+        """Paths changed between a commit and HEAD, from the repository root (None if unknown)"""
+        if not self._git_available:
+            return None
+        
+        # --no-renames lists both sides of a rename
+        success, stdout, _ = self._run_git_command(["diff", "--name-only", "--no-renames", commit, "HEAD"])
+        if not success:
+            return None
+        return [line for line in stdout.splitlines() if line]
+    
+    def get_path_prefix(self) -> str:
+        """Path of repo_path relative to the repository root ('' at the root)"""
+        if not self._git_available:
+            return ""
+        
+        success, stdout, _ = self._run_git_command(["rev-parse", "--show-prefix"])
+        return stdout.strip() if success else ""
+    
     def get_commit_info(self, commit: Optional[str] = None) -> Optional[Dict[str, str]]:
         """Get detailed commit information"""
         if not self._git_available:
@@ -1,19 +1,29 @@
 """
 Async QA Task Manager
-Orchestrates QA tools sequentially with RAM limits
+Orchestrates QA tools (sequentially or concurrently) with RAM limits
 """
 
 import asyncio
+import functools
 import logging
+import os
 import psutil
 import time
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 from .flake8_wrapper import Flake8Wrapper
 from .bandit_wrapper import BanditWrapper
 from .radon_wrapper import RadonWrapper
 from .qa_tools_config import QAToolsConfig
+from .qa_result_cache import get_qa_result_cache
+from .qa_inprocess import (
+    JOB_MODULES as INPROCESS_JOB_MODULES,
+    get_inprocess_backend,
+    job_available as inprocess_job_available,
+    to_file_result
+)
 from dev_platform.agents.schemas import (
     QAToolType, QAIssueDetail, QAIssueCategory, SeverityLevel,
     AggregatedQAReport, RAMUsageMetrics
@@ -21,13 +31,22 @@ from dev_platform.agents.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Directories skipped when collecting files for incremental analysis
+EXCLUDED_DIRS = {"__pycache__", "CVS", "node_modules", "venv"}
+
 
 class AsyncQATaskManager:
     """
-    Async manager for orchestrating QA tools sequentially
+    Async manager for orchestrating QA tools
     
     Features:
-    - Sequential execution to control RAM usage
+    - Sequential execution to control RAM usage (default)
+    - Concurrent execution within a RAM/CPU budget, with per-tool timeouts
+      and partial results
+    - Incremental analysis: per-file results cached by content hash, so only
+      changed files are re-analyzed
+    - In-process analyzers in a worker pool (one parse per file shared by
+      flake8/radon), with the subprocess wrappers as fallback
     - Memory monitoring and limits
     - Result aggregation
     - Error handling and recovery
@@ -49,6 +68,23 @@ class AsyncQATaskManager:
         
         # RAM tracking
         self.ram_limits = self.config.get_ram_limits()
+        self.execution_config = self.config.get_execution_config()
+        
+        # In-process analyzers for jobs whose libraries are installed;
+        # the remaining jobs use the subprocess wrappers
+        self.inprocess_jobs = self._select_inprocess_jobs()
+        self.inprocess = None
+        if self.inprocess_jobs:
+            self.inprocess = get_inprocess_backend(self.execution_config.get("worker_processes", 2))
+        
+        # Per-file result cache (None when disabled)
+        self.cache_config = self.config.get_cache_config()
+        self.result_cache = None
+        if self.cache_config.get("enabled", True):
+            self.result_cache = get_qa_result_cache(
+                self.cache_config.get("directory", "data/cache/qa_results"),
+                self.cache_config.get("size_limit_mb", 256)
+            )
         self.peak_memory_mb = 0.0
         self.initial_memory_mb = 0.0
         
@@ -56,20 +92,25 @@ class AsyncQATaskManager:
         self.total_runs = 0
         self.successful_runs = 0
         self.failed_runs = 0
+        self.last_tool_durations: Dict[str, float] = {}
+        self.last_cache_summary: Optional[Dict[str, int]] = None
     
     async def analyze_code_quality_async(
         self,
         file_path: str,
         tools: Optional[List[QAToolType]] = None,
-        options: Optional[Dict] = None
+        options: Optional[Dict] = None,
+        sequential: Optional[bool] = None
     ) -> AggregatedQAReport:
         """
-        Analyze code quality using multiple QA tools sequentially
+        Analyze code quality using multiple QA tools
         
         Args:
             file_path: Path to file or directory to analyze
             tools: List of tools to run (default: all)
             options: Tool-specific options
+            sequential: Run tools one at a time (default from the "execution"
+                config); False runs them concurrently within the RAM/CPU budget
         
         Returns:
             AggregatedQAReport with results from all tools
@@ -87,8 +128,11 @@ class AsyncQATaskManager:
                 tools = [QAToolType.FLAKE8, QAToolType.BANDIT, QAToolType.RADON]
             
             options = options or {}
+            if sequential is None:
+                sequential = self.execution_config.get("sequential", True)
             
-            logger.info(f"Starting QA analysis on {file_path} with tools: {tools}")
+            mode = "sequential" if sequential else "concurrent"
+            logger.info(f"Starting QA analysis on {file_path} with tools: {tools} ({mode})")
             
             # Initialize report
             report = AggregatedQAReport(
@@ -112,51 +156,15 @@ class AsyncQATaskManager:
                 summary=""
             )
             
-            all_issues: List[QAIssueDetail] = []
-            
-            # Run tools sequentially
-            if QAToolType.FLAKE8 in tools:
-                logger.info("Running flake8...")
-                flake8_result = await self._run_flake8(file_path, options)
-                report.flake8_executed = True
-                
-                if flake8_result["success"]:
-                    issues = self._convert_flake8_issues(flake8_result, file_path)
-                    all_issues.extend(issues)
-                    report.lint_issues = len(issues)
-                
-                await self._check_memory_limit()
-            
-            if QAToolType.BANDIT in tools:
-                logger.info("Running bandit...")
-                bandit_result = await self._run_bandit(file_path, options)
-                report.bandit_executed = True
-                
-                if bandit_result["success"]:
-                    issues = self._convert_bandit_issues(bandit_result, file_path)
-                    all_issues.extend(issues)
-                    report.security_issues = len(issues)
-                
-                await self._check_memory_limit()
+            self.last_tool_durations = {}
+            self.last_cache_summary = None
+            if self.result_cache is not None and Path(file_path).exists():
+                job_results = await self._run_jobs_cached(file_path, tools, options, sequential)
+            else:
+                job_results = await self._run_jobs_uncached(file_path, tools, options, sequential)
+            results = self._combine_job_results(job_results)
             
-            if QAToolType.RADON in tools:
-                logger.info("Running radon...")
-                radon_result = await self._run_radon(file_path, options)
-                report.radon_executed = True
-                
-                if radon_result["success"]:
-                    # Extract metrics
-                    report.average_complexity = radon_result.get("average_complexity", 0)
-                    report.max_complexity = radon_result.get("max_complexity", 0)
-                    report.maintainability_index = radon_result.get("maintainability_index")
-                    report.maintainability_grade = radon_result.get("maintainability_grade")
-                    
-                    # Convert complexity issues
-                    issues = self._convert_radon_issues(radon_result, file_path)
-                    all_issues.extend(issues)
-                    report.complexity_issues = len(issues)
-                
-                await self._check_memory_limit()
+            all_issues = self._apply_tool_results(report, results, file_path)
             
             # Aggregate results
             report.all_issues = all_issues
@@ -210,6 +218,438 @@ class AsyncQATaskManager:
                 summary=f"Analysis failed: {str(e)}"
             )
     
+    def _tool_jobs(self, tools: List[QAToolType], options: Dict) -> Dict[str, Callable[[str], Awaitable[Dict]]]:
+        """
+        Job name -> coroutine function analyzing a path
+        
+        Radon's complexity and maintainability passes are separate jobs.
+        """
+        jobs: Dict[str, Callable[[str], Awaitable[Dict]]] = {}
+        if QAToolType.FLAKE8 in tools:
+            jobs["flake8"] = lambda target: self._run_flake8(target, options)
+        if QAToolType.BANDIT in tools:
+            jobs["bandit"] = lambda target: self._run_bandit(target, options)
+        if QAToolType.RADON in tools:
+            jobs["radon_cc"] = lambda target: self._run_radon_complexity(target, options)
+            jobs["radon_mi"] = lambda target: self._run_radon_maintainability(target, options)
+        return jobs
+    
+    def _combine_job_results(self, job_results: Dict[str, Dict]) -> Dict[QAToolType, Dict]:
+        """Map job results to per-tool results (radon passes are merged)"""
+        results: Dict[QAToolType, Dict] = {}
+        if "flake8" in job_results:
+            results[QAToolType.FLAKE8] = job_results["flake8"]
+        if "bandit" in job_results:
+            results[QAToolType.BANDIT] = job_results["bandit"]
+        if "radon_cc" in job_results:
+            results[QAToolType.RADON] = self._merge_radon_results(
+                job_results["radon_cc"], job_results.get("radon_mi", {})
+            )
+        return results
+    
+    async def _run_jobs_uncached(
+        self,
+        file_path: str,
+        tools: List[QAToolType],
+        options: Dict,
+        sequential: bool
+    ) -> Dict[str, Dict]:
+        """Run every tool job over the whole path"""
+        jobs = self._tool_jobs(tools, options)
+        inprocess = [name for name in jobs if name in self.inprocess_jobs] if Path(file_path).exists() else []
+        
+        job_results: Dict[str, Dict] = {}
+        if inprocess:
+            files = self._collect_python_files(file_path)
+            file_results = await self._run_inprocess({f: inprocess for f in files}, options, sequential)
+            for name in inprocess:
+                entries = [(f, file_results[f][name]) for f in files]
+                failure = next((r for _, r in entries if r.get("success") is False), None)
+                job_results[name] = failure or self._merge_job_results(name, entries)
+        
+        job_results.update(await self._run_jobs(
+            [(name, name, functools.partial(job, file_path)) for name, job in jobs.items() if name not in inprocess],
+            sequential
+        ))
+        return job_results
+    
+    async def _run_jobs(
+        self,
+        jobs: List[Tuple[Any, str, Callable[[], Awaitable[Dict]]]],
+        sequential: bool
+    ) -> Dict[Any, Dict]:
+        """
+        Run (key, job name, coroutine function) jobs and return results by key
+        
+        Sequential mode runs one job at a time, checking memory in between.
+        Concurrent mode starts a job only while there is a free CPU slot and
+        the RAM budget (ram_limits) has room for another tool; at least one
+        job always runs. A concurrent job that exceeds its timeout is
+        abandoned and gets a timed_out error result.
+        """
+        results: Dict[Any, Dict] = {}
+        
+        if sequential:
+            for key, name, job in jobs:
+                logger.info(f"Running {name}...")
+                results[key] = await self._run_job(name, job)
+                await self._check_memory_limit()
+            return results
+        
+        limit = self._parallel_tool_limit()
+        pending = list(jobs)
+        running: Dict[asyncio.Task, Any] = {}
+        
+        try:
+            while pending or running:
+                while pending and len(running) < limit and (not running or self._has_memory_headroom(len(running))):
+                    key, name, job = pending.pop(0)
+                    logger.info(f"Running {name}...")
+                    running[asyncio.create_task(self._run_job(name, job, self._job_timeout(name)))] = key
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[running.pop(task)] = task.result()
+                
+                await self._check_memory_limit()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        return results
+    
+    async def _run_job(
+        self,
+        name: str,
+        job: Callable[[], Awaitable[Dict]],
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """Run one tool job, abandoning it after `timeout` seconds"""
+        started = time.time()
+        try:
+            return await asyncio.wait_for(job(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} timed out after {timeout}s, continuing with partial results")
+            return {
+                "success": False,
+                "error": f"{name} timed out after {timeout}s",
+                "timed_out": True,
+                "issues": [],
+                "functions": []
+            }
+        except Exception as e:
+            logger.error(f"{name} execution failed: {e}")
+            return {"success": False, "error": str(e), "issues": [], "functions": []}
+        finally:
+            duration = time.time() - started
+            self.last_tool_durations[name] = round(self.last_tool_durations.get(name, 0.0) + duration, 3)
+    
+    def _job_timeout(self, name: str) -> float:
+        """Tool timeout plus grace period (the wrapper kills its process first)"""
+        tool = name.split("_")[0]
+        tool_config = getattr(self.config, f"get_{tool}_config")()
+        return tool_config.get("timeout", 30) + self.execution_config.get("timeout_grace_seconds", 5)
+    
+    def _parallel_tool_limit(self) -> int:
+        """Maximum tools running at once (CPU budget)"""
+        configured = self.execution_config.get("max_parallel_tools", 4)
+        return max(1, min(configured, os.cpu_count() or 1))
+    
+    def _has_memory_headroom(self, running_tools: int) -> bool:
+        """Whether the RAM budget fits one more tool next to the running ones"""
+        per_tool_mb = self.ram_limits.get("max_memory_mb", 512)
+        limit_mb = self.ram_limits.get("total_limit_mb", 3584)
+        projected_mb = self._get_current_memory_mb() + (running_tools + 1) * per_tool_mb
+        return projected_mb <= limit_mb
+    
+    # ===== Incremental (cached) analysis =====
+    
+    async def _run_jobs_cached(
+        self,
+        file_path: str,
+        tools: List[QAToolType],
+        options: Dict,
+        sequential: bool
+    ) -> Dict[str, Dict]:
+        """
+        Run tool jobs only for files whose cached results are stale
+        
+        Results are cached per (file content, tool, tool version, config).
+        When more than `batch_threshold` files changed, the tool runs once
+        over the whole path and its output is split per file; otherwise it
+        runs once per changed file.
+        """
+        jobs = self._tool_jobs(tools, options)
+        files = self._collect_python_files(file_path)
+        hashes = {f: self.result_cache.hash_file(f) for f in files}
+        batch_threshold = self.cache_config.get("batch_threshold", 20)
+        
+        per_file: Dict[str, Dict[str, Dict]] = {name: {} for name in jobs}
+        misses: Dict[str, List[str]] = {}
+        config_hashes: Dict[str, str] = {}
+        for name in jobs:
+            config_hashes[name] = self._job_config_hash(name, options)
+            for f in files:
+                cached = self.result_cache.get(name, hashes[f], config_hashes[name]) if hashes[f] else None
+                if cached is None:
+                    misses.setdefault(name, []).append(f)
+                else:
+                    per_file[name][f] = cached
+        
+        def store(name: str, f: str, file_result: Dict):
+            per_file[name][f] = file_result
+            if hashes[f]:
+                self.result_cache.set(name, hashes[f], config_hashes[name], file_result)
+        
+        failed: Dict[str, Dict] = {}
+        
+        # In-process jobs: one worker call per changed file covers all of its stale jobs
+        inprocess_files: Dict[str, List[str]] = {}
+        for name in [n for n in misses if n in self.inprocess_jobs]:
+            for f in misses[name]:
+                inprocess_files.setdefault(f, []).append(name)
+        
+        for f, by_job in (await self._run_inprocess(inprocess_files, options, sequential)).items():
+            for name, file_result in by_job.items():
+                if file_result.get("success") is False:
+                    failed[name] = file_result
+                else:
+                    store(name, f, file_result)
+        
+        runs: List[Tuple[Any, str, Callable[[], Awaitable[Dict]]]] = []
+        for name, missed in misses.items():
+            if name in self.inprocess_jobs:
+                continue
+            if Path(file_path).is_file() or len(missed) > batch_threshold:
+                runs.append(((name, None), name, functools.partial(jobs[name], file_path)))
+            else:
+                runs.extend(((name, f), name, functools.partial(jobs[name], f)) for f in missed)
+        
+        run_results = await self._run_jobs(runs, sequential)
+        
+        for (name, target), result in run_results.items():
+            if not result.get("success"):
+                failed[name] = result
+                continue
+            if target is not None:
+                split = self._split_job_result(name, result, [target], attribute_all=True)
+            else:
+                split = self._split_job_result(name, result, misses[name], attribute_all=Path(file_path).is_file())
+            for f, file_result in split.items():
+                store(name, f, file_result)
+        
+        reanalyzed = {f for missed in misses.values() for f in missed}
+        self.last_cache_summary = {"files": len(files), "reanalyzed": len(reanalyzed)}
+        
+        return {
+            name: failed.get(name) or self._merge_job_results(
+                name, [(f, per_file[name][f]) for f in files if f in per_file[name]]
+            )
+            for name in jobs
+        }
+    
+    # ===== In-process backend =====
+    
+    def _select_inprocess_jobs(self) -> Set[str]:
+        """Jobs run by the in-process backend ("backend" execution setting)"""
+        backend = self.execution_config.get("backend", "auto")
+        if backend == "subprocess":
+            return set()
+        
+        available = {job for job in INPROCESS_JOB_MODULES if inprocess_job_available(job)}
+        if backend == "inprocess" and len(available) < len(INPROCESS_JOB_MODULES):
+            missing = sorted(set(INPROCESS_JOB_MODULES) - available)
+            logger.warning(f"In-process analyzers unavailable for {missing}, falling back to subprocess for them")
+        return available
+    
+    def _inprocess_settings(self, options: Dict) -> Dict[str, Dict]:
+        """Tool configs merged with runtime options (what the wrappers would use)"""
+        return {
+            tool: {**getattr(self.config, f"get_{tool}_config")(), **options.get(tool, {})}
+            for tool in ("flake8", "bandit", "radon")
+        }
+    
+    async def _run_inprocess(
+        self,
+        file_jobs: Dict[str, List[str]],
+        options: Dict,
+        sequential: bool
+    ) -> Dict[str, Dict[str, Dict]]:
+        """
+        Analyze files with the in-process backend
+        
+        Args:
+            file_jobs: File -> job names to run on it
+            options: Tool-specific options
+            sequential: Analyze one file at a time
+        
+        Returns:
+            File -> job name -> path-free per-file result (or error result)
+        """
+        if not file_jobs:
+            return {}
+        
+        settings = self._inprocess_settings(options)
+        timeout = max(self._job_timeout(name) for names in file_jobs.values() for name in names)
+        
+        async def analyze(f: str) -> Tuple[str, Dict[str, Dict]]:
+            results = await self.inprocess.analyze_file(f, file_jobs[f], settings, timeout)
+            return f, {name: to_file_result(name, result) for name, result in results.items()}
+        
+        logger.info(f"Running {len(file_jobs)} file(s) through in-process analyzers...")
+        started = time.time()
+        try:
+            if sequential:
+                return dict([await analyze(f) for f in file_jobs])
+            return dict(await asyncio.gather(*(analyze(f) for f in file_jobs)))
+        finally:
+            self.last_tool_durations["inprocess"] = round(time.time() - started, 3)
+            await self._check_memory_limit()
+    
+    def _collect_python_files(self, file_path: str) -> List[str]:
+        """The file itself, or every Python file under a directory"""
+        path = Path(file_path)
+        if path.is_file():
+            return [file_path]
+        
+        files = []
+        for candidate in sorted(path.rglob("*.py")):
+            parts = candidate.relative_to(path).parts[:-1]
+            if any(part.startswith(".") or part in EXCLUDED_DIRS or part.endswith(".egg") for part in parts):
+                continue
+            files.append(str(candidate))
+        return files
+    
+    def _job_config_hash(self, name: str, options: Dict) -> str:
+        """Hash of everything besides file content that affects a job's result"""
+        tool = name.split("_")[0]
+        return self.result_cache.hash_config({
+            "job": name,
+            "config": getattr(self.config, f"get_{tool}_config")(),
+            "options": options.get(tool, {})
+        })
+    
+    @staticmethod
+    def _empty_file_result(name: str) -> Dict:
+        if name == "radon_cc":
+            return {"functions": []}
+        if name == "radon_mi":
+            return {"maintainability_index": None, "grade": None}
+        return {"issues": []}
+    
+    def _split_job_result(self, name: str, result: Dict, targets: List[str], attribute_all: bool) -> Dict[str, Dict]:
+        """
+        Split a tool result into path-free per-file results
+        
+        Args:
+            name: Job name
+            result: Tool result for a run over one file or a directory
+            targets: Files whose results are wanted
+            attribute_all: The run covered only targets[0]; attribute everything to it
+        """
+        by_path = {os.path.normpath(t): t for t in targets}
+        split = {t: self._empty_file_result(name) for t in targets}
+        
+        def owner(reported: str) -> Optional[str]:
+            if attribute_all:
+                return targets[0]
+            return by_path.get(os.path.normpath(reported or ""))
+        
+        if name == "radon_mi":
+            entries = result.get("files") or [{
+                "file": targets[0],
+                "index": result.get("maintainability_index"),
+                "grade": result.get("grade")
+            }]
+            for entry in entries:
+                target = owner(entry.get("file"))
+                if target is not None:
+                    split[target] = {"maintainability_index": entry.get("index"), "grade": entry.get("grade")}
+            return split
+        
+        field = "functions" if name == "radon_cc" else "issues"
+        for item in result.get(field, []):
+            target = owner(item.get("file"))
+            if target is not None:
+                split[target][field].append({k: v for k, v in item.items() if k != "file"})
+        return split
+    
+    def _merge_job_results(self, name: str, entries: List[Tuple[str, Dict]]) -> Dict:
+        """Merge per-file results back into one tool result"""
+        if name == "radon_mi":
+            scored = [r for _, r in entries if r.get("maintainability_index") is not None]
+            if len(scored) == 1:
+                index, grade = scored[0]["maintainability_index"], scored[0]["grade"]
+            elif scored:
+                # Directory: mean index, graded with radon's MI ranks
+                index = round(sum(r["maintainability_index"] for r in scored) / len(scored), 2)
+                grade = "A" if index >= 20 else "B" if index >= 10 else "C"
+            else:
+                index, grade = None, None
+            return {"success": True, "maintainability_index": index, "grade": grade}
+        
+        field = "functions" if name == "radon_cc" else "issues"
+        items = [dict(item, file=f) for f, r in entries for item in r.get(field, [])]
+        
+        if name == "radon_cc":
+            complexities = [func.get("complexity", 0) for func in items]
+            return {
+                "success": True,
+                "average_complexity": round(sum(complexities) / len(complexities), 2) if complexities else 0,
+                "max_complexity": max(complexities) if complexities else 0,
+                "functions": items
+            }
+        
+        return {"success": True, "issues": items, "issues_count": len(items)}
+    
+    def _apply_tool_results(
+        self,
+        report: AggregatedQAReport,
+        results: Dict[QAToolType, Dict],
+        file_path: str
+    ) -> List[QAIssueDetail]:
+        """Fill tool flags, counts and metrics on the report; return all issues"""
+        all_issues: List[QAIssueDetail] = []
+        
+        if QAToolType.FLAKE8 in results:
+            flake8_result = results[QAToolType.FLAKE8]
+            report.flake8_executed = True
+            
+            if flake8_result["success"]:
+                issues = self._convert_flake8_issues(flake8_result, file_path)
+                all_issues.extend(issues)
+                report.lint_issues = len(issues)
+        
+        if QAToolType.BANDIT in results:
+            bandit_result = results[QAToolType.BANDIT]
+            report.bandit_executed = True
+            
+            if bandit_result["success"]:
+                issues = self._convert_bandit_issues(bandit_result, file_path)
+                all_issues.extend(issues)
+                report.security_issues = len(issues)
+        
+        if QAToolType.RADON in results:
+            radon_result = results[QAToolType.RADON]
+            report.radon_executed = True
+            
+            if radon_result["success"]:
+                # Extract metrics
+                report.average_complexity = radon_result.get("average_complexity", 0)
+                report.max_complexity = radon_result.get("max_complexity", 0)
+                report.maintainability_index = radon_result.get("maintainability_index")
+                report.maintainability_grade = radon_result.get("maintainability_grade")
+                
+                # Convert complexity issues
+                issues = self._convert_radon_issues(radon_result, file_path)
+                all_issues.extend(issues)
+                report.complexity_issues = len(issues)
+        
+        report.timed_out_tools = [tool.value for tool, result in results.items() if result.get("timed_out")]
+        return all_issues
+    
     async def _run_flake8(self, file_path: str, options: Dict) -> Dict:
         """Run flake8 linting"""
         try:
@@ -228,24 +668,32 @@ class AsyncQATaskManager:
             logger.error(f"Bandit execution failed: {e}")
             return {"success": False, "error": str(e), "issues": []}
     
-    async def _run_radon(self, file_path: str, options: Dict) -> Dict:
-        """Run radon complexity analysis"""
+    async def _run_radon_complexity(self, file_path: str, options: Dict) -> Dict:
+        """Run radon cyclomatic complexity analysis"""
         try:
-            # Run both complexity and maintainability
-            complexity_result = await self.radon.analyze_complexity_async(file_path, options.get("radon", {}))
-            maintainability_result = await self.radon.analyze_maintainability_async(file_path, options.get("radon", {}))
-            
-            # Merge results
-            result = complexity_result.copy()
-            if maintainability_result.get("success"):
-                result["maintainability_index"] = maintainability_result.get("maintainability_index", 0)
-                result["maintainability_grade"] = maintainability_result.get("grade", "F")
-            
-            return result
+            return await self.radon.analyze_complexity_async(file_path, options.get("radon", {}))
         except Exception as e:
             logger.error(f"Radon execution failed: {e}")
             return {"success": False, "error": str(e), "functions": []}
     
+    async def _run_radon_maintainability(self, file_path: str, options: Dict) -> Dict:
+        """Run radon maintainability index analysis"""
+        try:
+            return await self.radon.analyze_maintainability_async(file_path, options.get("radon", {}))
+        except Exception as e:
+            logger.error(f"Radon execution failed: {e}")
+            return {"success": False, "error": str(e), "maintainability_index": 0}
+    
+    def _merge_radon_results(self, complexity_result: Dict, maintainability_result: Dict) -> Dict:
+        """Merge radon cc and mi results into one result"""
+        result = complexity_result.copy()
+        if maintainability_result.get("success"):
+            result["maintainability_index"] = maintainability_result.get("maintainability_index", 0)
+            result["maintainability_grade"] = maintainability_result.get("grade", "F")
+        if maintainability_result.get("timed_out"):
+            result["timed_out"] = True
+        return result
+    
     def _convert_flake8_issues(self, result: Dict, file_path: str) -> List[QAIssueDetail]:
         """Convert flake8 issues to QAIssueDetail"""
         issues = []
@@ -282,8 +730,8 @@ class AsyncQATaskManager:
         
         for issue in result.get("issues", []):
             # Map severity
-            severity_str = issue.get("severity", "low").upper()
-            severity = SeverityLevel(severity_str) if severity_str in [s.value.upper() for s in SeverityLevel] else SeverityLevel.LOW
+            severity_str = issue.get("severity", "low").lower()
+            severity = SeverityLevel(severity_str) if severity_str in [s.value for s in SeverityLevel] else SeverityLevel.LOW
             
             issues.append(QAIssueDetail(
                 file=issue.get("file", file_path),
@@ -413,6 +861,13 @@ class AsyncQATaskManager:
         summary += f"Tools: {', '.join(tools_run)} | "
         summary += f"Time: {execution_time:.2f}s"
         
+        if report.timed_out_tools:
+            summary += f" | Timed out: {', '.join(report.timed_out_tools)}"
+        
+        if self.last_cache_summary is not None:
+            reused = self.last_cache_summary["files"] - self.last_cache_summary["reanalyzed"]
+            summary += f" | Cache: {reused}/{self.last_cache_summary['files']} files reused"
+        
         return summary
     
     def _get_current_memory_mb(self) -> float:
@@ -459,6 +914,11 @@ class AsyncQATaskManager:
             "failed_runs": self.failed_runs,
             "success_rate": (self.successful_runs / self.total_runs * 100) if self.total_runs > 0 else 0,
             "peak_memory_mb": self.peak_memory_mb,
+            "last_tool_durations": dict(self.last_tool_durations),
+            "last_cache_summary": self.last_cache_summary,
+            "result_cache": self.result_cache.get_stats() if self.result_cache is not None else None,
+            "inprocess_jobs": sorted(self.inprocess_jobs),
+            "inprocess_stats": self.inprocess.get_stats() if self.inprocess is not None else None,
             "flake8_stats": self.flake8.get_stats(),
             "bandit_stats": self.bandit.get_stats(),
             "radon_stats": self.radon.get_stats()
@@ -470,7 +930,8 @@ async def analyze_code_quality(
     file_path: str,
     tools: Optional[List[QAToolType]] = None,
     config: Optional[QAToolsConfig] = None,
-    options: Optional[Dict] = None
+    options: Optional[Dict] = None,
+    sequential: Optional[bool] = None
 ) -> AggregatedQAReport:
     """
     Convenience function to analyze code quality
@@ -480,9 +941,10 @@ async def analyze_code_quality(
         tools: Tools to run (default: all)
         config: QA tools configuration
         options: Tool-specific options
+        sequential: Run tools one at a time (default from config)
     
     Returns:
         AggregatedQAReport with results
     """
     manager = AsyncQATaskManager(config=config)
-    return await manager.analyze_code_quality_async(file_path, tools=tools, options=options)
+    return await manager.analyze_code_quality_async(file_path, tools=tools, options=options, sequential=sequential)
@@ -32,11 +32,13 @@ class BanditWrapper:
                 - severity_level: Minimum severity (low/medium/high)
                 - confidence_level: Minimum confidence (low/medium/high)
                 - exclude_tests: Exclude test files (default: True)
+                - timeout: Subprocess timeout in seconds (default: 60)
         """
         self.config = config or {}
         self.severity_level = self.config.get("severity_level", "low")
         self.confidence_level = self.config.get("confidence_level", "low")
         self.exclude_tests = self.config.get("exclude_tests", True)
+        self.timeout = self.config.get("timeout", 60)
         
         # Stats
         self.runs_count = 0
@@ -114,6 +116,7 @@ class BanditWrapper:
                 return {
                     "success": False,
                     "error": result.get("error", "Bandit execution failed"),
+                    "timed_out": result.get("timed_out", False),
                     "issues_count": 0,
                     "issues": []
                 }
@@ -168,18 +171,23 @@ class BanditWrapper:
                 stderr=asyncio.subprocess.PIPE
             )
             
-            # Wait for completion with timeout (60 seconds)
+            # Wait for completion with timeout
             try:
                 stdout, stderr = await asyncio.wait_for(
                     process.communicate(),
-                    timeout=60.0
+                    timeout=self.timeout
                 )
             except asyncio.TimeoutError:
                 process.kill()
                 return {
                     "success": False,
-                    "error": "Bandit execution timed out (60s)"
+                    "error": f"Bandit execution timed out ({self.timeout}s)",
+                    "timed_out": True
                 }
+            except asyncio.CancelledError:
+                # Don't leave the tool running when the caller gives up
+                process.kill()
+                raise
             
             # Decode output
             stdout_text = stdout.decode("utf-8", errors="ignore")
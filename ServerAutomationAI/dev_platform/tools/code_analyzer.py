@@ -5,9 +5,11 @@ Search, analyze, and understand code
 
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 import logging
 
+from .code_search_index import CodeSearchIndex, get_code_search_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,12 +18,54 @@ class CodeAnalyzer:
     Code analysis toolkit
     
     Tools:
-    - search_code: Search for patterns in code
+    - search_code: Search for patterns in code (narrowed by a trigram index)
     - analyze_dependencies: Analyze project dependencies
     """
     
-    def __init__(self, base_path: str = "."):
+    def __init__(self, base_path: str = ".", use_index: bool = True, index: Optional[CodeSearchIndex] = None):
+        """
+        Initialize CodeAnalyzer
+        
+        Args:
+            base_path: Workspace root
+            use_index: Narrow searches with the persistent trigram index
+            index: Index to use (default: shared index for base_path)
+        """
         self.base_path = Path(base_path).resolve()
+        self.use_index = use_index
+        self._index = index
+    
+    def _get_index(self) -> Optional[CodeSearchIndex]:
+        """Code search index for base_path (None if disabled or unavailable)"""
+        if not self.use_index:
+            return None
+        if self._index is None:
+            try:
+                self._index = get_code_search_index(str(self.base_path))
+            except Exception as e:
+                logger.warning(f"Code search index unavailable, falling back to full scan: {e}")
+                self.use_index = False
+                return None
+        return self._index
+    
+    def _search_candidates(self, search_path: Path, file_pattern: str, pattern: str, flags: int) -> Iterable[Path]:
+        """Files to verify: index candidates, or every file under search_path"""
+        index = self._get_index()
+        if index is not None and search_path.is_dir():
+            try:
+                relative = search_path.relative_to(self.base_path).as_posix()
+            except ValueError:
+                relative = None
+            if relative is not None:
+                prefix = "" if relative == "." else relative
+                try:
+                    return [self.base_path / p for p in index.candidates(pattern, flags, prefix, file_pattern)]
+                except Exception as e:
+                    logger.warning(f"Code search index query failed, falling back to full scan: {e}")
+        
+        if search_path.is_file():
+            return [search_path]
+        return (p for p in search_path.rglob(file_pattern) if p.is_file())
     
     def search_code(
         self,
@@ -56,11 +100,8 @@ class CodeAnalyzer:
             matches = []
             files_searched = 0
             
-            # Search recursively
-            for file_path in search_path.rglob(file_pattern):
-                if not file_path.is_file():
-                    continue
-                
+            # Search recursively (index narrows the candidate files)
+            for file_path in self._search_candidates(search_path, file_pattern, pattern, flags):
                 try:
                     content = file_path.read_text(encoding='utf-8')
                     files_searched += 1
@@ -80,7 +121,7 @@ class CodeAnalyzer:
                     if len(matches) >= max_results:
                         break
                 
-                except (UnicodeDecodeError, PermissionError):
+                except (UnicodeDecodeError, OSError):
                     continue
             
             return {
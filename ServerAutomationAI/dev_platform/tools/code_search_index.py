@@ -0,0 +1,518 @@
+"""
+Code Search Index
+Persistent trigram index that narrows regex code search to candidate files
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+# Directories never worth indexing (in addition to .gitignore rules)
+DEFAULT_IGNORED_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", "env",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", "htmlcov",
+    ".idea", ".next", "site-packages"
+}
+
+
+class IgnoreRules:
+    """
+    Compiled .gitignore rules for one directory
+    
+    Supports comments, negation (!), directory-only patterns (trailing /),
+    anchored patterns (containing /), *, ?, [...] and **.
+    """
+    
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, dir_only)
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.strip("/") if dir_only else line
+            if not line:
+                continue
+            anchored = "/" in line.rstrip("/")
+            self.rules.append((self._compile(line.lstrip("/"), anchored), negated, dir_only))
+    
+    @classmethod
+    def from_file(cls, path: Path) -> Optional["IgnoreRules"]:
+        try:
+            rules = cls(path.read_text(encoding="utf-8", errors="ignore").splitlines())
+        except OSError:
+            return None
+        return rules if rules.rules else None
+    
+    @staticmethod
+    def _compile(pattern: str, anchored: bool) -> re.Pattern:
+        regex = []
+        i = 0
+        while i < len(pattern):
+            c = pattern[i]
+            if pattern.startswith("**/", i):
+                regex.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("/**", i) and i + 3 == len(pattern):
+                regex.append("/.*")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                regex.append(".*")
+                i += 2
+                continue
+            if c == "*":
+                regex.append("[^/]*")
+            elif c == "?":
+                regex.append("[^/]")
+            elif c == "[":
+                end = pattern.find("]", i + 2)
+                if end == -1:
+                    regex.append(re.escape(c))
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    regex.append(f"[{body}]")
+                    i = end
+            else:
+                regex.append(re.escape(c))
+            i += 1
+        prefix = "" if anchored else "(?:.*/)?"
+        return re.compile(f"{prefix}{''.join(regex)}")
+    
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included, None if no rule matches"""
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(relative_path):
+                return not negated
+        return None
+
+
+def walk_files(root: Path, ignored_dirs: Set[str] = DEFAULT_IGNORED_DIRS) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Walk a tree honoring .gitignore files, pruning ignored directories
+    
+    Yields:
+        (path relative to root with / separators, stat result)
+    """
+    # Stack of (directory relative path, applicable (base, rules) chain)
+    stack: List[Tuple[str, List[Tuple[str, IgnoreRules]]]] = [("", [])]
+    while stack:
+        directory, chain = stack.pop()
+        full_dir = root / directory if directory else root
+        rules = IgnoreRules.from_file(full_dir / ".gitignore")
+        if rules is not None:
+            chain = chain + [(directory, rules)]
+        
+        try:
+            entries = list(os.scandir(full_dir))
+        except OSError:
+            continue
+        
+        for entry in entries:
+            relative = f"{directory}/{entry.name}" if directory else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+            if is_dir and entry.name in ignored_dirs:
+                continue
+            
+            ignored = None
+            for base, base_rules in reversed(chain):
+                ignored = base_rules.match(relative[len(base) + 1:] if base else relative, is_dir)
+                if ignored is not None:
+                    break
+            if ignored:
+                continue
+            
+            if is_dir:
+                stack.append((relative, chain))
+            else:
+                try:
+                    yield relative, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+
+def required_trigrams(pattern: str, flags: int = 0) -> Optional[List[Set[bytes]]]:
+    """
+    Trigrams a matching line must contain, as OR-of-AND sets
+    
+    Args:
+        pattern: Regular expression
+        flags: re flags the pattern is compiled with
+    
+    Returns:
+        List of alternatives (each a set of lowercase ASCII trigrams that must
+        all be present), or None if the pattern cannot be narrowed
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    
+    alternatives = []
+    for literals in _required_literals(list(parsed)):
+        trigrams = {lit[i:i + 3] for lit in literals for i in range(len(lit) - 2)}
+        if not trigrams:
+            return None  # One unconstrained alternative: any file can match
+        alternatives.append(trigrams)
+    return alternatives
+
+
+# Cap on OR alternatives tracked while walking the regex
+_MAX_ALTERNATIVES = 16
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+if hasattr(sre_parse, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_parse.POSSESSIVE_REPEAT)
+
+
+def _required_literals(items: list) -> List[List[bytes]]:
+    """Literal strings required by a parsed regex sequence (OR of AND lists)"""
+    result: List[List[bytes]] = [[]]
+    run: List[int] = []
+    
+    def combine(alternatives: List[List[bytes]]) -> None:
+        nonlocal result
+        if len(result) * len(alternatives) <= _MAX_ALTERNATIVES:
+            result = [a + b for a in result for b in alternatives]
+    
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(av)
+            continue
+        
+        if run:
+            combine([[bytes(run).lower()]])
+            run = []
+        
+        if op is sre_parse.SUBPATTERN:
+            combine(_required_literals(list(av[-1])))
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            combine(_required_literals(list(av)))
+        elif op is sre_parse.BRANCH:
+            branches: List[List[bytes]] = []
+            for branch in av[1]:
+                branches.extend(_required_literals(list(branch)))
+            if all(branches):
+                combine(branches)
+        elif op in _REPEATS and av[0] >= 1:
+            combine(_required_literals(list(av[2])))
+    
+    if run:
+        combine([[bytes(run).lower()]])
+    return result
+
+
+class CodeSearchIndex:
+    """
+    Persistent trigram index over a workspace
+    
+    Features:
+    - SQLite posting lists: lowercase ASCII trigram -> packed sorted file IDs
+      (one row per trigram, so a query reads one blob per trigram)
+    - Incremental refresh: only files whose (mtime, size) changed are re-read,
+      and only the posting lists of their old/new trigrams are rewritten
+    - Ignore rules: .gitignore files (nested, with negation) plus
+      node_modules, virtualenvs, caches and VCS directories
+    - Queries narrow to candidate files; callers verify with the real regex
+    
+    Files that are not UTF-8 text are recorded but never returned as
+    candidates; files over max_file_size are always candidates.
+    """
+    
+    KIND_TEXT, KIND_BINARY, KIND_LARGE = 0, 1, 2
+    
+    def __init__(
+        self,
+        root: str = ".",
+        index_dir: str = "data/cache/code_search",
+        max_file_size: int = 1024 * 1024,
+        refresh_interval: float = 2.0
+    ):
+        """
+        Initialize CodeSearchIndex
+        
+        Args:
+            root: Workspace root to index
+            index_dir: Directory for index databases (one per root)
+            max_file_size: Larger files are not indexed (always candidates)
+            refresh_interval: Seconds between automatic freshness checks
+        """
+        self.root = Path(root).resolve()
+        self.max_file_size = max_file_size
+        self.refresh_interval = refresh_interval
+        
+        Path(index_dir).mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(str(self.root).encode()).hexdigest()[:12]
+        self.db_path = str(Path(index_dir) / f"{digest}.db")
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                kind INTEGER NOT NULL,  -- 0 indexed text, 1 binary, 2 too large
+                trigrams BLOB NOT NULL  -- packed trigrams (to update postings)
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                trigram INTEGER PRIMARY KEY,
+                file_ids BLOB NOT NULL
+            );
+        """)
+        self._conn.commit()
+        
+        self._last_refresh = 0.0
+        self.stats = {"queries": 0, "refreshes": 0, "files_reindexed": 0, "candidates": 0}
+    
+    @staticmethod
+    def _trigram_ids(data: bytes) -> Set[int]:
+        """Distinct lowercase trigrams of a file, packed as 24-bit ints"""
+        lowered = data.lower()
+        return {(a << 16) | (b << 8) | c for a, b, c in set(zip(lowered, lowered[1:], lowered[2:]))}
+    
+    # ===== Indexing =====
+    
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index up to date with the workspace
+        
+        Args:
+            force: Check now even if refreshed within refresh_interval
+        
+        Returns:
+            Dict with added/updated/removed file counts
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+                return {"added": 0, "updated": 0, "removed": 0}
+            
+            known = {
+                path: (file_id, mtime_ns, size)
+                for file_id, path, mtime_ns, size in self._conn.execute("SELECT id, path, mtime_ns, size FROM files")
+            }
+            counts = {"added": 0, "updated": 0, "removed": 0}
+            seen = set()
+            
+            # trigram -> file IDs to add / remove
+            additions: Dict[int, Set[int]] = {}
+            removals: Dict[int, Set[int]] = {}
+            
+            for relative, stat in walk_files(self.root):
+                seen.add(relative)
+                entry = known.get(relative)
+                if entry is not None and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size:
+                    continue
+                file_id = entry[0] if entry else None
+                if file_id is not None:
+                    self._collect_removal(file_id, removals)
+                if self._index_file(relative, stat, file_id, additions):
+                    counts["updated" if entry else "added"] += 1
+            
+            removed = [known[path][0] for path in set(known) - seen]
+            for file_id in removed:
+                self._collect_removal(file_id, removals)
+                self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            counts["removed"] = len(removed)
+            
+            self._apply_postings(additions, removals)
+            self._conn.commit()
+            
+            self._last_refresh = time.monotonic()
+            self.stats["refreshes"] += 1
+            self.stats["files_reindexed"] += counts["added"] + counts["updated"]
+            return counts
+    
+    def _collect_removal(self, file_id: int, removals: Dict[int, Set[int]]) -> None:
+        row = self._conn.execute("SELECT trigrams FROM files WHERE id = ?", (file_id,)).fetchone()
+        if row:
+            for trigram in array("I", row[0]):
+                removals.setdefault(trigram, set()).add(file_id)
+    
+    def _index_file(self, relative: str, stat: os.stat_result, file_id: Optional[int], additions: Dict[int, Set[int]]) -> bool:
+        if stat.st_size > self.max_file_size:
+            kind, trigrams = self.KIND_LARGE, set()
+        else:
+            try:
+                data = (self.root / relative).read_bytes()
+            except OSError:
+                return False
+            try:
+                data.decode("utf-8")
+                kind, trigrams = self.KIND_TEXT, self._trigram_ids(data)
+            except UnicodeDecodeError:
+                kind, trigrams = self.KIND_BINARY, set()
+        
+        packed = array("I", sorted(trigrams)).tobytes()
+        if file_id is None:
+            file_id = self._conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, kind, trigrams) VALUES (?, ?, ?, ?, ?)",
+                (relative, stat.st_mtime_ns, stat.st_size, kind, packed)
+            ).lastrowid
+        else:
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, kind = ?, trigrams = ? WHERE id = ?",
+                (stat.st_mtime_ns, stat.st_size, kind, packed, file_id)
+            )
+        for trigram in trigrams:
+            additions.setdefault(trigram, set()).add(file_id)
+        return True
+    
+    def _apply_postings(self, additions: Dict[int, Set[int]], removals: Dict[int, Set[int]]) -> None:
+        """Rewrite the posting lists of every touched trigram"""
+        touched = sorted(set(additions) | set(removals))
+        for chunk in _chunks(touched, 500):
+            existing = {
+                trigram: blob for trigram, blob in self._conn.execute(
+                    f"SELECT trigram, file_ids FROM postings WHERE trigram IN ({','.join('?' * len(chunk))})", chunk
+                )
+            }
+            updates, deletes = [], []
+            for trigram in chunk:
+                ids = set(array("I", existing[trigram])) if trigram in existing else set()
+                ids -= removals.get(trigram, set())
+                ids |= additions.get(trigram, set())
+                if ids:
+                    updates.append((trigram, array("I", sorted(ids)).tobytes()))
+                elif trigram in existing:
+                    deletes.append((trigram,))
+            self._conn.executemany("INSERT OR REPLACE INTO postings (trigram, file_ids) VALUES (?, ?)", updates)
+            self._conn.executemany("DELETE FROM postings WHERE trigram = ?", deletes)
+    
+    # ===== Queries =====
+    
+    def _lookup(self, trigrams: Set[bytes]) -> Set[int]:
+        """File IDs containing all trigrams"""
+        ids = [(t[0] << 16) | (t[1] << 8) | t[2] for t in trigrams]
+        rows = self._conn.execute(
+            f"SELECT file_ids FROM postings WHERE trigram IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+        if len(rows) < len(ids):
+            return set()  # Some trigram occurs nowhere
+        postings = sorted((array("I", blob) for (blob,) in rows), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+    
+    def candidates(self, pattern: str, flags: int = 0, path_prefix: str = "", file_pattern: str = "*") -> List[str]:
+        """
+        Files that may contain a line matching pattern
+        
+        Args:
+            pattern: Regular expression
+            flags: re flags
+            path_prefix: Only files under this relative directory ("" for all)
+            file_pattern: Glob the file path must match (e.g. "*.py")
+        
+        Returns:
+            Sorted relative paths (verification with the regex is up to the caller)
+        """
+        self.refresh()
+        
+        alternatives = required_trigrams(pattern, flags)
+        with self._lock:
+            if alternatives is None:
+                rows = self._conn.execute("SELECT path FROM files WHERE kind = ?", (self.KIND_TEXT,)).fetchall()
+            else:
+                file_ids: Set[int] = set()
+                for trigrams in alternatives:
+                    file_ids |= self._lookup(trigrams)
+                rows = [
+                    row for chunk in _chunks(sorted(file_ids), 500)
+                    for row in self._conn.execute(
+                        f"SELECT path FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                ]
+                rows += self._conn.execute("SELECT path FROM files WHERE kind = ?", (self.KIND_LARGE,)).fetchall()
+        
+        prefix = path_prefix.strip("/")
+        paths = []
+        for (path,) in rows:
+            if prefix and not (path == prefix or path.startswith(prefix + "/")):
+                continue
+            if file_pattern not in ("*", "") and not _glob_match(path, file_pattern):
+                continue
+            paths.append(path)
+        
+        self.stats["queries"] += 1
+        self.stats["candidates"] += len(paths)
+        return sorted(paths)
+    
+    def get_stats(self) -> Dict:
+        """Index size and query counters"""
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            trigrams = self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        return {
+            "root": str(self.root),
+            "files": files,
+            "trigrams": trigrams,
+            "db_size_bytes": os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            **self.stats
+        }
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _glob_match(path: str, file_pattern: str) -> bool:
+    """rglob-style match: the pattern matches the trailing path components"""
+    if "/" not in file_pattern:
+        return fnmatchcase(path.rsplit("/", 1)[-1], file_pattern)
+    return PurePosixPath(path).match(file_pattern)
+
+
+# Global instances (one per workspace root)
+_indexes: Dict[str, CodeSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_code_search_index(root: str = ".") -> CodeSearchIndex:
+    """Get shared code search index for a workspace root"""
+    key = str(Path(root).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = CodeSearchIndex(key)
+        return _indexes[key]
@@ -34,12 +34,14 @@ class Flake8Wrapper:
                 - ignore: List of error codes to ignore
                 - select: List of error codes to select
                 - max_complexity: Max cyclomatic complexity (default: 10)
+                - timeout: Subprocess timeout in seconds (default: 30)
         """
         self.config = config or {}
         self.max_line_length = self.config.get("max_line_length", 88)
         self.ignore = self.config.get("ignore", [])
         self.select = self.config.get("select", [])
         self.max_complexity = self.config.get("max_complexity", 10)
+        self.timeout = self.config.get("timeout", 30)
         
         # Stats
         self.runs_count = 0
@@ -103,6 +105,7 @@ class Flake8Wrapper:
                 return {
                     "success": False,
                     "error": result.get("error", "Flake8 execution failed"),
+                    "timed_out": result.get("timed_out", False),
                     "issues_count": 0,
                     "issues": []
                 }
@@ -156,18 +159,23 @@ class Flake8Wrapper:
                 stderr=asyncio.subprocess.PIPE
             )
             
-            # Wait for completion with timeout (30 seconds)
+            # Wait for completion with timeout
             try:
                 stdout, stderr = await asyncio.wait_for(
                     process.communicate(),
-                    timeout=30.0
+                    timeout=self.timeout
                 )
             except asyncio.TimeoutError:
                 process.kill()
                 return {
                     "success": False,
-                    "error": "Flake8 execution timed out (30s)"
+                    "error": f"Flake8 execution timed out ({self.timeout}s)",
+                    "timed_out": True
                 }
+            except asyncio.CancelledError:
+                # Don't leave the tool running when the caller gives up
+                process.kill()
+                raise
             
             # Decode output
             stdout_text = stdout.decode("utf-8", errors="ignore")
@@ -237,7 +245,8 @@ class Flake8Wrapper:
         
         return issues
     
-    def _get_severity(self, code: str) -> str:
+    @staticmethod
+    def _get_severity(code: str) -> str:
         """Determine severity based on error code"""
         if not code or len(code) < 1:
             return "info"
@@ -0,0 +1,516 @@
+"""
+In-Process QA Analyzers
+Runs flake8's checkers, bandit and radon through their library APIs in a worker process pool
+"""
+
+import ast
+import asyncio
+import atexit
+import functools
+import importlib.util
+import logging
+import multiprocessing
+import re
+import threading
+import time
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .flake8_wrapper import Flake8Wrapper
+from .qa_metrics_schema import (
+    LintMetrics,
+    QAToolResult,
+    SecurityMetrics,
+    normalize_bandit_issue,
+    normalize_flake8_issue,
+    normalize_radon_issue
+)
+
+logger = logging.getLogger(__name__)
+
+# Job name -> modules its in-process analyzer imports
+JOB_MODULES = {
+    "flake8": ("flake8", "pyflakes", "pycodestyle", "mccabe"),
+    "bandit": ("bandit",),
+    "radon_cc": ("radon",),
+    "radon_mi": ("radon",),
+}
+
+# flake8's default --ignore list (used when no ignore codes are configured)
+FLAKE8_DEFAULT_IGNORE = ("E121", "E123", "E126", "E226", "E24", "E704", "W503", "W504")
+
+NOQA_REGEX = re.compile(r"# noqa(?::[\s]?(?P<codes>([A-Z]+[0-9]+(?:[,\s]+)?)+))?", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def job_available(job: str) -> bool:
+    """Whether the libraries for an in-process job are importable"""
+    modules = JOB_MODULES.get(job)
+    if not modules:
+        return False
+    return all(importlib.util.find_spec(module) is not None for module in modules)
+
+
+# ===== Worker-side analyzers (run inside pool processes) =====
+
+class ParsedFile(NamedTuple):
+    """A source file read and parsed once, shared by every analyzer"""
+    path: str
+    source: str
+    lines: List[str]
+    tree: Optional[ast.AST]
+    syntax_error: Optional[SyntaxError]
+
+
+def _tool_name(job: str) -> str:
+    return job.split("_")[0]
+
+
+def _failed(job: str, path: str, error: str, timed_out: bool = False) -> QAToolResult:
+    return QAToolResult(
+        tool=_tool_name(job),
+        success=False,
+        file_path=path,
+        error=error,
+        metrics={"timed_out": True} if timed_out else {}
+    )
+
+
+def _lint_code_selected(code: str, select: List[str], ignore: List[str]) -> bool:
+    """flake8 select/ignore semantics: the longest matching prefix wins"""
+    selected = [len(prefix) for prefix in select if code.startswith(prefix)]
+    ignored = [len(prefix) for prefix in ignore if code.startswith(prefix)]
+    if select and not selected:
+        return False
+    if not ignored:
+        return True
+    return bool(selected) and max(selected) > max(ignored)
+
+
+def _noqa_suppressed(line: str, code: str) -> bool:
+    match = NOQA_REGEX.search(line)
+    if match is None:
+        return False
+    codes = match.group("codes")
+    if not codes:
+        return True
+    return any(code.startswith(c) for c in re.split(r"[,\s]+", codes.strip()) if c)
+
+
+@functools.lru_cache(maxsize=8)
+def _style_guide(max_line_length: int):
+    """pycodestyle StyleGuide collecting E/W results (filtering is done by _lint)"""
+    import pycodestyle
+    
+    class CollectingReport(pycodestyle.BaseReport):
+        def __init__(self, options):
+            super().__init__(options)
+            self.results = []
+        
+        def error(self, line_number, offset, text, check):
+            code = super().error(line_number, offset, text, check)
+            if code:
+                self.results.append((line_number, offset + 1, code, text[5:]))
+            return code
+    
+    return pycodestyle.StyleGuide(
+        select=("E", "W"),
+        max_line_length=max_line_length,
+        reporter=CollectingReport,
+        quiet=True
+    )
+
+
+def _lint(parsed: ParsedFile, settings: Dict) -> QAToolResult:
+    """flake8's default checkers (pyflakes, pycodestyle, mccabe) on the shared AST"""
+    import mccabe
+    import pycodestyle
+    from flake8.plugins.pyflakes import FLAKE8_PYFLAKES_CODES
+    from pyflakes.checker import Checker
+    
+    found = []  # (line, column, code, message)
+    if parsed.tree is None:
+        error = parsed.syntax_error
+        found.append((error.lineno or 1, (error.offset or 0) + 1, "E999", f"SyntaxError: {error.msg}"))
+    else:
+        for message in Checker(parsed.tree, filename=parsed.path).messages:
+            code = FLAKE8_PYFLAKES_CODES.get(type(message).__name__, "F999")
+            found.append((message.lineno, message.col + 1, code, message.message % message.message_args))
+        
+        max_complexity = settings.get("max_complexity", 10)
+        if max_complexity >= 0:
+            visitor = mccabe.PathGraphingAstVisitor()
+            visitor.preorder(parsed.tree, visitor)
+            for graph in visitor.graphs.values():
+                if graph.complexity() > max_complexity:
+                    found.append((
+                        graph.lineno,
+                        graph.column + 1,
+                        "C901",
+                        f"{graph.entity!r} is too complex ({graph.complexity()})"
+                    ))
+        
+        style = _style_guide(settings.get("max_line_length", 88))
+        style.options.report.results = []
+        pycodestyle.Checker(parsed.path, lines=parsed.lines, options=style.options).check_all()
+        found.extend(style.options.report.results)
+    
+    select = list(settings.get("select") or [])
+    ignore = list(settings.get("ignore") or FLAKE8_DEFAULT_IGNORE)
+    
+    issues = []
+    for line, column, code, message in sorted(found):
+        if not _lint_code_selected(code, select, ignore):
+            continue
+        source_line = parsed.lines[line - 1] if 0 < line <= len(parsed.lines) else ""
+        if _noqa_suppressed(source_line, code):
+            continue
+        issues.append(normalize_flake8_issue({
+            "line": line,
+            "column": column,
+            "code": code,
+            "message": message,
+            "severity": Flake8Wrapper._get_severity(code)
+        }, parsed.path))
+    
+    metrics = LintMetrics(
+        error_count=sum(1 for issue in issues if issue.severity.value == "error"),
+        warning_count=sum(1 for issue in issues if issue.severity.value == "warning"),
+        info_count=sum(1 for issue in issues if issue.severity.value == "info")
+    )
+    return QAToolResult(
+        tool="flake8",
+        success=True,
+        file_path=parsed.path,
+        issues_count=len(issues),
+        issues=issues,
+        summary=f"Found {len(issues)} linting issues",
+        metrics=metrics.model_dump()
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _bandit_config():
+    from bandit.core import config as bandit_config
+    return bandit_config.BanditConfig()
+
+
+def _security(parsed: ParsedFile, settings: Dict) -> QAToolResult:
+    """bandit scan (bandit parses the file itself; its visitor API takes source, not an AST)"""
+    from bandit.core import manager as bandit_manager
+    
+    manager = bandit_manager.BanditManager(_bandit_config(), "file", quiet=True)
+    manager.discover_files([parsed.path])
+    manager.run_tests()
+    
+    # Same filter as the subprocess backend (-ll -i): medium+ severity, any confidence
+    issues = []
+    for issue in manager.get_issue_list(sev_level="MEDIUM", conf_level="LOW"):
+        data = issue.as_dict(with_code=False)
+        issues.append(normalize_bandit_issue({
+            "line": data.get("line_number", 0),
+            "code": data.get("test_id", ""),
+            "severity": data.get("issue_severity", "LOW").lower(),
+            "confidence": data.get("issue_confidence", "LOW").lower(),
+            "message": data.get("issue_text", ""),
+            "more_info": data.get("more_info", "")
+        }, parsed.path))
+    
+    metrics = SecurityMetrics(
+        critical_count=sum(1 for issue in issues if issue.severity.value == "high"),
+        high_count=sum(1 for issue in issues if issue.severity.value == "high"),
+        medium_count=sum(1 for issue in issues if issue.severity.value == "medium"),
+        low_count=sum(1 for issue in issues if issue.severity.value == "low")
+    )
+    return QAToolResult(
+        tool="bandit",
+        success=True,
+        file_path=parsed.path,
+        issues_count=len(issues),
+        issues=issues,
+        summary=f"Found {len(issues)} security issue{'s' if len(issues) != 1 else ''}",
+        metrics=metrics.model_dump()
+    )
+
+
+def _complexity(parsed: ParsedFile, settings: Dict) -> QAToolResult:
+    """radon cyclomatic complexity on the shared AST"""
+    from radon.complexity import cc_rank, cc_visit_ast
+    from radon.visitors import Class
+    
+    functions = []
+    if parsed.tree is not None:
+        for block in cc_visit_ast(parsed.tree):
+            if isinstance(block, Class):
+                block_type = "class"
+            else:
+                block_type = "method" if block.is_method else "function"
+            functions.append({
+                "name": block.name,
+                "type": block_type,
+                "line": block.lineno,
+                "complexity": block.complexity,
+                "rank": cc_rank(block.complexity)
+            })
+    
+    threshold = settings.get("max_complexity", 10)
+    issues = [
+        issue for issue in (normalize_radon_issue(func, threshold, parsed.path) for func in functions)
+        if issue is not None
+    ]
+    complexities = [func["complexity"] for func in functions]
+    return QAToolResult(
+        tool="radon",
+        success=True,
+        file_path=parsed.path,
+        issues_count=len(issues),
+        issues=issues,
+        summary=f"Analyzed {len(functions)} functions",
+        metrics={
+            "functions": functions,
+            "average_complexity": round(sum(complexities) / len(complexities), 2) if complexities else 0,
+            "max_complexity": max(complexities) if complexities else 0
+        }
+    )
+
+
+def _maintainability(parsed: ParsedFile, settings: Dict) -> QAToolResult:
+    """radon maintainability index (same inputs as `radon mi`, AST shared)"""
+    from radon.metrics import h_visit_ast, mi_compute, mi_rank
+    from radon.raw import analyze
+    from radon.visitors import ComplexityVisitor
+    
+    if parsed.tree is None:
+        metrics = {"maintainability_index": None, "grade": None}
+    else:
+        raw = analyze(parsed.source)
+        comments = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc else 0
+        index = mi_compute(
+            h_visit_ast(parsed.tree).total.volume,
+            ComplexityVisitor.from_ast(parsed.tree).total_complexity,
+            raw.lloc,
+            comments
+        )
+        metrics = {"maintainability_index": round(index, 2), "grade": mi_rank(index)}
+    
+    return QAToolResult(
+        tool="radon",
+        success=True,
+        file_path=parsed.path,
+        summary=f"Maintainability: {metrics['grade']} ({metrics['maintainability_index']})",
+        metrics=metrics
+    )
+
+
+ANALYZERS = {
+    "flake8": _lint,
+    "bandit": _security,
+    "radon_cc": _complexity,
+    "radon_mi": _maintainability,
+}
+
+
+def analyze_file(path: str, jobs: List[str], settings: Dict[str, Dict]) -> Dict[str, QAToolResult]:
+    """
+    Read and parse a file once, then run every requested job on it
+    
+    Args:
+        path: Python file to analyze
+        jobs: Job names (flake8, bandit, radon_cc, radon_mi)
+        settings: Tool name -> tool config merged with runtime options
+    
+    Returns:
+        Job name -> QAToolResult
+    """
+    try:
+        with tokenize.open(path) as f:
+            source = f.read()
+    except (OSError, SyntaxError) as e:
+        return {job: _failed(job, path, f"Cannot read {path}: {e}") for job in jobs}
+    
+    try:
+        tree, syntax_error = ast.parse(source, filename=path), None
+    except SyntaxError as e:
+        tree, syntax_error = None, e
+    parsed = ParsedFile(path, source, source.splitlines(keepends=True), tree, syntax_error)
+    
+    results = {}
+    for job in jobs:
+        started = time.perf_counter()
+        try:
+            result = ANALYZERS[job](parsed, settings.get(_tool_name(job), {}))
+        except Exception as e:
+            result = _failed(job, path, f"{type(e).__name__}: {e}")
+        result.execution_time = round(time.perf_counter() - started, 4)
+        results[job] = result
+    return results
+
+
+def to_file_result(job: str, result: QAToolResult) -> Dict:
+    """
+    Convert a QAToolResult to the manager's path-free per-file result dict
+    
+    Args:
+        job: Job name
+        result: In-process analyzer result
+    """
+    if not result.success:
+        return {
+            "success": False,
+            "error": result.error,
+            "timed_out": result.metrics.get("timed_out", False),
+            "issues": [],
+            "functions": []
+        }
+    
+    if job == "radon_cc":
+        return {"functions": list(result.metrics.get("functions", []))}
+    if job == "radon_mi":
+        return {
+            "maintainability_index": result.metrics.get("maintainability_index"),
+            "grade": result.metrics.get("grade")
+        }
+    
+    issues = []
+    for issue in result.issues:
+        entry = {
+            "line": issue.line,
+            "code": issue.code,
+            "message": issue.message,
+            "severity": issue.severity.value
+        }
+        if job == "flake8":
+            entry["column"] = issue.column
+        else:
+            entry["confidence"] = issue.confidence
+            entry["more_info"] = issue.more_info
+        issues.append(entry)
+    return {"issues": issues}
+
+
+# ===== Process pool =====
+
+def _mp_context():
+    """
+    Start method for pool workers
+    
+    Forking this (threaded) process is unsafe, and a spawned worker would
+    re-import the whole dev_platform package. A forkserver imports this
+    module once and forks workers from that clean process instead.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class InProcessQABackend:
+    """
+    Worker process pool for the in-process analyzers
+    
+    Features:
+    - Long-lived workers: tools are imported once per worker, not per run
+    - One call per file runs every requested job on a single parsed AST
+    - A timed-out call recycles the pool so a stuck worker cannot block later runs
+    """
+    
+    def __init__(self, max_workers: int = 2):
+        """
+        Initialize InProcessQABackend
+        
+        Args:
+            max_workers: Worker processes (each holds the imported tools in memory)
+        """
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        
+        self.stats = {"files": 0, "errors": 0, "timeouts": 0, "pool_restarts": 0}
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+            return self._pool
+    
+    def _recycle_pool(self) -> None:
+        """Drop the current pool (a new one starts on the next call)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        self.stats["pool_restarts"] += 1
+        terminate = getattr(pool, "terminate_workers", None)  # Python 3.14+
+        if terminate is not None:
+            terminate()
+            return
+        # shutdown() alone leaves a hung worker running: kill it first
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    async def analyze_file(
+        self,
+        path: str,
+        jobs: List[str],
+        settings: Dict[str, Dict],
+        timeout: Optional[float] = None
+    ) -> Dict[str, QAToolResult]:
+        """
+        Analyze one file in a worker process
+        
+        Args:
+            path: Python file to analyze
+            jobs: Job names to run on it
+            settings: Tool name -> tool config merged with runtime options
+            timeout: Seconds before the call is abandoned
+        
+        Returns:
+            Job name -> QAToolResult (failed results on timeout or worker crash)
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_pool(), analyze_file, path, list(jobs), settings)
+            results = await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self._recycle_pool()
+            return {job: _failed(job, path, f"In-process analysis timed out after {timeout}s", timed_out=True) for job in jobs}
+        except BrokenProcessPool as e:
+            self.stats["errors"] += 1
+            self._recycle_pool()
+            return {job: _failed(job, path, f"Analyzer worker crashed: {e}") for job in jobs}
+        
+        self.stats["files"] += 1
+        return results
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "running": self._pool is not None,
+            **self.stats
+        }
+
+
+# Global instance
+_inprocess_backend = None
+_inprocess_backend_lock = threading.Lock()
+
+def get_inprocess_backend(max_workers: int = 2) -> InProcessQABackend:
+    """Get global in-process analyzer backend"""
+    global _inprocess_backend
+    with _inprocess_backend_lock:
+        if _inprocess_backend is None:
+            _inprocess_backend = InProcessQABackend(max_workers=max_workers)
+            atexit.register(_inprocess_backend.shutdown)
+    return _inprocess_backend
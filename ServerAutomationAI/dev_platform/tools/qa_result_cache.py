@@ -0,0 +1,152 @@
+"""
+QA Result Cache
+Per-file QA tool results keyed by content hash, tool version and tool config
+"""
+
+import hashlib
+import json
+import logging
+import os
+from importlib import metadata
+from typing import Any, Dict, Optional, Tuple
+
+from diskcache import Cache
+
+logger = logging.getLogger(__name__)
+
+
+class QAResultCache:
+    """
+    Disk-backed cache of per-file QA results
+    
+    Features:
+    - Key: (file content hash, tool, tool version, tool config hash), so a
+      result is reused only if nothing that could change it has changed
+    - Results are stored without file paths (identical files share entries)
+    - Size-bounded LRU eviction (diskcache)
+    - Content hashes memoized by (mtime, size) to avoid re-reading unchanged files
+    """
+    
+    def __init__(self, directory: str = "data/cache/qa_results", size_limit_mb: int = 256):
+        """
+        Initialize QAResultCache
+        
+        Args:
+            directory: diskcache directory
+            size_limit_mb: Maximum cache size before least-recently-used eviction
+        """
+        self.directory = directory
+        self.cache = Cache(
+            directory,
+            size_limit=size_limit_mb * 1024 * 1024,
+            eviction_policy="least-recently-used"
+        )
+        
+        self._versions: Dict[str, str] = {}
+        self._hash_memo: Dict[str, Tuple[int, int, str]] = {}  # path -> (mtime_ns, size, hash)
+        
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+    
+    def hash_file(self, file_path: str) -> Optional[str]:
+        """
+        SHA-256 of a file's content (None if unreadable)
+        
+        Args:
+            file_path: File to hash
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        memo = self._hash_memo.get(file_path)
+        if memo is not None and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+            return memo[2]
+        
+        try:
+            with open(file_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError as e:
+            logger.warning(f"Cannot hash {file_path}: {e}")
+            return None
+        
+        self._hash_memo[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+    
+    @staticmethod
+    def hash_config(config: Dict) -> str:
+        """Stable hash of a tool configuration dict"""
+        encoded = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+    
+    def tool_version(self, tool: str) -> str:
+        """Installed version of a tool package ("unknown" if not found)"""
+        package = tool.split("_")[0]
+        if package not in self._versions:
+            try:
+                self._versions[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                self._versions[package] = "unknown"
+        return self._versions[package]
+    
+    def make_key(self, tool: str, content_hash: str, config_hash: str) -> str:
+        return f"qa:{tool}:{self.tool_version(tool)}:{config_hash}:{content_hash}"
+    
+    def get(self, tool: str, content_hash: str, config_hash: str) -> Optional[Dict]:
+        """
+        Get a cached per-file result
+        
+        Args:
+            tool: Tool job name (flake8, bandit, radon_cc, radon_mi)
+            content_hash: File content hash
+            config_hash: Tool configuration hash
+        
+        Returns:
+            Cached result dict, or None on miss
+        """
+        try:
+            value = self.cache.get(self.make_key(tool, content_hash, config_hash))
+        except Exception as e:
+            logger.warning(f"QA result cache read failed: {e}")
+            value = None
+        
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return value
+    
+    def set(self, tool: str, content_hash: str, config_hash: str, result: Dict) -> None:
+        """Store a per-file result"""
+        try:
+            self.cache.set(self.make_key(tool, content_hash, config_hash), result)
+            self.stats["stores"] += 1
+        except Exception as e:
+            logger.warning(f"QA result cache write failed: {e}")
+    
+    def clear(self) -> None:
+        """Remove all cached results"""
+        self.cache.clear()
+        self._hash_memo.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and cache size"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "stores": self.stats["stores"],
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self.cache),
+            "size_bytes": self.cache.volume()
+        }
+
+
+# Global instances (one per cache directory)
+_qa_result_caches: Dict[str, QAResultCache] = {}
+
+def get_qa_result_cache(directory: str = "data/cache/qa_results", size_limit_mb: int = 256) -> QAResultCache:
+    """Get shared QA result cache for a directory"""
+    if directory not in _qa_result_caches:
+        _qa_result_caches[directory] = QAResultCache(directory, size_limit_mb=size_limit_mb)
+    return _qa_result_caches[directory]
@@ -5,6 +5,7 @@ Centralized configuration for all QA tools (flake8, bandit, radon)
 
 from typing import Dict, Optional
 from pathlib import Path
+import copy
 import json
 import logging
 
@@ -34,6 +35,19 @@ DEFAULT_CONFIG = {
     "ram_limits": {
         "max_memory_mb": 512,  # Per tool
         "total_limit_mb": 3584  # 3.5 GB total
+    },
+    "execution": {
+        "sequential": True,  # False runs tools concurrently within the RAM/CPU budget
+        "max_parallel_tools": 4,  # Also capped by CPU count
+        "timeout_grace_seconds": 5,  # Added to each tool's timeout before it is abandoned
+        "backend": "auto",  # auto/inprocess: library APIs in a worker pool where installed; subprocess: CLI per run
+        "worker_processes": 2  # In-process analyzer pool size
+    },
+    "cache": {
+        "enabled": True,  # Per-file results keyed by content hash, tool version and config
+        "directory": "data/cache/qa_results",
+        "size_limit_mb": 256,  # LRU eviction beyond this size
+        "batch_threshold": 20  # More changed files than this: one run over the whole path
     }
 }
 
@@ -48,7 +62,8 @@ class QAToolsConfig:
         Args:
             config_path: Optional path to config JSON file
         """
-        self.config = DEFAULT_CONFIG.copy()
+        # Deep copy: update_config() must not leak into other instances
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
         
         if config_path:
             self.load_from_file(config_path)
@@ -102,12 +117,20 @@ class QAToolsConfig:
         """Get RAM limits configuration"""
         return self.config.get("ram_limits", {})
     
+    def get_execution_config(self) -> Dict:
+        """Get tool execution (sequential/concurrent) configuration"""
+        return self.config.get("execution", {})
+    
+    def get_cache_config(self) -> Dict:
+        """Get per-file result cache configuration"""
+        return self.config.get("cache", {})
+    
     def update_config(self, tool: str, updates: Dict) -> None:
         """
         Update configuration for a specific tool
         
         Args:
-            tool: Tool name (flake8/bandit/radon/ram_limits)
+            tool: Tool name (flake8/bandit/radon/ram_limits/execution/cache)
             updates: Dict of updates to apply
         """
         if tool in self.config:
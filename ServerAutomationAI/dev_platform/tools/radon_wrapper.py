@@ -33,11 +33,13 @@ class RadonWrapper:
                 - max_complexity: Max cyclomatic complexity (default: 10)
                 - min_maintainability: Min maintainability index (default: 20)
                 - show_complexity: Include complexity breakdown (default: True)
+                - timeout: Subprocess timeout in seconds (default: 30)
         """
         self.config = config or {}
         self.max_complexity = self.config.get("max_complexity", 10)
         self.min_maintainability = self.config.get("min_maintainability", 20)
         self.show_complexity = self.config.get("show_complexity", True)
+        self.timeout = self.config.get("timeout", 30)
         
         # Stats
         self.runs_count = 0
@@ -103,6 +105,7 @@ class RadonWrapper:
                 return {
                     "success": False,
                     "error": result.get("error", "Radon execution failed"),
+                    "timed_out": result.get("timed_out", False),
                     "average_complexity": 0,
                     "functions": []
                 }
@@ -133,6 +136,7 @@ class RadonWrapper:
                 - success: bool
                 - maintainability_index: float
                 - grade: str (A-F)
+                - files: List[Dict] with per-file file, index, grade
                 - summary: str
                 - file_path: str
         """
@@ -162,6 +166,7 @@ class RadonWrapper:
                     "success": True,
                     "maintainability_index": mi_data["index"],
                     "grade": mi_data["grade"],
+                    "files": mi_data.get("files", []),
                     "summary": mi_data["summary"],
                     "file_path": file_path
                 }
@@ -169,6 +174,7 @@ class RadonWrapper:
                 return {
                     "success": False,
                     "error": result.get("error", "Radon execution failed"),
+                    "timed_out": result.get("timed_out", False),
                     "maintainability_index": 0
                 }
         
@@ -217,18 +223,23 @@ class RadonWrapper:
                 stderr=asyncio.subprocess.PIPE
             )
             
-            # Wait for completion with timeout (30 seconds)
+            # Wait for completion with timeout
             try:
                 stdout, stderr = await asyncio.wait_for(
                     process.communicate(),
-                    timeout=30.0
+                    timeout=self.timeout
                 )
             except asyncio.TimeoutError:
                 process.kill()
                 return {
                     "success": False,
-                    "error": "Radon execution timed out (30s)"
+                    "error": f"Radon execution timed out ({self.timeout}s)",
+                    "timed_out": True
                 }
+            except asyncio.CancelledError:
+                # Don't leave the tool running when the caller gives up
+                process.kill()
+                raise
             
             # Decode output
             stdout_text = stdout.decode("utf-8", errors="ignore")
@@ -337,19 +348,29 @@ class RadonWrapper:
                 }
             
             # Extract grade and score from: "path - A (95.23)"
-            line = lines[0]
-            parts = line.split(" - ")
-            
-            if len(parts) >= 2:
+            files = []
+            for line in lines:
+                parts = line.rsplit(" - ", 1)
+                if len(parts) < 2:
+                    continue
                 grade_score = parts[1].strip()
                 # Extract: "A (95.23)"
-                grade = grade_score[0]
                 score_match = grade_score[grade_score.find("(")+1:grade_score.find(")")]
-                score = float(score_match)
+                files.append({
+                    "file": parts[0].strip(),
+                    "index": round(float(score_match), 2),
+                    "grade": grade_score[0]
+                })
+            
+            if files:
+                # Headline values come from the first file (single-file runs)
+                grade = files[0]["grade"]
+                score = files[0]["index"]
                 
                 return {
-                    "index": round(score, 2),
+                    "index": score,
                     "grade": grade,
+                    "files": files,
                     "summary": f"Maintainability: {grade} ({score:.1f}/100)"
                 }
             
@@ -0,0 +1,334 @@
+"""
+Sharded Test Runner
+Runs pytest across parallel worker processes balanced by historical durations
+"""
+
+import asyncio
+import heapq
+import importlib.util
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from dev_platform.agents.schemas import TestResult, TestStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedTestRunner:
+    """
+    Parallel pytest runner
+    
+    Features:
+    - Test files split across N pytest processes, balanced by historical
+      per-file durations (longest first, each to the least-loaded shard)
+    - Previously failed tests run first; with fail_fast a still-failing
+      test ends the run before the full suite starts
+    - Results merged from per-shard JUnit XML instead of parsing stdout
+    - Per-shard coverage data (with per-test contexts) combined into .coverage
+    """
+    
+    # Assumed duration for test files without history (seconds)
+    DEFAULT_FILE_DURATION = 1.0
+    
+    def __init__(self, shards: Optional[int] = None, timeout: float = 300.0, python: str = "python"):
+        """
+        Initialize ShardedTestRunner
+        
+        Args:
+            shards: Worker processes (default: one per CPU core)
+            timeout: Seconds for the whole run; unfinished shards are killed
+            python: Interpreter used to run pytest
+        """
+        self.shards = max(1, shards or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.python = python
+        self.has_pytest_cov = importlib.util.find_spec("pytest_cov") is not None
+    
+    # ===== Planning =====
+    
+    @staticmethod
+    def discover_test_files(target: str) -> List[str]:
+        """Test files under a path (test_*.py / *_test.py), or the file itself"""
+        path = Path(target)
+        if path.is_file():
+            return [str(path)]
+        
+        files = set()
+        for pattern in ("test_*.py", "*_test.py"):
+            for candidate in path.rglob(pattern):
+                parts = candidate.relative_to(path).parts[:-1]
+                if any(part.startswith(".") or part == "__pycache__" for part in parts):
+                    continue
+                files.add(str(candidate))
+        return sorted(files)
+    
+    def plan_shards(self, files: List[str], durations: Optional[Dict[str, float]] = None) -> List[List[str]]:
+        """
+        Split test files into balanced shards
+        
+        Args:
+            files: Test files
+            durations: Historical seconds per test file
+        
+        Returns:
+            Non-empty list of file lists (at most self.shards)
+        """
+        durations = durations or {}
+        known = [durations[f] for f in files if f in durations]
+        default = sum(known) / len(known) if known else self.DEFAULT_FILE_DURATION
+        
+        count = min(self.shards, len(files))
+        if count == 0:
+            return []
+        
+        shards: List[List[str]] = [[] for _ in range(count)]
+        loads = [(0.0, i) for i in range(count)]
+        for f in sorted(files, key=lambda f: (-durations.get(f, default), f)):
+            load, index = heapq.heappop(loads)
+            shards[index].append(f)
+            heapq.heappush(loads, (load + durations.get(f, default), index))
+        return shards
+    
+    # ===== Execution =====
+    
+    async def run(
+        self,
+        target: Union[str, List[str]],
+        test_pattern: Optional[str] = None,
+        coverage: bool = False,
+        verbose: bool = False,
+        durations: Optional[Dict[str, float]] = None,
+        failed_first: Optional[List[str]] = None,
+        fail_fast: bool = False
+    ) -> Dict:
+        """
+        Run the tests under a path
+        
+        Args:
+            target: Test file or directory, or a list of them
+            test_pattern: pytest -k expression
+            coverage: Collect coverage for dev_platform
+            verbose: Verbose pytest output
+            durations: Historical seconds per test file (for balancing)
+            failed_first: Test node IDs that failed last time (run first)
+            fail_fast: Stop after the first phase if a previous failure still fails
+        
+        Returns:
+            Dict with results (List[TestResult]), counts, failed_tests,
+            file_durations, coverage, duration, shards, timed_out, stopped_early
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        workdir = tempfile.mkdtemp(prefix="pytest-shards-")
+        
+        targets = [target] if isinstance(target, str) else target
+        files = sorted({f for t in targets for f in self.discover_test_files(t)})
+        rerun = self._rerun_candidates(failed_first or [], files)
+        
+        results: List[TestResult] = []
+        timed_out = False
+        stopped_early = False
+        shard_count = 0
+        
+        try:
+            common = self._common_args(test_pattern, coverage, verbose)
+            
+            # Phase 1: tests that failed last time
+            if rerun:
+                logger.info(f"Re-running {len(rerun)} previously failed test(s) first")
+                count = min(self.shards, len(rerun))
+                phase_results, timed_out = await self._run_phase(
+                    "rerun", [rerun[i::count] for i in range(count)],
+                    common, coverage, workdir, deadline
+                )
+                results.extend(phase_results)
+                shard_count = count
+                still_failing = any(r.status in (TestStatus.FAILED, TestStatus.ERROR) for r in phase_results)
+                stopped_early = fail_fast and still_failing
+            
+            # Phase 2: everything else
+            if not timed_out and not stopped_early:
+                shards = self.plan_shards(files, durations)
+                deselect = [arg for node_id in rerun for arg in ("--deselect", node_id)]
+                logger.info(f"Running {len(files)} test file(s) in {len(shards)} shard(s)")
+                phase_results, timed_out = await self._run_phase(
+                    "main", [shard + deselect for shard in shards],
+                    common, coverage, workdir, deadline
+                )
+                results.extend(phase_results)
+                shard_count = max(shard_count, len(shards))
+            
+            coverage_percent = await self._combine_coverage(workdir) if coverage else None
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        
+        counts = {status: 0 for status in ("passed", "failed", "skipped", "errors")}
+        file_durations: Dict[str, float] = {}
+        for result in results:
+            key = "errors" if result.status == TestStatus.ERROR else result.status.value
+            counts[key] += 1
+            if result.file_path:
+                file_durations[result.file_path] = round(file_durations.get(result.file_path, 0.0) + (result.duration or 0.0), 3)
+        
+        return {
+            "results": results,
+            "counts": counts,
+            "failed_tests": [r.test_name for r in results if r.status in (TestStatus.FAILED, TestStatus.ERROR)],
+            "passed_tests": [r.test_name for r in results if r.status == TestStatus.PASSED],
+            "file_durations": file_durations,
+            "coverage": coverage_percent,
+            "duration": round(time.monotonic() - started, 3),
+            "shards": shard_count,
+            "timed_out": timed_out,
+            "stopped_early": stopped_early
+        }
+    
+    def _rerun_candidates(self, failed: List[str], files: List[str]) -> List[str]:
+        """Previously failed node IDs that still belong to the selected files"""
+        selected = {os.path.abspath(f) for f in files}
+        return [node_id for node_id in dict.fromkeys(failed) if os.path.abspath(node_id.split("::")[0]) in selected]
+    
+    def _common_args(self, test_pattern: Optional[str], coverage: bool, verbose: bool) -> List[str]:
+        args = ["-v" if verbose else "-q", "--tb=short", "-p", "no:cacheprovider", "-o", "junit_family=xunit1"]
+        if test_pattern:
+            args.extend(["-k", test_pattern])
+        if coverage:
+            args.extend(["--cov=dev_platform", "--cov-report=", "--cov-context=test"])
+        elif self.has_pytest_cov:
+            args.append("--no-cov")
+        return args
+    
+    async def _run_phase(
+        self,
+        phase: str,
+        shard_args: List[List[str]],
+        common: List[str],
+        coverage: bool,
+        workdir: str,
+        deadline: float
+    ) -> tuple:
+        """Run shards concurrently; returns (results, timed_out)"""
+        processes = []
+        for index, args in enumerate(shard_args):
+            junit = os.path.join(workdir, f"{phase}-{index}.xml")
+            env = dict(os.environ)
+            if coverage:
+                env["COVERAGE_FILE"] = os.path.join(workdir, f".coverage.{phase}-{index}")
+            process = await asyncio.create_subprocess_exec(
+                self.python, "-m", "pytest", *args, *common, f"--junitxml={junit}",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                env=env
+            )
+            processes.append((index, process, junit))
+        
+        outputs: Dict[int, bytes] = {}
+        
+        async def wait(index: int, process) -> None:
+            stdout, _ = await process.communicate()
+            outputs[index] = stdout
+        
+        tasks = [asyncio.create_task(wait(index, process)) for index, process, _ in processes]
+        _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+        timed_out = bool(pending)
+        for task in pending:
+            task.cancel()
+        for _, process, _ in processes:
+            if process.returncode is None:
+                process.kill()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        results: List[TestResult] = []
+        for index, process, junit in processes:
+            if os.path.exists(junit):
+                results.extend(self._parse_junit(junit))
+                continue
+            output = outputs.get(index, b"").decode("utf-8", errors="ignore")
+            message = "Shard timed out" if index not in outputs else f"Shard exited with code {process.returncode}"
+            results.append(TestResult(
+                test_name=f"{phase}-shard-{index}",
+                status=TestStatus.ERROR,
+                error_message=message,
+                traceback=output[-4000:] or None
+            ))
+        return results, timed_out
+    
+    # ===== Results =====
+    
+    @staticmethod
+    def _node_id(file: Optional[str], classname: str, name: str) -> str:
+        """Rebuild a pytest node ID from xunit1 testcase attributes"""
+        if not file:
+            return f"{classname}::{name}" if classname else name
+        parts = [file]
+        module = re.sub(r"\.py$", "", file).replace("/", ".").replace("\\", ".")
+        if classname.startswith(module + "."):
+            parts.extend(classname[len(module) + 1:].split("."))
+        parts.append(name)
+        return "::".join(parts)
+    
+    def _parse_junit(self, path: str) -> List[TestResult]:
+        """Parse a pytest JUnit XML report into TestResults"""
+        try:
+            root = ET.parse(path).getroot()
+        except ET.ParseError as e:
+            return [TestResult(test_name=os.path.basename(path), status=TestStatus.ERROR, error_message=f"Invalid JUnit XML: {e}")]
+        
+        results = []
+        for case in root.iter("testcase"):
+            status = TestStatus.PASSED
+            message = None
+            details = None
+            for child in case:
+                if child.tag in ("failure", "error", "skipped"):
+                    status = {
+                        "failure": TestStatus.FAILED,
+                        "error": TestStatus.ERROR,
+                        "skipped": TestStatus.SKIPPED
+                    }[child.tag]
+                    message = child.get("message")
+                    details = child.text
+                    break
+            
+            line = case.get("line")
+            results.append(TestResult(
+                test_name=self._node_id(case.get("file"), case.get("classname", ""), case.get("name", "")),
+                status=status,
+                duration=float(case.get("time") or 0.0),
+                error_message=message if status != TestStatus.PASSED else None,
+                traceback=details if status in (TestStatus.FAILED, TestStatus.ERROR) else None,
+                file_path=case.get("file"),
+                line_number=int(line) + 1 if line and line.isdigit() else None
+            ))
+        return results
+    
+    async def _combine_coverage(self, workdir: str) -> Optional[float]:
+        """Combine per-shard coverage data into .coverage; returns the total percentage"""
+        data_files = [str(p) for p in Path(workdir).glob(".coverage.*")]
+        if not data_files:
+            return None
+        
+        env = dict(os.environ, COVERAGE_FILE=os.path.abspath(".coverage"))
+        try:
+            combine = await asyncio.create_subprocess_exec(
+                self.python, "-m", "coverage", "combine", *data_files,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL, env=env
+            )
+            await combine.wait()
+            report = await asyncio.create_subprocess_exec(
+                self.python, "-m", "coverage", "report", "--format=total",
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, env=env
+            )
+            stdout, _ = await report.communicate()
+            return float(stdout.decode().strip())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to combine shard coverage: {e}")
+            return None
@@ -0,0 +1,289 @@
+"""
+Test Impact Analysis
+Selects the tests affected by changed files from a static import graph and per-test coverage
+"""
+
+import ast
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TestImpactAnalyzer:
+    """
+    Maps source modules to the tests that exercise them
+    
+    Features:
+    - Static import graph of the source package and test directory (ast,
+      including function-level imports); a test depends on every module it
+      imports transitively
+    - Per-test coverage contexts (pytest --cov-context=test) add dependencies
+      the import graph cannot see
+    - Parsed imports memoized by (mtime, size); state is JSON-serializable so
+      it can be cached between runs
+    - Safety valve: a full run every N selections, when the changes are
+      unknown or empty, and whenever test infrastructure (conftest,
+      pytest/packaging config) or a non-Python file in the source package
+      changes
+    """
+    
+    __test__ = False  # Not a pytest test class
+    
+    # Changes to these always trigger a full run
+    FULL_RUN_FILES = {
+        "conftest.py", "pytest.ini", "setup.cfg", "setup.py", "pyproject.toml", "tox.ini"
+    }
+    
+    def __init__(
+        self,
+        repo_root: str = ".",
+        source_package: str = "dev_platform",
+        test_dir: str = "tests",
+        full_run_every: int = 10,
+        state: Optional[Dict] = None
+    ):
+        """
+        Initialize TestImpactAnalyzer
+        
+        Args:
+            repo_root: Project root (module paths are relative to it)
+            source_package: Top-level source package
+            test_dir: Test directory
+            full_run_every: Force a full run after this many selective runs
+            state: State from a previous get_state() call
+        """
+        self.repo_root = Path(repo_root).resolve()
+        self.source_package = source_package
+        self.test_dir = test_dir
+        self.full_run_every = max(1, full_run_every)
+        
+        state = state or {}
+        self._imports: Dict[str, List] = state.get("imports", {})  # path -> [mtime_ns, size, modules]
+        self.coverage_map: Dict[str, List[str]] = state.get("coverage_map", {})  # test file -> source files
+        self.runs_since_full: int = state.get("runs_since_full", self.full_run_every)
+        # Commit of the last passing run; changes are diffed against it
+        self.last_tested_commit: Optional[str] = state.get("last_tested_commit")
+    
+    def get_state(self) -> Dict[str, Any]:
+        """JSON-serializable state for caching"""
+        return {
+            "imports": self._imports,
+            "coverage_map": self.coverage_map,
+            "runs_since_full": self.runs_since_full,
+            "last_tested_commit": self.last_tested_commit
+        }
+    
+    # ===== Import graph =====
+    
+    def _python_files(self) -> List[str]:
+        files = []
+        for top in (self.source_package, self.test_dir):
+            root = self.repo_root / top
+            if not root.is_dir():
+                continue
+            for path in root.rglob("*.py"):
+                relative = path.relative_to(self.repo_root)
+                if any(part.startswith(".") or part == "__pycache__" for part in relative.parts):
+                    continue
+                files.append(relative.as_posix())
+        return sorted(files)
+    
+    @staticmethod
+    def _module_name(path: str) -> str:
+        parts = path[:-3].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        return ".".join(parts)
+    
+    def _parse_imports(self, path: str) -> List[str]:
+        """Absolute module names imported anywhere in a file (memoized)"""
+        full_path = self.repo_root / path
+        try:
+            stat = full_path.stat()
+        except OSError:
+            return []
+        
+        memo = self._imports.get(path)
+        if memo is not None and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+            return memo[2]
+        
+        try:
+            tree = ast.parse(full_path.read_text(encoding="utf-8", errors="ignore"), filename=path)
+        except SyntaxError as e:
+            logger.warning(f"Cannot parse {path} for test impact analysis: {e}")
+            return []
+        
+        package = self._module_name(path).split(".")
+        if not path.endswith("__init__.py"):
+            package = package[:-1]
+        
+        modules = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base_parts = package[:len(package) - node.level + 1]
+                    base = ".".join(base_parts + ([node.module] if node.module else []))
+                else:
+                    base = node.module or ""
+                if base:
+                    modules.add(base)
+                    # "from package import module" imports a submodule
+                    modules.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+        
+        imports = sorted(modules)
+        self._imports[path] = [stat.st_mtime_ns, stat.st_size, imports]
+        return imports
+    
+    def build_graph(self) -> Dict[str, Set[str]]:
+        """
+        Reverse dependency graph
+        
+        Returns:
+            Dict of file path -> files that import it directly
+        """
+        files = self._python_files()
+        index = {self._module_name(f): f for f in files}
+        
+        # Drop memoized entries for files that no longer exist
+        for stale in set(self._imports) - set(files):
+            del self._imports[stale]
+        
+        dependents: Dict[str, Set[str]] = {f: set() for f in files}
+        for f in files:
+            for module in self._parse_imports(f):
+                # Importing a.b.c also executes a/__init__ and a/b/__init__
+                parts = module.split(".")
+                for i in range(1, len(parts) + 1):
+                    target = index.get(".".join(parts[:i]))
+                    if target and target != f:
+                        dependents[target].add(f)
+        return dependents
+    
+    def update_from_coverage(self, data_file: str = ".coverage") -> int:
+        """
+        Add per-test dependencies from coverage data recorded with --cov-context=test
+        
+        Args:
+            data_file: Coverage data file
+        
+        Returns:
+            Number of tests files with coverage information
+        """
+        if not os.path.exists(data_file):
+            return 0
+        try:
+            from coverage import CoverageData
+        except ImportError:
+            return 0
+        
+        data = CoverageData(basename=data_file)
+        try:
+            data.read()
+        except Exception as e:
+            logger.warning(f"Cannot read coverage data {data_file}: {e}")
+            return 0
+        
+        mapping: Dict[str, Set[str]] = {}
+        for measured in data.measured_files():
+            try:
+                source = Path(measured).resolve().relative_to(self.repo_root).as_posix()
+            except ValueError:
+                continue
+            contexts = set()
+            for line_contexts in data.contexts_by_lineno(measured).values():
+                contexts.update(line_contexts)
+            for context in contexts:
+                test_file = context.split("::")[0].split("|")[0]
+                if test_file.endswith(".py"):
+                    mapping.setdefault(test_file, set()).add(source)
+        
+        for test_file, sources in mapping.items():
+            self.coverage_map[test_file] = sorted(sources)
+        return len(mapping)
+    
+    # ===== Selection =====
+    
+    def _is_test_file(self, path: str) -> bool:
+        name = os.path.basename(path)
+        return (
+            path.startswith(self.test_dir + "/")
+            and path.endswith(".py")
+            and (name.startswith("test_") or name.endswith("_test.py"))
+        )
+    
+    def _normalize(self, changed_files: Iterable[str]) -> List[str]:
+        normalized = []
+        for path in changed_files:
+            # git status reports renames as "old -> new"; both sides matter
+            for part in path.split(" -> "):
+                part = part.strip().strip('"')
+                if part:
+                    normalized.append(Path(os.path.normpath(part)).as_posix())
+        return sorted(set(normalized))
+    
+    def select_tests(self, changed_files: Optional[Iterable[str]]) -> Dict[str, Any]:
+        """
+        Select the tests impacted by changed files
+        
+        Args:
+            changed_files: Changed paths relative to repo_root (None if unknown)
+        
+        Returns:
+            Dict with full_run (bool), reason, tests (test file paths),
+            changed_files
+        """
+        changed = self._normalize(changed_files or [])
+        result = {"full_run": False, "reason": "", "tests": [], "changed_files": changed}
+        
+        if changed_files is None:
+            result.update(full_run=True, reason="changed files unknown")
+            return result
+        
+        if not changed:
+            result.update(full_run=True, reason="no changed files detected")
+            return result
+        
+        if self.runs_since_full >= self.full_run_every:
+            result.update(full_run=True, reason=f"periodic full run (every {self.full_run_every} runs)")
+            return result
+        
+        for path in changed:
+            name = os.path.basename(path)
+            if name in self.FULL_RUN_FILES or name.startswith("requirements"):
+                result.update(full_run=True, reason=f"test infrastructure changed: {path}")
+                return result
+            if path.startswith(self.source_package + "/") and not path.endswith(".py"):
+                result.update(full_run=True, reason=f"non-Python source file changed: {path}")
+                return result
+        
+        dependents = self.build_graph()
+        covered_by: Dict[str, Set[str]] = {}
+        for test_file, sources in self.coverage_map.items():
+            for source in sources:
+                covered_by.setdefault(source, set()).add(test_file)
+        
+        # Everything that (transitively) imports a changed file
+        impacted: Set[str] = set()
+        queue = deque(changed)
+        while queue:
+            path = queue.popleft()
+            if path in impacted:
+                continue
+            impacted.add(path)
+            queue.extend(dependents.get(path, ()))
+            queue.extend(covered_by.get(path, ()))
+        
+        tests = sorted(p for p in impacted if self._is_test_file(p) and (self.repo_root / p).exists())
+        result["tests"] = tests
+        result["reason"] = f"{len(tests)} test file(s) affected by {len(changed)} changed file(s)"
+        return result
+    
+    def record_run(self, full_run: bool) -> None:
+        """Count a test run toward the periodic full-run safety valve"""
+        self.runs_since_full = 0 if full_run else self.runs_since_full + 1
@@ -11,12 +11,14 @@ from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from typing import Optional, Dict, Any
 import os
+import math
 import uvicorn
 import secrets
 import logging
 
 from dev_platform.agents import get_ops_coordinator_agent
 from dev_platform.core.workflow_storage import WorkflowStorage
+from dev_platform.core.admission_queue import AdmissionRejected
 from dev_platform.web.metrics_provider import get_metrics_provider
 from dev_platform.core.secrets_manager import get_secrets_manager
 from dev_platform.web.auth import init_auth_manager, get_auth_manager
@@ -36,6 +38,7 @@ class WorkflowStartRequest(BaseModel):
     project_name: str = Field(..., description="Name of the project associated with the workflow")
     user_request: str = Field(..., description="The user's request or prompt for the workflow")
     parameters: Optional[Dict[str, Any]] = Field(None, description="Optional parameters for the workflow")
+    priority: int = Field(0, ge=0, le=10, description="Admission priority (0-10); higher-priority workflows leave the queue first")
 
 
 def create_app():
@@ -341,6 +344,20 @@ async def get_system_metrics(
     return await metrics_provider.get_system_metrics()
 
 
+@app.get("/api/metrics/history")
+async def get_metrics_history(
+    metrics_provider = Depends(get_metrics),
+    current_user: Dict = Depends(get_current_user),
+    metric: str = "cpu.percent",
+    minutes: int = 60,
+    points: int = 120
+):
+    """Get rolled-up history (min/max/avg/p95 per bucket) of one metric"""
+    minutes = max(1, minutes)
+    points = min(max(1, points), 1000)
+    return await metrics_provider.get_metrics_history(metric, minutes=minutes, max_points=points)
+
+
 @app.get("/api/workflows/partial", response_class=HTMLResponse)
 async def workflows_partial(
     request: Request,
@@ -391,6 +408,15 @@ async def get_workflows(
         return all_workflows[:limit]
 
 
+@app.get("/api/workflows/queue")
+async def get_workflow_queue(
+    coordinator = Depends(get_coordinator),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get workflow admission queue metrics (depth, running, wait times)"""
+    return coordinator.get_admission_stats()
+
+
 @app.get("/api/workflows/{workflow_id}")
 async def get_workflow_detail(
     workflow_id: str,
@@ -404,6 +430,57 @@ async def get_workflow_detail(
     return workflow
 
 
+@app.get("/api/workflows/{workflow_id}/stream")
+async def stream_workflow_progress(
+    workflow_id: str,
+    coordinator = Depends(get_coordinator),
+    storage = Depends(get_storage),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Stream workflow progress with Server-Sent Events
+    
+    Emits progress updates and LLM tokens as they are generated
+    (events with "type": "token"), so the dashboard can render output live.
+    Each connection gets its own subscription; for a workflow that is no
+    longer running, the stored final state is sent followed by "end".
+    """
+    from fastapi.responses import StreamingResponse
+    import json
+    
+    final_state = None
+    try:
+        stream = coordinator.get_progress_stream(workflow_id, include_tokens=True)
+    except ValueError:
+        stream = None
+        final_state = await storage.get_workflow(workflow_id)
+        if not final_state:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    async def event_stream():
+        """Generate SSE events"""
+        try:
+            if stream is None:
+                yield f"data: {json.dumps(final_state, ensure_ascii=False, default=str)}\n\n"
+            else:
+                async for update in stream:
+                    yield f"data: {json.dumps(update, ensure_ascii=False, default=str)}\n\n"
+            yield f"data: {json.dumps({'workflow_id': workflow_id, 'type': 'end'})}\n\n"
+        except Exception as e:
+            error_data = {"workflow_id": workflow_id, "type": "error", "error": str(e)}
+            yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        }
+    )
+
+
 @app.get("/api/agents/status")
 async def get_agent_status(
     coordinator = Depends(get_coordinator),
@@ -613,7 +690,8 @@ async def start_workflow(
             project_name=request.project_name,
             user_request=request.user_request,
             parameters=request.parameters,
-            auto_execute=True
+            auto_execute=True,
+            priority=request.priority
         )
 
         logger.info(f"Started workflow {workflow_id} by user {current_user.get('user_id')}")
@@ -621,9 +699,18 @@ async def start_workflow(
         return {
             "workflow_id": workflow_id,
             "status": "started",
-            "message": "Workflow started successfully"
+            "message": "Workflow started successfully",
+            "queue_depth": coordinator.get_admission_stats()["queue_depth"]
         }
 
+    except AdmissionRejected as e:
+        logger.warning(f"Workflow admission rejected: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
     except Exception as e:
         logger.error(f"Error starting workflow: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,27 +2,35 @@
 Dedicated Metrics Provider - Decoupled from business logic
 
 Provides system metrics without coupling to OpsCoordinator.
-Uses async executor pattern and caching for efficiency.
+Current values come from the shared background MetricsSampler, so a request
+never calls psutil; history comes from the MetricsStore written by the
+PerformanceMonitor agent.
 """
-import psutil
+import time
 import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from tools.metrics_store import MetricsStore, get_metrics_store
+from tools.metrics_sampler import MetricsSampler, get_metrics_sampler
 
 
 class MetricsProvider:
     """Lightweight metrics provider for telemetry"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[MetricsStore] = None, sampler: Optional[MetricsSampler] = None):
         self._cache_ttl = 5
         self._last_metrics = None
         self._last_update = None
+        self.store = store if store is not None else get_metrics_store()
+        self.sampler = sampler if sampler is not None else get_metrics_sampler()
     
     async def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system metrics with caching
         
-        Runs psutil in executor to avoid blocking the event loop.
-        Caches results for 5 seconds to reduce overhead.
+        Reads the sampler's latest snapshot (a plain memory read; only the
+        first call waits for the sampler to start). Caches results for 5
+        seconds so every poll in that window gets the same dict.
         """
         now = datetime.now()
         
@@ -30,22 +38,37 @@ class MetricsProvider:
             (now - self._last_update).total_seconds() < self._cache_ttl):
             return self._last_metrics
         
-        loop = asyncio.get_event_loop()
-        cpu = await loop.run_in_executor(None, psutil.cpu_percent, 0.5)
-        mem = await loop.run_in_executor(None, lambda: psutil.virtual_memory().percent)
-        disk = await loop.run_in_executor(None, lambda: psutil.disk_usage('/').percent)
+        snapshot = self.sampler.snapshot
+        if snapshot is None or not self.sampler.running:
+            loop = asyncio.get_event_loop()
+            snapshot = await loop.run_in_executor(None, self.sampler.latest)
         
         metrics = {
-            "cpu_percent": cpu,
-            "memory_percent": mem,
-            "disk_percent": disk,
-            "timestamp": now.isoformat()
+            "cpu_percent": snapshot["cpu"]["percent"],
+            "memory_percent": snapshot["memory"]["percent"],
+            "disk_percent": snapshot["disk"]["percent"],
+            "network_sent_kb_per_sec": snapshot["network"]["sent_kb_per_sec"],
+            "network_recv_kb_per_sec": snapshot["network"]["recv_kb_per_sec"],
+            "top_processes": snapshot["processes"],
+            "timestamp": snapshot["timestamp"]
         }
         
         self._last_metrics = metrics
         self._last_update = now
         
         return metrics
+    
+    async def get_metrics_history(self, metric: str = "cpu.percent", minutes: int = 60,
+                                  max_points: int = 120) -> Dict[str, Any]:
+        """Get min/max/avg/p95 buckets of one metric over the last minutes
+        
+        The store picks the finest resolution (1s, 1m or 1h) that still
+        covers the range with at most max_points buckets.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.store.refresh)
+        start = time.time() - minutes * 60
+        return self.store.query(metric, start, max_points=max_points)
 
 
 _metrics_provider = None
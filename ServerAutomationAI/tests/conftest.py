@@ -42,6 +42,13 @@ def test_cache_path(temp_dir):
         shutil.rmtree(cache_path, ignore_errors=True)
 
 
+@pytest.fixture(autouse=True)
+def isolated_qa_result_cache(tmp_path, monkeypatch):
+    """Give each test its own QA result cache so results never leak between tests"""
+    from dev_platform.tools.qa_tools_config import DEFAULT_CONFIG
+    monkeypatch.setitem(DEFAULT_CONFIG["cache"], "directory", str(tmp_path / "qa_results"))
+
+
 @pytest.fixture
 def mock_env_vars(monkeypatch):
     """Set up mock environment variables"""
@@ -157,6 +164,7 @@ def mock_cache_manager():
     
     mock.cache_get.side_effect = cache_get
     mock.cache_set.side_effect = cache_set
+    mock.cache_set_deferred.side_effect = cache_set
     mock.cache_delete.side_effect = cache_delete
     mock._cache_store = cache_store  # For inspection
     
@@ -129,7 +129,7 @@ def mock_qa_test_agent():
         )
     
     # Mock run_tests_async
-    async def mock_run_tests(test_type, coverage):
+    async def mock_run_tests(test_type, coverage, shards=None, impacted=False):
         return {
             "passed": 45,
             "failed": 2,
@@ -17,6 +17,7 @@ import psutil
 
 from dev_platform.agents.qa_test_agent import QATestAgent
 from dev_platform.tools.async_qa_manager import AsyncQATaskManager
+from dev_platform.tools.qa_tools_config import QAToolsConfig
 from dev_platform.agents.schemas import QAToolType
 
 
@@ -292,7 +293,7 @@ async def test_sequential_tool_execution(temp_test_dir):
          patch('dev_platform.tools.radon_wrapper.RadonWrapper.analyze_complexity_async', new=track_radon_cc), \
          patch('dev_platform.tools.radon_wrapper.RadonWrapper.analyze_maintainability_async', new=track_radon_mi):
         
-        manager = AsyncQATaskManager()
+        manager = AsyncQATaskManager(config=_subprocess_config())
         report = await manager.analyze_code_quality_async(
             file_path=test_file,
             tools=[QAToolType.FLAKE8, QAToolType.BANDIT, QAToolType.RADON],
@@ -331,6 +332,114 @@ async def test_sequential_tool_execution(temp_test_dir):
         assert report.radon_executed, "Radon should have executed"
 
 
+def _subprocess_config():
+    """Config pinned to the subprocess backend (these tests patch the wrappers)"""
+    config = QAToolsConfig()
+    config.update_config("execution", {"backend": "subprocess"})
+    return config
+
+
+def _timed_tool(name, delay, result, running, peak):
+    """Fake wrapper method that sleeps and tracks how many tools overlap"""
+    async def run(*args, **kwargs):
+        running.append(name)
+        peak[0] = max(peak[0], len(running))
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            running.remove(name)
+        return result
+    return run
+
+
+def _patch_tools(delays, running, peak):
+    flake8 = _timed_tool("flake8", delays["flake8"], {"success": True, "issues": []}, running, peak)
+    bandit = _timed_tool("bandit", delays["bandit"], {"success": True, "issues": []}, running, peak)
+    radon_cc = _timed_tool("radon_cc", delays["radon_cc"], {
+        "success": True, "average_complexity": 1.0, "max_complexity": 2.0, "functions": []
+    }, running, peak)
+    radon_mi = _timed_tool("radon_mi", delays["radon_mi"], {
+        "success": True, "maintainability_index": 85.0, "grade": "A"
+    }, running, peak)
+    return (
+        patch('dev_platform.tools.flake8_wrapper.Flake8Wrapper.run_async', new=flake8),
+        patch('dev_platform.tools.bandit_wrapper.BanditWrapper.run_async', new=bandit),
+        patch('dev_platform.tools.radon_wrapper.RadonWrapper.analyze_complexity_async', new=radon_cc),
+        patch('dev_platform.tools.radon_wrapper.RadonWrapper.analyze_maintainability_async', new=radon_mi)
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tool_execution(temp_test_dir):
+    """
+    Concurrent mode runs tools side by side: wall time tracks the slowest tool
+    """
+    test_file = str(Path(temp_test_dir) / "sample.py")
+    running, peak = [], [0]
+    delays = {"flake8": 0.3, "bandit": 0.3, "radon_cc": 0.3, "radon_mi": 0.3}
+    
+    p1, p2, p3, p4 = _patch_tools(delays, running, peak)
+    with p1, p2, p3, p4, patch('os.cpu_count', return_value=8):
+        manager = AsyncQATaskManager(config=_subprocess_config())
+        started = asyncio.get_event_loop().time()
+        report = await manager.analyze_code_quality_async(test_file, sequential=False)
+        elapsed = asyncio.get_event_loop().time() - started
+    
+    assert peak[0] == 4
+    assert elapsed < 0.9, f"Concurrent run took {elapsed:.2f}s (sum of tools is 1.2s)"
+    assert report.flake8_executed and report.bandit_executed and report.radon_executed
+    assert report.maintainability_index == 85.0
+    assert report.timed_out_tools == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tools_respect_ram_budget(temp_test_dir):
+    """
+    With room for only one tool in the RAM budget, tools run one at a time
+    """
+    test_file = str(Path(temp_test_dir) / "sample.py")
+    running, peak = [], [0]
+    delays = {"flake8": 0.02, "bandit": 0.02, "radon_cc": 0.02, "radon_mi": 0.02}
+    
+    config = _subprocess_config()
+    config.update_config("ram_limits", {"max_memory_mb": 10_000, "total_limit_mb": 10_000})
+    
+    p1, p2, p3, p4 = _patch_tools(delays, running, peak)
+    with p1, p2, p3, p4:
+        manager = AsyncQATaskManager(config=config)
+        report = await manager.analyze_code_quality_async(test_file, sequential=False)
+    
+    assert peak[0] == 1
+    assert report.success
+    assert set(manager.get_stats()["last_tool_durations"]) == {"flake8", "bandit", "radon_cc", "radon_mi"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tool_timeout_returns_partial_report(temp_test_dir):
+    """
+    A tool that exceeds its timeout is abandoned; the other results are kept
+    """
+    test_file = str(Path(temp_test_dir) / "sample.py")
+    running, peak = [], [0]
+    delays = {"flake8": 0.01, "bandit": 5.0, "radon_cc": 0.01, "radon_mi": 0.01}
+    
+    config = _subprocess_config()
+    config.update_config("bandit", {"timeout": 0.1})
+    config.update_config("execution", {"timeout_grace_seconds": 0})
+    
+    p1, p2, p3, p4 = _patch_tools(delays, running, peak)
+    with p1, p2, p3, p4:
+        manager = AsyncQATaskManager(config=config)
+        report = await manager.analyze_code_quality_async(test_file, sequential=False)
+    
+    assert report.success
+    assert report.timed_out_tools == ["bandit"]
+    assert report.security_issues == 0
+    assert report.radon_executed and report.maintainability_index == 85.0
+    assert "Timed out: bandit" in report.summary
+    assert running == []
+
+
 @pytest.mark.asyncio
 async def test_quality_gate_evaluation(temp_test_dir, qa_agent):
     """
@@ -369,3 +478,64 @@ async def test_quality_gate_evaluation(temp_test_dir, qa_agent):
     
     if report_lenient.passes_quality_gate:
         assert report_lenient.quality_score >= 50
+
+
+def _recording_tools(calls):
+    """Fake wrapper methods that record the analyzed path and report one issue per file"""
+    def record(name, make_result):
+        async def run(self, file_path, *args, **kwargs):
+            calls.append((name, Path(file_path).name))
+            return make_result(file_path)
+        return run
+    
+    flake8 = record("flake8", lambda path: {"success": True, "issues": [
+        {"file": path, "line": 1, "column": 1, "code": "E501", "message": "line too long", "severity": "error"}
+    ]})
+    bandit = record("bandit", lambda path: {"success": True, "issues": []})
+    radon_cc = record("radon_cc", lambda path: {"success": True, "average_complexity": 2.0, "max_complexity": 2, "functions": [
+        {"file": path, "name": "f", "complexity": 2, "grade": "A", "line": 1}
+    ]})
+    radon_mi = record("radon_mi", lambda path: {"success": True, "maintainability_index": 80.0, "grade": "A", "files": [
+        {"file": path, "index": 80.0, "grade": "A"}
+    ]})
+    return (
+        patch('dev_platform.tools.flake8_wrapper.Flake8Wrapper.run_async', new=flake8),
+        patch('dev_platform.tools.bandit_wrapper.BanditWrapper.run_async', new=bandit),
+        patch('dev_platform.tools.radon_wrapper.RadonWrapper.analyze_complexity_async', new=radon_cc),
+        patch('dev_platform.tools.radon_wrapper.RadonWrapper.analyze_maintainability_async', new=radon_mi)
+    )
+
+
+@pytest.mark.asyncio
+async def test_incremental_analysis_reuses_cached_results(temp_test_dir):
+    """
+    A second run over unchanged files is served from the result cache;
+    after editing one file only that file is re-analyzed
+    """
+    project = Path(temp_test_dir) / "project"
+    project.mkdir()
+    for name in ("a.py", "b.py", "c.py"):
+        (project / name).write_text(f"# {name}\nx = 1\n")
+    
+    calls = []
+    p1, p2, p3, p4 = _recording_tools(calls)
+    with p1, p2, p3, p4:
+        manager = AsyncQATaskManager(config=_subprocess_config())
+        
+        first = await manager.analyze_code_quality_async(str(project))
+        assert len(calls) == 12  # 4 jobs x 3 files
+        assert first.total_issues == 3
+        
+        calls.clear()
+        second = await manager.analyze_code_quality_async(str(project))
+        assert calls == []
+        assert second.total_issues == first.total_issues
+        assert second.average_complexity == first.average_complexity
+        assert second.maintainability_index == 80.0
+        assert "Cache: 3/3 files reused" in second.summary
+        
+        (project / "b.py").write_text("# b.py edited\nx = 2\n")
+        third = await manager.analyze_code_quality_async(str(project))
+        assert sorted(calls) == [("bandit", "b.py"), ("flake8", "b.py"), ("radon_cc", "b.py"), ("radon_mi", "b.py")]
+        assert third.total_issues == 3
+        assert {issue.file for issue in third.all_issues} == {str(project / n) for n in ("a.py", "b.py", "c.py")}
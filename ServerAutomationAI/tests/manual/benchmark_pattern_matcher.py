@@ -0,0 +1,134 @@
+"""
+Manual Log Pattern Matching Benchmark
+
+Compares the previous per-pattern re.search loops of LogAnalyzer and
+SecurityMonitor with the shared PatternMatcher (literal prefilter + compiled
+patterns) on an auth/syslog sample. Without a sample file, a synthetic one
+of the given size is generated (mostly routine sshd, cron, systemd and
+application lines, ~2% failed logins and errors).
+
+Run with: python tests/manual/benchmark_pattern_matcher.py [size_mb (default 1024)] [sample_file]
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from agents.security_monitor import SecurityMonitor
+from tools.pattern_matcher import PatternMatcher
+
+ROUTINE_LINES = [
+    "{ts} web1 sshd[{pid}]: Accepted publickey for deploy from 10.0.{a}.{b} port {port} ssh2: RSA SHA256:Xk3c9s0aQ",
+    "{ts} web1 sshd[{pid}]: pam_unix(sshd:session): session opened for user deploy(uid=1000) by (uid=0)",
+    "{ts} web1 CRON[{pid}]: pam_unix(cron:session): session closed for user root",
+    "{ts} web1 systemd[1]: Started Session {pid} of User deploy.",
+    "{ts} web1 kernel: [{pid}.123456] IPv4: martian source 10.0.{a}.{b} from 10.0.0.1, on dev eth0",
+    "2026-10-18 04:33:{sec:02d} - ai_manager - INFO - Health check completed for {a} agents in 0.{b}s",
+    "2026-10-18 04:33:{sec:02d} - performance_monitor - DEBUG - cpu={a}% mem={b}%",
+]
+
+INCIDENT_LINES = [
+    "{ts} web1 sshd[{pid}]: Failed password for root from 203.0.{a}.{b} port {port} ssh2",
+    "{ts} web1 sshd[{pid}]: Failed password for invalid user admin from 198.51.{a}.{b} port {port} ssh2",
+    "{ts} web1 sshd[{pid}]: Invalid user test from 192.0.{a}.{b} port {port}",
+    "{ts} web1 sshd[{pid}]: pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost=203.0.{a}.{b}  user=root",
+    "2026-10-18 04:33:{sec:02d} - database_manager - ERROR - connection to 10.0.{a}.{b} refused",
+    "2026-10-18 04:33:{sec:02d} - ai_manager - WARNING - agent restart #{a}",
+]
+
+
+def generate_sample(path: str, size_mb: int):
+    """Write a synthetic auth/syslog file of about size_mb megabytes"""
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            batch = []
+            for _ in range(10000):
+                templates = INCIDENT_LINES if rng.random() < 0.02 else ROUTINE_LINES
+                batch.append(rng.choice(templates).format(
+                    ts="Oct 18 04:33:13", pid=rng.randint(100, 99999), port=rng.randint(1024, 65535),
+                    a=rng.randint(0, 255), b=rng.randint(0, 255), sec=rng.randint(0, 59)
+                ))
+            chunk = '\n'.join(batch) + '\n'
+            f.write(chunk)
+            written += len(chunk)
+
+
+def load_log_patterns():
+    config_path = Path(__file__).parent.parent.parent / 'configs' / 'config.yaml'
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    patterns = config.get('agents', {}).get('log_analyzer', {}).get('patterns', {})
+    return [(pattern_type, pattern) for pattern_type, pattern_list in patterns.items() for pattern in pattern_list]
+
+
+def scan_legacy(path: str, log_patterns, auth_patterns):
+    """Previous behaviour: re.search per pattern per line"""
+    findings = failed_logins = 0
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            for _, pattern in log_patterns:
+                if re.search(pattern, line, re.IGNORECASE):
+                    findings += 1
+            for pattern in auth_patterns:
+                if re.search(pattern, line):
+                    failed_logins += 1
+                    break
+    return findings, failed_logins
+
+
+def scan_matcher(path: str, log_patterns, auth_matcher):
+    log_matcher = PatternMatcher(log_patterns, re.IGNORECASE)
+    findings = failed_logins = 0
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            findings += len(log_matcher.match_all(line))
+            if auth_matcher.match_first(line):
+                failed_logins += 1
+    return findings, failed_logins
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    sample = sys.argv[2] if len(sys.argv) > 2 else None
+    
+    log_patterns = load_log_patterns()
+    auth_matcher = SecurityMonitor.FAILED_LOGIN_MATCHER
+    auth_patterns = [pattern for _, pattern, _ in auth_matcher.entries]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        if sample is None:
+            sample = os.path.join(tmp, 'auth_sample.log')
+            print(f"Generating {size_mb} MB sample...")
+            generate_sample(sample, size_mb)
+        size = os.path.getsize(sample) / 1024 / 1024
+        print(f"Sample: {sample} ({size:.0f} MB), {len(log_patterns)} log patterns, {len(auth_patterns)} auth patterns")
+        
+        results = {}
+        for label, scan, args in [
+            ("Before (re.search per pattern)", scan_legacy, (log_patterns, auth_patterns)),
+            ("After  (PatternMatcher)       ", scan_matcher, (log_patterns, auth_matcher)),
+        ]:
+            start = time.perf_counter()
+            results[label] = scan(sample, *args)
+            elapsed = time.perf_counter() - start
+            print(f"  {label}: {elapsed:7.1f}s  {size / elapsed:6.1f} MB/s  "
+                  f"findings={results[label][0]} failed_logins={results[label][1]}")
+        
+        before, after = results.values()
+        print(f"  Results identical: {before == after}")
+
+
+if __name__ == "__main__":
+    main()
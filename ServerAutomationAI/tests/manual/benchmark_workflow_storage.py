@@ -0,0 +1,101 @@
+"""
+Manual WorkflowStorage Throughput Benchmark
+
+Compares workflows/second for the pooled storage (persistent connections,
+WAL, single writer) against the legacy connection-per-operation behaviour.
+Each simulated workflow mirrors a delivery pipeline: create, start, then
+save a step and update progress per task, then complete.
+
+Run with: python tests/manual/benchmark_workflow_storage.py [workflows] [tasks] [concurrency]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+import aiosqlite
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from dev_platform.core.workflow_storage import WorkflowStorage
+
+
+class LegacyWorkflowStorage(WorkflowStorage):
+    """WorkflowStorage with the previous open-per-operation connections"""
+    
+    @asynccontextmanager
+    async def _get_connection(self):
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("PRAGMA foreign_keys = ON")
+            yield db
+    
+    _get_write_connection = _get_connection
+
+
+async def run_workflow(storage: WorkflowStorage, workflow_id: str, tasks: int):
+    """Persist one simulated delivery pipeline"""
+    await storage.save_workflow({
+        "workflow_id": workflow_id,
+        "workflow_type": "delivery_pipeline",
+        "status": "pending",
+        "parameters": {"tasks": tasks},
+        "created_at": datetime.now().isoformat(),
+        "total_steps": tasks
+    })
+    await storage.start_workflow_transition(workflow_id)
+    
+    for step in range(1, tasks + 1):
+        await storage.save_step(workflow_id, {
+            "step_number": step,
+            "title": f"Task {step}",
+            "status": "completed",
+            "result": {"files": [f"file_{step}.py"]}
+        })
+        await storage.update_workflow_progress(workflow_id, step / tasks * 100, step, tasks)
+    
+    await storage.complete_workflow_transition(workflow_id, {"success": True})
+
+
+async def benchmark(storage_cls, db_path: str, workflows: int, tasks: int, concurrency: int) -> float:
+    """Return workflows/second for a storage implementation"""
+    storage = storage_cls(db_path)
+    await storage.initialize_schema()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def bounded(index: int):
+        async with semaphore:
+            await run_workflow(storage, f"wf_{index}", tasks)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(workflows)))
+    elapsed = time.perf_counter() - start
+    
+    await storage.close()
+    return workflows / elapsed
+
+
+async def main():
+    workflows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    tasks = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Workflows: {workflows}, tasks/workflow: {tasks}, concurrency: {concurrency}")
+        
+        legacy = await benchmark(LegacyWorkflowStorage, str(Path(tmp) / "legacy.db"),
+                                 workflows, tasks, concurrency)
+        print(f"  Before (connection per operation): {legacy:8.1f} workflows/s")
+        
+        pooled = await benchmark(WorkflowStorage, str(Path(tmp) / "pooled.db"),
+                                 workflows, tasks, concurrency)
+        print(f"  After  (pooled, WAL, single writer): {pooled:8.1f} workflows/s")
+        print(f"  Speedup: {pooled / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
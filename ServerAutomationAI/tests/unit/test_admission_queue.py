@@ -0,0 +1,154 @@
+"""
+Unit tests for WorkflowAdmissionQueue
+Tests priority ordering, worker and type quotas, backpressure and metrics
+"""
+
+import asyncio
+
+import pytest
+
+from dev_platform.core.admission_queue import WorkflowAdmissionQueue, AdmissionRejected
+
+
+async def run_in_slot(admission, workflow_id, started, release):
+    """Hold an execution slot until `release` is set"""
+    async with admission.slot(workflow_id):
+        started.append(workflow_id)
+        await release.wait()
+
+
+class TestOrdering:
+    """Test slot assignment order and limits"""
+    
+    @pytest.mark.asyncio
+    async def test_max_workers_limits_running(self):
+        """Only max_workers workflows hold a slot at once"""
+        admission = WorkflowAdmissionQueue(max_workers=2)
+        started, release = [], asyncio.Event()
+        for workflow_id in ("a", "b", "c"):
+            admission.submit(workflow_id, "custom")
+        tasks = [asyncio.create_task(run_in_slot(admission, w, started, release)) for w in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        
+        assert started == ["a", "b"]
+        assert admission.get_stats()["queue_depth"] == 1
+        
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started == ["a", "b", "c"]
+        assert admission.get_stats()["completed"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_higher_priority_runs_first(self):
+        """Waiting workflows are admitted by priority, FIFO within a priority"""
+        admission = WorkflowAdmissionQueue(max_workers=1)
+        started, release = [], asyncio.Event()
+        admission.submit("blocker", "custom")
+        blocker = asyncio.create_task(run_in_slot(admission, "blocker", started, release))
+        await asyncio.sleep(0)
+        
+        admission.submit("low", "custom", priority=0)
+        admission.submit("high", "custom", priority=5)
+        admission.submit("low2", "custom", priority=0)
+        tasks = [asyncio.create_task(run_in_slot(admission, w, started, release)) for w in ("low", "high", "low2")]
+        await asyncio.sleep(0.01)
+        
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+        assert started == ["blocker", "high", "low", "low2"]
+    
+    @pytest.mark.asyncio
+    async def test_type_quota_lets_other_types_through(self):
+        """A type at its quota does not block other workflow types"""
+        admission = WorkflowAdmissionQueue(max_workers=3, type_quotas={"regression": 1})
+        started, release = [], asyncio.Event()
+        for workflow_id, workflow_type in (("r1", "regression"), ("r2", "regression"), ("m1", "maintenance")):
+            admission.submit(workflow_id, workflow_type)
+        tasks = [asyncio.create_task(run_in_slot(admission, w, started, release)) for w in ("r1", "r2", "m1")]
+        await asyncio.sleep(0.01)
+        
+        assert started == ["r1", "m1"]
+        assert admission.get_stats()["running_by_type"] == {"regression": 1, "maintenance": 1}
+        
+        release.set()
+        await asyncio.gather(*tasks)
+        assert started[-1] == "r2"
+
+
+class TestBackpressure:
+    """Test rejection, cancellation and metrics"""
+    
+    def test_full_queue_rejects_with_retry_after(self):
+        """Submits beyond max_queue_depth raise AdmissionRejected"""
+        admission = WorkflowAdmissionQueue(max_workers=1, max_queue_depth=2)
+        assert admission.submit("a", "custom") == 0
+        assert admission.submit("b", "custom", priority=1) == 0
+        
+        with pytest.raises(AdmissionRejected) as exc_info:
+            admission.submit("c", "custom")
+        
+        assert exc_info.value.retry_after >= 1.0
+        stats = admission.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["admitted"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancel_while_waiting_removes_from_queue(self):
+        """A cancelled waiter leaves the queue and does not block later ones"""
+        admission = WorkflowAdmissionQueue(max_workers=1)
+        started, release = [], asyncio.Event()
+        for workflow_id in ("a", "b", "c"):
+            admission.submit(workflow_id, "custom")
+        tasks = {w: asyncio.create_task(run_in_slot(admission, w, started, release)) for w in ("a", "b", "c")}
+        await asyncio.sleep(0.01)
+        
+        tasks["b"].cancel()
+        await asyncio.gather(tasks["b"], return_exceptions=True)
+        assert not admission.is_queued("b")
+        
+        release.set()
+        await asyncio.gather(tasks["a"], tasks["c"])
+        assert started == ["a", "c"]
+    
+    @pytest.mark.asyncio
+    async def test_admitting_higher_priority_wakes_waiters(self):
+        """A waiter parked behind a newly admitted item takes a free slot right away"""
+        admission = WorkflowAdmissionQueue(max_workers=4)
+        started, release = [], asyncio.Event()
+        admission.submit("a", "custom", priority=0)
+        admission.submit("b", "custom", priority=5)
+        tasks = [asyncio.create_task(run_in_slot(admission, w, started, release)) for w in ("a", "b")]
+        await asyncio.sleep(0.01)
+        
+        assert sorted(started) == ["a", "b"]
+        
+        release.set()
+        await asyncio.gather(*tasks)
+    
+    @pytest.mark.asyncio
+    async def test_remove_wakes_waiters(self):
+        """Removing the next queued item lets the waiter behind it run"""
+        admission = WorkflowAdmissionQueue(max_workers=4)
+        started, release = [], asyncio.Event()
+        admission.submit("a", "custom", priority=0)
+        admission.submit("b", "custom", priority=5)
+        task = asyncio.create_task(run_in_slot(admission, "a", started, release))
+        await asyncio.sleep(0.01)
+        assert started == []
+        
+        assert await admission.remove("b") is True
+        await asyncio.sleep(0.01)
+        
+        assert started == ["a"]
+        assert await admission.remove("b") is False
+        release.set()
+        await asyncio.wait_for(task, timeout=1.0)
+    
+    @pytest.mark.asyncio
+    async def test_slot_requires_submit(self):
+        """Slots are only handed out to submitted workflows"""
+        admission = WorkflowAdmissionQueue()
+        
+        with pytest.raises(ValueError):
+            async with admission.slot("unknown"):
+                pass
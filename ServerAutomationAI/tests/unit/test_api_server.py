@@ -5,7 +5,7 @@ import pytest
 import httpx
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from dev_platform.web.api_server import app, get_coordinator, get_storage, get_metrics
+from dev_platform.web.api_server import app, get_coordinator, get_storage, get_metrics, get_current_user
 
 
 class TestAPIEndpoints:
@@ -141,6 +141,60 @@ class TestAPIEndpoints:
         
         app.dependency_overrides.clear()
     
+    @pytest.mark.asyncio
+    async def test_stream_finished_workflow_sends_final_state(self, client):
+        """Streaming a workflow that is no longer running ends immediately"""
+        mock_coordinator = MagicMock()
+        mock_coordinator.get_progress_stream = MagicMock(side_effect=ValueError("not running"))
+        mock_storage = AsyncMock()
+        mock_storage.get_workflow = AsyncMock(return_value={
+            "workflow_id": "wf-123",
+            "status": "completed"
+        })
+        
+        app.dependency_overrides[get_coordinator] = lambda: mock_coordinator
+        app.dependency_overrides[get_storage] = lambda: mock_storage
+        app.dependency_overrides[get_current_user] = lambda: {"user_id": "test"}
+        
+        response = await client.get("/api/workflows/wf-123/stream")
+        
+        assert response.status_code == 200
+        events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+        assert len(events) == 2
+        assert '"status": "completed"' in events[0]
+        assert '"type": "end"' in events[1]
+        
+        app.dependency_overrides.clear()
+    
+    @pytest.mark.asyncio
+    async def test_stream_unknown_workflow_not_found(self, client):
+        """Streaming an unknown workflow returns 404"""
+        mock_coordinator = MagicMock()
+        mock_coordinator.get_progress_stream = MagicMock(side_effect=ValueError("not running"))
+        mock_storage = AsyncMock()
+        mock_storage.get_workflow = AsyncMock(return_value=None)
+        
+        app.dependency_overrides[get_coordinator] = lambda: mock_coordinator
+        app.dependency_overrides[get_storage] = lambda: mock_storage
+        app.dependency_overrides[get_current_user] = lambda: {"user_id": "test"}
+        
+        response = await client.get("/api/workflows/wf-999/stream")
+        
+        assert response.status_code == 404
+        
+        app.dependency_overrides.clear()
+    
+    def test_start_request_priority_is_bounded(self):
+        """Client-supplied priority is limited to 0-10"""
+        from pydantic import ValidationError
+        from dev_platform.web.api_server import WorkflowStartRequest
+        
+        fields = {"workflow_type": "delivery_pipeline", "project_name": "demo", "user_request": "Build"}
+        assert WorkflowStartRequest(**fields, priority=10).priority == 10
+        for priority in (-1, 11, 1000):
+            with pytest.raises(ValidationError):
+                WorkflowStartRequest(**fields, priority=priority)
+    
     @pytest.mark.asyncio
     async def test_agent_status_requires_auth(self, client):
         """Agent status endpoint should require authentication"""
@@ -211,6 +265,55 @@ class TestMetricsProvider:
         assert "memory_percent" in metrics1
         assert "disk_percent" in metrics1
     
+    @pytest.mark.asyncio
+    async def test_metrics_provider_reads_sampler_snapshot(self):
+        """Test that requests read the background sampler's snapshot, not psutil"""
+        from dev_platform.web.metrics_provider import MetricsProvider
+        from tools.metrics_sampler import MetricsSampler
+        
+        sampler = MetricsSampler(interval=60, top_processes=0)
+        sampler.start()
+        try:
+            provider = MetricsProvider(sampler=sampler)
+            with patch("tools.metrics_sampler.psutil") as mock_psutil:
+                metrics = await provider.get_system_metrics()
+            mock_psutil.cpu_percent.assert_not_called()
+        finally:
+            sampler.stop()
+        
+        snapshot = sampler.snapshot
+        assert metrics["cpu_percent"] == snapshot["cpu"]["percent"]
+        assert metrics["memory_percent"] == snapshot["memory"]["percent"]
+        assert metrics["disk_percent"] == snapshot["disk"]["percent"]
+        assert metrics["timestamp"] == snapshot["timestamp"]
+    
+    @pytest.mark.asyncio
+    async def test_metrics_provider_history_rollups(self, tmp_path):
+        """Test that history is read back from a saved store as rollup buckets"""
+        import time
+        from dev_platform.web.metrics_provider import MetricsProvider
+        from tools.metrics_store import MetricsStore
+        
+        path = str(tmp_path / "metrics.bin")
+        writer = MetricsStore(path)
+        now = int(time.time())
+        for offset in range(120):
+            writer.record({"cpu.percent": float(offset % 10)}, timestamp=now - 119 + offset)
+        writer.save()
+        
+        provider = MetricsProvider(store=MetricsStore(path))
+        history = await provider.get_metrics_history("cpu.percent", minutes=2, max_points=10)
+        
+        assert history["resolution"] == 60
+        assert 2 <= len(history["points"]) <= 3
+        assert sum(point["count"] for point in history["points"]) == 120
+        assert min(point["min"] for point in history["points"]) == 0.0
+        assert max(point["max"] for point in history["points"]) == 9.0
+        
+        fine = await provider.get_metrics_history("cpu.percent", minutes=2, max_points=500)
+        assert fine["resolution"] == 1
+        assert len(fine["points"]) == 120
+    
     @pytest.mark.asyncio
     async def test_metrics_provider_singleton(self):
         """Test that get_metrics_provider returns singleton"""
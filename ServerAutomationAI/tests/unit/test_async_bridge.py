@@ -0,0 +1,112 @@
+"""
+Unit tests for AsyncBridge
+Tests loop reuse, sync calls from async context, timeouts and metrics
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from dev_platform.core.async_bridge import AsyncBridge, get_async_bridge
+from dev_platform.core.workflow_storage import WorkflowStorage
+
+
+@pytest.fixture
+def bridge():
+    """Private bridge, shut down after each test"""
+    bridge = AsyncBridge(default_timeout=5.0, name="async-bridge-test")
+    yield bridge
+    bridge.shutdown()
+
+
+async def current_loop_and_thread():
+    return asyncio.get_running_loop(), threading.current_thread()
+
+
+class TestBridgeExecution:
+    """Test running coroutines through the shared loop"""
+    
+    def test_calls_reuse_one_loop_and_thread(self, bridge):
+        """No thread or loop is created per call"""
+        first = bridge.run(current_loop_and_thread())
+        second = bridge.run(current_loop_and_thread())
+        
+        assert first == second
+        assert first[1] is not threading.current_thread()
+        # Count only bridge threads: other tests' worker threads may still be exiting
+        bridge_threads = [t for t in threading.enumerate() if t.name == bridge.name]
+        assert bridge_threads == [first[1]]
+    
+    @pytest.mark.asyncio
+    async def test_works_from_running_loop(self, bridge):
+        """Sync callers inside an event loop do not hit 'loop already running'"""
+        loop, _ = bridge.run(current_loop_and_thread())
+        
+        assert loop is not asyncio.get_running_loop()
+    
+    def test_exceptions_propagate(self, bridge):
+        """Errors raised by the coroutine reach the sync caller"""
+        async def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            bridge.run(fail())
+        assert bridge.get_stats()["errors"] == 1
+    
+    def test_timeout_cancels_coroutine(self, bridge):
+        """A timed-out coroutine is cancelled on the loop"""
+        cancelled = threading.Event()
+        
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        with pytest.raises(TimeoutError):
+            bridge.run(slow(), timeout=0.05)
+        
+        assert cancelled.wait(1.0)
+        assert bridge.get_stats()["timeouts"] == 1
+    
+    def test_run_from_bridge_loop_is_rejected(self, bridge):
+        """Re-entrant run() would deadlock, so it raises instead"""
+        async def reenter():
+            bridge.run(asyncio.sleep(0))
+        
+        with pytest.raises(RuntimeError):
+            bridge.run(reenter())
+    
+    def test_stats_track_latency(self, bridge):
+        """Calls are counted and latencies recorded"""
+        for _ in range(3):
+            bridge.run(asyncio.sleep(0))
+        
+        stats = bridge.get_stats()
+        assert stats["running"] is True
+        assert stats["calls"] == 3
+        assert stats["in_flight"] == 0
+        assert stats["total_p95_ms"] >= stats["dispatch_avg_ms"] >= 0.0
+
+
+class TestStorageOnBridge:
+    """Test WorkflowStorage pools for bridged calls"""
+    
+    @pytest.mark.asyncio
+    async def test_bridge_calls_do_not_claim_app_pool(self, test_db_path):
+        """Bridged storage calls use their own pool; the app loop keeps its pool"""
+        storage = WorkflowStorage(test_db_path)
+        await storage.initialize_schema()
+        app_pool = storage._pool
+        
+        assert get_async_bridge().run(storage.is_empty()) is True
+        assert storage._bridge_pool is not None
+        assert storage._bridge_pool.loop is get_async_bridge().loop
+        
+        assert await storage.is_empty() is True
+        assert storage._pool is app_pool
+        
+        await storage.close()
+        assert storage._pool is None and storage._bridge_pool is None
@@ -11,6 +11,8 @@ from pathlib import Path
 
 from dev_platform.agents.ops_coordinator_agent import OpsCoordinatorAgent
 from dev_platform.core.workflow_storage import WorkflowStorage
+from dev_platform.core.admission_queue import WorkflowAdmissionQueue, AdmissionRejected
+from dev_platform.core.progress_coalescer import ProgressQueue
 from dev_platform.agents.schemas import (
     WorkflowType, WorkflowStatus,
     AgentCommand, AgentResult
@@ -26,6 +28,7 @@ async def workflow_storage(test_db_path):
     await storage.initialize_schema()
     yield storage
     # Cleanup
+    await storage.close()
     db_path = Path(test_db_path)
     if db_path.exists():
         db_path.unlink()
@@ -319,6 +322,34 @@ class TestAsyncExecutorBehavior:
         assert 75.0 in percentages
         assert 100.0 in percentages
     
+    @pytest.mark.asyncio
+    async def test_delivery_pipeline_task_results_in_plan_order(self, async_ops_agent):
+        """Task results keep plan order and carry their task id"""
+        plan = {"tasks": [
+            {"id": 1, "title": "Slow", "dependencies": []},
+            {"id": 2, "title": "Fast", "dependencies": []},
+            {"id": 3, "title": "Blocked", "dependencies": [2]}
+        ]}
+        
+        async def dispatch(command):
+            if command.agent_id == "planner":
+                return AgentResult(agent_id="planner", success=True, result={"plan": plan})
+            if command.action == "generate_code":
+                task = command.parameters["task"]
+                await asyncio.sleep(0.05 if task["id"] == 1 else 0)
+                return AgentResult(agent_id="code_executor", success=task["id"] == 1, result={})
+            return AgentResult(agent_id=command.agent_id, success=True, result={})
+        
+        with patch.object(async_ops_agent, '_dispatch_agent_command_async', side_effect=dispatch):
+            result = await async_ops_agent._execute_delivery_pipeline_async(
+                "wf_delivery_002", {"user_request": "Build"}, asyncio.Queue(), asyncio.Event()
+            )
+        
+        task_results = [r for r in result["results"] if r.task_id is not None]
+        assert [r.task_id for r in task_results] == [1, 2, 3]
+        assert [r.success for r in task_results] == [True, False, False]
+        assert "skipped" in task_results[2].error
+    
     @pytest.mark.asyncio
     async def test_regression_workflow_executor(self, async_ops_agent):
         """Test regression workflow executor"""
@@ -534,6 +565,37 @@ class TestPersistenceIntegration:
         assert retrieved["completed_at"] is not None
         assert retrieved["progress_percent"] == 100.0
     
+    @pytest.mark.asyncio
+    async def test_progress_events_update_hot_state_and_storage(self, async_ops_agent):
+        """Progress events update in-memory state and are persisted via the coalescer"""
+        workflow_id = "wf_persist_003"
+        workflow = {
+            "workflow_id": workflow_id,
+            "workflow_type": WorkflowType.DELIVERY_PIPELINE.value,
+            "status": WorkflowStatus.RUNNING.value,
+            "created_at": datetime.now().isoformat(),
+            "parameters": {}
+        }
+        async_ops_agent.active_workflows[workflow_id] = workflow
+        await async_ops_agent.storage.save_workflow(workflow)
+        
+        queue = async_ops_agent._create_progress_queue(workflow_id)
+        for percent in (25.0, 50.0, 62.5):
+            await queue.put({
+                "workflow_id": workflow_id,
+                "current_step": 2,
+                "total_steps": 4,
+                "progress_percent": percent
+            })
+        
+        assert workflow["progress_percent"] == 62.5
+        
+        await async_ops_agent._progress_coalescer.flush(workflow_id)
+        retrieved = await async_ops_agent.storage.get_workflow(workflow_id)
+        assert retrieved["progress_percent"] == 62.5
+        assert retrieved["current_step"] == 2
+        assert async_ops_agent._progress_coalescer.get_stats()["writes"] == 1
+    
     @pytest.mark.asyncio
     async def test_workflow_not_found_transition(self, async_ops_agent):
         """Test transition helpers return False for non-existent workflow"""
@@ -541,6 +603,82 @@ class TestPersistenceIntegration:
         assert success is False
 
 
+class TestConnectionPool:
+    """Test pooled WorkflowStorage connections"""
+    
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, workflow_storage):
+        """Repeated operations share pooled connections"""
+        for i in range(5):
+            await workflow_storage.save_workflow({
+                "workflow_id": f"wf_pool_{i}",
+                "workflow_type": WorkflowType.MAINTENANCE.value,
+                "status": WorkflowStatus.PENDING.value,
+                "created_at": datetime.now().isoformat()
+            })
+            await workflow_storage.get_workflow(f"wf_pool_{i}")
+        
+        pool = workflow_storage._pool
+        # One writer plus a single reader for sequential access
+        assert len(pool._all) == 2
+    
+    @pytest.mark.asyncio
+    async def test_wal_mode_enabled(self, workflow_storage):
+        """Database uses WAL journaling"""
+        async with workflow_storage._get_connection() as db:
+            cursor = await db.execute("PRAGMA journal_mode")
+            row = await cursor.fetchone()
+        
+        assert row[0] == "wal"
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_do_not_lock(self, workflow_storage):
+        """Concurrent workflows queue on the single writer instead of failing"""
+        async def write_workflow(index):
+            workflow_id = f"wf_concurrent_{index}"
+            await workflow_storage.save_workflow({
+                "workflow_id": workflow_id,
+                "workflow_type": WorkflowType.DELIVERY_PIPELINE.value,
+                "status": WorkflowStatus.PENDING.value,
+                "created_at": datetime.now().isoformat()
+            })
+            for step in range(1, 6):
+                await workflow_storage.save_step(workflow_id, {
+                    "step_number": step, "title": f"Step {step}", "status": "completed"
+                })
+                assert await workflow_storage.update_workflow_progress(workflow_id, step * 20.0, step, 5)
+        
+        await asyncio.gather(*(write_workflow(i) for i in range(10)))
+        
+        workflows = await workflow_storage.get_active_workflows()
+        assert len(workflows) == 10
+        assert all(wf["progress_percent"] == 100.0 for wf in workflows)
+    
+    @pytest.mark.asyncio
+    async def test_failed_write_is_rolled_back(self, workflow_storage):
+        """Errors inside a write block roll back and release the writer"""
+        with pytest.raises(RuntimeError):
+            async with workflow_storage._get_write_connection() as db:
+                await db.execute("DELETE FROM workflows")
+                raise RuntimeError("boom")
+        
+        # Writer is usable again
+        await workflow_storage.save_alert({
+            "alert_type": "test", "severity": "info", "title": "t", "message": "m",
+            "timestamp": datetime.now().isoformat()
+        })
+        assert len(await workflow_storage.get_recent_alerts()) == 1
+    
+    def test_foreign_event_loop_uses_ephemeral_connection(self, test_db_path):
+        """Calls from a loop other than the pool's still work"""
+        storage = WorkflowStorage(test_db_path)
+        asyncio.run(storage.initialize_schema())
+        
+        # Original loop is closed: pool is rebuilt on the new loop
+        assert asyncio.run(storage.is_empty()) is True
+        asyncio.run(storage.close())
+
+
 class TestProgressStreamingEdgeCases:
     """Test progress streaming edge cases"""
     
@@ -606,6 +744,55 @@ class TestProgressStreamingEdgeCases:
         # All should complete
         assert len(async_ops_agent.workflow_history) >= 3
 
+    
+    @pytest.mark.asyncio
+    async def test_token_events_are_opt_in(self, async_ops_agent):
+        """Token events are only yielded when include_tokens=True"""
+        events = [
+            {"workflow_id": "wf_tokens", "type": "token", "content": "Hel"},
+            {"workflow_id": "wf_tokens", "progress_percent": 50.0, "message": "step"},
+            {"_complete": True}
+        ]
+        
+        queue = ProgressQueue()
+        async_ops_agent._progress_queues["wf_tokens"] = queue
+        default_stream = async_ops_agent.get_progress_stream("wf_tokens")
+        token_stream = async_ops_agent.get_progress_stream("wf_tokens", include_tokens=True)
+        for event in events:
+            queue.put_nowait(event)
+        
+        default_updates = [u async for u in default_stream]
+        token_updates = [u async for u in token_stream]
+        
+        assert [u.get("type") for u in default_updates] == [None]
+        assert [u.get("type") for u in token_updates] == ["token", None]
+    
+    @pytest.mark.asyncio
+    async def test_progress_queue_freed_after_completion(self, async_ops_agent, fake_executor_factory):
+        """Finished workflows release their progress queue; late streams are refused"""
+        workflow_id = "wf_stream_done"
+        async_ops_agent.active_workflows[workflow_id] = {
+            "workflow_id": workflow_id,
+            "workflow_type": WorkflowType.CUSTOM.value,
+            "status": WorkflowStatus.PENDING.value,
+            "created_at": datetime.now().isoformat(),
+            "parameters": {},
+            "steps": []
+        }
+        async_ops_agent._progress_queues[workflow_id] = async_ops_agent._create_progress_queue(workflow_id)
+        async_ops_agent._cancel_events[workflow_id] = asyncio.Event()
+        
+        stream = async_ops_agent.get_progress_stream(workflow_id)
+        fake_executor = fake_executor_factory(success=True, steps=3)
+        with patch.object(async_ops_agent, '_execute_custom_workflow_async', fake_executor):
+            await async_ops_agent._workflow_runner(workflow_id)
+        
+        updates = [u async for u in stream]
+        
+        assert updates
+        assert workflow_id not in async_ops_agent._progress_queues
+        with pytest.raises(ValueError):
+            async_ops_agent.get_progress_stream(workflow_id)
 
 # ========== Test New Unified Async Method ==========
 
@@ -719,5 +906,68 @@ class TestUnifiedAsyncMethod:
                 assert wf_id in async_ops_agent._cancel_events
 
 
+
+class TestAdmissionControl:
+    """Tests for bounded workflow admission in the coordinator"""
+    
+    @pytest.mark.asyncio
+    async def test_workflow_waits_for_free_slot(self, async_ops_agent, fake_executor_factory):
+        """With one slot, the second workflow stays pending until the first finishes"""
+        async_ops_agent._admission = WorkflowAdmissionQueue(max_workers=1)
+        fake_executor = fake_executor_factory(success=True, steps=3, delay=0.05)
+        
+        with patch.object(async_ops_agent, '_execute_custom_workflow_async', fake_executor):
+            first = await async_ops_agent.start_and_execute_workflow_async(WorkflowType.CUSTOM)
+            second = await async_ops_agent.start_and_execute_workflow_async(WorkflowType.CUSTOM)
+            await asyncio.sleep(0.02)
+            
+            assert async_ops_agent.get_admission_stats()["queue_depth"] == 1
+            assert async_ops_agent.active_workflows[second]["status"] == WorkflowStatus.PENDING.value
+            
+            await async_ops_agent._workflow_tasks[second]
+        
+        saved = await async_ops_agent.storage.get_workflow(second)
+        assert saved["queued_at"] is not None
+        assert saved["started_at"] >= saved["queued_at"]
+        assert first not in async_ops_agent.active_workflows
+        assert async_ops_agent.get_admission_stats()["completed"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancel_queued_workflow(self, async_ops_agent, fake_executor_factory):
+        """Cancelling a queued workflow never runs it and closes its stream"""
+        async_ops_agent._admission = WorkflowAdmissionQueue(max_workers=1)
+        fake_executor = fake_executor_factory(success=True, steps=3, delay=0.05)
+        
+        with patch.object(async_ops_agent, '_execute_custom_workflow_async', fake_executor):
+            first = await async_ops_agent.start_and_execute_workflow_async(WorkflowType.CUSTOM)
+            second = await async_ops_agent.start_and_execute_workflow_async(WorkflowType.CUSTOM)
+            await asyncio.sleep(0.01)
+            
+            stream = async_ops_agent.get_progress_stream(second)
+            assert await async_ops_agent.cancel_workflow_async(second) is True
+            updates = [update async for update in stream]
+            await async_ops_agent._workflow_tasks[first]
+        
+        assert updates == []
+        saved = await async_ops_agent.storage.get_workflow(second)
+        assert saved["status"] == WorkflowStatus.CANCELLED.value
+        assert saved["started_at"] is None
+        assert second not in async_ops_agent._workflow_tasks
+        assert second not in async_ops_agent._progress_queues
+    
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_without_creating_workflow(self, async_ops_agent):
+        """Backpressure: a full queue raises before anything is persisted"""
+        async_ops_agent._admission = WorkflowAdmissionQueue(max_workers=1, max_queue_depth=0)
+        
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await async_ops_agent.start_and_execute_workflow_async(WorkflowType.REGRESSION)
+        
+        assert exc_info.value.retry_after >= 1.0
+        assert async_ops_agent.active_workflows == {}
+        assert async_ops_agent._workflow_tasks == {}
+        assert async_ops_agent.get_admission_stats()["rejected"] == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--asyncio-mode=auto"])
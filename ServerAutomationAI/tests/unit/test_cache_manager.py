@@ -0,0 +1,147 @@
+"""
+Unit tests for CacheManager
+Tests write-behind batching of model usage rows and deferred cache writes
+"""
+
+import time
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch
+
+from dev_platform.core.cache_manager import CacheManager
+
+
+@pytest.fixture
+def cache_manager(tmp_path):
+    """CacheManager on a temp directory with the background flusher effectively idle"""
+    manager = CacheManager(
+        cache_dir=str(tmp_path / "cache"),
+        db_file=str(tmp_path / "state.db"),
+        flush_interval=3600,
+        flush_batch_size=10
+    )
+    yield manager
+    manager.close()
+
+
+def _count_usage_rows(db_file) -> int:
+    with sqlite3.connect(str(db_file)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM model_usage").fetchone()[0]
+
+
+class TestWriteBehindUsageLog:
+    """Test batched model usage logging"""
+
+    def test_database_uses_wal(self, cache_manager):
+        """Database is switched to WAL journal mode"""
+        with sqlite3.connect(str(cache_manager.db_file)) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_usage_is_buffered_until_flush(self, cache_manager):
+        """Rows are not written on the request path"""
+        cache_manager.log_model_usage("groq", "llama", 100, 0.5)
+
+        assert _count_usage_rows(cache_manager.db_file) == 0
+
+        cache_manager.flush()
+        assert _count_usage_rows(cache_manager.db_file) == 1
+
+    def test_flushes_when_batch_size_reached(self, cache_manager):
+        """A full batch wakes the background flusher instead of writing inline"""
+        flush_threads = []
+        original_flush = cache_manager.flush
+
+        def recording_flush():
+            flush_threads.append(threading.current_thread())
+            original_flush()
+
+        with patch.object(cache_manager, "flush", side_effect=recording_flush):
+            for _ in range(10):
+                cache_manager.log_model_usage("groq", "llama", 100, 0.5)
+
+            deadline = time.monotonic() + 5
+            while _count_usage_rows(cache_manager.db_file) < 10 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert _count_usage_rows(cache_manager.db_file) == 10
+        assert flush_threads and threading.current_thread() not in flush_threads
+
+    def test_buffer_is_capped(self, tmp_path):
+        """Rows beyond max_buffered_rows drop the oldest ones"""
+        manager = CacheManager(
+            cache_dir=str(tmp_path / "cache"),
+            db_file=str(tmp_path / "state.db"),
+            flush_interval=3600,
+            flush_batch_size=1000,
+            max_buffered_rows=5
+        )
+        for tokens in range(8):
+            manager.log_model_usage("groq", "llama", tokens, 0.5)
+
+        assert [row[2] for row in manager._usage_buffer] == [3, 4, 5, 6, 7]
+        assert manager.dropped_rows == 3
+        manager.close()
+
+    def test_buffer_is_not_locked_during_io(self, cache_manager):
+        """Rows can be logged while a flush is writing"""
+        cache_manager.log_model_usage("groq", "llama", 100, 0.5)
+        writing = threading.Event()
+        release = threading.Event()
+        original_set = cache_manager.cache.set
+
+        def slow_set(*args, **kwargs):
+            writing.set()
+            release.wait(5)
+            return original_set(*args, **kwargs)
+
+        cache_manager.cache_set_deferred("health_score_groq", 80)
+        with patch.object(cache_manager.cache, "set", side_effect=slow_set):
+            flusher = threading.Thread(target=cache_manager.flush)
+            flusher.start()
+            assert writing.wait(5)
+
+            cache_manager.log_model_usage("groq", "llama", 200, 0.5)
+            assert cache_manager.cache_get("health_score_groq") == 80
+            release.set()
+            flusher.join(5)
+
+        assert _count_usage_rows(cache_manager.db_file) == 1
+        assert len(cache_manager._usage_buffer) == 1
+
+    def test_stats_include_buffered_rows(self, cache_manager):
+        """Reads flush first so stats are never stale"""
+        cache_manager.log_model_usage("groq", "llama", 100, 0.5)
+        cache_manager.log_model_usage("groq", "llama", 0, 1.5, success=False)
+
+        stats = cache_manager.get_model_stats()
+
+        assert stats["groq"]["requests"] == 2
+        assert stats["groq"]["successful"] == 1
+
+    def test_close_flushes_pending_rows(self, cache_manager):
+        """Shutdown persists everything still buffered"""
+        cache_manager.log_model_usage("gemini", "flash", 50, 0.2)
+        cache_manager.close()
+
+        assert _count_usage_rows(cache_manager.db_file) == 1
+
+
+class TestDeferredCacheWrites:
+    """Test coalesced cache writes"""
+
+    def test_pending_value_is_readable(self, cache_manager):
+        """cache_get sees deferred values before they are flushed"""
+        cache_manager.cache_set_deferred("health_score_groq", 80, expire=60)
+
+        assert cache_manager.cache_get("health_score_groq") == 80
+        assert cache_manager.cache.get("health_score_groq") is None
+
+    def test_writes_are_coalesced(self, cache_manager):
+        """Only the latest value per key is written"""
+        for score in (95, 90, 85):
+            cache_manager.cache_set_deferred("health_score_groq", score)
+        cache_manager.flush()
+
+        assert cache_manager.cache.get("health_score_groq") == 85
+        assert cache_manager._deferred_cache == {}
@@ -0,0 +1,137 @@
+"""
+Unit tests for CodeSearchIndex
+Tests regex trigram extraction, ignore rules, incremental refresh and search parity
+"""
+
+import re
+
+import pytest
+
+from dev_platform.tools.code_analyzer import CodeAnalyzer
+from dev_platform.tools.code_search_index import (
+    CodeSearchIndex, IgnoreRules, required_trigrams, walk_files
+)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Workspace with sources, ignored directories and a binary file"""
+    root = tmp_path / "ws"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "service.py").write_text(
+        "class UserManager:\n    def load_user(self):\n        return fetch('users')\n"
+    )
+    (root / "src" / "pkg" / "util.py").write_text("def helper():\n    return 42\n")
+    (root / "src" / "app.js").write_text("const manager = new UserManager();\n")
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "node_modules" / "lib" / "index.js").write_text("class UserManager {}\n")
+    (root / "build").mkdir()
+    (root / "build" / "out.py").write_text("class UserManager: pass\n")
+    (root / "logs").mkdir()
+    (root / "logs" / "app.log").write_text("UserManager started\n")
+    (root / "logs" / "keep.log").write_text("UserManager kept\n")
+    (root / "blob.bin").write_bytes(b"\xff\xfeUserManager\x00")
+    (root / ".gitignore").write_text("# build output\n/build/\n*.log\n!keep.log\n")
+    return root
+
+
+@pytest.fixture
+def index(workspace, tmp_path):
+    idx = CodeSearchIndex(str(workspace), index_dir=str(tmp_path / "index"), refresh_interval=0)
+    yield idx
+    idx.close()
+
+
+# ===== Regex planning =====
+
+@pytest.mark.parametrize("pattern,expected", [
+    ("load_user", [{b"loa", b"oad", b"ad_", b"d_u", b"_us", b"use", b"ser"}]),
+    ("Foo|Bar", [{b"foo"}, {b"bar"}]),
+    (r"class \w+Manager", [{b"cla", b"las", b"ass", b"ss "} | {b"man", b"ana", b"nag", b"age", b"ger"}]),
+    ("(abc)+def", [{b"abc", b"def"}]),
+])
+def test_required_trigrams(pattern, expected):
+    assert required_trigrams(pattern, re.IGNORECASE) == expected
+
+
+@pytest.mark.parametrize("pattern", [".*", "ab", "x?yzw?", "(abc)?", "abc|d", r"\w+"])
+def test_required_trigrams_unconstrained(pattern):
+    assert required_trigrams(pattern) is None
+
+
+# ===== Ignore rules =====
+
+def test_ignore_rules_semantics():
+    rules = IgnoreRules(["*.pyc", "/dist", "docs/**/draft.md", "cache/", "!important.pyc"])
+
+    assert rules.match("a/b/c.pyc", False) is True
+    assert rules.match("important.pyc", False) is False
+    assert rules.match("dist", True) is True
+    assert rules.match("src/dist", True) is None
+    assert rules.match("docs/a/b/draft.md", False) is True
+    assert rules.match("cache", True) is True
+    assert rules.match("cache", False) is None
+
+
+def test_walk_prunes_ignored_directories(workspace):
+    files = sorted(path for path, _ in walk_files(workspace))
+
+    assert files == [".gitignore", "blob.bin", "logs/keep.log", "src/app.js", "src/pkg/service.py", "src/pkg/util.py"]
+
+
+# ===== Index =====
+
+def test_candidates_narrow_to_matching_files(index):
+    assert index.candidates("UserManager", re.IGNORECASE) == ["logs/keep.log", "src/app.js", "src/pkg/service.py"]
+    assert index.candidates("UserManager", re.IGNORECASE, "src", "*.py") == ["src/pkg/service.py"]
+    assert index.candidates("no_such_identifier") == []
+    # Unconstrained patterns return every text file (binary files never)
+    assert "blob.bin" not in index.candidates(".")
+
+
+def test_refresh_is_incremental(index, workspace):
+    assert index.refresh(force=True)["added"] == 6
+    assert index.refresh(force=True) == {"added": 0, "updated": 0, "removed": 0}
+
+    (workspace / "src" / "pkg" / "util.py").write_text("def helper():\n    return fetch_config()\n")
+    (workspace / "src" / "pkg" / "service.py").unlink()
+    (workspace / "src" / "new.py").write_text("fetch_config = None\n")
+
+    assert index.refresh(force=True) == {"added": 1, "updated": 1, "removed": 1}
+    assert index.candidates("fetch_config") == ["src/new.py", "src/pkg/util.py"]
+    assert index.candidates("load_user") == []
+
+
+def test_index_persists_across_instances(index, workspace, tmp_path):
+    index.refresh(force=True)
+
+    reopened = CodeSearchIndex(str(workspace), index_dir=str(tmp_path / "index"), refresh_interval=0)
+    try:
+        assert reopened.refresh(force=True) == {"added": 0, "updated": 0, "removed": 0}
+        assert reopened.candidates("helper") == ["src/pkg/util.py"]
+    finally:
+        reopened.close()
+
+
+# ===== CodeAnalyzer =====
+
+@pytest.mark.parametrize("pattern,file_pattern", [
+    ("usermanager", "*"),
+    (r"return \w+", "*.py"),
+    ("fetch|helper", "*"),
+    ("42", "*"),
+])
+def test_search_code_matches_full_scan_outside_ignored(workspace, index, pattern, file_pattern):
+    indexed = CodeAnalyzer(str(workspace), index=index).search_code(pattern, "src", file_pattern)
+    scanned = CodeAnalyzer(str(workspace), use_index=False).search_code(pattern, "src", file_pattern)
+
+    assert indexed["success"] is True
+    assert sorted(indexed["matches"], key=lambda m: (m["file"], m["line"])) == \
+        sorted(scanned["matches"], key=lambda m: (m["file"], m["line"]))
+    assert indexed["files_searched"] <= scanned["files_searched"]
+
+
+def test_search_code_skips_ignored_files(workspace, index):
+    result = CodeAnalyzer(str(workspace), index=index).search_code("UserManager", case_sensitive=True)
+
+    assert sorted(m["file"] for m in result["matches"]) == ["logs/keep.log", "src/app.js", "src/pkg/service.py"]
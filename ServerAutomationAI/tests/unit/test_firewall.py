@@ -0,0 +1,164 @@
+"""
+Unit tests for FirewallBlocker
+Tests the ipset/iptables scripts with subprocess.run mocked
+"""
+
+import subprocess
+import pytest
+from unittest.mock import patch
+
+from tools.firewall import FirewallBlocker
+
+
+def completed(returncode=0, stdout="", stderr=""):
+    return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr=stderr)
+
+
+@pytest.fixture
+def run():
+    with patch("tools.firewall.subprocess.run", return_value=completed()) as mock_run:
+        yield mock_run
+
+
+def commands(mock_run):
+    return [c.args[0] for c in mock_run.call_args_list]
+
+
+def stdin_of(mock_run, command):
+    for c in mock_run.call_args_list:
+        if c.args[0][:len(command)] == command:
+            return c.kwargs["input"]
+    raise AssertionError(f"{command} was not run")
+
+
+class TestIpsetBackend:
+    """Test one ipset restore per batch"""
+
+    def test_batch_is_one_restore(self, run):
+        blocker = FirewallBlocker(backend="ipset", timeout_seconds=3600)
+
+        blocked, failed = blocker.block(["1.2.3.4", "5.6.7.8"])
+
+        assert (blocked, failed) == (["1.2.3.4", "5.6.7.8"], [])
+        assert stdin_of(run, ["sudo", "ipset", "-exist", "restore"]) == (
+            "add ai_blocked_ips 1.2.3.4 timeout 3600\n"
+            "add ai_blocked_ips 5.6.7.8 timeout 3600\n"
+        )
+
+    def test_set_and_rule_created_once(self, run):
+        # iptables -C fails the first time: the rule is not there yet
+        run.side_effect = lambda args, **kwargs: completed(1 if args[1:3] == ["iptables", "-C"] else 0)
+        blocker = FirewallBlocker(backend="ipset", timeout_seconds=60)
+
+        blocker.block(["1.2.3.4"])
+        blocker.block(["5.6.7.8"])
+
+        issued = commands(run)
+        assert issued[0] == ["sudo", "ipset", "-exist", "create", "ai_blocked_ips", "hash:ip", "timeout", "60"]
+        assert ["sudo", "iptables", "-I", "INPUT", "-m", "set", "--match-set", "ai_blocked_ips", "src", "-j", "DROP"] in issued
+        assert sum(1 for args in issued if "create" in args) == 1
+        assert sum(1 for args in issued if args[1:3] == ["ipset", "-exist"] and "restore" in args) == 2
+
+    def test_permanent_entries(self, run):
+        blocker = FirewallBlocker(backend="ipset", timeout_seconds=0)
+
+        blocker.block(["1.2.3.4"])
+
+        assert ["sudo", "ipset", "-exist", "create", "ai_blocked_ips", "hash:ip"] in commands(run)
+        assert stdin_of(run, ["sudo", "ipset", "-exist", "restore"]) == "add ai_blocked_ips 1.2.3.4\n"
+        assert not blocker.expires
+
+    def test_per_address_timeouts(self, run):
+        blocker = FirewallBlocker(backend="ipset", timeout_seconds=3600, use_sudo=False)
+
+        blocker.block(["1.2.3.4", "5.6.7.8"], timeouts={"1.2.3.4": 120})
+
+        assert stdin_of(run, ["ipset", "-exist", "restore"]) == (
+            "add ai_blocked_ips 1.2.3.4 timeout 120\n"
+            "add ai_blocked_ips 5.6.7.8 timeout 3600\n"
+        )
+        assert blocker.expires
+
+    def test_timeout_clamped_to_ipset_maximum(self, run):
+        blocker = FirewallBlocker(backend="ipset", timeout_seconds=10 ** 9)
+
+        assert blocker.timeout_seconds == FirewallBlocker.MAX_IPSET_TIMEOUT
+
+    def test_restore_failure_fails_batch(self, run):
+        run.side_effect = lambda args, **kwargs: completed(1, stderr="boom") if "restore" in args else completed()
+        blocker = FirewallBlocker(backend="ipset")
+
+        assert blocker.block(["1.2.3.4"]) == ([], ["1.2.3.4"])
+
+    def test_create_failure_fails_batch(self, run):
+        run.return_value = completed(1, stderr="no ipset")
+        blocker = FirewallBlocker(backend="ipset")
+
+        assert blocker.block(["1.2.3.4"]) == ([], ["1.2.3.4"])
+        assert not any("restore" in args for args in commands(run))
+
+    def test_auto_prefers_ipset(self):
+        with patch("tools.firewall.shutil.which", return_value="/usr/sbin/ipset"):
+            assert FirewallBlocker().backend == "ipset"
+        with patch("tools.firewall.shutil.which", return_value=None):
+            assert FirewallBlocker().backend == "iptables"
+
+
+class TestIptablesBackend:
+    """Test one iptables-restore per batch, skipping existing rules"""
+
+    IPTABLES_SAVE = (
+        "*filter\n"
+        ":INPUT ACCEPT [0:0]\n"
+        "-A INPUT -s 1.2.3.4/32 -j DROP\n"
+        "-A INPUT -s 9.9.9.9/32 -p tcp -j DROP\n"
+        "-A INPUT -i lo -j ACCEPT\n"
+        "COMMIT\n"
+    )
+
+    def test_missing_rules_added_in_one_restore(self, run):
+        run.side_effect = lambda args, **kwargs: (
+            completed(stdout=self.IPTABLES_SAVE) if "iptables-save" in args else completed()
+        )
+        blocker = FirewallBlocker(backend="iptables")
+
+        blocked, failed = blocker.block(["1.2.3.4", "5.6.7.8", "9.9.9.9"])
+
+        assert (blocked, failed) == (["1.2.3.4", "5.6.7.8", "9.9.9.9"], [])
+        assert stdin_of(run, ["sudo", "iptables-restore", "--noflush"]) == (
+            "*filter\n"
+            "-A INPUT -s 5.6.7.8 -j DROP\n"
+            "-A INPUT -s 9.9.9.9 -j DROP\n"
+            "COMMIT\n"
+        )
+        assert not blocker.expires
+
+    def test_all_existing_skips_restore(self, run):
+        run.return_value = completed(stdout=self.IPTABLES_SAVE)
+        blocker = FirewallBlocker(backend="iptables")
+
+        assert blocker.block(["1.2.3.4"]) == (["1.2.3.4"], [])
+        assert commands(run) == [["sudo", "iptables-save", "-t", "filter"]]
+
+    def test_timeout_fails_batch(self, run):
+        run.side_effect = subprocess.TimeoutExpired("iptables-save", 30)
+        blocker = FirewallBlocker(backend="iptables")
+
+        assert blocker.block(["1.2.3.4"]) == ([], ["1.2.3.4"])
+
+
+class TestValidation:
+    """Test that only IPv4 addresses reach the firewall"""
+
+    def test_invalid_addresses_rejected(self, run):
+        blocker = FirewallBlocker(backend="ipset")
+
+        blocked, failed = blocker.block(["1.2.3.4", "not-an-ip", "1.2.3.4; rm -rf /", "::1", "300.1.1.1"])
+
+        assert blocked == ["1.2.3.4"]
+        assert failed == ["not-an-ip", "1.2.3.4; rm -rf /", "::1", "300.1.1.1"]
+        assert "rm" not in stdin_of(run, ["sudo", "ipset", "-exist", "restore"])
+
+    def test_nothing_valid_runs_nothing(self, run):
+        assert FirewallBlocker(backend="ipset").block(["bogus"]) == ([], ["bogus"])
+        run.assert_not_called()
@@ -0,0 +1,188 @@
+"""
+Unit tests for the bridge IgnoreMatcher
+Tests .gitignore semantics and directory pruning while listing files to sync
+"""
+
+from pathlib import Path
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+pytest.importorskip("paramiko")
+
+from bridge_tool.services.ignore_matcher import IgnoreMatcher
+from bridge_tool.services.sync_manager import SyncManager
+
+
+class TestNegation:
+    """Test that the last matching pattern wins"""
+
+    def test_negation_reincludes_file(self):
+        matcher = IgnoreMatcher(["*.log", "!keep.log"])
+        assert matcher.is_excluded("debug.log")
+        assert not matcher.is_excluded("keep.log")
+        assert not matcher.is_excluded("logs/keep.log")
+
+    def test_later_pattern_overrides_negation(self):
+        matcher = IgnoreMatcher(["*.log", "!keep.log", "keep.log"])
+        assert matcher.is_excluded("keep.log")
+
+    def test_negation_cannot_reinclude_file_in_excluded_directory(self):
+        """As in git, a file inside an excluded directory stays excluded"""
+        matcher = IgnoreMatcher(["build/", "!build/keep.txt"])
+        assert matcher.is_excluded("build/keep.txt")
+
+    def test_comments_and_blank_lines_ignored(self):
+        matcher = IgnoreMatcher(["# *.py", "", "   "])
+        assert matcher.rules == []
+        assert not matcher.is_excluded("main.py")
+
+
+class TestDirectoryOnly:
+    """Test patterns with a trailing slash"""
+
+    def test_trailing_slash_matches_directories_only(self):
+        matcher = IgnoreMatcher(["cache/"])
+        assert matcher.match("cache", is_dir=True)
+        assert matcher.match("sub/cache", is_dir=True)
+        assert not matcher.match("cache")
+
+    def test_files_below_excluded_directory(self):
+        matcher = IgnoreMatcher(["cache/"])
+        assert matcher.is_excluded("cache/data.bin")
+        assert matcher.is_excluded("a/b/cache/c/data.bin")
+        assert not matcher.is_excluded("a/cache.py")
+
+
+class TestAnchoring:
+    """Test patterns containing a slash"""
+
+    def test_leading_slash_anchors_to_root(self):
+        matcher = IgnoreMatcher(["/config.yaml"])
+        assert matcher.is_excluded("config.yaml")
+        assert not matcher.is_excluded("sub/config.yaml")
+
+    def test_middle_slash_anchors_to_root(self):
+        matcher = IgnoreMatcher(["docs/*.md"])
+        assert matcher.is_excluded("docs/readme.md")
+        assert not matcher.is_excluded("pkg/docs/readme.md")
+        assert not matcher.is_excluded("docs/sub/readme.md")
+
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        matcher = IgnoreMatcher(["*.pyc"])
+        assert matcher.is_excluded("a.pyc")
+        assert matcher.is_excluded("pkg/sub/a.pyc")
+
+
+class TestWildcards:
+    """Test *, ?, [...] and **"""
+
+    def test_star_does_not_cross_directories(self):
+        matcher = IgnoreMatcher(["src/*.py"])
+        assert matcher.is_excluded("src/main.py")
+        assert not matcher.is_excluded("src/pkg/main.py")
+
+    def test_question_mark_and_character_class(self):
+        matcher = IgnoreMatcher(["file?.txt", "v[0-9].bak", "x[!a].tmp"])
+        assert matcher.is_excluded("file1.txt")
+        assert not matcher.is_excluded("file10.txt")
+        assert matcher.is_excluded("v3.bak")
+        assert not matcher.is_excluded("va.bak")
+        assert matcher.is_excluded("xb.tmp")
+        assert not matcher.is_excluded("xa.tmp")
+
+    def test_leading_double_star(self):
+        matcher = IgnoreMatcher(["**/node_modules"])
+        assert matcher.is_excluded("node_modules", is_dir=True)
+        assert matcher.is_excluded("web/app/node_modules/pkg/index.js")
+
+    def test_trailing_double_star(self):
+        matcher = IgnoreMatcher(["logs/**"])
+        assert matcher.is_excluded("logs/a.log")
+        assert matcher.is_excluded("logs/2024/01/a.log")
+        assert not matcher.is_excluded("other/logs/a.log")
+
+    def test_middle_double_star(self):
+        matcher = IgnoreMatcher(["a/**/b.txt"])
+        assert matcher.is_excluded("a/b.txt")
+        assert matcher.is_excluded("a/x/y/b.txt")
+        assert not matcher.is_excluded("c/a/b.txt")
+
+
+class TestEscapes:
+    """Test backslash escapes"""
+
+    def test_escaped_hash_and_bang(self):
+        matcher = IgnoreMatcher(["\\#notes", "\\!important"])
+        assert matcher.is_excluded("#notes")
+        assert matcher.is_excluded("!important")
+
+    def test_escaped_wildcards_are_literal(self):
+        matcher = IgnoreMatcher(["data\\*.csv", "what\\?"])
+        assert matcher.is_excluded("data*.csv")
+        assert not matcher.is_excluded("data1.csv")
+        assert matcher.is_excluded("what?")
+        assert not matcher.is_excluded("whatx")
+
+    def test_trailing_spaces_stripped_unless_escaped(self):
+        matcher = IgnoreMatcher(["tmp.txt   ", "space\\ "])
+        assert matcher.is_excluded("tmp.txt")
+        assert matcher.is_excluded("space ")
+        assert not matcher.is_excluded("space")
+
+    def test_regex_metacharacters_are_literal(self):
+        matcher = IgnoreMatcher(["a+b(c).txt"])
+        assert matcher.is_excluded("a+b(c).txt")
+        assert not matcher.is_excluded("aab(c).txt")
+
+
+class TestPruning:
+    """Test that get_files_to_sync skips excluded directories entirely"""
+
+    def make_tree(self, tmp_path, patterns):
+        (tmp_path / ".bridgeignore").write_text("\n".join(patterns) + "\n")
+        for path in ["main.py", "build/out.bin", "build/deep/x.bin", "src/app.py", "src/cache/c.tmp", "debug.log"]:
+            target = tmp_path / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text("x")
+        return SyncManager(MagicMock(), {
+            'paths': {'local': {'root': str(tmp_path), 'exclude_file': str(tmp_path / '.bridgeignore')}}
+        })
+
+    def test_excluded_files_not_listed(self, tmp_path):
+        manager = self.make_tree(tmp_path, ["build/", "cache/", "*.log", ".bridgeignore"])
+
+        files = sorted(relative for _, relative in manager.get_files_to_sync())
+
+        assert files == ["main.py", "src/app.py"]
+
+    def test_excluded_directories_not_scanned(self, tmp_path):
+        manager = self.make_tree(tmp_path, ["build/", "cache/"])
+
+        import bridge_tool.services.sync_manager as sync_module
+        with patch.object(sync_module.os, "scandir", wraps=sync_module.os.scandir) as scandir:
+            manager.get_files_to_sync()
+
+        scanned = {call.args[0].replace(str(tmp_path.resolve()), "").strip("/") for call in scandir.call_args_list}
+        assert scanned == {"", "src"}
+
+
+class TestShippedBridgeignore:
+    """Test the project's own .bridgeignore"""
+
+    @pytest.fixture
+    def matcher(self):
+        root = Path(__file__).parents[2]
+        manager = SyncManager(MagicMock(), {
+            'paths': {'local': {'root': str(root), 'exclude_file': str(root / '.bridgeignore')}}
+        })
+        return manager.ignore_matcher
+
+    def test_environment_files_not_deployed(self, matcher):
+        for path in [".env", ".env.local", ".env.production", "dev_platform/.env.staging"]:
+            assert matcher.is_excluded(path), path
+        assert not matcher.is_excluded(".env.example")
+
+    def test_application_code_deployed(self, matcher):
+        assert not matcher.is_excluded("agents/security_monitor.py")
+        assert matcher.is_excluded("agents/__pycache__", is_dir=True)
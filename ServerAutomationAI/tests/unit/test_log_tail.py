@@ -0,0 +1,196 @@
+"""
+Unit tests for LogTailer
+Tests incremental reads, persisted offsets, rotation and truncation
+"""
+
+import os
+import pytest
+
+from tools.log_tail import LogTailer
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"")
+    return path
+
+
+@pytest.fixture
+def tailer(tmp_path):
+    return LogTailer(str(tmp_path / "state" / "offsets.json"))
+
+
+def append(path, data: bytes):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def read(tailer, path):
+    return list(tailer.read_new_lines(str(path)))
+
+
+class TestIncrementalReads:
+    """Test that each call returns only new complete lines"""
+
+    def test_reads_appended_lines_once(self, tailer, log_file):
+        append(log_file, b"one\ntwo\n")
+        assert read(tailer, log_file) == [(1, "one"), (2, "two")]
+        assert read(tailer, log_file) == []
+
+        append(log_file, b"three\n")
+        assert read(tailer, log_file) == [(3, "three")]
+
+    def test_partial_line_waits_for_newline(self, tailer, log_file):
+        append(log_file, b"complete\npart")
+        assert read(tailer, log_file) == [(1, "complete")]
+
+        append(log_file, b"ial\n")
+        assert read(tailer, log_file) == [(2, "partial")]
+
+    def test_line_split_across_chunks(self, tmp_path, log_file):
+        tailer = LogTailer(str(tmp_path / "offsets.json"), chunk_size=4)
+        append(log_file, b"abcdefghij\nxy\n")
+
+        assert read(tailer, log_file) == [(1, "abcdefghij"), (2, "xy")]
+
+    def test_first_read_starts_at_backlog_line_boundary(self, tmp_path, log_file):
+        tailer = LogTailer(str(tmp_path / "offsets.json"), initial_backlog=10)
+        append(log_file, b"old line 1\nold line 2\nnew\n")
+
+        assert read(tailer, log_file) == [(3, "new")]
+
+    def test_missing_file_yields_nothing(self, tailer, tmp_path):
+        assert read(tailer, tmp_path / "missing.log") == []
+
+
+class TestPersistedState:
+    """Test resuming from the saved offsets"""
+
+    def test_resume_after_restart(self, tmp_path, log_file):
+        state_file = str(tmp_path / "offsets.json")
+        tailer = LogTailer(state_file)
+        append(log_file, b"a\nb\n")
+        read(tailer, log_file)
+        tailer.save()
+
+        append(log_file, b"c\n")
+        restarted = LogTailer(state_file)
+
+        assert read(restarted, log_file) == [(3, "c")]
+
+    def test_save_only_when_changed(self, tailer, log_file):
+        append(log_file, b"a\n")
+        read(tailer, log_file)
+        tailer.save()
+        mtime = tailer.state_file.stat().st_mtime_ns
+
+        tailer.save()
+
+        assert tailer.state_file.stat().st_mtime_ns == mtime
+
+    def test_corrupt_state_starts_fresh(self, tmp_path, log_file):
+        state_file = tmp_path / "offsets.json"
+        state_file.write_text("{not json")
+        append(log_file, b"a\n")
+
+        assert read(LogTailer(str(state_file)), log_file) == [(1, "a")]
+
+    def test_forget_missing(self, tailer, log_file):
+        append(log_file, b"a\n")
+        read(tailer, log_file)
+        log_file.unlink()
+
+        tailer.forget_missing()
+
+        assert tailer.positions == {}
+
+
+class TestEarlyStop:
+    """Test that the position is committed per consumed line"""
+
+    def test_resumes_after_last_consumed_line(self, tailer, log_file):
+        append(log_file, b"1\n2\n3\n4\n")
+
+        lines = tailer.read_new_lines(str(log_file))
+        assert [next(lines), next(lines)] == [(1, "1"), (2, "2")]
+        lines.close()
+
+        assert read(tailer, log_file) == [(3, "3"), (4, "4")]
+
+    def test_max_bytes_per_read(self, tmp_path, log_file):
+        tailer = LogTailer(str(tmp_path / "offsets.json"), max_bytes_per_read=6)
+        append(log_file, b"aa\nbb\ncc\n")
+
+        assert read(tailer, log_file) == [(1, "aa"), (2, "bb")]
+        assert read(tailer, log_file) == [(3, "cc")]
+
+
+class TestRotation:
+    """Test rotation to <path>.1 and in-place truncation"""
+
+    def test_rotated_file_finished_before_new_file(self, tailer, log_file):
+        append(log_file, b"a\n")
+        read(tailer, log_file)
+        append(log_file, b"b\n")
+        os.rename(log_file, f"{log_file}.1")
+        log_file.write_bytes(b"c\n")
+
+        assert read(tailer, log_file) == [(2, "b"), (1, "c")]
+        assert read(tailer, log_file) == []
+
+    def test_rotation_without_rotated_file(self, tailer, log_file):
+        append(log_file, b"a\n")
+        read(tailer, log_file)
+        log_file.unlink()
+        log_file.write_bytes(b"new\n")
+
+        assert read(tailer, log_file) == [(1, "new")]
+
+    def test_truncation_restarts_from_beginning(self, tailer, log_file):
+        append(log_file, b"first line\nsecond line\n")
+        read(tailer, log_file)
+
+        with open(log_file, 'r+b') as f:
+            f.truncate(0)
+        append(log_file, b"x\n")
+
+        assert read(tailer, log_file) == [(1, "x")]
+
+    def test_truncation_then_regrowth_past_offset(self, tailer, log_file):
+        """copytruncate followed by more writes than were read is still detected"""
+        append(log_file, b"2024-01-01 old\n")
+        read(tailer, log_file)
+
+        with open(log_file, 'r+b') as f:
+            f.truncate(0)
+        append(log_file, b"2024-01-02 new one\n2024-01-02 new two\n")
+
+        assert read(tailer, log_file) == [(1, "2024-01-02 new one"), (2, "2024-01-02 new two")]
+
+    def test_truncation_detected_after_restart(self, tmp_path, log_file):
+        state_file = str(tmp_path / "offsets.json")
+        tailer = LogTailer(state_file)
+        append(log_file, b"before rotation\n")
+        read(tailer, log_file)
+        tailer.save()
+
+        with open(log_file, 'r+b') as f:
+            f.truncate(0)
+        append(log_file, b"after rotation, longer than before\n")
+
+        assert read(LogTailer(state_file), log_file) == [(1, "after rotation, longer than before")]
+
+    def test_fingerprint_grows_with_short_file(self, tailer, log_file):
+        """A file first seen shorter than the fingerprint still detects later truncation"""
+        append(log_file, b"a\n")
+        read(tailer, log_file)
+        append(log_file, b"b" * 300 + b"\n")
+        read(tailer, log_file)
+        assert tailer.positions[str(log_file)]['head_size'] == LogTailer.FINGERPRINT_SIZE
+
+        with open(log_file, 'r+b') as f:
+            f.truncate(0)
+        append(log_file, b"c" * 400 + b"\n")
+
+        assert read(tailer, log_file) == [(1, "c" * 400)]
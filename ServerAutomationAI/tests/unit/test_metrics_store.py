@@ -0,0 +1,266 @@
+"""
+Unit tests for MetricsStore
+Tests rollup slots, open buckets, persistence, refresh and summaries
+"""
+
+import json
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+from tools.metrics_store import MetricsStore, _Rollup
+
+
+NOW = 1_000_000
+
+# 1s buckets for 4 seconds, 10s buckets for a minute
+RESOLUTIONS = ((1, 4), (10, 6))
+
+
+@pytest.fixture(autouse=True)
+def clock():
+    with patch("tools.metrics_store.time.time", return_value=float(NOW)) as mock_time:
+        yield mock_time
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "metrics.bin")
+
+
+def bump_mtime(path):
+    """Make a rewrite visible even on filesystems with coarse timestamps"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+class TestRollupSlots:
+    """Test the ring of fixed-size bucket arrays"""
+
+    def test_wrap_around_overwrites_oldest_slot(self):
+        rollup = _Rollup(1, 4)
+        for second in range(6):
+            rollup.add(second, float(second))
+        rollup._close()
+
+        assert list(rollup.starts) == [4, 5, 2, 3]
+        assert [bucket[0] for bucket in rollup.buckets(0, 5)] == [2, 3, 4, 5]
+
+    def test_stale_slot_not_returned(self):
+        rollup = _Rollup(1, 4)
+        rollup.add(1, 1.0)
+        rollup.add(9, 9.0)
+        rollup._close()
+
+        # Slot 1 is reused by second 9; second 5 (same slot) was never written
+        assert list(rollup.buckets(5, 5)) == []
+        assert [bucket[0] for bucket in rollup.buckets(6, 9)] == [9]
+
+    def test_open_bucket_closed_by_next_bucket(self):
+        rollup = _Rollup(10, 6)
+        for value in (1.0, 2.0, 3.0, 10.0):
+            rollup.add(NOW + 3, value)
+
+        assert rollup.counts[(NOW // 10) % 6] == 0
+        assert list(rollup.buckets(NOW, NOW + 9)) == [(NOW, 4, 16.0, 1.0, 10.0, 10.0)]
+
+        rollup.add(NOW + 10, 5.0)
+
+        slot = (NOW // 10) % 6
+        assert (rollup.starts[slot], rollup.counts[slot], rollup.sums[slot]) == (NOW, 4, 16.0)
+        assert (rollup.mins[slot], rollup.maxs[slot], rollup.p95s[slot]) == (1.0, 10.0, 10.0)
+        assert list(rollup.open_samples) == [5.0]
+
+    def test_late_sample_joins_open_bucket(self):
+        rollup = _Rollup(1, 4)
+        rollup.add(10, 1.0)
+        rollup.add(8, 2.0)
+
+        assert list(rollup.buckets(8, 10)) == [(10, 2, 3.0, 1.0, 2.0, 2.0)]
+
+
+class TestQuery:
+    """Test resolution choice for range queries"""
+
+    def test_finest_covering_resolution(self):
+        store = MetricsStore(None, resolutions=RESOLUTIONS)
+        for offset in range(30):
+            store.record({"cpu.percent": float(offset)}, timestamp=NOW - 29 + offset)
+
+        recent = store.query("cpu.percent", NOW - 3)
+        older = store.query("cpu.percent", NOW - 29)
+
+        assert recent["resolution"] == 1
+        assert [point["avg"] for point in recent["points"]] == [26.0, 27.0, 28.0, 29.0]
+        assert older["resolution"] == 10
+        assert sum(point["count"] for point in older["points"]) == 30
+
+    def test_unknown_metric(self):
+        store = MetricsStore(None, resolutions=RESOLUTIONS)
+
+        assert store.query("missing", NOW - 10) == {"metric": "missing", "resolution": None, "points": []}
+
+
+class TestSummary:
+    """Test min/max/avg/p95 over a window"""
+
+    def test_single_sample_buckets_are_exact(self):
+        store = MetricsStore(None, resolutions=((1, 100),))
+        for offset in range(20):
+            store.record({"cpu.percent": float(offset + 1)}, timestamp=NOW - 19 + offset)
+
+        summary = store.summary("cpu.percent", 20)
+
+        assert summary == {"avg": 10.5, "min": 1.0, "max": 20.0, "p95": 19.0, "samples": 20}
+
+    def test_window_limits_samples(self):
+        store = MetricsStore(None, resolutions=((1, 100),))
+        for offset in range(20):
+            store.record({"cpu.percent": float(offset)}, timestamp=NOW - 19 + offset)
+
+        assert store.summary("cpu.percent", 5)["samples"] == 5
+
+    def test_no_samples(self):
+        store = MetricsStore(None, resolutions=RESOLUTIONS)
+        store.record({"cpu.percent": 1.0}, timestamp=NOW - 50)
+
+        assert store.summary("missing", 60) is None
+        assert store.summary("cpu.percent", 5) is None
+
+
+class TestPersistence:
+    """Test the binary file round trip"""
+
+    def test_round_trip(self, store_path):
+        writer = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        for offset in range(12):
+            writer.record({"cpu.percent": float(offset), "memory.percent": 50.0}, timestamp=NOW - 11 + offset)
+        writer.save()
+
+        reader = MetricsStore(store_path, resolutions=RESOLUTIONS)
+
+        assert reader.metrics() == ["cpu.percent", "memory.percent"]
+        assert reader.latest_value("cpu.percent") == (NOW, 11.0)
+        for name in ("cpu.percent", "memory.percent"):
+            for start in (NOW - 3, NOW - 11):
+                assert reader.query(name, start) == writer.query(name, start)
+        # The open bucket's raw samples survive the round trip
+        assert list(reader.series["cpu.percent"][1].open_samples) == list(writer.series["cpu.percent"][1].open_samples)
+
+    def test_save_skipped_when_clean(self, store_path):
+        store = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        store.save()
+
+        assert not os.path.exists(store_path)
+
+    def test_layout_mismatch_rejected(self, store_path):
+        writer = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        writer.record({"cpu.percent": 1.0}, timestamp=NOW)
+        writer.save()
+
+        reader = MetricsStore(store_path, resolutions=((1, 8), (10, 6)))
+
+        assert reader.metrics() == []
+
+    def test_version_mismatch_rejected(self, store_path):
+        writer = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        writer.record({"cpu.percent": 1.0}, timestamp=NOW)
+        writer.save()
+        with open(store_path, 'rb') as f:
+            header, data = json.loads(f.readline()), f.read()
+        header["version"] += 1
+        with open(store_path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n' + data)
+
+        assert MetricsStore(store_path, resolutions=RESOLUTIONS).metrics() == []
+
+    def test_truncated_file_rejected(self, store_path):
+        writer = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        writer.record({"cpu.percent": 1.0}, timestamp=NOW)
+        writer.save()
+        with open(store_path, 'r+b') as f:
+            f.truncate(os.path.getsize(store_path) - 8)
+
+        assert MetricsStore(store_path, resolutions=RESOLUTIONS).metrics() == []
+
+
+class TestRefresh:
+    """Test picking up another process's saves"""
+
+    def test_refresh_loads_newer_file(self, store_path):
+        writer = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        writer.record({"cpu.percent": 1.0}, timestamp=NOW - 1)
+        writer.save()
+        reader = MetricsStore(store_path, resolutions=RESOLUTIONS)
+
+        assert reader.refresh() is False
+
+        writer.record({"cpu.percent": 2.0}, timestamp=NOW)
+        writer.save()
+        bump_mtime(store_path)
+
+        assert reader.refresh() is True
+        assert reader.latest_value("cpu.percent") == (NOW, 2.0)
+
+    def test_dirty_store_keeps_local_samples(self, store_path):
+        writer = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        writer.record({"cpu.percent": 1.0}, timestamp=NOW - 1)
+        writer.save()
+        reader = MetricsStore(store_path, resolutions=RESOLUTIONS)
+        reader.record({"disk.percent": 70.0}, timestamp=NOW)
+
+        writer.record({"cpu.percent": 2.0}, timestamp=NOW)
+        writer.save()
+        bump_mtime(store_path)
+
+        assert reader.refresh() is False
+        assert reader.latest_value("cpu.percent") == (NOW - 1, 1.0)
+        assert reader.latest_value("disk.percent") == (NOW, 70.0)
+
+    def test_missing_file(self, tmp_path):
+        store = MetricsStore(str(tmp_path / "missing.bin"), resolutions=RESOLUTIONS)
+
+        assert store.refresh() is False
+
+
+class TestPerformanceMonitorSummary:
+    """Test PerformanceMonitor.get_metrics_summary on top of the store"""
+
+    @pytest.fixture
+    def monitor(self):
+        from agents.performance_monitor import PerformanceMonitor
+
+        config = {'agents': {'performance_monitor': {'check_interval': 30}}}
+        store = MetricsStore(None, resolutions=((1, 3600), (60, 60)))
+        with patch.object(PerformanceMonitor, '_load_config', return_value=config), \
+                patch('agents.performance_monitor.get_communication_system', return_value=MagicMock()), \
+                patch('agents.performance_monitor.get_metrics_sampler', return_value=MagicMock()), \
+                patch('agents.performance_monitor.get_metrics_store', return_value=store):
+            return PerformanceMonitor()
+
+    def record(self, monitor, seconds, groups=('cpu', 'memory', 'disk')):
+        for offset in range(seconds):
+            monitor.store.record(
+                {f"{group}.percent": float(offset % 10) + index * 10 for index, group in enumerate(groups)},
+                timestamp=NOW - seconds + 1 + offset
+            )
+
+    def test_summary_over_check_intervals(self, monitor):
+        self.record(monitor, 600)
+
+        summary = monitor.get_metrics_summary(count=2)
+
+        assert summary['samples'] == 60
+        assert summary['cpu'] == {'avg': 4.5, 'max': 9.0, 'min': 0.0, 'p95': 9.0}
+        assert summary['memory'] == {'avg': 14.5, 'max': 19.0, 'min': 10.0, 'p95': 19.0}
+        assert summary['disk']['min'] == 20.0
+
+    def test_count_zero_uses_everything_retained(self, monitor):
+        self.record(monitor, 600)
+
+        assert monitor.get_metrics_summary(count=0)['samples'] == 600
+
+    def test_missing_group_gives_empty_summary(self, monitor):
+        self.record(monitor, 60, groups=('cpu', 'memory'))
+
+        assert monitor.get_metrics_summary() == {}
@@ -5,7 +5,8 @@ Tests credential validation, health scoring, retry logic, quarantine
 
 import pytest
 import time
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from litellm.exceptions import RateLimitError, APIError, Timeout, AuthenticationError
 
 
@@ -204,6 +205,372 @@ class TestChatMethod:
             assert response is not None
 
 
+class TestChatAsync:
+    """Test the native async chat_async() path"""
+    
+    async def test_provider_concurrency_limit_from_secrets(self, mock_secrets_manager, mock_cache_manager):
+        """Test {PROVIDER}_MAX_CONCURRENCY configures the provider semaphore"""
+        base_get = mock_secrets_manager.get.side_effect
+        mock_secrets_manager.get.side_effect = lambda key, default=None: (
+            "3" if key == "GROQ_MAX_CONCURRENCY" else base_get(key, default)
+        )
+        
+        with patch('dev_platform.core.model_router.get_secrets_manager', return_value=mock_secrets_manager), \
+             patch('dev_platform.core.model_router.get_cache_manager', return_value=mock_cache_manager), \
+             patch('dev_platform.core.model_router.completion'):
+            from dev_platform.core.model_router import ModelRouter
+            router = ModelRouter()
+        
+        assert router.async_pool.get_semaphore("groq")._value == 3
+        assert router.async_pool.get_semaphore("gemini")._value == router.async_pool.max_concurrency
+    
+    async def test_chat_async_returns_response(self, router, mock_litellm_completion):
+        """Test successful chat_async() call uses acompletion"""
+        with patch('dev_platform.core.model_router.acompletion', new_callable=AsyncMock) as mock_acompletion, \
+             patch('dev_platform.core.model_router.completion') as mock_completion:
+            mock_acompletion.return_value = mock_litellm_completion(content="Hello async!")
+            
+            response = await router.chat_async(
+                messages=[{"role": "user", "content": "Test prompt"}],
+                use_cache=False
+            )
+            
+            assert response["content"] == "Hello async!"
+            assert mock_acompletion.await_count == 1
+            mock_completion.assert_not_called()
+    
+    async def test_chat_async_backoff_does_not_block(self, router, mock_litellm_completion):
+        """Test that retries back off with asyncio.sleep instead of time.sleep"""
+        with patch('dev_platform.core.model_router.acompletion', new_callable=AsyncMock) as mock_acompletion, \
+             patch('dev_platform.core.model_router.asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+             patch('dev_platform.core.model_router.time.sleep') as mock_time_sleep:
+            mock_acompletion.side_effect = [
+                APIError(message="API Error", model="groq", llm_provider="groq", status_code=500),
+                mock_litellm_completion(content="Recovered")
+            ]
+            
+            response = await router.chat_async(
+                messages=[{"role": "user", "content": "Test"}],
+                use_cache=False
+            )
+            
+            assert response["content"] == "Recovered"
+            assert mock_sleep.await_count == 1
+            mock_time_sleep.assert_not_called()
+    
+    async def test_chat_async_cancellation_propagates(self, router):
+        """Test that cancelling chat_async aborts without penalizing the provider"""
+        started = asyncio.Event()
+        
+        async def slow_completion(**kwargs):
+            started.set()
+            await asyncio.sleep(10)
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=slow_completion):
+            router.health_scores = {"groq": 100, "gemini": 90, "mistral": 80}
+            task = asyncio.create_task(
+                router.chat_async(messages=[{"role": "user", "content": "Test"}], use_cache=False)
+            )
+            await started.wait()
+            task.cancel()
+            
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            
+            assert router.health_scores["groq"] == 100
+    
+    async def test_latency_excludes_semaphore_wait(self, router, mock_litellm_completion):
+        """Recorded latency starts once the provider's concurrency slot is acquired"""
+        router.async_pool.provider_limits["groq"] = 1
+        groq = next(m for m in router.available_models if m["provider"] == "groq")
+        
+        async def slow_acompletion(**kwargs):
+            await asyncio.sleep(0.2)
+            return mock_litellm_completion(content="ok")
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=slow_acompletion):
+            results = await asyncio.gather(*[
+                router._call_model_async(groq, [{"role": "user", "content": "Hi"}], 0.7, 100)
+                for _ in range(2)
+            ])
+        
+        assert all(result["time_taken"] < 0.35 for result in results)
+        assert max(router._latency_samples["groq"]) < 0.35
+    
+    async def test_chat_async_passes_pooled_client_per_call(self, router, mock_litellm_completion):
+        """Test each call gets the running loop's pooled handler instead of a global session"""
+        import litellm
+        
+        with patch('dev_platform.core.model_router.acompletion', new_callable=AsyncMock) as mock_acompletion:
+            mock_acompletion.return_value = mock_litellm_completion(content="ok")
+            await router.chat_async(messages=[{"role": "user", "content": "Test"}], use_cache=False)
+        
+        handler = mock_acompletion.call_args.kwargs["client"]
+        assert handler is router.async_pool.get_handler()
+        assert handler.client is router.async_pool.get_client()
+        assert litellm.aclient_session is None
+        await router.aclose()
+    
+    def test_async_pool_keeps_one_pool_per_loop(self):
+        """Test alternating loops keep their own clients and semaphores, and ended loops are closed"""
+        from dev_platform.core.model_router import AsyncProviderPool
+        
+        pool = AsyncProviderPool()
+        
+        async def grab():
+            return pool.get_client(), pool.get_semaphore("groq")
+        
+        loop_a = asyncio.new_event_loop()
+        loop_b = asyncio.new_event_loop()
+        try:
+            client_a, semaphore_a = loop_a.run_until_complete(grab())
+            client_b, semaphore_b = loop_b.run_until_complete(grab())
+            assert client_a is not client_b
+            assert semaphore_a is not semaphore_b
+            
+            # Switching back does not reset loop A's pool
+            assert loop_a.run_until_complete(grab()) == (client_a, semaphore_a)
+            
+            loop_a.close()
+            
+            async def grab_and_settle():
+                result = await grab()
+                await asyncio.sleep(0)
+                return result
+            
+            assert loop_b.run_until_complete(grab_and_settle()) == (client_b, semaphore_b)
+            loop_b.run_until_complete(asyncio.sleep(0))
+        finally:
+            if not loop_a.is_closed():
+                loop_a.close()
+        
+        # Loop A ended: its pool is dropped and its client closed from loop B
+        assert loop_a not in pool._pools
+        assert client_a.is_closed
+        loop_b.run_until_complete(pool.aclose())
+        assert client_b.is_closed
+        loop_b.close()
+
+
+class TestHedgedRequests:
+    """Test hedged (parallel-race) mode of chat_async()"""
+    
+    async def test_hedge_fires_next_provider_and_cancels_loser(self, router, mock_litellm_completion):
+        """Slow primary is raced by the next provider; the loser is cancelled"""
+        router.health_scores = {"groq": 100, "gemini": 90, "mistral": 80}
+        cancelled = []
+        
+        async def fake_acompletion(**kwargs):
+            model = kwargs["model"]
+            delay = 5.0 if model.startswith("groq/") else 0.01
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(model)
+                raise
+            return mock_litellm_completion(content=f"from {model}")
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion):
+            response = await router.chat_async(
+                messages=[{"role": "user", "content": "Plan"}],
+                use_cache=False,
+                hedged=True,
+                hedge_delay=0.05
+            )
+        
+        assert response["provider"] == "gemini"
+        assert response["hedged"] is True
+        assert any(m.startswith("groq/") for m in cancelled)
+        # Losing provider is not penalized for being cancelled
+        assert router.health_scores["groq"] == 100
+    
+    async def test_hedge_fails_over_immediately_on_error(self, router, mock_litellm_completion):
+        """A failed in-flight request launches the next provider without waiting"""
+        router.health_scores = {"groq": 100, "gemini": 90, "mistral": 80}
+        
+        async def fake_acompletion(**kwargs):
+            if kwargs["model"].startswith("groq/"):
+                raise APIError(message="down", model="groq", llm_provider="groq", status_code=500)
+            return mock_litellm_completion(content="ok")
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion):
+            response = await router.chat_async(
+                messages=[{"role": "user", "content": "Plan"}],
+                use_cache=False,
+                hedged=True,
+                hedge_delay=10.0
+            )
+        
+        assert response["content"] == "ok"
+        assert router.health_scores["groq"] == 85
+    
+    def test_hedge_delay_adapts_to_rolling_p90(self, router):
+        """Hedge delay follows the provider's observed latency"""
+        for latency in [0.2] * 9 + [1.5]:
+            router._record_latency("groq", latency)
+        
+        assert router._get_hedge_delay("groq") == 1.5
+        # No samples and no usable history -> default delay
+        assert router._get_hedge_delay("mistral") == router.default_hedge_delay
+    
+    @pytest.mark.asyncio
+    async def test_hedge_delay_history_loaded_once_off_loop(self, router, mock_cache_manager):
+        """Persisted p90 is loaded once per provider, never from _get_hedge_delay()"""
+        mock_cache_manager.get_latency_percentile = Mock(return_value=4.0)
+        
+        assert router._get_hedge_delay("gemini") == router.default_hedge_delay
+        mock_cache_manager.get_latency_percentile.assert_not_called()
+        
+        with patch('dev_platform.core.model_router.asyncio.to_thread', wraps=asyncio.to_thread) as to_thread:
+            await router._load_latency_history(["gemini"])
+            await router._load_latency_history(["gemini"])
+        
+        assert to_thread.call_count == 1
+        mock_cache_manager.get_latency_percentile.assert_called_once_with("gemini", 0.9)
+        assert router._get_hedge_delay("gemini") == 4.0
+
+
+class TestStreaming:
+    """Test token streaming (stream_chat / stream_chat_async)"""
+    
+    @staticmethod
+    def _chunk(text):
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = text
+        chunk.usage = None
+        return chunk
+    
+    def test_stream_chat_fails_over_before_first_token(self, router):
+        """Rate-limited provider is skipped and tokens come from the next one"""
+        router.health_scores = {"groq": 100, "gemini": 90, "mistral": 80}
+        
+        def fake_completion(**kwargs):
+            assert kwargs["stream"] is True
+            if kwargs["model"].startswith("groq/"):
+                raise RateLimitError("Rate limit exceeded", model="groq", llm_provider="groq")
+            return iter([self._chunk("Hel"), self._chunk("lo")])
+        
+        with patch('dev_platform.core.model_router.completion', side_effect=fake_completion):
+            events = list(router.stream_chat(messages=[{"role": "user", "content": "Hi"}], use_cache=False))
+        
+        tokens = [e["content"] for e in events if e["type"] == "token"]
+        assert tokens == ["Hel", "lo"]
+        assert events[-1]["type"] == "done"
+        assert events[-1]["content"] == "Hello"
+        assert events[-1]["provider"] == "gemini"
+        assert "time_to_first_token" in events[-1]
+    
+    async def test_stream_chat_async_yields_tokens(self, router):
+        """Async variant streams tokens from acompletion(stream=True)"""
+        async def chunks():
+            for text in ["A", "B", "C"]:
+                yield self._chunk(text)
+        
+        async def fake_acompletion(**kwargs):
+            return chunks()
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion):
+            events = [
+                e async for e in router.stream_chat_async(
+                    messages=[{"role": "user", "content": "Hi"}], use_cache=False
+                )
+            ]
+        
+        assert [e["content"] for e in events if e["type"] == "token"] == ["A", "B", "C"]
+        assert events[-1]["type"] == "done"
+        assert events[-1]["content"] == "ABC"
+    
+    async def test_chat_async_forwards_tokens_to_sink(self, router):
+        """chat_async() streams into the context-local token sink"""
+        from dev_platform.core.model_router import stream_tokens_to
+        
+        async def chunks():
+            for text in ["x", "y"]:
+                yield self._chunk(text)
+        
+        async def fake_acompletion(**kwargs):
+            return chunks()
+        
+        received = []
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion):
+            with stream_tokens_to(received.append):
+                result = await router.chat_async(
+                    messages=[{"role": "user", "content": "Hi"}], use_cache=False
+                )
+        
+        assert result["content"] == "xy"
+        assert [e["content"] for e in received] == ["x", "y"]
+    
+    async def test_chat_async_broken_stream_fails_over(self, router, mock_litellm_completion):
+        """Partial content from a stream that broke is never returned as a completion"""
+        from dev_platform.core.model_router import stream_tokens_to
+        
+        async def broken_chunks():
+            yield self._chunk("par")
+            raise APIError(message="Connection reset", model="groq", llm_provider="groq", status_code=500)
+        
+        async def fake_acompletion(**kwargs):
+            if kwargs.get("stream"):
+                return broken_chunks()
+            return mock_litellm_completion(content="complete answer")
+        
+        received = []
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion):
+            with stream_tokens_to(received.append):
+                result = await router.chat_async(
+                    messages=[{"role": "user", "content": "Hi"}], use_cache=False
+                )
+        
+        assert [e["content"] for e in received] == ["par"]
+        assert result["content"] == "complete answer"
+        assert "model" in result
+        assert "error" not in result
+    
+    async def test_stream_retries_penalize_provider_once(self, router):
+        """Health is updated once per provider, after its last retry, like chat()"""
+        router.health_scores = {"groq": 100, "gemini": 90, "mistral": 80}
+        
+        async def chunks():
+            yield self._chunk("ok")
+        
+        async def fake_acompletion(**kwargs):
+            if kwargs["model"].startswith("groq/"):
+                raise APIError(message="Bad gateway", model="groq", llm_provider="groq", status_code=502)
+            return chunks()
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion), \
+             patch('dev_platform.core.model_router.asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+             patch.object(router, '_update_health_score', wraps=router._update_health_score) as update:
+            events = [
+                e async for e in router.stream_chat_async(
+                    messages=[{"role": "user", "content": "Hi"}], use_cache=False, retry_count=3
+                )
+            ]
+        
+        assert events[-1]["provider"] == "gemini"
+        assert mock_sleep.await_count == 2
+        assert [(c.args[0], c.kwargs["success"]) for c in update.call_args_list] == [("groq", False), ("gemini", True)]
+    
+    async def test_sink_path_counts_one_cache_miss(self, router):
+        """chat_async() with a token sink looks up the response cache once"""
+        from dev_platform.core.model_router import stream_tokens_to
+        
+        async def chunks():
+            yield self._chunk("fresh")
+        
+        async def fake_acompletion(**kwargs):
+            return chunks()
+        
+        with patch('dev_platform.core.model_router.acompletion', side_effect=fake_acompletion):
+            with stream_tokens_to(lambda event: None):
+                result = await router.chat_async(messages=[{"role": "user", "content": "Hi"}])
+        
+        assert result["content"] == "fresh"
+        totals = router.response_cache.get_stats()["totals"]
+        assert totals["misses"] == 1
+        assert totals["sets"] == 1
+
+
 class TestHealthReport:
     """Test health reporting"""
     
@@ -421,6 +788,29 @@ class TestProviderExhaustionAndFallback:
             # Should get response from healthy provider
             assert result is not None
     
+    @pytest.mark.parametrize("call", ["chat", "chat_async", "stream_chat", "stream_chat_async"])
+    async def test_fallback_uses_request_cache_namespace(self, router, call):
+        """When every provider fails the stale fallback comes from the request's namespace"""
+        messages = [{"role": "user", "content": "Plan the release"}]
+        router.response_cache.set(messages, 0.7, {"content": "cached plan", "model": "groq/x"}, "planner")
+        rate_limited = RateLimitError("Rate limit exceeded", model="groq", llm_provider="groq")
+        
+        with patch('dev_platform.core.model_router.completion', side_effect=rate_limited), \
+             patch('dev_platform.core.model_router.acompletion', side_effect=rate_limited), \
+             patch('dev_platform.core.model_router.random.random', return_value=0.5):
+            kwargs = {"messages": messages, "use_cache": False, "cache_namespace": "planner"}
+            if call == "chat":
+                result = router.chat(**kwargs)
+            elif call == "chat_async":
+                result = await router.chat_async(**kwargs)
+            elif call == "stream_chat":
+                result = list(router.stream_chat(**kwargs))[-1]
+            else:
+                result = [e async for e in router.stream_chat_async(**kwargs)][-1]
+        
+        assert result["content"] == "cached plan"
+        assert result["fallback"] is True
+    
     def test_health_score_recovery_over_time(self, router):
         """Test that health scores recover gradually with successful calls"""
         # Start with low health
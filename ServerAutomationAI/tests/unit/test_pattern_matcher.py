@@ -0,0 +1,131 @@
+"""
+Unit tests for PatternMatcher
+Tests literal extraction and that the prefilter never changes what matches
+"""
+
+import random
+import re
+
+import pytest
+
+from tools.pattern_matcher import PatternMatcher
+
+
+PATTERNS = [
+    ("ssh_failed", r"Failed password for (?:invalid user )?(\w+) from (\d+\.\d+\.\d+\.\d+)"),
+    ("optional_group", r"(disk )?quota exceeded"),
+    ("optional_prefix", r"(?:kernel: )?Out of memory: Kill(ed)? process (\d+)"),
+    ("zero_repeat", r"x*y?z{0,3}!"),
+    ("short_branch", r"(?:ab|cdef)ghi"),
+    ("branch", r"segfault|core dumped"),
+    ("repeat", r"(?:ha){2,}"),
+    ("no_literal", r"\d{4}-\d{2}-\d{2}"),
+    ("lookahead", r"(?!bar)baz\w*"),
+    ("non_ascii", r"Fehler: Datei über(\w+)"),
+]
+
+LINES = [
+    "Failed password for root from 10.0.0.1 port 22 ssh2",
+    "failed password for invalid user admin from 10.0.0.2",
+    "FAILED PASSWORD FOR root from 1.2.3.4",
+    "quota exceeded for /home",
+    "disk quota exceeded",
+    "kernel: Out of memory: Killed process 4242",
+    "Out of memory: Kill process 7",
+    "!",
+    "xxyzz!",
+    "abghi cdefghi ghi",
+    "segfault at 0 ip 0",
+    "core dumped",
+    "hahaha",
+    "ha",
+    "2024-01-02 service started",
+    "bazooka",
+    "barbaz",
+    "Fehler: Datei übergroß",
+    "FEHLER: DATEI ÜBERGROSS",
+    "Straße ſegfault",
+    # Dotless i matches "i" under IGNORECASE but casefolds to itself
+    "faıled password for root from 1.2.3.4",
+    "",
+]
+
+
+def brute_force(patterns, line, flags=0):
+    return [name for name, pattern in patterns if re.search(pattern, line, flags)]
+
+
+class TestRequiredLiterals:
+    """Test the literals extracted for the prefilter"""
+
+    def test_plain_literal(self):
+        assert PatternMatcher.required_literals(r"Failed password for (\w+)") == ["failed password for "]
+
+    def test_optional_group_is_not_required(self):
+        assert PatternMatcher.required_literals(r"(abc)?defg") == ["defg"]
+        assert PatternMatcher.required_literals(r"(?:abcdef)?xy") is None
+
+    def test_repeat_with_min_zero_is_not_required(self):
+        assert PatternMatcher.required_literals(r"(?:abcd)*xy") is None
+        assert PatternMatcher.required_literals(r"x*yz{0,3}") is None
+
+    def test_repeat_with_min_one_is_required(self):
+        assert PatternMatcher.required_literals(r"(?:abcd)+") == ["abcd"]
+
+    def test_branch_needs_every_alternative(self):
+        assert PatternMatcher.required_literals(r"error|warning") == ["error", "warning"]
+        # "a" is too short to filter on, so the branch gives no literal
+        assert PatternMatcher.required_literals(r"a|bcd") is None
+        assert PatternMatcher.required_literals(r"(?:ab|cdef)ghi") == ["ghi"]
+
+    def test_longest_required_run_wins(self):
+        assert PatternMatcher.required_literals(r"(?:timeout|oom) killed") == [" killed"]
+
+    def test_literals_are_casefolded(self):
+        assert PatternMatcher.required_literals(r"DISK Full", re.IGNORECASE) == ["disk full"]
+
+    def test_non_ascii_characters_end_a_literal(self):
+        assert PatternMatcher.required_literals(r"Fehler: über") == ["fehler: "]
+
+    def test_invalid_pattern(self):
+        assert PatternMatcher.required_literals(r"(unclosed") is None
+
+
+class TestMatching:
+    """Test match_all/match_first against plain re.search"""
+
+    @pytest.mark.parametrize("flags", [0, re.IGNORECASE])
+    @pytest.mark.parametrize("line", LINES)
+    def test_match_all_equals_re_search(self, line, flags):
+        matcher = PatternMatcher(PATTERNS, flags)
+
+        matches = matcher.match_all(line)
+
+        assert [m.name for m in matches] == brute_force(PATTERNS, line, flags)
+        for m in matches:
+            assert m.groups == re.search(m.pattern, line, flags).groups()
+
+    @pytest.mark.parametrize("flags", [0, re.IGNORECASE])
+    @pytest.mark.parametrize("line", LINES)
+    def test_match_first_is_first_match(self, line, flags):
+        matcher = PatternMatcher(PATTERNS, flags)
+        expected = brute_force(PATTERNS, line, flags)
+
+        first = matcher.match_first(line)
+
+        assert (first.name if first else None) == (expected[0] if expected else None)
+
+    def test_priority_order_kept(self):
+        matcher = PatternMatcher([("specific", r"disk full"), ("generic", r"full"), ("no_literal", r"\w+")])
+
+        assert [m.name for m in matcher.match_all("disk full")] == ["specific", "generic", "no_literal"]
+        assert matcher.match_first("disk full").name == "specific"
+
+    def test_random_lines_match_re_search(self):
+        rng = random.Random(3)
+        alphabet = "abcdefghiz!xy ha-0123 FAILEDpasword:ÜüßſKı"
+        for flags in (0, re.IGNORECASE):
+            matcher = PatternMatcher(PATTERNS, flags)
+            for _ in range(2000):
+                line = "".join(rng.choice(alphabet) for _ in range(rng.randrange(30)))
+                assert [m.name for m in matcher.match_all(line)] == brute_force(PATTERNS, line, flags)
@@ -0,0 +1,196 @@
+"""
+Unit tests for ProgressCoalescer
+Tests rate-limited, changed-column-only persistence of workflow progress
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from dev_platform.core.progress_coalescer import ProgressCoalescer, ProgressQueue
+from dev_platform.core.workflow_storage import WorkflowStorage
+
+
+@pytest.fixture
+def mock_storage():
+    """Storage double recording column updates"""
+    storage = AsyncMock()
+    storage.update_workflow_columns.return_value = True
+    return storage
+
+
+class TestProgressCoalescer:
+    """Test coalescing behaviour"""
+    
+    @pytest.mark.asyncio
+    async def test_burst_of_updates_is_coalesced(self, mock_storage):
+        """Many updates inside the interval produce one write of the latest values"""
+        coalescer = ProgressCoalescer(mock_storage, min_interval=0.05)
+        
+        for step in range(1, 51):
+            coalescer.update("wf_1", progress_percent=float(step), current_step=step)
+        await asyncio.sleep(0.1)
+        
+        mock_storage.update_workflow_columns.assert_awaited_once_with(
+            "wf_1", {"progress_percent": 50.0, "current_step": 50}
+        )
+        assert coalescer.get_stats()["updates"] == 50
+        assert coalescer.get_stats()["writes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_only_changed_columns_are_written(self, mock_storage):
+        """Unchanged columns are not rewritten"""
+        coalescer = ProgressCoalescer(mock_storage, min_interval=0)
+        
+        coalescer.update("wf_1", status="running", progress_percent=10.0, total_steps=4)
+        await coalescer.flush("wf_1")
+        coalescer.update("wf_1", status="running", progress_percent=20.0, total_steps=4)
+        await coalescer.flush("wf_1")
+        
+        assert mock_storage.update_workflow_columns.await_args_list[-1].args == (
+            "wf_1", {"progress_percent": 20.0}
+        )
+    
+    @pytest.mark.asyncio
+    async def test_no_write_when_nothing_changed(self, mock_storage):
+        """Repeating persisted values schedules nothing"""
+        coalescer = ProgressCoalescer(mock_storage, min_interval=0)
+        coalescer.update("wf_1", progress_percent=10.0)
+        await coalescer.flush("wf_1")
+        
+        coalescer.update("wf_1", progress_percent=10.0)
+        await asyncio.sleep(0.01)
+        
+        assert mock_storage.update_workflow_columns.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_flush_ignores_rate_limit(self, mock_storage):
+        """Terminal flush writes immediately"""
+        coalescer = ProgressCoalescer(mock_storage, min_interval=60)
+        coalescer.update("wf_1", progress_percent=10.0)
+        await coalescer.flush("wf_1")
+        coalescer.update("wf_1", progress_percent=90.0)
+        
+        assert await coalescer.flush("wf_1") is True
+        assert mock_storage.update_workflow_columns.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_discard_drops_pending_write(self, mock_storage):
+        """Discarded changes are never written"""
+        coalescer = ProgressCoalescer(mock_storage, min_interval=0.01)
+        coalescer.update("wf_1", progress_percent=10.0)
+        coalescer.discard("wf_1")
+        await asyncio.sleep(0.05)
+        
+        mock_storage.update_workflow_columns.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_failed_write_is_retried_on_flush(self, mock_storage):
+        """Changes survive a failed write"""
+        mock_storage.update_workflow_columns.side_effect = [False, True]
+        coalescer = ProgressCoalescer(mock_storage, min_interval=0)
+        
+        coalescer.update("wf_1", progress_percent=10.0)
+        assert await coalescer.flush("wf_1") is False
+        assert await coalescer.flush("wf_1") is True
+        assert mock_storage.update_workflow_columns.await_args.args == ("wf_1", {"progress_percent": 10.0})
+
+
+class TestProgressQueue:
+    """Test the observing fan-out progress queue"""
+    
+    @pytest.mark.asyncio
+    async def test_events_are_observed_and_fanned_out(self):
+        """Observer sees every event; each subscriber receives its own copy"""
+        seen = []
+        queue = ProgressQueue(seen.append)
+        first, second = queue.subscribe(), queue.subscribe()
+        
+        await queue.put({"progress_percent": 50.0})
+        
+        assert seen == [{"progress_percent": 50.0}]
+        assert await first.get() == {"progress_percent": 50.0}
+        assert await second.get() == {"progress_percent": 50.0}
+    
+    @pytest.mark.asyncio
+    async def test_observer_errors_do_not_block_queue(self):
+        """A failing observer never drops events"""
+        def broken(event):
+            raise RuntimeError("boom")
+        
+        queue = ProgressQueue(broken)
+        subscriber = queue.subscribe()
+        await queue.put({"progress_percent": 1.0})
+        
+        assert subscriber.qsize() == 1
+    
+    @pytest.mark.asyncio
+    async def test_nothing_buffered_without_subscribers(self):
+        """Events before a subscription are not kept, except the latest progress"""
+        queue = ProgressQueue()
+        for percent in (10.0, 20.0):
+            await queue.put({"progress_percent": percent})
+        await queue.put({"type": "token", "content": "x"})
+        
+        subscriber = queue.subscribe()
+        
+        assert subscriber.qsize() == 1
+        assert subscriber.get_nowait() == {"progress_percent": 20.0}
+    
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self):
+        """A full subscriber queue drops its oldest event, never the newest"""
+        queue = ProgressQueue(subscriber_maxsize=2)
+        subscriber = queue.subscribe()
+        for index in range(3):
+            await queue.put({"type": "token", "content": str(index)})
+        await queue.put({"_complete": True})
+        
+        assert [subscriber.get_nowait() for _ in range(2)] == [
+            {"type": "token", "content": "2"}, {"_complete": True}
+        ]
+        assert queue.dropped == 2
+        assert not queue.has_subscribers()
+    
+    @pytest.mark.asyncio
+    async def test_late_subscriber_gets_terminal_event(self):
+        """Subscribing after completion yields the final events immediately"""
+        queue = ProgressQueue()
+        await queue.put({"progress_percent": 100.0})
+        await queue.put({"_complete": True, "status": "completed"})
+        
+        subscriber = queue.subscribe()
+        
+        assert subscriber.get_nowait() == {"progress_percent": 100.0}
+        assert subscriber.get_nowait() == {"_complete": True, "status": "completed"}
+        assert not queue.has_subscribers()
+
+
+class TestStorageColumnUpdates:
+    """Test WorkflowStorage.update_workflow_columns with a real database"""
+    
+    @pytest.mark.asyncio
+    async def test_updates_only_hot_columns(self, test_db_path):
+        """Only whitelisted columns are updated; the rest of the row is untouched"""
+        storage = WorkflowStorage(test_db_path)
+        await storage.initialize_schema()
+        await storage.save_workflow({
+            "workflow_id": "wf_cols",
+            "workflow_type": "maintenance",
+            "status": "running",
+            "parameters": {"keep": True},
+            "created_at": datetime.now().isoformat()
+        })
+        
+        coalescer = ProgressCoalescer(storage, min_interval=0)
+        coalescer.update("wf_cols", progress_percent=42.0, current_step=2, total_steps=4)
+        await coalescer.flush("wf_cols")
+        
+        workflow = await storage.get_workflow("wf_cols")
+        assert workflow["progress_percent"] == 42.0
+        assert workflow["current_step"] == 2
+        assert workflow["parameters"] == {"keep": True}
+        
+        assert await storage.update_workflow_columns("missing", {"progress_percent": 1.0}) is False
+        await storage.close()
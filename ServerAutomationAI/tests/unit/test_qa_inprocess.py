@@ -0,0 +1,210 @@
+"""
+Unit tests for the in-process QA analyzers
+Tests flake8 code filtering, result conversion, backend selection and (when
+the tools are installed) parity of the analyzers with the CLI output format
+"""
+
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from dev_platform.tools import qa_inprocess
+from dev_platform.tools.async_qa_manager import AsyncQATaskManager
+from dev_platform.tools.qa_inprocess import (
+    InProcessQABackend,
+    _lint_code_selected,
+    _noqa_suppressed,
+    analyze_file,
+    to_file_result
+)
+from dev_platform.tools.qa_metrics_schema import QAToolResult, normalize_flake8_issue
+from dev_platform.tools.qa_tools_config import QAToolsConfig
+
+
+SAMPLE = '''import os
+
+
+def check(value):
+    unused = 1
+    if value:
+        return eval(value)
+    return None
+x=1
+'''
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "sample.py"
+    path.write_text(SAMPLE)
+    return str(path)
+
+
+def _config(backend):
+    config = QAToolsConfig()
+    config.update_config("execution", {"backend": backend})
+    return config
+
+
+class TestLintFiltering:
+    """Test flake8 select/ignore/noqa semantics"""
+
+    def test_ignore_prefix(self):
+        assert not _lint_code_selected("E501", [], ["E5"])
+        assert _lint_code_selected("E302", [], ["E5"])
+
+    def test_select_limits_codes(self):
+        assert _lint_code_selected("F401", ["F"], [])
+        assert not _lint_code_selected("E501", ["F"], [])
+
+    def test_longest_prefix_wins(self):
+        """A more specific select overrides a broader ignore"""
+        assert _lint_code_selected("E501", ["E501"], ["E"])
+        assert not _lint_code_selected("E501", ["E"], ["E501"])
+
+    def test_noqa(self):
+        assert _noqa_suppressed("import os  # noqa", "F401")
+        assert _noqa_suppressed("import os  # noqa: F401", "F401")
+        assert not _noqa_suppressed("import os  # noqa: E501", "F401")
+        assert not _noqa_suppressed("import os", "F401")
+
+
+class TestResultConversion:
+    """Test QAToolResult -> manager per-file result dicts"""
+
+    def test_lint_issues(self):
+        issue = normalize_flake8_issue(
+            {"line": 3, "column": 1, "code": "F401", "message": "unused", "severity": "error"}, "a.py"
+        )
+        result = QAToolResult(tool="flake8", success=True, file_path="a.py", issues_count=1, issues=[issue])
+
+        assert to_file_result("flake8", result) == {"issues": [
+            {"line": 3, "column": 1, "code": "F401", "message": "unused", "severity": "error"}
+        ]}
+
+    def test_radon_metrics(self):
+        functions = [{"name": "f", "type": "function", "line": 1, "complexity": 2, "rank": "A"}]
+        cc = QAToolResult(tool="radon", success=True, file_path="a.py", metrics={"functions": functions})
+        mi = QAToolResult(tool="radon", success=True, file_path="a.py",
+                          metrics={"maintainability_index": 81.5, "grade": "A"})
+
+        assert to_file_result("radon_cc", cc) == {"functions": functions}
+        assert to_file_result("radon_mi", mi) == {"maintainability_index": 81.5, "grade": "A"}
+
+    def test_failure_keeps_timeout_flag(self):
+        result = qa_inprocess._failed("bandit", "a.py", "timed out", timed_out=True)
+        converted = to_file_result("bandit", result)
+
+        assert converted["success"] is False
+        assert converted["timed_out"] is True
+
+
+class TestBackendSelection:
+    """Test which jobs the manager runs in-process"""
+
+    def test_subprocess_backend_disables_inprocess(self):
+        manager = AsyncQATaskManager(config=_config("subprocess"))
+        assert manager.inprocess_jobs == set()
+        assert manager.inprocess is None
+
+    def test_auto_uses_installed_tools_only(self):
+        """Jobs without their libraries fall back to the subprocess wrappers"""
+        with patch("dev_platform.tools.async_qa_manager.inprocess_job_available",
+                   side_effect=lambda job: job.startswith("radon")):
+            manager = AsyncQATaskManager(config=_config("auto"))
+        assert manager.inprocess_jobs == {"radon_cc", "radon_mi"}
+        assert manager.inprocess is not None
+
+    @pytest.mark.asyncio
+    async def test_fallback_jobs_use_wrappers(self, sample_file):
+        """Subprocess wrappers still run the jobs the in-process backend does not cover"""
+        async def fake_analyze(path, jobs, settings, timeout=None):
+            return {job: QAToolResult(tool="radon", success=True, file_path=path,
+                                      metrics={"functions": [], "maintainability_index": 70.0, "grade": "A"})
+                    for job in jobs}
+
+        async def fake_flake8(self, file_path, options=None):
+            return {"success": True, "issues": [{"file": file_path, "line": 1, "code": "F401",
+                                                 "message": "unused", "severity": "error"}]}
+
+        with patch("dev_platform.tools.async_qa_manager.inprocess_job_available",
+                   side_effect=lambda job: job.startswith("radon")):
+            manager = AsyncQATaskManager(config=_config("auto"))
+
+        with patch.object(manager.inprocess, "analyze_file", side_effect=fake_analyze) as analyze, \
+                patch("dev_platform.tools.flake8_wrapper.Flake8Wrapper.run_async", new=fake_flake8):
+            report = await manager.analyze_code_quality_async(sample_file, tools=None)
+
+        analyze.assert_called_once()
+        assert sorted(analyze.call_args.args[1]) == ["radon_cc", "radon_mi"]
+        assert report.lint_issues == 1
+        assert report.maintainability_index == 70.0
+
+
+class TestAnalyzers:
+    """Analyzer output (runs only where the tools are installed)"""
+
+    def test_lint_matches_flake8_codes(self, sample_file):
+        pytest.importorskip("flake8")
+        result = analyze_file(sample_file, ["flake8"], {"flake8": {"max_line_length": 88}})["flake8"]
+
+        assert result.success
+        codes = {(issue.line, issue.code) for issue in result.issues}
+        assert {(1, "F401"), (5, "F841"), (9, "E305"), (9, "E225")} <= codes
+
+    def test_radon_shares_parse(self, sample_file):
+        pytest.importorskip("radon")
+        results = analyze_file(sample_file, ["radon_cc", "radon_mi"], {"radon": {}})
+
+        functions = results["radon_cc"].metrics["functions"]
+        assert [(f["name"], f["complexity"]) for f in functions] == [("check", 2)]
+        assert results["radon_mi"].metrics["grade"] == "A"
+
+    def test_syntax_error(self, tmp_path):
+        pytest.importorskip("radon")
+        pytest.importorskip("flake8")
+        path = tmp_path / "broken.py"
+        path.write_text("def broken(:\n")
+        results = analyze_file(str(path), ["flake8", "radon_cc"], {})
+
+        assert [issue.code for issue in results["flake8"].issues] == ["E999"]
+        assert results["radon_cc"].success
+        assert results["radon_cc"].metrics["functions"] == []
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_round_trip(self, sample_file):
+        pytest.importorskip("radon")
+        backend = InProcessQABackend(max_workers=1)
+        try:
+            results = await backend.analyze_file(sample_file, ["radon_mi"], {"radon": {}}, timeout=120)
+        finally:
+            backend.shutdown()
+
+        assert results["radon_mi"].success
+        assert backend.get_stats()["files"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timed_out_worker_is_terminated(self, tmp_path):
+        # Opening a FIFO with no writer blocks the worker indefinitely
+        fifo = tmp_path / "hang.py"
+        os.mkfifo(fifo)
+        backend = InProcessQABackend(max_workers=1)
+        pool = backend._get_pool()
+        try:
+            call = asyncio.ensure_future(backend.analyze_file(str(fifo), ["radon_mi"], {}, timeout=3))
+            while not pool._processes:
+                await asyncio.sleep(0.05)
+            workers = list(pool._processes.values())
+            results = await call
+            deadline = time.monotonic() + 10
+            while any(w.is_alive() for w in workers) and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+        finally:
+            backend.shutdown()
+
+        assert results["radon_mi"].metrics == {"timed_out": True}
+        assert backend.get_stats()["pool_restarts"] == 1
+        assert not any(w.is_alive() for w in workers)
@@ -0,0 +1,106 @@
+"""
+Unit tests for QAResultCache
+Tests content-hash keys, config/version invalidation and size-bounded eviction
+"""
+
+import os
+
+import pytest
+
+from dev_platform.tools.qa_result_cache import QAResultCache
+
+
+RESULT = {"issues": [{"line": 1, "code": "E501", "message": "line too long"}]}
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    """QAResultCache in a temporary directory"""
+    cache = QAResultCache(str(tmp_path / "qa_results"), size_limit_mb=1)
+    yield cache
+    cache.cache.close()
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("x = 1\n")
+    return str(path)
+
+
+class TestContentHash:
+    """Test file hashing"""
+
+    def test_same_content_same_hash(self, result_cache, tmp_path, source_file):
+        """Identical files share a hash regardless of path"""
+        other = tmp_path / "copy.py"
+        other.write_text("x = 1\n")
+        assert result_cache.hash_file(source_file) == result_cache.hash_file(str(other))
+
+    def test_changed_content_changes_hash(self, result_cache, source_file):
+        """Editing a file changes its hash"""
+        before = result_cache.hash_file(source_file)
+        with open(source_file, "w") as f:
+            f.write("x = 2  # changed\n")
+        os.utime(source_file, ns=(1, 1))
+        assert result_cache.hash_file(source_file) != before
+
+    def test_missing_file_has_no_hash(self, result_cache, tmp_path):
+        assert result_cache.hash_file(str(tmp_path / "missing.py")) is None
+
+
+class TestLookup:
+    """Test get/set and key components"""
+
+    def test_miss_then_hit(self, result_cache, source_file):
+        """A stored result is returned for the same key"""
+        content_hash = result_cache.hash_file(source_file)
+        config_hash = result_cache.hash_config({"max_line_length": 120})
+
+        assert result_cache.get("flake8", content_hash, config_hash) is None
+        result_cache.set("flake8", content_hash, config_hash, RESULT)
+        assert result_cache.get("flake8", content_hash, config_hash) == RESULT
+
+        stats = result_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["stores"] == 1
+        assert stats["entries"] == 1
+
+    def test_config_change_misses(self, result_cache, source_file):
+        """A different tool configuration does not reuse results"""
+        content_hash = result_cache.hash_file(source_file)
+        result_cache.set("flake8", content_hash, result_cache.hash_config({"max_line_length": 120}), RESULT)
+        assert result_cache.get("flake8", content_hash, result_cache.hash_config({"max_line_length": 80})) is None
+
+    def test_config_hash_ignores_key_order(self, result_cache):
+        assert result_cache.hash_config({"a": 1, "b": 2}) == result_cache.hash_config({"b": 2, "a": 1})
+
+    def test_tool_version_in_key(self, result_cache, source_file):
+        """Upgrading a tool invalidates its cached results"""
+        content_hash = result_cache.hash_file(source_file)
+        result_cache._versions["flake8"] = "6.0.0"
+        result_cache.set("flake8", content_hash, "cfg", RESULT)
+
+        result_cache._versions["flake8"] = "7.0.0"
+        assert result_cache.get("flake8", content_hash, "cfg") is None
+
+    def test_tools_do_not_share_entries(self, result_cache, source_file):
+        content_hash = result_cache.hash_file(source_file)
+        result_cache.set("flake8", content_hash, "cfg", RESULT)
+        assert result_cache.get("bandit", content_hash, "cfg") is None
+
+
+class TestEviction:
+    """Test the size bound"""
+
+    def test_size_limit_evicts_old_entries(self, result_cache):
+        """Writing past size_limit keeps the cache bounded"""
+        payload = {"issues": [{"message": "x" * 50_000}]}
+        for i in range(60):
+            result_cache.set("flake8", f"hash{i}", "cfg", payload)
+        result_cache.cache.cull()
+
+        assert result_cache.cache.volume() <= 1024 * 1024 + 256 * 1024
+        assert result_cache.get("flake8", "hash0", "cfg") is None
+        assert result_cache.get("flake8", "hash59", "cfg") is not None
@@ -0,0 +1,257 @@
+"""
+Unit tests for ResponseCache
+Tests key normalization, near-duplicate matching, TTLs, eviction and counters
+"""
+
+import threading
+import pytest
+from unittest.mock import patch
+
+from dev_platform.core.response_cache import ResponseCache
+
+
+LONG_PROMPT = (
+    "Please design a detailed implementation plan for a REST API that manages tasks "
+    "with create read update delete operations, persistent sqlite storage, token based "
+    "authentication, input validation, pagination of list endpoints and structured "
+    "error responses for every failure case"
+)
+
+
+@pytest.fixture
+def response_cache(mock_cache_manager):
+    """ResponseCache backed by the in-memory mock cache manager"""
+    return ResponseCache(mock_cache_manager)
+
+
+class TestKeyNormalization:
+    """Test canonical cache keys"""
+
+    def test_whitespace_and_timestamps_do_not_change_key(self, response_cache):
+        """Trivially different prompts map to the same key"""
+        a = [
+            {"role": "system", "content": "You are a planner.  Now: 2025-11-19T10:00:00Z"},
+            {"role": "user", "content": "Build   an API"}
+        ]
+        b = [
+            {"role": "system", "content": "You are a planner.\nNow: 2026-01-02 08:15:30"},
+            {"role": "user", "content": "Build an API\n"}
+        ]
+
+        assert response_cache.make_key(a, 0.7) == response_cache.make_key(b, 0.7)
+
+    def test_system_message_order_does_not_change_key(self, response_cache):
+        """System prompts are merged order-independently"""
+        a = [
+            {"role": "system", "content": "Rule A"},
+            {"role": "system", "content": "Rule B"},
+            {"role": "user", "content": "Go"}
+        ]
+        b = [a[1], a[0], a[2]]
+
+        assert response_cache.make_key(a, 0.7) == response_cache.make_key(b, 0.7)
+
+    def test_temperature_and_namespace_change_key(self, response_cache):
+        """Different sampling temperature or namespace is a different entry"""
+        messages = [{"role": "user", "content": "Go"}]
+
+        assert response_cache.make_key(messages, 0.7) != response_cache.make_key(messages, 0.1)
+        assert response_cache.make_key(messages, 0.7, "planner") != response_cache.make_key(messages, 0.7, "qa_test")
+
+
+class TestCacheOperations:
+    """Test get/set, TTLs and counters"""
+
+    def test_hit_and_miss_counters(self, response_cache):
+        """Counters track hits, misses and bytes saved"""
+        messages = [{"role": "user", "content": "Plan it"}]
+
+        assert response_cache.get(messages, 0.7) is None
+        response_cache.set(messages, 0.7, {"content": "plan", "tokens_used": 42})
+        assert response_cache.get(messages, 0.7)["content"] == "plan"
+
+        totals = response_cache.get_stats()["totals"]
+        assert totals["hits"] == 1
+        assert totals["misses"] == 1
+        assert totals["bytes_saved"] == len("plan")
+        assert totals["tokens_saved"] == 42
+
+    def test_namespace_ttl_is_applied(self, response_cache, mock_cache_manager):
+        """Entries are stored with their namespace TTL"""
+        messages = [{"role": "user", "content": "Plan it"}]
+        response_cache.set(messages, 0.7, {"content": "plan"}, namespace="planner")
+
+        key = response_cache.make_key(messages, 0.7, "planner")
+        assert mock_cache_manager._cache_store[f"{key}_ttl"] == ResponseCache.DEFAULT_TTLS["planner"]
+
+    def test_lru_eviction_respects_max_entries(self, mock_cache_manager):
+        """Least recently used entry is evicted when over budget"""
+        cache = ResponseCache(mock_cache_manager, max_entries=2)
+        first = [{"role": "user", "content": "first"}]
+        second = [{"role": "user", "content": "second"}]
+        third = [{"role": "user", "content": "third"}]
+
+        cache.set(first, 0.7, {"content": "1"})
+        cache.set(second, 0.7, {"content": "2"})
+        cache.get(first, 0.7)  # first is now most recently used
+        cache.set(third, 0.7, {"content": "3"})
+
+        assert cache.get(second, 0.7) is None
+        assert cache.get(first, 0.7)["content"] == "1"
+        assert cache.get_stats()["totals"]["evictions"] == 1
+
+    def test_lfu_eviction_keeps_frequent_entries(self, mock_cache_manager):
+        """Least frequently used entry is evicted under the LFU policy"""
+        cache = ResponseCache(mock_cache_manager, max_entries=2, eviction_policy="lfu")
+        hot = [{"role": "user", "content": "hot"}]
+        cold = [{"role": "user", "content": "cold"}]
+
+        cache.set(hot, 0.7, {"content": "h"})
+        cache.set(cold, 0.7, {"content": "c"})
+        for _ in range(3):
+            cache.get(hot, 0.7)
+        cache.set([{"role": "user", "content": "new"}], 0.7, {"content": "n"})
+
+        assert cache.get(cold, 0.7) is None
+        assert cache.get(hot, 0.7) is not None
+
+    def test_lfu_ties_evict_least_recently_used(self, mock_cache_manager):
+        """Among entries with equal hits the least recently used goes first"""
+        cache = ResponseCache(mock_cache_manager, max_entries=3, eviction_policy="lfu")
+        prompts = [[{"role": "user", "content": name}] for name in ("a", "b", "c", "d", "e")]
+
+        for prompt in prompts[:3]:
+            cache.set(prompt, 0.7, {"content": "x"})
+        cache.get(prompts[0], 0.7)
+        cache.get(prompts[1], 0.7)
+        cache.get(prompts[0], 0.7)
+        cache.set(prompts[3], 0.7, {"content": "x"})  # evicts c (0 hits)
+        cache.set(prompts[4], 0.7, {"content": "x"})  # evicts d (0 hits, older than e)
+
+        assert cache.get(prompts[2], 0.7, count=False) is None
+        assert cache.get(prompts[3], 0.7, count=False) is None
+        assert cache.get(prompts[1], 0.7, count=False) is not None
+        assert cache.get(prompts[4], 0.7, count=False) is not None
+
+
+class TestIndexPersistence:
+    """Test deferred writes of the eviction index"""
+
+    def test_index_written_on_interval_not_every_set(self, mock_cache_manager):
+        """set() only marks the index dirty until the flush interval passes"""
+        cache = ResponseCache(mock_cache_manager, index_flush_interval=3600)
+        for name in ("a", "b", "c"):
+            cache.set([{"role": "user", "content": name}], 0.7, {"content": name})
+
+        assert ResponseCache.INDEX_KEY not in mock_cache_manager._cache_store
+
+        cache.index_flush_interval = 0
+        cache.set([{"role": "user", "content": "d"}], 0.7, {"content": "d"})
+
+        assert len(mock_cache_manager._cache_store[ResponseCache.INDEX_KEY]) == 4
+
+    def test_flush_persists_index_for_next_instance(self, mock_cache_manager):
+        """flush() writes pending changes; a new cache restores order and hits"""
+        cache = ResponseCache(mock_cache_manager, max_entries=2, eviction_policy="lfu",
+                              index_flush_interval=3600)
+        hot = [{"role": "user", "content": "hot"}]
+        cold = [{"role": "user", "content": "cold"}]
+        cache.set(hot, 0.7, {"content": "h"})
+        cache.set(cold, 0.7, {"content": "c"})
+        cache.get(hot, 0.7)
+        cache.flush()
+
+        restored = ResponseCache(mock_cache_manager, max_entries=2, eviction_policy="lfu")
+        restored.set([{"role": "user", "content": "new"}], 0.7, {"content": "n"})
+
+        assert restored.get(cold, 0.7) is None
+        assert restored.get(hot, 0.7) is not None
+
+    def test_expired_entries_pruned_from_index(self, mock_cache_manager):
+        """Entries past their TTL leave the index when it is next written"""
+        cache = ResponseCache(mock_cache_manager, ttls={"default": 60}, index_flush_interval=0)
+        with patch("dev_platform.core.response_cache.time.time", return_value=1000.0):
+            cache.set([{"role": "user", "content": "old"}], 0.7, {"content": "o"})
+        with patch("dev_platform.core.response_cache.time.time", return_value=1061.0):
+            cache.set([{"role": "user", "content": "new"}], 0.7, {"content": "n"})
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] == cache._index[cache.make_key([{"role": "user", "content": "new"}], 0.7)]["size"]
+        assert len(mock_cache_manager._cache_store[ResponseCache.INDEX_KEY]) == 1
+
+    def test_miss_on_indexed_key_drops_entry(self, mock_cache_manager):
+        """A key the store already expired is removed from the index on lookup"""
+        cache = ResponseCache(mock_cache_manager, ttls={"default": 60}, index_flush_interval=3600)
+        messages = [{"role": "user", "content": "gone"}]
+        with patch("dev_platform.core.response_cache.time.time", return_value=1000.0):
+            cache.set(messages, 0.7, {"content": "g"})
+        mock_cache_manager.cache_delete(cache.make_key(messages, 0.7))
+
+        with patch("dev_platform.core.response_cache.time.time", return_value=1060.0):
+            assert cache.get(messages, 0.7) is None
+        assert cache.get_stats()["entries"] == 0
+        assert cache.get_stats()["bytes"] == 0
+
+
+class TestConcurrency:
+    """Test the index under concurrent use from worker threads"""
+
+    def test_concurrent_set_and_get_keep_index_consistent(self, mock_cache_manager):
+        """Byte totals and LFU buckets match the index after threaded churn"""
+        cache = ResponseCache(mock_cache_manager, max_entries=20, eviction_policy="lfu",
+                              index_flush_interval=0)
+        errors = []
+
+        def worker(worker_id):
+            try:
+                for i in range(200):
+                    messages = [{"role": "user", "content": f"prompt {(worker_id * 7 + i) % 50}"}]
+                    if i % 3:
+                        cache.get(messages, 0.7)
+                    else:
+                        cache.set(messages, 0.7, {"content": "x" * (i % 17)})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(cache._index) <= 20
+        assert cache._total_bytes == sum(meta["size"] for meta in cache._index.values())
+        bucketed = {key: hits for hits, keys in cache._hit_buckets.items() for key in keys}
+        assert bucketed == {key: meta["hits"] for key, meta in cache._index.items()}
+
+
+class TestSimilarityTier:
+    """Test MinHash near-duplicate matching"""
+
+    def test_near_duplicate_hit_when_enabled(self, mock_cache_manager):
+        """A one-word edit of a long prompt is served from cache"""
+        cache = ResponseCache(mock_cache_manager, similarity_threshold=0.8)
+        cache.set([{"role": "user", "content": LONG_PROMPT}], 0.7, {"content": "plan"})
+
+        edited = [{"role": "user", "content": LONG_PROMPT.replace("pagination", "paging")}]
+        result = cache.get(edited, 0.7)
+
+        assert result["content"] == "plan"
+        assert result["cache_similarity"] >= 0.8
+        assert cache.get_stats()["totals"]["near_hits"] == 1
+
+    def test_near_duplicates_ignored_when_disabled(self, response_cache):
+        """Exact-match only by default"""
+        response_cache.set([{"role": "user", "content": LONG_PROMPT}], 0.7, {"content": "plan"})
+        edited = [{"role": "user", "content": LONG_PROMPT.replace("pagination", "paging")}]
+
+        assert response_cache.get(edited, 0.7) is None
+
+    def test_unrelated_prompt_is_not_matched(self, mock_cache_manager):
+        """Dissimilar prompts do not produce false hits"""
+        cache = ResponseCache(mock_cache_manager, similarity_threshold=0.8)
+        cache.set([{"role": "user", "content": LONG_PROMPT}], 0.7, {"content": "plan"})
+
+        assert cache.get([{"role": "user", "content": "Summarize yesterday's failing QA tests"}], 0.7) is None
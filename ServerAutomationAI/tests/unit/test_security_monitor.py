@@ -0,0 +1,120 @@
+"""
+Unit tests for SecurityMonitor blocking
+Tests block expiry tracking with the firewall commands mocked
+"""
+
+import subprocess
+import pytest
+from unittest.mock import MagicMock, patch
+
+from agents.security_monitor import SecurityMonitor
+
+
+@pytest.fixture
+def run():
+    with patch("tools.firewall.subprocess.run",
+               return_value=subprocess.CompletedProcess([], 0, stdout="", stderr="")) as mock_run:
+        yield mock_run
+
+
+@pytest.fixture
+def make_monitor(tmp_path, run):
+    def factory(**agent_config):
+        config = {'agents': {'security_monitor': {
+            'max_failed_logins': 3,
+            'block_backend': 'ipset',
+            'block_duration_minutes': 60,
+            'state_file': str(tmp_path / 'offsets.json'),
+            'suspicious_ips_file': str(tmp_path / 'blocked.txt'),
+            'whitelist_ips_file': str(tmp_path / 'whitelist.txt'),
+            **agent_config
+        }}}
+        with patch.object(SecurityMonitor, '_load_config', return_value=config), \
+                patch('agents.security_monitor.get_communication_system', return_value=MagicMock()):
+            monitor = SecurityMonitor()
+        monitor._get_ip_geolocation = MagicMock(return_value=None)
+        return monitor
+    return factory
+
+
+def fail_logins(monitor, ip_address, count):
+    for _ in range(count):
+        monitor._analyze_auth_line(f"sshd[1]: Failed password for root from {ip_address} port 22 ssh2")
+    monitor._flush_blocks()
+
+
+def restore_script(run):
+    for c in run.call_args_list:
+        if "restore" in c.args[0]:
+            return c.kwargs["input"]
+    return None
+
+
+class TestBlockExpiry:
+    """Test that expired ipset blocks are forgotten"""
+
+    def test_block_recorded_with_expiry(self, make_monitor, tmp_path):
+        monitor = make_monitor()
+        with patch('agents.security_monitor.time.time', return_value=1000.0):
+            fail_logins(monitor, "1.2.3.4", 3)
+
+        assert monitor.blocked_ips == {"1.2.3.4": 1000.0 + 3600}
+        assert (tmp_path / 'blocked.txt').read_text() == "1.2.3.4 4600\n"
+
+    def test_expired_block_counted_again(self, make_monitor, tmp_path):
+        monitor = make_monitor()
+        with patch('agents.security_monitor.time.time', return_value=1000.0):
+            fail_logins(monitor, "1.2.3.4", 3)
+        with patch('agents.security_monitor.time.time', return_value=4600.0):
+            monitor._cleanup_old_events()
+
+        assert monitor.blocked_ips == {}
+        assert (tmp_path / 'blocked.txt').read_text() == ""
+
+        fail_logins(monitor, "1.2.3.4", 3)
+        assert "1.2.3.4" in monitor.blocked_ips
+
+    def test_unexpired_block_kept(self, make_monitor):
+        monitor = make_monitor()
+        with patch('agents.security_monitor.time.time', return_value=1000.0):
+            fail_logins(monitor, "1.2.3.4", 3)
+        with patch('agents.security_monitor.time.time', return_value=4599.0):
+            monitor._cleanup_old_events()
+
+        assert "1.2.3.4" in monitor.blocked_ips
+
+    def test_restart_restores_remaining_time(self, make_monitor, tmp_path, run):
+        (tmp_path / 'blocked.txt').write_text("1.2.3.4 4600\n5.6.7.8 1500\n")
+
+        with patch('agents.security_monitor.time.time', return_value=2000.0):
+            monitor = make_monitor()
+
+        assert monitor.blocked_ips == {"1.2.3.4": 4600.0}
+        assert (tmp_path / 'blocked.txt').read_text() == "1.2.3.4 4600\n"
+        assert restore_script(run) == "add ai_blocked_ips 1.2.3.4 timeout 2600\n"
+
+    def test_legacy_entries_get_expiry(self, make_monitor, tmp_path):
+        (tmp_path / 'blocked.txt').write_text("1.2.3.4\n")
+
+        with patch('agents.security_monitor.time.time', return_value=1000.0):
+            monitor = make_monitor()
+
+        assert monitor.blocked_ips == {"1.2.3.4": 4600.0}
+        assert (tmp_path / 'blocked.txt').read_text() == "1.2.3.4 4600\n"
+
+    def test_permanent_blocks_never_expire(self, make_monitor, tmp_path):
+        monitor = make_monitor(block_duration_minutes=0)
+        fail_logins(monitor, "1.2.3.4", 3)
+        with patch('agents.security_monitor.time.time', return_value=10 ** 10):
+            monitor._cleanup_old_events()
+
+        assert monitor.blocked_ips == {"1.2.3.4": 0}
+        assert (tmp_path / 'blocked.txt').read_text() == "1.2.3.4\n"
+
+    def test_iptables_blocks_are_permanent(self, make_monitor, tmp_path):
+        (tmp_path / 'blocked.txt').write_text("1.2.3.4 4600\n")
+
+        monitor = make_monitor(block_backend='iptables')
+
+        assert monitor.blocked_ips == {"1.2.3.4": 0}
+        assert (tmp_path / 'blocked.txt').read_text() == "1.2.3.4\n"
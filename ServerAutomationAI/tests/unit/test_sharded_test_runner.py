@@ -0,0 +1,147 @@
+"""
+Unit tests for ShardedTestRunner
+Tests duration-balanced shard planning, JUnit XML merging and failed-first ordering
+"""
+
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from dev_platform.agents.qa_test_agent import QATestAgent
+from dev_platform.agents.schemas import TestStatus
+from dev_platform.tools.sharded_test_runner import ShardedTestRunner
+
+
+@pytest.fixture
+def test_tree(tmp_path, monkeypatch):
+    """Small test suite in a temporary project root"""
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    (tests / "test_math.py").write_text(
+        "def test_add():\n    assert 1 + 1 == 2\n\n"
+        "def test_broken():\n    assert 1 + 1 == 3\n"
+    )
+    (tests / "test_text.py").write_text(
+        "import pytest\n\n"
+        "class TestUpper:\n"
+        "    def test_upper(self):\n        assert 'a'.upper() == 'A'\n\n"
+        "@pytest.mark.skip(reason='not ready')\n"
+        "def test_later():\n    pass\n"
+    )
+    (tests / "test_more.py").write_text("def test_one():\n    pass\n\ndef test_two():\n    pass\n")
+    (tests / "helpers.py").write_text("VALUE = 1\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_runner(shards=2):
+    return ShardedTestRunner(shards=shards, timeout=120.0, python=sys.executable)
+
+
+# ===== Planning =====
+
+def test_discover_test_files(test_tree):
+    files = ShardedTestRunner.discover_test_files("tests")
+
+    assert files == ["tests/test_math.py", "tests/test_more.py", "tests/test_text.py"]
+
+
+def test_plan_shards_balances_by_duration():
+    runner = make_runner(shards=2)
+    durations = {"a.py": 10.0, "b.py": 6.0, "c.py": 5.0, "d.py": 1.0}
+
+    shards = runner.plan_shards(["a.py", "b.py", "c.py", "d.py"], durations)
+
+    loads = sorted(sum(durations[f] for f in shard) for shard in shards)
+    assert loads == [11.0, 11.0]
+
+
+def test_plan_shards_unknown_files_use_average():
+    runner = make_runner(shards=3)
+
+    shards = runner.plan_shards(["a.py", "b.py", "new.py"], {"a.py": 4.0, "b.py": 2.0})
+
+    assert sorted(len(shard) for shard in shards) == [1, 1, 1]
+    assert runner.plan_shards([], {}) == []
+    assert len(make_runner(shards=8).plan_shards(["a.py", "b.py"])) == 2
+
+
+# ===== Execution =====
+
+@pytest.mark.asyncio
+async def test_run_merges_junit_results(test_tree):
+    run = await make_runner(shards=2).run("tests")
+
+    assert run["counts"] == {"passed": 4, "failed": 1, "skipped": 1, "errors": 0}
+    assert run["shards"] == 2
+    assert run["failed_tests"] == ["tests/test_math.py::test_broken"]
+    assert "tests/test_text.py::TestUpper::test_upper" in run["passed_tests"]
+    assert set(run["file_durations"]) == {"tests/test_math.py", "tests/test_more.py", "tests/test_text.py"}
+
+    broken = next(r for r in run["results"] if r.test_name == "tests/test_math.py::test_broken")
+    assert broken.status == TestStatus.FAILED
+    assert broken.line_number == 4
+    assert "assert" in broken.error_message
+
+
+@pytest.mark.asyncio
+async def test_run_previously_failed_first(test_tree):
+    failed = ["tests/test_math.py::test_broken", "tests/test_gone.py::test_x"]
+
+    run = await make_runner().run("tests", failed_first=failed)
+
+    # Re-run first, then deselected from the main phase (not counted twice)
+    assert run["results"][0].test_name == "tests/test_math.py::test_broken"
+    assert run["counts"]["failed"] == 1
+    assert run["counts"]["passed"] == 4
+    assert run["stopped_early"] is False
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast_stops_after_rerun(test_tree):
+    run = await make_runner().run(
+        "tests", failed_first=["tests/test_math.py::test_broken"], fail_fast=True
+    )
+
+    assert run["stopped_early"] is True
+    assert [r.test_name for r in run["results"]] == ["tests/test_math.py::test_broken"]
+
+
+@pytest.mark.asyncio
+async def test_run_reports_shard_crash(test_tree):
+    (test_tree / "tests" / "test_math.py").write_text("def test_add(:\n")
+
+    run = await make_runner(shards=1).run("tests")
+
+    # Collection errors are reported as errors, not lost
+    assert run["counts"]["errors"] >= 1
+
+
+# ===== QATestAgent integration =====
+
+@pytest.fixture
+def qa_agent():
+    """QA agent created before test_tree changes directory (cache paths are relative)"""
+    agent = QATestAgent()
+    agent.test_history = []
+    agent.test_durations = {}
+    agent.last_failed_tests = []
+    agent._save_qa_state = MagicMock()
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_agent_sharded_run_updates_state(qa_agent, test_tree):
+    agent = qa_agent
+
+    result = await agent.run_tests_async(test_path="tests", coverage=False, shards=2)
+
+    assert result["success"] is True
+    assert result["total_tests"] == 6
+    assert result["failed"] == 1
+    assert result["shards"] == 2
+    assert agent.last_failed_tests == ["tests/test_math.py::test_broken"]
+    assert "tests/test_more.py" in agent.test_durations
+    assert "test_results" not in agent.test_history[-1]["results"]
+    agent._save_qa_state.assert_called_once()
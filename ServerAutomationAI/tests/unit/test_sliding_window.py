@@ -0,0 +1,171 @@
+"""
+Unit tests for SlidingWindowCounter and CountMinSketch
+Tests bucket expiry, LRU eviction and sketch estimates
+"""
+
+import random
+
+from tools.sliding_window import CountMinSketch, SlidingWindowCounter
+
+
+class TestWindowExpiry:
+    """Test counts across bucket boundaries (60s window, 10s buckets)"""
+
+    def make_counter(self, **kwargs):
+        return SlidingWindowCounter(60, buckets=6, **kwargs)
+
+    def test_counts_within_window(self):
+        counter = self.make_counter()
+        for now in (0, 5, 15, 59):
+            counter.add("a", now=now)
+
+        assert counter.count("a", now=59) == 4
+
+    def test_oldest_bucket_expires_at_boundary(self):
+        counter = self.make_counter()
+        counter.add("a", now=0)
+        counter.add("a", now=9.9)
+        counter.add("a", now=10)
+
+        # Bucket [0, 10) leaves the window once time reaches 60
+        assert counter.count("a", now=59.9) == 3
+        assert counter.count("a", now=60) == 1
+        assert counter.count("a", now=70) == 0
+
+    def test_add_after_partial_expiry(self):
+        counter = self.make_counter()
+        counter.add("a", now=0)
+        counter.add("a", now=30)
+
+        assert counter.add("a", now=65) == 2
+        assert counter.count("a", now=65) == 2
+        assert counter.add("a", now=95) == 2
+
+    def test_add_after_whole_window_resets(self):
+        counter = self.make_counter()
+        for now in range(0, 60, 10):
+            counter.add("a", now=now)
+
+        assert counter.add("a", now=200) == 1
+
+    def test_count_does_not_mutate(self):
+        counter = self.make_counter()
+        counter.add("a", now=0)
+        counter.add("a", now=30)
+
+        assert counter.count("a", now=65) == 1
+        assert counter.count("a", now=35) == 2
+
+    def test_clock_step_back_counts_as_newest(self):
+        counter = self.make_counter()
+        counter.add("a", now=100)
+
+        assert counter.add("a", now=50) == 2
+        assert counter.count("a", now=100) == 2
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        counter = self.make_counter()
+        events = []
+        now = 0.0
+        for _ in range(2000):
+            now += rng.random() * 3
+            key = rng.choice("abc")
+            counter.add(key, now=now)
+            events.append((key, now))
+            # Bucketed window: events in the current bucket and the 5 before it
+            first_bucket = int(now // 10) - 5
+            expected = sum(1 for k, t in events if k == key and int(t // 10) >= first_bucket)
+            assert counter.count(key, now=now) == expected
+
+    def test_expire_drops_idle_keys(self):
+        counter = self.make_counter()
+        counter.add("old", now=0)
+        counter.add("new", now=50)
+
+        assert counter.expire(now=65) == 1
+        assert list(counter) == ["new"]
+
+
+class TestEviction:
+    """Test the max_keys bound"""
+
+    def test_least_recently_updated_key_evicted(self):
+        counter = SlidingWindowCounter(60, buckets=6, max_keys=2)
+        counter.add("a", now=0)
+        counter.add("b", now=1)
+        counter.add("a", now=2)
+        counter.add("c", now=3)
+
+        assert sorted(counter) == ["a", "c"]
+        assert counter.evictions == 1
+        assert counter.count("b", now=3) == 0
+
+    def test_count_does_not_refresh_lru(self):
+        counter = SlidingWindowCounter(60, buckets=6, max_keys=2)
+        counter.add("a", now=0)
+        counter.add("b", now=1)
+        counter.count("a", now=2)
+        counter.add("c", now=3)
+
+        assert sorted(counter) == ["b", "c"]
+
+    def test_len_bounded(self):
+        counter = SlidingWindowCounter(60, buckets=6, max_keys=100)
+        for i in range(1000):
+            counter.add(f"10.0.{i // 256}.{i % 256}", now=i / 100)
+
+        assert len(counter) == 100
+        assert counter.evictions == 900
+
+    def test_sketch_keeps_count_of_evicted_key(self):
+        counter = SlidingWindowCounter(60, buckets=6, max_keys=1, sketch_width=1024)
+        for now in range(3):
+            counter.add("a", now=now)
+        counter.add("b", now=3)
+
+        assert "a" not in list(counter)
+        assert counter.count("a", now=3) >= 3
+        # Re-tracked key resumes from the sketch estimate
+        assert counter.add("a", now=4) >= 4
+
+
+class TestCountMinSketch:
+    """Test that estimates never under-count"""
+
+    def test_never_under_counts(self):
+        rng = random.Random(11)
+        sketch = CountMinSketch(width=64, depth=4, buckets=6)
+        exact = {}
+        for _ in range(5000):
+            key = f"ip-{rng.randrange(500)}"
+            sketch.add(key, bucket=0)
+            exact[key] = exact.get(key, 0) + 1
+
+        for key, count in exact.items():
+            assert sketch.estimate(key, bucket=0) >= count
+
+    def test_exact_when_wide(self):
+        sketch = CountMinSketch(width=4096, depth=4, buckets=6)
+        for key, count in (("a", 3), ("b", 5)):
+            sketch.add(key, bucket=0, count=count)
+
+        assert sketch.estimate("a", bucket=0) == 3
+        assert sketch.estimate("b", bucket=0) == 5
+        assert sketch.estimate("c", bucket=0) == 0
+
+    def test_expired_buckets_not_counted(self):
+        sketch = CountMinSketch(width=256, depth=4, buckets=6)
+        sketch.add("a", bucket=0, count=2)
+        sketch.add("a", bucket=3, count=1)
+
+        assert sketch.estimate("a", bucket=5) == 3
+        assert sketch.estimate("a", bucket=6) == 1
+        assert sketch.estimate("a", bucket=9) == 0
+
+    def test_reused_slot_is_cleared(self):
+        sketch = CountMinSketch(width=256, depth=4, buckets=6)
+        sketch.add("a", bucket=0, count=7)
+        sketch.add("a", bucket=6)
+
+        assert sketch.estimate("a", bucket=6) == 1
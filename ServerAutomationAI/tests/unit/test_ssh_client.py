@@ -0,0 +1,169 @@
+"""
+Unit tests for the bridge SSH client batching and connection broker
+Remote execution is replaced by a local shell
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+pytest.importorskip("paramiko")
+
+from bridge_tool.services.ssh_client import SSHClientManager
+from bridge_tool.services.ssh_broker import BrokerClient, SSHBroker
+
+
+def local_exec(command, timeout=120):
+    """Run a 'remote' command in a local /bin/sh, like an SSH exec channel"""
+    result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+    return result.returncode, result.stdout, result.stderr
+
+
+@pytest.fixture
+def ssh():
+    """SSHClientManager whose commands run locally"""
+    client = SSHClientManager({'host': 'example.com', 'username': 'deploy'})
+    client.execute_command = MagicMock(side_effect=local_exec)
+    return client
+
+
+class TestExecuteBatch:
+    """Test splitting one remote shell's output back into per-command results"""
+
+    def test_one_remote_command_for_the_batch(self, ssh):
+        results = ssh.execute_batch(["echo one", "echo two >&2", "echo three"])
+
+        assert ssh.execute_command.call_count == 1
+        assert results == [
+            ("echo one", 0, "one\n", ""),
+            ("echo two >&2", 0, "", "two\n"),
+            ("echo three", 0, "three\n", "")
+        ]
+
+    def test_output_without_trailing_newline(self, ssh):
+        results = ssh.execute_batch(["printf abc", "printf err >&2", "printf ''"])
+
+        assert [(out, err) for _, _, out, err in results] == [("abc", ""), ("", "err"), ("", "")]
+
+    def test_commands_run_in_separate_subshells(self, ssh):
+        results = ssh.execute_batch(["cd / && X=1", "pwd; echo \"x=$X\""])
+
+        assert results[1][2] == f"{os.getcwd()}\nx=\n"
+
+    def test_stop_on_error(self, ssh):
+        results = ssh.execute_batch(["echo a", "echo bad >&2; exit 3", "echo never"])
+
+        assert results == [("echo a", 0, "a\n", ""), ("echo bad >&2; exit 3", 3, "", "bad\n")]
+
+    def test_continue_on_error(self, ssh):
+        results = ssh.execute_batch(["false", "echo after"], stop_on_error=False)
+
+        assert [(cmd, code, out) for cmd, code, out, _ in results] == [("false", 1, ""), ("echo after", 0, "after\n")]
+
+    def test_interrupted_batch_reports_partial_output(self, ssh):
+        """Commands after a lost connection are not reported; the cut-off one fails"""
+        def cut_off(command, timeout=120):
+            _, stdout, _ = local_exec(command)
+            return -1, stdout[:stdout.index("partial") + len("partial")], "timed out"
+
+        ssh.execute_command = MagicMock(side_effect=cut_off)
+
+        results = ssh.execute_batch(["echo done", "echo partial; echo rest", "echo never"])
+
+        assert results == [("echo done", 0, "done\n", ""), ("echo partial; echo rest", -1, "partial", "timed out")]
+
+    @pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+    def test_batch_runs_under_bash(self, ssh):
+        results = ssh.execute_batch(["[[ -n \"$BASH_VERSION\" ]] && echo bash"])
+
+        assert results == [("[[ -n \"$BASH_VERSION\" ]] && echo bash", 0, "bash\n", "")]
+
+    def test_falls_back_to_sh_without_bash(self, ssh):
+        with tempfile.TemporaryDirectory() as bin_dir:
+            os.symlink(shutil.which("sh"), os.path.join(bin_dir, "sh"))
+            path = f"PATH={bin_dir} "
+            ssh.execute_command = MagicMock(side_effect=lambda command, timeout=120: local_exec(path + command))
+
+            results = ssh.execute_batch(["echo ok"])
+
+        assert results == [("echo ok", 0, "ok\n", "")]
+
+    def test_commands_do_not_read_stdin(self, ssh):
+        results = ssh.execute_batch(["cat", "echo next"])
+
+        assert [code for _, code, _, _ in results] == [0, 0]
+
+
+class TestBroker:
+    """Test the broker's request/response protocol over its Unix socket"""
+
+    @pytest.fixture
+    def broker(self):
+        socket_dir = tempfile.mkdtemp(prefix="bridge")
+        socket_path = os.path.join(socket_dir, "ssh.sock")
+        server = SSHBroker({'host': 'example.com', 'username': 'deploy'}, socket_path, idle_timeout=60)
+        server.ssh.connect = MagicMock(return_value=True)
+        server.ssh.disconnect = MagicMock()
+        server.ssh.client = MagicMock()
+        server.ssh.client.get_transport.return_value.is_active.return_value = True
+        server.ssh.execute_command = MagicMock(side_effect=local_exec)
+
+        thread = threading.Thread(target=server.serve, daemon=True)
+        thread.start()
+        client = BrokerClient(socket_path)
+        for _ in range(100):
+            if client.ping():
+                break
+            threading.Event().wait(0.05)
+        yield server, client
+
+        client.shutdown()
+        thread.join(timeout=5)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+    def test_exec(self, broker):
+        server, client = broker
+
+        assert client.execute("echo hi; echo err >&2; exit 2", timeout=30) == (2, "hi\n", "err\n")
+        server.ssh.execute_command.assert_called_with("echo hi; echo err >&2; exit 2", 30)
+
+    def test_batch(self, broker):
+        _, client = broker
+
+        results = client.execute_batch(["echo a", "exit 4", "echo b"], stop_on_error=True, timeout=30)
+
+        assert results == [("echo a", 0, "a\n", ""), ("exit 4", 4, "", "")]
+
+    def test_client_routes_through_broker(self, broker):
+        server, client = broker
+        ssh = SSHClientManager({'host': 'example.com', 'username': 'deploy'})
+        ssh.broker = client
+
+        assert ssh.execute_command("echo via broker") == (0, "via broker\n", "")
+        assert ssh.execute_batch(["echo x"]) == [("echo x", 0, "x\n", "")]
+        assert server.ssh.execute_command.call_count == 2
+
+    def test_unknown_op_is_an_error(self, broker):
+        _, client = broker
+
+        with pytest.raises(ConnectionError, match="unknown op"):
+            client.request({'op': 'nope'}, timeout=5)
+
+    def test_lost_connection_is_an_error(self, broker):
+        server, client = broker
+        server.ssh.client.get_transport.return_value.is_active.return_value = False
+        server.ssh.connect.return_value = False
+
+        with pytest.raises(ConnectionError, match="SSH connection failed"):
+            client.execute("true")
+
+    def test_unreachable_broker(self):
+        client = BrokerClient(os.path.join(tempfile.gettempdir(), "no-such-bridge.sock"))
+
+        assert client.ping() is False
+        with pytest.raises(ConnectionError):
+            client.execute("true")
@@ -0,0 +1,214 @@
+"""
+Unit tests for the bridge SyncManager
+Tests manifest-based upload/delete planning and the local hash cache
+"""
+
+import os
+import json
+import hashlib
+import pytest
+from unittest.mock import MagicMock, patch
+
+pytest.importorskip("paramiko")
+
+from bridge_tool.services.sync_manager import SyncManager
+
+
+def md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.fixture
+def local_tree(tmp_path):
+    """Local project with three files"""
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "app.py").write_bytes(b"print('app')\n")
+    (root / "src" / "util.py").write_bytes(b"def util(): pass\n")
+    (root / "README.md").write_bytes(b"# readme\n")
+    return root
+
+
+@pytest.fixture
+def ssh():
+    """SSHClientManager stand-in that records remote calls"""
+    client = MagicMock()
+    client.read_file.return_value = None
+    client.execute_command.return_value = (0, "", "")
+    client.write_file.return_value = True
+    client.upload_files.side_effect = lambda files, **kwargs: {
+        'uploaded': [remote for _, remote in files],
+        'failed': [],
+        'bytes': 0,
+        'throughput': 0.0,
+        'packed': 0
+    }
+    return client
+
+
+def make_manager(ssh, root, **sync):
+    return SyncManager(ssh, {
+        'paths': {'local': {'root': str(root), 'exclude_file': str(root / '.bridgeignore')}},
+        'sync': {'hash_cache': str(root.parent / 'hash_cache.json'), **sync}
+    })
+
+
+def manifest_bytes(files):
+    return json.dumps({'updated': '2025-01-01T00:00:00', 'files': files}).encode('utf-8')
+
+
+def uploaded_paths(ssh):
+    files = ssh.upload_files.call_args[0][0]
+    return sorted(remote for _, remote in files)
+
+
+def written_manifest(ssh):
+    path, payload = ssh.write_file.call_args[0]
+    assert path == "/srv/app/.bridge_manifest.json"
+    return json.loads(payload.decode('utf-8'))['files']
+
+
+class TestSyncPlanning:
+    """Test upload and delete planning against the remote manifest"""
+
+    def test_uploads_only_changed_and_new_files(self, ssh, local_tree):
+        """Files whose manifest hash matches are skipped"""
+        ssh.read_file.return_value = manifest_bytes({
+            'app.py': md5(b"print('app')\n"),
+            'src/util.py': md5(b"old contents\n")
+        })
+        manager = make_manager(ssh, local_tree)
+
+        total, transferred, errors = manager.sync_files("/srv/app")
+
+        assert errors == []
+        assert total == 3
+        assert transferred == 2
+        assert uploaded_paths(ssh) == ["/srv/app/README.md", "/srv/app/src/util.py"]
+        assert manager.last_sync_stats['changed'] == 2
+        assert manager.last_sync_stats['unchanged'] == 1
+
+    def test_deletes_files_removed_since_last_sync(self, ssh, local_tree):
+        """Manifest entries without a local file are deleted in one command"""
+        ssh.read_file.return_value = manifest_bytes({
+            'app.py': md5(b"print('app')\n"),
+            'old.py': 'x',
+            'src/gone.py': 'y'
+        })
+        manager = make_manager(ssh, local_tree)
+
+        manager.sync_files("/srv/app")
+
+        commands = [c[0][0] for c in ssh.execute_command.call_args_list]
+        deletes = [c for c in commands if c.startswith("rm -f --")]
+        assert deletes == ["rm -f -- /srv/app/old.py /srv/app/src/gone.py"]
+        assert manager.last_sync_stats['deleted'] == 2
+
+    def test_scanned_remote_files_kept_without_delete_remote(self, ssh, local_tree):
+        """Without a manifest, unknown remote files are only deleted when delete_remote is set"""
+        ssh.execute_command.side_effect = lambda command, **kwargs: (
+            (0, f"{md5(b'x')}  ./app.py\n{md5(b'x')}  ./extra.log\n", "") if "md5sum" in command else (0, "", "")
+        )
+
+        make_manager(ssh, local_tree).sync_files("/srv/app")
+        commands = [c[0][0] for c in ssh.execute_command.call_args_list]
+        assert not any(c.startswith("rm -f --") for c in commands)
+
+        ssh.execute_command.reset_mock()
+        make_manager(ssh, local_tree, delete_remote=True).sync_files("/srv/app")
+        commands = [c[0][0] for c in ssh.execute_command.call_args_list]
+        assert "rm -f -- /srv/app/extra.log" in commands
+
+    def test_manifest_excludes_failed_uploads(self, ssh, local_tree):
+        """A failed upload is left out of the new manifest so it is retried"""
+        ssh.upload_files.side_effect = lambda files, **kwargs: {
+            'uploaded': [remote for _, remote in files if not remote.endswith("README.md")],
+            'failed': [("/srv/app/README.md", "permission denied")],
+            'bytes': 0,
+            'throughput': 0.0,
+            'packed': 0
+        }
+        manager = make_manager(ssh, local_tree)
+
+        _, transferred, errors = manager.sync_files("/srv/app")
+
+        assert transferred == 2
+        assert errors == ["Failed to upload: README.md: permission denied"]
+        assert sorted(written_manifest(ssh)) == ["app.py", "src/util.py"]
+
+    def test_mkdir_only_for_leaf_directories(self, ssh, local_tree):
+        """Remote directories are created with one mkdir -p of the leaves"""
+        make_manager(ssh, local_tree).sync_files("/srv/app")
+
+        commands = [c[0][0] for c in ssh.execute_command.call_args_list]
+        assert "mkdir -p /srv/app/src" in commands
+
+    def test_dry_run_changes_nothing(self, ssh, local_tree):
+        """Dry run plans but neither uploads, deletes nor writes the manifest"""
+        ssh.read_file.return_value = manifest_bytes({'old.py': 'x'})
+        manager = make_manager(ssh, local_tree)
+
+        total, transferred, errors = manager.sync_files("/srv/app", dry_run=True)
+
+        assert (total, transferred, errors) == (3, 0, [])
+        ssh.upload_files.assert_not_called()
+        ssh.write_file.assert_not_called()
+        assert manager.last_sync_stats['changed'] == 3
+        assert manager.last_sync_stats['deleted'] == 1
+
+
+class TestLocalHashCache:
+    """Test the (mtime, size) cache in compute_local_hashes"""
+
+    def test_unchanged_files_are_not_rehashed(self, ssh, local_tree):
+        """Second run reads hashes from the cache"""
+        manager = make_manager(ssh, local_tree)
+        files = manager.get_files_to_sync()
+
+        first = manager.compute_local_hashes(files)
+        assert manager.last_sync_stats['hashed'] == 3
+
+        with patch.object(manager, 'calculate_file_hash', wraps=manager.calculate_file_hash) as hasher:
+            second = manager.compute_local_hashes(files)
+
+        hasher.assert_not_called()
+        assert second == first
+        assert manager.last_sync_stats['hash_cache_hits'] == 3
+        assert first['app.py'] == md5(b"print('app')\n")
+
+    def test_modified_file_is_rehashed(self, ssh, local_tree):
+        """A changed size or mtime invalidates the cached hash"""
+        manager = make_manager(ssh, local_tree)
+        files = manager.get_files_to_sync()
+        manager.compute_local_hashes(files)
+
+        app = local_tree / "app.py"
+        app.write_bytes(b"print('changed app')\n")
+        stat = app.stat()
+        os.utime(app, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        hashes = manager.compute_local_hashes(files)
+
+        assert manager.last_sync_stats['hashed'] == 1
+        assert hashes['app.py'] == md5(b"print('changed app')\n")
+
+    def test_cache_drops_deleted_files(self, ssh, local_tree):
+        """Entries for files no longer synced are not kept in the cache"""
+        manager = make_manager(ssh, local_tree)
+        manager.compute_local_hashes(manager.get_files_to_sync())
+
+        (local_tree / "README.md").unlink()
+        manager.compute_local_hashes(manager.get_files_to_sync())
+
+        cache = json.loads(manager.hash_cache_file.read_text())
+        assert sorted(cache) == ["app.py", "src/util.py"]
+
+    def test_unreadable_file_reported_as_error(self, ssh, local_tree):
+        """Files that cannot be hashed are omitted and reported by sync_files"""
+        manager = make_manager(ssh, local_tree)
+
+        with patch.object(manager, 'calculate_file_hash', side_effect=lambda path: "" if path.endswith("app.py") else "d"):
+            _, _, errors = manager.sync_files("/srv/app")
+
+        assert errors == ["Failed to read: app.py"]
+        assert "/srv/app/app.py" not in uploaded_paths(ssh)
@@ -0,0 +1,189 @@
+"""
+Unit tests for DAGScheduler
+Tests dependency ordering, concurrency limits, failure skipping and cancellation
+"""
+
+import asyncio
+import pytest
+
+from dev_platform.core.task_scheduler import DAGScheduler
+
+
+def make_tasks(deps_by_id):
+    """Build planner-style task dicts from {id: [dependencies]}"""
+    return [
+        {"id": task_id, "title": f"Task {task_id}", "dependencies": deps}
+        for task_id, deps in deps_by_id.items()
+    ]
+
+
+class TestDAGScheduler:
+    """Test DAG execution"""
+    
+    @pytest.mark.asyncio
+    async def test_independent_tasks_run_concurrently(self):
+        """Independent tasks overlap instead of running back to back"""
+        tasks = make_tasks({i: [] for i in range(1, 9)})
+        
+        async def execute(task):
+            await asyncio.sleep(0.05)
+            return task["id"]
+        
+        start = asyncio.get_running_loop().time()
+        run = await DAGScheduler(max_concurrency=8).run(tasks, execute)
+        elapsed = asyncio.get_running_loop().time() - start
+        
+        assert [entry["task_id"] for entry in run["results"]] == list(range(1, 9))
+        assert elapsed < 0.2
+    
+    @pytest.mark.asyncio
+    async def test_dependencies_run_first(self):
+        """A task starts only after all its dependencies finished"""
+        tasks = make_tasks({1: [], 2: [1], 3: [1], 4: [2, 3]})
+        finished = []
+        
+        async def execute(task):
+            for dep in task["dependencies"]:
+                assert dep in finished
+            await asyncio.sleep(0.01)
+            finished.append(task["id"])
+            return True
+        
+        run = await DAGScheduler(max_concurrency=4).run(tasks, execute)
+        
+        assert finished[0] == 1
+        assert finished[-1] == 4
+        assert run["skipped"] == []
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_limits_are_respected(self):
+        """Global and per-agent limits cap in-flight tasks"""
+        tasks = make_tasks({i: [] for i in range(1, 7)})
+        tasks[0]["agent_type"] = "qa"
+        in_flight = {"now": 0, "peak": 0}
+        
+        async def execute(task):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+        
+        await DAGScheduler(max_concurrency=4, agent_limits={"code_executor": 2}).run(tasks, execute)
+        
+        # Two code_executor slots plus the single qa task
+        assert in_flight["peak"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_dependents_of_failed_task_are_skipped(self):
+        """Failure propagates to transitive dependents only"""
+        tasks = make_tasks({1: [], 2: [1], 3: [2], 4: []})
+        
+        async def execute(task):
+            return task["id"] != 1
+        
+        run = await DAGScheduler().run(tasks, execute, is_success=lambda ok: ok)
+        
+        assert [(entry["task_id"], entry["skipped"]) for entry in run["results"]] == [
+            (1, False), (2, True), (3, True), (4, False)
+        ]
+        assert run["skipped"] == [2, 3]
+    
+    @pytest.mark.asyncio
+    async def test_exceptions_become_failed_results(self):
+        """A raising task is recorded as a failure"""
+        tasks = make_tasks({1: [], 2: [1]})
+        
+        async def execute(task):
+            raise RuntimeError("boom")
+        
+        run = await DAGScheduler().run(tasks, execute)
+        
+        assert isinstance(run["results"][0]["result"], RuntimeError)
+        assert run["skipped"] == [2]
+    
+    @pytest.mark.asyncio
+    async def test_cancel_event_stops_scheduling(self):
+        """Setting the cancel event cancels running work and starts nothing new"""
+        tasks = make_tasks({1: [], 2: [1]})
+        cancel_event = asyncio.Event()
+        started = []
+        
+        async def execute(task):
+            started.append(task["id"])
+            cancel_event.set()
+            await asyncio.sleep(10)
+        
+        run = await asyncio.wait_for(
+            DAGScheduler().run(tasks, execute, cancel_event=cancel_event), timeout=1
+        )
+        
+        assert run["cancelled"] is True
+        assert started == [1]
+    
+    @pytest.mark.asyncio
+    async def test_progress_callback_counts_tasks(self):
+        """on_task_done reports done/total for every finished task"""
+        tasks = make_tasks({1: [], 2: [], 3: [1]})
+        reports = []
+        
+        async def execute(task):
+            return True
+        
+        async def on_done(task, result, done, total):
+            reports.append((task["id"], done, total))
+        
+        await DAGScheduler().run(tasks, execute, on_task_done=on_done)
+        
+        assert [r[1] for r in reports] == [1, 2, 3]
+        assert all(r[2] == 3 for r in reports)
+    
+    @pytest.mark.asyncio
+    async def test_results_are_in_plan_order(self):
+        """Results follow the plan, not completion order"""
+        tasks = make_tasks({1: [], 2: [], 3: []})
+        
+        async def execute(task):
+            await asyncio.sleep(0.01 * (4 - task["id"]))
+            return task["id"] * 10
+        
+        run = await DAGScheduler().run(tasks, execute)
+        
+        assert run["results"] == [
+            {"task_id": 1, "result": 10, "skipped": False},
+            {"task_id": 2, "result": 20, "skipped": False},
+            {"task_id": 3, "result": 30, "skipped": False}
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_cycle_falls_back_to_plan_order(self, caplog):
+        """Cyclic plans still run, in plan order, with a warning"""
+        tasks = make_tasks({1: [], 2: [1, 3], 3: [2], 4: [3]})
+        finished = []
+        
+        async def execute(task):
+            finished.append(task["id"])
+            return True
+        
+        run = await DAGScheduler(max_concurrency=1).run(tasks, execute)
+        
+        assert finished == [1, 2, 3, 4]
+        assert run["skipped"] == []
+        assert "cycle" in caplog.text
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_are_all_run(self, caplog):
+        """Duplicate ids log a warning; dependencies refer to the first one"""
+        tasks = make_tasks({1: [], 2: [1]})
+        tasks.insert(1, {"id": 1, "title": "Duplicate", "dependencies": []})
+        finished = []
+        
+        async def execute(task):
+            await asyncio.sleep(0.02 if task["title"] == "Duplicate" else 0)
+            finished.append(task["title"])
+            return True
+        
+        run = await DAGScheduler().run(tasks, execute)
+        
+        assert [entry["task_id"] for entry in run["results"]] == [1, 1, 2]
+        assert finished.index("Task 2") < finished.index("Duplicate")
+        assert "Duplicate task ID 1" in caplog.text
@@ -0,0 +1,230 @@
+"""
+Unit tests for TestImpactAnalyzer
+Tests import-graph selection, coverage-based mapping and the full-run safety valve
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from dev_platform.agents.qa_test_agent import QATestAgent
+from dev_platform.tools.test_impact import TestImpactAnalyzer
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Small project: app package and tests importing it"""
+    app = tmp_path / "app"
+    app.mkdir()
+    (app / "__init__.py").write_text("")
+    (app / "core.py").write_text("VALUE = 1\n")
+    (app / "service.py").write_text("from .core import VALUE\n")
+    (app / "cli.py").write_text("def main():\n    from app import service\n")
+    (app / "report.py").write_text("import json\n")
+    (app / "config.yaml").write_text("a: 1\n")
+
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    (tests / "__init__.py").write_text("")
+    (tests / "conftest.py").write_text("")
+    (tests / "test_core.py").write_text("from app.core import VALUE\n")
+    (tests / "test_service.py").write_text("from app import service\n")
+    (tests / "test_cli.py").write_text("import app.cli\n")
+    (tests / "test_report.py").write_text("def test_report():\n    pass\n")
+    return tmp_path
+
+
+def make_analyzer(project, **kwargs):
+    analyzer = TestImpactAnalyzer(str(project), source_package="app", test_dir="tests", **kwargs)
+    analyzer.runs_since_full = 0
+    return analyzer
+
+
+def test_selects_transitive_importers(project):
+    analyzer = make_analyzer(project)
+
+    selection = analyzer.select_tests(["app/core.py"])
+
+    # core <- service (relative import) <- cli (function-level import)
+    assert selection["full_run"] is False
+    assert selection["tests"] == ["tests/test_cli.py", "tests/test_core.py", "tests/test_service.py"]
+
+
+def test_selects_changed_test_and_ignores_unrelated(project):
+    analyzer = make_analyzer(project)
+
+    assert analyzer.select_tests(["tests/test_report.py"])["tests"] == ["tests/test_report.py"]
+    assert analyzer.select_tests(["app/cli.py"])["tests"] == ["tests/test_cli.py"]
+    assert analyzer.select_tests(["README.md"])["tests"] == []
+
+
+def test_rename_counts_both_paths(project):
+    analyzer = make_analyzer(project)
+
+    selection = analyzer.select_tests(["app/old_cli.py -> app/cli.py"])
+
+    assert selection["changed_files"] == ["app/cli.py", "app/old_cli.py"]
+    assert selection["tests"] == ["tests/test_cli.py"]
+
+
+def test_package_init_change_impacts_all_importers(project):
+    analyzer = make_analyzer(project)
+
+    selection = analyzer.select_tests(["app/__init__.py"])
+
+    assert selection["tests"] == ["tests/test_cli.py", "tests/test_core.py", "tests/test_service.py"]
+
+
+@pytest.mark.parametrize("changed", ["tests/conftest.py", "pytest.ini", "requirements.txt", "app/config.yaml"])
+def test_infrastructure_changes_force_full_run(project, changed):
+    selection = make_analyzer(project).select_tests([changed])
+
+    assert selection["full_run"] is True
+    assert changed in selection["reason"]
+
+
+def test_full_run_every_n(project):
+    analyzer = make_analyzer(project, full_run_every=2)
+
+    assert TestImpactAnalyzer(str(project)).select_tests([])["full_run"] is True  # No history yet
+    assert analyzer.select_tests(["app/core.py"])["full_run"] is False
+    analyzer.record_run(False)
+    analyzer.record_run(False)
+    assert analyzer.select_tests(["app/core.py"])["full_run"] is True
+    analyzer.record_run(True)
+    assert analyzer.runs_since_full == 0
+    assert analyzer.select_tests(None)["full_run"] is True
+
+
+def test_coverage_contexts_add_dependencies(project):
+    coverage = pytest.importorskip("coverage")
+    data_file = str(project / ".coverage")
+    data = coverage.CoverageData(basename=data_file)
+    data.set_context("tests/test_report.py::test_report|run")
+    data.add_lines({str(project / "app" / "report.py"): [1]})
+    data.write()
+
+    analyzer = make_analyzer(project)
+    assert analyzer.update_from_coverage(data_file) == 1
+
+    assert analyzer.coverage_map == {"tests/test_report.py": ["app/report.py"]}
+    assert analyzer.select_tests(["app/report.py"])["tests"] == ["tests/test_report.py"]
+
+
+def test_state_round_trip_reuses_parsed_imports(project):
+    analyzer = make_analyzer(project)
+    analyzer.select_tests(["app/core.py"])
+
+    restored = TestImpactAnalyzer(str(project), source_package="app", state=analyzer.get_state())
+
+    assert restored._imports == analyzer._imports
+    assert restored.runs_since_full == 0
+
+
+# ===== QATestAgent integration =====
+
+@pytest.mark.asyncio
+async def test_agent_runs_only_impacted_tests():
+    agent = QATestAgent()
+    agent.test_impact_state = {"runs_since_full": 0}
+    agent._save_qa_state = MagicMock()
+    agent._run_tests_sharded_async = AsyncMock(return_value={"success": True, "total_tests": 3})
+
+    result = await agent.run_impacted_tests_async(
+        changed_files=["dev_platform/tools/test_impact.py"], shards=2
+    )
+
+    assert result["impact"]["full_run"] is False
+    assert "tests/unit/test_test_impact.py" in result["impact"]["selected_tests"]
+    args = agent._run_tests_sharded_async.call_args.args
+    assert args[0] == "impacted"
+    assert args[1] == result["impact"]["selected_tests"]
+    assert agent.test_impact_state["runs_since_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_skips_run_when_nothing_impacted():
+    agent = QATestAgent()
+    agent.test_impact_state = {"runs_since_full": 0}
+    agent._save_qa_state = MagicMock()
+    agent._run_tests_sharded_async = AsyncMock()
+    agent._get_changed_files = MagicMock(return_value=(["docs/notes.md"], None))
+
+    result = await agent.run_tests_async(impacted=True, coverage=False)
+
+    assert result["success"] is True
+    assert result["total_tests"] == 0
+    agent._run_tests_sharded_async.assert_not_called()
+
+
+def test_empty_changes_force_full_run(project):
+    selection = make_analyzer(project).select_tests([])
+
+    assert selection["full_run"] is True
+    assert selection["reason"] == "no changed files detected"
+
+
+@pytest.mark.asyncio
+async def test_agent_diffs_against_last_passing_commit():
+    agent = QATestAgent()
+    agent.test_impact_state = {"runs_since_full": 0, "last_tested_commit": "abc123"}
+    agent._save_qa_state = MagicMock()
+    agent._run_tests_sharded_async = AsyncMock(return_value={"success": True, "total_tests": 3})
+    agent._get_changed_files = MagicMock(return_value=(["dev_platform/tools/test_impact.py"], "def456"))
+
+    result = await agent.run_tests_async(impacted=True, coverage=True)
+
+    agent._get_changed_files.assert_called_once_with("abc123")
+    assert result["impact"]["full_run"] is False
+    assert agent.test_impact_state["last_tested_commit"] == "def456"
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_full_suite_without_base_commit():
+    agent = QATestAgent()
+    agent.test_impact_state = {"runs_since_full": 0}
+    agent._save_qa_state = MagicMock()
+    agent._run_tests_sharded_async = AsyncMock(return_value={"success": False, "total_tests": 3})
+    agent._get_changed_files = MagicMock(return_value=(None, "def456"))
+
+    result = await agent.run_tests_async(impacted=True, coverage=True)
+
+    assert result["impact"]["full_run"] is True
+    assert agent._run_tests_sharded_async.call_args.args[0] == "all"
+    # A failing run does not become the next base
+    assert agent.test_impact_state.get("last_tested_commit") is None
+
+
+def sharded_run(passed=3, failed=0, errors=0, timed_out=False):
+    """ShardedTestRunner.run() result"""
+    return {
+        "results": [],
+        "counts": {"passed": passed, "failed": failed, "skipped": 0, "errors": errors},
+        "failed_tests": [],
+        "passed_tests": [],
+        "file_durations": {},
+        "coverage": None,
+        "duration": 1.0,
+        "shards": 2,
+        "timed_out": timed_out,
+        "stopped_early": False
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("run, advances", [
+    (sharded_run(), True),
+    (sharded_run(failed=1), False),
+    (sharded_run(errors=1), False),
+    (sharded_run(timed_out=True), False),
+])
+async def test_only_clean_sharded_run_becomes_base(run, advances):
+    agent = QATestAgent()
+    agent.test_impact_state = {"runs_since_full": 0, "last_tested_commit": "abc123"}
+    agent._save_qa_state = MagicMock()
+    agent._get_changed_files = MagicMock(return_value=(["dev_platform/tools/test_impact.py"], "def456"))
+
+    with patch("dev_platform.tools.sharded_test_runner.ShardedTestRunner.run", AsyncMock(return_value=run)):
+        await agent.run_impacted_tests_async(shards=2)
+
+    assert agent.test_impact_state["last_tested_commit"] == ("def456" if advances else "abc123")
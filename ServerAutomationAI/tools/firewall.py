@@ -0,0 +1,120 @@
+import shutil
+import ipaddress
+import subprocess
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from tools.logger import get_logger
+
+
+class FirewallBlocker:
+    """Drops traffic from IPv4 addresses, many addresses per subprocess.
+    
+    The ipset backend keeps blocked addresses in one hash:ip set matched by
+    a single iptables rule; a batch is one `ipset restore` (entries expire
+    after timeout_seconds, 0 = permanent). The iptables backend appends one
+    permanent DROP rule per address through one `iptables-restore --noflush`.
+    """
+    
+    MAX_IPSET_TIMEOUT = 2147483
+    
+    def __init__(self, backend: str = 'auto', set_name: str = 'ai_blocked_ips', timeout_seconds: int = 0,
+                 use_sudo: bool = True, command_timeout: int = 30):
+        self.logger = get_logger('firewall')
+        if backend == 'auto':
+            backend = 'ipset' if shutil.which('ipset') else 'iptables'
+        self.backend = backend
+        self.set_name = set_name
+        self.timeout_seconds = min(max(0, int(timeout_seconds)), self.MAX_IPSET_TIMEOUT)
+        self.sudo = ['sudo'] if use_sudo else []
+        self.command_timeout = command_timeout
+        self._ready = False
+    
+    @property
+    def expires(self) -> bool:
+        """Whether blocks are removed by the firewall after timeout_seconds"""
+        return self.backend == 'ipset' and self.timeout_seconds > 0
+    
+    def _run(self, args: List[str], stdin: Optional[str] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            self.sudo + args,
+            input=stdin,
+            capture_output=True,
+            text=True,
+            timeout=self.command_timeout
+        )
+    
+    @staticmethod
+    def valid_addresses(ips: Iterable[str]) -> Tuple[List[str], List[str]]:
+        valid, invalid = [], []
+        for ip in ips:
+            try:
+                valid.append(str(ipaddress.IPv4Address(ip)))
+            except ValueError:
+                invalid.append(ip)
+        return valid, invalid
+    
+    def _ensure_ipset(self) -> bool:
+        if self._ready:
+            return True
+        create = ['ipset', '-exist', 'create', self.set_name, 'hash:ip']
+        if self.timeout_seconds:
+            create += ['timeout', str(self.timeout_seconds)]
+        result = self._run(create)
+        if result.returncode != 0:
+            self.logger.error(f"Could not create ipset {self.set_name}: {result.stderr.strip()}")
+            return False
+        
+        rule = ['INPUT', '-m', 'set', '--match-set', self.set_name, 'src', '-j', 'DROP']
+        if self._run(['iptables', '-C'] + rule).returncode != 0:
+            result = self._run(['iptables', '-I'] + rule)
+            if result.returncode != 0:
+                self.logger.error(f"Could not add iptables rule for ipset {self.set_name}: {result.stderr.strip()}")
+                return False
+        self._ready = True
+        return True
+    
+    def _existing_iptables_drops(self) -> Set[str]:
+        result = self._run(['iptables-save', '-t', 'filter'])
+        existing = set()
+        if result.returncode != 0:
+            return existing
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if parts[:2] == ['-A', 'INPUT'] and parts[2:3] == ['-s'] and parts[4:] == ['-j', 'DROP']:
+                existing.add(parts[3].split('/')[0])
+        return existing
+    
+    def block(self, ips: Iterable[str], timeouts: Optional[Dict[str, int]] = None) -> Tuple[List[str], List[str]]:
+        """Blocks addresses; returns (blocked, failed).
+        
+        timeouts overrides timeout_seconds per address (e.g. the time left
+        on a block being restored) when blocks expire.
+        """
+        valid, failed = self.valid_addresses(ips)
+        if not valid:
+            return [], failed
+        try:
+            if self.backend == 'ipset':
+                if not self._ensure_ipset():
+                    return [], failed + valid
+                timeouts = timeouts or {}
+                script = ''.join(
+                    f"add {self.set_name} {ip} timeout {min(timeouts.get(ip, self.timeout_seconds), self.MAX_IPSET_TIMEOUT)}\n"
+                    if self.timeout_seconds else f"add {self.set_name} {ip}\n"
+                    for ip in valid
+                )
+                result = self._run(['ipset', '-exist', 'restore'], stdin=script)
+            else:
+                existing = self._existing_iptables_drops()
+                missing = [ip for ip in valid if ip not in existing]
+                if not missing:
+                    return valid, failed
+                rules = ''.join(f"-A INPUT -s {ip} -j DROP\n" for ip in missing)
+                result = self._run(['iptables-restore', '--noflush'], stdin=f"*filter\n{rules}COMMIT\n")
+        except (OSError, subprocess.TimeoutExpired) as e:
+            self.logger.error(f"Firewall update failed for {len(valid)} IPs: {e}")
+            return [], failed + valid
+        
+        if result.returncode != 0:
+            self.logger.error(f"Firewall update failed for {len(valid)} IPs: {result.stderr.strip()}")
+            return [], failed + valid
+        return valid, failed
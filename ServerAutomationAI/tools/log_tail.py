@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from tools.logger import get_logger
+
+
+class LogTailer:
+    """Reads only the lines appended to log files since the previous call.
+    
+    Per-file position (device, inode, byte offset, line number and a hash of
+    the first bytes) is persisted to a JSON state file, so restarts resume
+    where they stopped. Rotation (new inode at the same path) and truncation
+    (smaller size, or different first bytes once the file has grown back)
+    are detected; the unread end of a file rotated to "<path>.1" is read
+    before the new file.
+    """
+    
+    FINGERPRINT_SIZE = 256
+    
+    def __init__(self, state_file: str, chunk_size: int = 1024 * 1024,
+                 max_bytes_per_read: int = 16 * 1024 * 1024, initial_backlog: int = 64 * 1024,
+                 max_line_length: int = 64 * 1024):
+        self.logger = get_logger('log_tail')
+        self.state_file = Path(state_file)
+        self.chunk_size = chunk_size
+        self.max_bytes_per_read = max_bytes_per_read
+        self.initial_backlog = initial_backlog
+        self.max_line_length = max_line_length
+        
+        self.positions: Dict[str, Dict] = self._load_state()
+        self._dirty = False
+        self._lock = threading.Lock()
+    
+    def _load_state(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load log offsets from {self.state_file}: {e}")
+            return {}
+    
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.state_file.with_suffix(self.state_file.suffix + '.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.positions, f)
+                os.replace(tmp_file, self.state_file)
+                self._dirty = False
+            except OSError as e:
+                self.logger.error(f"Could not save log offsets to {self.state_file}: {e}")
+    
+    def forget_missing(self):
+        with self._lock:
+            missing = [path for path in self.positions if not os.path.exists(path)]
+            for path in missing:
+                del self.positions[path]
+            if missing:
+                self._dirty = True
+    
+    def _count_lines(self, f, end: int) -> int:
+        f.seek(0)
+        count = 0
+        remaining = end
+        while remaining > 0:
+            chunk = f.read(min(self.chunk_size, remaining))
+            if not chunk:
+                break
+            count += chunk.count(b'\n')
+            remaining -= len(chunk)
+        return count
+    
+    def _start_position(self, f, size: int) -> Tuple[int, int]:
+        # First sight of a file: only a small backlog, starting at a line boundary
+        offset = max(0, size - self.initial_backlog)
+        if offset > 0:
+            f.seek(offset - 1)
+            head = f.read(min(self.max_line_length, size - offset + 1))
+            newline = head.find(b'\n')
+            offset = offset + newline if newline != -1 else size
+        return offset, self._count_lines(f, offset)
+    
+    def _fingerprint(self, f, size: int) -> Tuple[int, str]:
+        f.seek(0)
+        head = f.read(min(size, self.FINGERPRINT_SIZE))
+        return len(head), hashlib.blake2b(head, digest_size=8).hexdigest()
+    
+    def _truncated(self, f, size: int, state: Dict) -> bool:
+        if size < state['offset']:
+            return True
+        head_size = state.get('head_size', 0)
+        if not head_size:
+            return False
+        # copytruncate followed by new writes: the size may have caught up, the first bytes have not
+        return size < head_size or self._fingerprint(f, head_size) != (head_size, state['head'])
+    
+    def _read_lines(self, f, offset: int, line_number: int, end: int) -> Iterator[Tuple[int, str, int]]:
+        # Yields (line_number, text, offset after the line); a trailing partial line is left unread
+        f.seek(offset)
+        pending = b''
+        position = offset
+        while position < end:
+            chunk = f.read(min(self.chunk_size, end - position))
+            if not chunk:
+                break
+            position += len(chunk)
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop()
+            for raw in lines:
+                offset += len(raw) + 1
+                line_number += 1
+                yield line_number, raw.decode('utf-8', errors='ignore'), offset
+            if len(pending) > self.max_line_length:
+                offset += len(pending)
+                line_number += 1
+                yield line_number, pending.decode('utf-8', errors='ignore'), offset
+                pending = b''
+    
+    def _rotated_file(self, path: str, state: Dict) -> Optional[str]:
+        candidate = f"{path}.1"
+        try:
+            stat = os.stat(candidate)
+        except OSError:
+            return None
+        if stat.st_ino == state['inode'] and stat.st_dev == state['device']:
+            return candidate
+        return None
+    
+    def read_new_lines(self, path: str) -> Iterator[Tuple[int, str]]:
+        """Yields (line_number, line) for lines appended since the last call.
+        
+        The position is committed as lines are consumed, so a caller that
+        stops early resumes after the last line it received.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        
+        state = self.positions.get(path)
+        
+        if state and (state['inode'] != stat.st_ino or state['device'] != stat.st_dev):
+            rotated = self._rotated_file(path, state)
+            if rotated:
+                try:
+                    with open(rotated, 'rb') as f:
+                        end = min(os.fstat(f.fileno()).st_size, state['offset'] + self.max_bytes_per_read)
+                        for line_number, line, _ in self._read_lines(f, state['offset'], state['line'], end):
+                            yield line_number, line
+                except OSError as e:
+                    self.logger.debug(f"Could not finish rotated log {rotated}: {e}")
+            state = {'inode': stat.st_ino, 'device': stat.st_dev, 'offset': 0, 'line': 0}
+        
+        try:
+            with open(path, 'rb') as f:
+                if state is None:
+                    offset, line_number = self._start_position(f, stat.st_size)
+                    state = {'inode': stat.st_ino, 'device': stat.st_dev, 'offset': offset, 'line': line_number}
+                elif self._truncated(f, stat.st_size, state):
+                    # Truncated in place (copytruncate)
+                    state = dict(state, offset=0, line=0, head_size=0)
+                
+                if state.get('head_size', 0) < min(stat.st_size, self.FINGERPRINT_SIZE):
+                    state['head_size'], state['head'] = self._fingerprint(f, stat.st_size)
+                
+                with self._lock:
+                    self.positions[path] = state
+                    self._dirty = True
+                
+                end = min(stat.st_size, state['offset'] + self.max_bytes_per_read)
+                for line_number, line, offset in self._read_lines(f, state['offset'], state['line'], end):
+                    state['offset'] = offset
+                    state['line'] = line_number
+                    yield line_number, line
+        except OSError as e:
+            self.logger.debug(f"Could not read {path}: {e}")
@@ -0,0 +1,187 @@
+import time
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+import psutil
+from tools.logger import get_logger
+from tools.metrics_store import MetricsStore
+
+
+DEFAULT_SAMPLE_INTERVAL = 1.0
+
+# Numeric snapshot fields recorded into an attached store, as "<group>.<field>"
+STORED_METRICS = (
+    ('cpu', 'percent'),
+    ('memory', 'percent'),
+    ('memory', 'used_gb'),
+    ('disk', 'percent'),
+    ('disk', 'used_gb'),
+    ('network', 'bytes_sent_mb'),
+    ('network', 'bytes_recv_mb')
+)
+
+
+class MetricsSampler:
+    """Samples system metrics on a background thread at a fixed cadence.
+    
+    CPU usage comes from psutil's non-blocking mode (the delta since the
+    previous sample), so a sample never sleeps. Each sample is published as a
+    new snapshot dict that is never mutated afterwards; readers just take the
+    current reference, without a lock and without touching psutil.
+    """
+    
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL, process_interval: float = 5.0,
+                 top_processes: int = 5, disk_path: str = '/'):
+        self.logger = get_logger('metrics_sampler')
+        self.interval = interval
+        self.process_interval = process_interval
+        self.top_processes = top_processes
+        self.disk_path = disk_path
+        
+        self.snapshot: Optional[Dict] = None
+        self.store: Optional[MetricsStore] = None
+        
+        self._processes: List[Dict] = []
+        self._last_process_sample = 0.0
+        self._last_net = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._start_lock = threading.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+    
+    def record_to(self, store: MetricsStore):
+        """Also record every sample into a metrics store"""
+        self.store = store
+    
+    def start(self):
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            # Prime the CPU counters; the first non-blocking reading is relative to this point
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None, percpu=True)
+            time.sleep(min(0.1, self.interval))
+            self.sample()
+            self._thread = threading.Thread(target=self._run, name='metrics-sampler', daemon=True)
+            self._thread.start()
+            self.logger.debug(f"Metrics sampler started (every {self.interval}s)")
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+    
+    def _run(self):
+        next_run = time.monotonic() + self.interval
+        while not self._stop_event.wait(max(0.0, next_run - time.monotonic())):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"Metrics sampling failed: {e}")
+            next_run += self.interval
+            if next_run < time.monotonic():
+                # Fell behind (suspend, overload): skip the missed ticks
+                next_run = time.monotonic() + self.interval
+    
+    def _sample_processes(self) -> List[Dict]:
+        processes = []
+        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+            info = proc.info
+            if info.get('cpu_percent') is None:
+                continue
+            processes.append({
+                'pid': info['pid'],
+                'name': info.get('name') or '',
+                'cpu_percent': info['cpu_percent'],
+                'memory_percent': round(info.get('memory_percent') or 0.0, 2)
+            })
+        processes.sort(key=lambda p: (p['cpu_percent'], p['memory_percent']), reverse=True)
+        return processes[:self.top_processes]
+    
+    def sample(self) -> Dict:
+        now = time.time()
+        cpu_percent = psutil.cpu_percent(interval=None)
+        per_cpu = psutil.cpu_percent(interval=None, percpu=True)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        net_io = psutil.net_io_counters()
+        
+        # Per-second network rates from the previous sample
+        sent_rate = recv_rate = 0.0
+        if self._last_net:
+            last_time, last_sent, last_recv = self._last_net
+            elapsed = now - last_time
+            if elapsed > 0:
+                sent_rate = max(0, net_io.bytes_sent - last_sent) / elapsed
+                recv_rate = max(0, net_io.bytes_recv - last_recv) / elapsed
+        self._last_net = (now, net_io.bytes_sent, net_io.bytes_recv)
+        
+        if self.top_processes and now - self._last_process_sample >= self.process_interval:
+            self._processes = self._sample_processes()
+            self._last_process_sample = now
+        
+        snapshot = {
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+            'epoch': now,
+            'cpu': {
+                'percent': cpu_percent,
+                'count': len(per_cpu),
+                'per_cpu': per_cpu
+            },
+            'memory': {
+                'total_gb': round(memory.total / (1024**3), 2),
+                'available_gb': round(memory.available / (1024**3), 2),
+                'used_gb': round(memory.used / (1024**3), 2),
+                'percent': memory.percent
+            },
+            'disk': {
+                'total_gb': round(disk.total / (1024**3), 2),
+                'used_gb': round(disk.used / (1024**3), 2),
+                'free_gb': round(disk.free / (1024**3), 2),
+                'percent': disk.percent
+            },
+            'network': {
+                'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
+                'bytes_recv_mb': round(net_io.bytes_recv / (1024**2), 2),
+                'packets_sent': net_io.packets_sent,
+                'packets_recv': net_io.packets_recv,
+                'sent_kb_per_sec': round(sent_rate / 1024, 2),
+                'recv_kb_per_sec': round(recv_rate / 1024, 2)
+            },
+            'processes': self._processes
+        }
+        self.snapshot = snapshot
+        
+        store = self.store
+        if store is not None:
+            store.record({
+                f"{group}.{field}": snapshot[group][field]
+                for group, field in STORED_METRICS
+            }, timestamp=now)
+        return snapshot
+    
+    def latest(self) -> Dict:
+        """Newest snapshot (starts the sampler if it is not running)"""
+        snapshot = self.snapshot
+        if snapshot is None or not self.running:
+            self.start()
+            snapshot = self.snapshot
+        return snapshot
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_metrics_sampler(interval: float = DEFAULT_SAMPLE_INTERVAL) -> MetricsSampler:
+    """Process-wide sampler; the first caller's interval wins"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler(interval)
+        return _sampler
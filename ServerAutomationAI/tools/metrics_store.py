@@ -0,0 +1,322 @@
+import os
+import sys
+import json
+import math
+import time
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from tools.logger import get_logger
+
+
+DEFAULT_STORE_PATH = './data/metrics_store.bin'
+
+# (bucket seconds, buckets kept): 1s for an hour, 1m for three days, 1h for 90 days
+DEFAULT_RESOLUTIONS = ((1, 3600), (60, 3 * 24 * 60), (3600, 90 * 24))
+
+FORMAT_VERSION = 1
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class _Rollup:
+    """Ring of fixed-size numeric arrays holding one metric at one resolution.
+    
+    A bucket lives in slot (bucket_start // resolution) % capacity; the slot's
+    start value tells whether it still holds that bucket or an older one, so
+    writes and lookups are O(1) and nothing is ever shifted or copied.
+    """
+    
+    ARRAYS = (('starts', 'q'), ('counts', 'q'), ('sums', 'd'), ('mins', 'd'), ('maxs', 'd'), ('p95s', 'd'))
+    
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.starts = array('q', [-1]) * capacity
+        self.counts = array('q', [0]) * capacity
+        self.sums = array('d', [0.0]) * capacity
+        self.mins = array('d', [0.0]) * capacity
+        self.maxs = array('d', [0.0]) * capacity
+        self.p95s = array('d', [0.0]) * capacity
+        
+        # Raw samples of the bucket still being filled
+        self.open_start = -1
+        self.open_samples = array('d')
+    
+    def add(self, timestamp: float, value: float):
+        start = int(timestamp) // self.resolution * self.resolution
+        if start > self.open_start:
+            self._close()
+            self.open_start = start
+        # A sample older than the open bucket (clock stepped back) joins the open bucket
+        self.open_samples.append(value)
+    
+    def _close(self):
+        if not self.open_samples:
+            return
+        slot = (self.open_start // self.resolution) % self.capacity
+        self.starts[slot] = self.open_start
+        self.counts[slot] = len(self.open_samples)
+        self.sums[slot] = math.fsum(self.open_samples)
+        self.mins[slot] = min(self.open_samples)
+        self.maxs[slot] = max(self.open_samples)
+        self.p95s[slot] = _percentile(self.open_samples, 0.95)
+        self.open_samples = array('d')
+    
+    def covers(self, seconds: float) -> bool:
+        return seconds <= self.resolution * self.capacity
+    
+    def buckets(self, start: float, end: float) -> Iterator[Tuple[int, int, float, float, float, float]]:
+        """Yields (bucket_start, count, sum, min, max, p95) for non-empty buckets in [start, end]."""
+        last = int(end) // self.resolution * self.resolution
+        first = max(int(start) // self.resolution * self.resolution, last - (self.capacity - 1) * self.resolution)
+        for bucket in range(first, last + 1, self.resolution):
+            if bucket == self.open_start and self.open_samples:
+                samples = self.open_samples
+                yield (bucket, len(samples), math.fsum(samples), min(samples), max(samples),
+                       _percentile(samples, 0.95))
+                continue
+            slot = (bucket // self.resolution) % self.capacity
+            if self.starts[slot] == bucket:
+                yield (bucket, self.counts[slot], self.sums[slot], self.mins[slot], self.maxs[slot],
+                       self.p95s[slot])
+
+
+class MetricsStore:
+    """Multi-resolution time-series store for numeric metrics.
+    
+    Each metric is kept as 1s/1m/1h rollups (count, sum, min, max, p95 per
+    bucket) in preallocated arrays, so memory and file size are fixed by the
+    resolutions rather than by how long the process runs, and a range query
+    touches one entry per bucket. The store is saved to a single binary file;
+    another process can pick up the saved state with refresh().
+    """
+    
+    def __init__(self, path: Optional[str] = DEFAULT_STORE_PATH, resolutions=DEFAULT_RESOLUTIONS):
+        self.logger = get_logger('metrics_store')
+        self.path = Path(path) if path else None
+        self.resolutions = tuple(sorted((int(resolution), int(capacity)) for resolution, capacity in resolutions))
+        
+        self.series: Dict[str, List[_Rollup]] = {}
+        self.latest: Dict[str, Tuple[float, float]] = {}
+        self._dirty = False
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+        
+        if self.path:
+            self._load()
+    
+    def record(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """Adds one sample per metric (values keyed by metric name)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+                value = float(value)
+                rollups = self.series.get(name)
+                if rollups is None:
+                    rollups = self.series[name] = [_Rollup(res, cap) for res, cap in self.resolutions]
+                for rollup in rollups:
+                    rollup.add(timestamp, value)
+                self.latest[name] = (timestamp, value)
+            self._dirty = True
+    
+    def metrics(self) -> List[str]:
+        with self._lock:
+            return sorted(self.series)
+    
+    def latest_value(self, name: str) -> Optional[Tuple[float, float]]:
+        """(timestamp, value) of the newest sample of a metric."""
+        with self._lock:
+            return self.latest.get(name)
+    
+    def _pick_rollup(self, rollups: List[_Rollup], start: float, end: float, now: float,
+                     max_points: Optional[int]) -> _Rollup:
+        for rollup in rollups:
+            if not rollup.covers(now - start):
+                continue
+            if max_points and (end - start) / rollup.resolution > max_points:
+                continue
+            return rollup
+        return rollups[-1]
+    
+    def query(self, name: str, start: float, end: Optional[float] = None,
+              max_points: Optional[int] = None) -> Dict:
+        """Buckets of a metric between start and end (epoch seconds).
+        
+        Uses the finest resolution that still holds start and returns at most
+        max_points buckets.
+        """
+        now = time.time()
+        end = now if end is None else end
+        with self._lock:
+            rollups = self.series.get(name)
+            if not rollups:
+                return {'metric': name, 'resolution': None, 'points': []}
+            rollup = self._pick_rollup(rollups, start, end, max(now, end), max_points)
+            points = [
+                {
+                    'timestamp': bucket,
+                    'count': count,
+                    'avg': total / count,
+                    'min': low,
+                    'max': high,
+                    'p95': p95
+                }
+                for bucket, count, total, low, high, p95 in rollup.buckets(start, end)
+            ]
+        return {'metric': name, 'resolution': rollup.resolution, 'points': points}
+    
+    def summary(self, name: str, seconds: float, end: Optional[float] = None) -> Optional[Dict]:
+        """min/max/avg/p95 of a metric over the last `seconds`.
+        
+        p95 is taken over the bucket p95s weighted by sample count, which is
+        exact when buckets hold single samples and an estimate otherwise.
+        """
+        now = time.time()
+        end = now if end is None else end
+        start = end - seconds
+        with self._lock:
+            rollups = self.series.get(name)
+            if not rollups:
+                return None
+            rollup = self._pick_rollup(rollups, start, end, max(now, end), None)
+            # The bucket holding `start` lies (mostly) before the window
+            buckets = list(rollup.buckets(min(start + rollup.resolution, end), end))
+        if not buckets:
+            return None
+        
+        samples = sum(bucket[1] for bucket in buckets)
+        weighted = sorted((bucket[5], bucket[1]) for bucket in buckets)
+        threshold = 0.95 * samples
+        seen = 0
+        for p95, count in weighted:
+            seen += count
+            if seen >= threshold:
+                break
+        return {
+            'avg': math.fsum(bucket[2] for bucket in buckets) / samples,
+            'min': min(bucket[3] for bucket in buckets),
+            'max': max(bucket[4] for bucket in buckets),
+            'p95': p95,
+            'samples': samples
+        }
+    
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            header = {
+                'version': FORMAT_VERSION,
+                'byteorder': sys.byteorder,
+                'resolutions': [list(level) for level in self.resolutions],
+                'series': [
+                    {
+                        'name': name,
+                        'latest': list(self.latest[name]) if name in self.latest else None,
+                        'open': [[rollup.open_start, len(rollup.open_samples)] for rollup in rollups]
+                    }
+                    for name, rollups in self.series.items()
+                ]
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.path.with_suffix(self.path.suffix + '.tmp')
+                with open(tmp_file, 'wb') as f:
+                    f.write(json.dumps(header).encode('utf-8') + b'\n')
+                    for rollups in self.series.values():
+                        for rollup in rollups:
+                            for attr, _ in _Rollup.ARRAYS:
+                                getattr(rollup, attr).tofile(f)
+                            rollup.open_samples.tofile(f)
+                os.replace(tmp_file, self.path)
+                self._loaded_mtime = os.stat(self.path).st_mtime_ns
+                self._dirty = False
+            except OSError as e:
+                self.logger.error(f"Could not save metrics to {self.path}: {e}")
+    
+    def refresh(self) -> bool:
+        """Reloads the file if another process saved it since (unsaved local samples win)."""
+        if not self.path:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        with self._lock:
+            if self._dirty or mtime == self._loaded_mtime:
+                return False
+        return self._load()
+    
+    def _load(self) -> bool:
+        try:
+            with open(self.path, 'rb') as f:
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+                header = json.loads(f.readline())
+                data = memoryview(f.read())
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load metrics from {self.path}: {e}")
+            return False
+        
+        resolutions = tuple(tuple(level) for level in header.get('resolutions', []))
+        if (header.get('version') != FORMAT_VERSION or header.get('byteorder') != sys.byteorder
+                or resolutions != self.resolutions):
+            self.logger.warning(f"Ignoring metrics file {self.path}: saved with a different layout")
+            return False
+        
+        series: Dict[str, List[_Rollup]] = {}
+        latest: Dict[str, Tuple[float, float]] = {}
+        position = 0
+        try:
+            for entry in header['series']:
+                rollups = []
+                for (resolution, capacity), (open_start, open_count) in zip(self.resolutions, entry['open']):
+                    rollup = _Rollup(resolution, capacity)
+                    for attr, typecode in _Rollup.ARRAYS:
+                        values = array(typecode)
+                        size = capacity * values.itemsize
+                        values.frombytes(data[position:position + size])
+                        position += size
+                        setattr(rollup, attr, values)
+                    size = open_count * rollup.open_samples.itemsize
+                    rollup.open_samples.frombytes(data[position:position + size])
+                    position += size
+                    rollup.open_start = open_start
+                    rollups.append(rollup)
+                series[entry['name']] = rollups
+                if entry.get('latest'):
+                    latest[entry['name']] = tuple(entry['latest'])
+            if position != len(data):
+                raise ValueError(f"expected {position} bytes of data, found {len(data)}")
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Could not load metrics from {self.path}: {e}")
+            return False
+        
+        with self._lock:
+            self.series = series
+            self.latest = latest
+            self._loaded_mtime = mtime
+            self._dirty = False
+        return True
+
+
+_stores: Dict[str, MetricsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_metrics_store(path: str = DEFAULT_STORE_PATH) -> MetricsStore:
+    """Shared MetricsStore for a file, so every component in a process uses the same arrays."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = MetricsStore(path)
+        return _stores[key]
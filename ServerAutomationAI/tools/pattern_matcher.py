@@ -0,0 +1,109 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+class PatternMatch(NamedTuple):
+    name: str
+    pattern: str
+    groups: tuple
+    match: re.Match
+
+
+class PatternMatcher:
+    """Matches a set of named regexes against lines with a literal prefilter.
+    
+    Every pattern is compiled once. For each pattern the longest literal it
+    requires (e.g. "failed password" in r"Failed password for (\\w+)") is
+    extracted; a line is only run through the regexes whose literal occurs
+    in it, so the common case (a line matching nothing) costs a few
+    substring searches instead of one regex search per pattern.
+    """
+    
+    MIN_LITERAL_LENGTH = 3
+    
+    def __init__(self, patterns: Iterable[Tuple[str, str]], flags: int = 0):
+        """patterns: (name, regex) pairs, in priority order."""
+        self.entries: List[Tuple[str, str, re.Pattern]] = []
+        self._by_literal: Dict[str, Set[int]] = {}
+        self._always: List[int] = []  # Patterns without a usable literal
+        
+        for index, (name, pattern) in enumerate(patterns):
+            self.entries.append((name, pattern, re.compile(pattern, flags)))
+            literals = self.required_literals(pattern, flags)
+            if literals is None:
+                self._always.append(index)
+            else:
+                for literal in literals:
+                    self._by_literal.setdefault(literal, set()).add(index)
+    
+    @classmethod
+    def required_literals(cls, pattern: str, flags: int = 0) -> Optional[List[str]]:
+        """Casefolded literals of which every match contains at least one (None if unknown)."""
+        try:
+            parsed = sre_parse.parse(pattern, flags)
+        except re.error:
+            return None
+        return cls._sequence_literals(list(parsed))
+    
+    @classmethod
+    def _sequence_literals(cls, items) -> Optional[List[str]]:
+        # Longest run of consecutive literal characters (searching required sub-sequences too)
+        best: Optional[List[str]] = None
+        run: List[str] = []
+        
+        def consider(candidate: Optional[List[str]]):
+            nonlocal best
+            if candidate and all(len(literal) >= cls.MIN_LITERAL_LENGTH for literal in candidate):
+                if best is None or min(map(len, candidate)) > min(map(len, best)):
+                    best = candidate
+        
+        for op, av in items + [(None, None)]:
+            if op is sre_constants.LITERAL and chr(av).isascii():
+                run.append(chr(av))
+                continue
+            consider([''.join(run).casefold()])
+            run = []
+            if op is sre_constants.SUBPATTERN:
+                consider(cls._sequence_literals(list(av[-1])))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+                consider(cls._sequence_literals(list(av[2])))
+            elif op is sre_constants.BRANCH:
+                alternatives = [cls._sequence_literals(list(branch)) for branch in av[1]]
+                if all(alternatives):
+                    consider(sorted({literal for literals in alternatives for literal in literals}))
+        return best
+    
+    def _candidates(self, line: str) -> List[int]:
+        if not line.isascii():
+            # Case folding of non-ASCII text differs from re.IGNORECASE; check everything
+            return list(range(len(self.entries)))
+        folded = line.casefold()
+        hits = [indexes for literal, indexes in self._by_literal.items() if literal in folded]
+        if not hits:
+            return self._always
+        return sorted(set(self._always).union(*hits))
+    
+    def match_all(self, line: str) -> List[PatternMatch]:
+        """Every pattern that matches the line, in priority order."""
+        matches = []
+        for index in self._candidates(line):
+            name, pattern, compiled = self.entries[index]
+            m = compiled.search(line)
+            if m:
+                matches.append(PatternMatch(name, pattern, m.groups(), m))
+        return matches
+    
+    def match_first(self, line: str) -> Optional[PatternMatch]:
+        """The first pattern (in priority order) that matches the line."""
+        for index in self._candidates(line):
+            name, pattern, compiled = self.entries[index]
+            m = compiled.search(line)
+            if m:
+                return PatternMatch(name, pattern, m.groups(), m)
+        return None
@@ -0,0 +1,162 @@
+import time
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+
+
+class _KeyWindow:
+    __slots__ = ('counts', 'last_bucket', 'total', 'since_bucket')
+    
+    def __init__(self, buckets: int, bucket: int):
+        self.counts = array('I', [0]) * buckets
+        self.last_bucket = bucket
+        self.total = 0
+        self.since_bucket = bucket
+
+
+class CountMinSketch:
+    """Sliding-window count-min sketch: one counter table per time bucket.
+    
+    Estimates never under-count, so a key that fell out of the exact table
+    still reaches its threshold. Over-counting grows with events / width,
+    so size width well above the event volume per window.
+    """
+    
+    def __init__(self, width: int, depth: int, buckets: int):
+        self.width = width
+        self.depth = depth
+        self.buckets = buckets
+        self.tables = [array('I', [0]) * (width * depth) for _ in range(buckets)]
+        self.table_bucket = [-1] * buckets
+    
+    def _cells(self, key: Hashable) -> List[int]:
+        digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=8 * self.depth).digest()
+        return [
+            row * self.width + int.from_bytes(digest[row * 8:row * 8 + 8], 'little') % self.width
+            for row in range(self.depth)
+        ]
+    
+    def _table(self, bucket: int) -> array:
+        slot = bucket % self.buckets
+        if self.table_bucket[slot] != bucket:
+            self.tables[slot] = array('I', [0]) * (self.width * self.depth)
+            self.table_bucket[slot] = bucket
+        return self.tables[slot]
+    
+    def add(self, key: Hashable, bucket: int, count: int = 1):
+        table = self._table(bucket)
+        for cell in self._cells(key):
+            table[cell] += count
+    
+    def estimate(self, key: Hashable, bucket: int) -> int:
+        cells = self._cells(key)
+        live = [
+            self.tables[slot] for slot in range(self.buckets)
+            if 0 <= bucket - self.table_bucket[slot] < self.buckets
+        ]
+        return min(sum(table[cell] for table in live) for cell in cells)
+
+
+class SlidingWindowCounter:
+    """Counts events per key over a sliding time window with bounded memory.
+    
+    The window is split into fixed buckets; each tracked key holds one
+    counter per bucket plus a running total, so add() and count() are O(1)
+    (expired buckets are zeroed as time moves on, at most once per bucket).
+    At most max_keys keys are tracked, least recently updated evicted first.
+    With sketch_width > 0 every event is also added to a count-min sketch,
+    and keys tracked for less than the window fall back to its estimate.
+    """
+    
+    def __init__(self, window_seconds: float, buckets: int = 30, max_keys: int = 10000,
+                 sketch_width: int = 0, sketch_depth: int = 4):
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.max_keys = max_keys
+        self.keys: 'OrderedDict[Hashable, _KeyWindow]' = OrderedDict()
+        self.evictions = 0
+        self.sketch = CountMinSketch(sketch_width, sketch_depth, buckets) if sketch_width > 0 else None
+    
+    def _bucket(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+    
+    def _advance(self, window: _KeyWindow, bucket: int):
+        elapsed = bucket - window.last_bucket
+        if elapsed <= 0:
+            return
+        if elapsed >= self.buckets:
+            for i in range(self.buckets):
+                window.counts[i] = 0
+            window.total = 0
+        else:
+            for b in range(window.last_bucket + 1, bucket + 1):
+                slot = b % self.buckets
+                window.total -= window.counts[slot]
+                window.counts[slot] = 0
+        window.last_bucket = bucket
+    
+    def add(self, key: Hashable, now: Optional[float] = None, count: int = 1) -> int:
+        """Records count events for key; returns the key's count in the window."""
+        bucket = self._bucket(now)
+        window = self.keys.get(key)
+        if window is None:
+            window = self.keys[key] = _KeyWindow(self.buckets, bucket)
+            if len(self.keys) > self.max_keys:
+                self.keys.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.keys.move_to_end(key)
+            # An event older than the key's newest (clock stepped back) counts as newest
+            bucket = max(bucket, window.last_bucket)
+            self._advance(window, bucket)
+        
+        window.counts[bucket % self.buckets] += count
+        window.total += count
+        
+        if self.sketch is None:
+            return window.total
+        self.sketch.add(key, bucket, count)
+        if bucket - window.since_bucket >= self.buckets:
+            return window.total
+        return max(window.total, self.sketch.estimate(key, bucket))
+    
+    def count(self, key: Hashable, now: Optional[float] = None) -> int:
+        """The key's count in the window (read-only; the LRU order is untouched)."""
+        bucket = self._bucket(now)
+        window = self.keys.get(key)
+        if window is None:
+            return self.sketch.estimate(key, bucket) if self.sketch else 0
+        elapsed = bucket - window.last_bucket
+        if elapsed >= self.buckets:
+            total = 0
+        else:
+            total = window.total - sum(
+                window.counts[b % self.buckets] for b in range(window.last_bucket + 1, bucket + 1)
+            )
+        if self.sketch and bucket - window.since_bucket < self.buckets:
+            return max(total, self.sketch.estimate(key, bucket))
+        return total
+    
+    def discard(self, key: Hashable):
+        self.keys.pop(key, None)
+    
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drops keys with no events in the window; returns how many."""
+        bucket = self._bucket(now)
+        expired = 0
+        # Least recently updated keys come first
+        while self.keys:
+            key, window = next(iter(self.keys.items()))
+            if bucket - window.last_bucket < self.buckets:
+                break
+            del self.keys[key]
+            expired += 1
+        return expired
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def __iter__(self):
+        return iter(self.keys)